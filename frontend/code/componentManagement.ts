@@ -21,6 +21,7 @@ import { HtmlComponent } from './components/html';
 import { IconComponent } from './components/icon';
 import { ImageComponent } from './components/image';
 import { KeyEventListenerComponent } from './components/keyEventListener';
+import { LazyComponent } from './components/lazy';
 import { LinkComponent } from './components/link';
 import { ListViewComponent } from './components/listView';
 import { MarginComponent } from './components/margin';
@@ -55,6 +56,7 @@ import { TextInputComponent } from './components/textInput';
 import { ThemeContextSwitcherComponent } from './components/themeContextSwitcher';
 import { TooltipComponent } from './components/tooltip';
 import { updateLayout } from './layouting';
+import { VirtualListViewComponent } from './components/virtualListView';
 
 const COMPONENT_CLASSES = {
     'Align-builtin': AlignComponent,
@@ -78,6 +80,7 @@ const COMPONENT_CLASSES = {
     'Icon-builtin': IconComponent,
     'Image-builtin': ImageComponent,
     'KeyEventListener-builtin': KeyEventListenerComponent,
+    'Lazy-builtin': LazyComponent,
     'Link-builtin': LinkComponent,
     'ListView-builtin': ListViewComponent,
     'Margin-builtin': MarginComponent,
@@ -110,6 +113,7 @@ const COMPONENT_CLASSES = {
     'TextInput-builtin': TextInputComponent,
     'ThemeContextSwitcher-builtin': ThemeContextSwitcherComponent,
     'Tooltip-builtin': TooltipComponent,
+    'VirtualListView-builtin': VirtualListViewComponent,
     Placeholder: PlaceholderComponent,
 };
 
@@ -17,6 +17,9 @@ const ADDITIONAL_SPACE = (BOX_PADDING * 2 + MAIN_GAP) * 2 + ARROW_SIZE;
 export type CodeExplorerState = ComponentState & {
     _type_: 'CodeExplorer-builtin';
     source_code?: string;
+
+    // The highlighted source code, if the server has taken care of that
+    source_code_html?: string | null;
     build_result?: ComponentId;
     line_indices_to_component_keys: (string | null)[];
 };
@@ -94,11 +97,18 @@ export class CodeExplorerComponent extends ComponentBase {
     ): void {
         // Update the source
         if (deltaState.source_code !== undefined) {
-            let hlResult = hljs.highlight(deltaState.source_code, {
-                language: 'python',
-                ignoreIllegals: true,
-            });
-            this.sourceCodeElement.innerHTML = hlResult.value;
+            if (
+                deltaState.source_code_html !== undefined &&
+                deltaState.source_code_html !== null
+            ) {
+                this.sourceCodeElement.innerHTML = deltaState.source_code_html;
+            } else {
+                let hlResult = hljs.highlight(deltaState.source_code, {
+                    language: 'python',
+                    ignoreIllegals: true,
+                });
+                this.sourceCodeElement.innerHTML = hlResult.value;
+            }
 
             // Remember the dimensions now, for faster layouting
             this.sourceCodeDimensions = getElementDimensions(
@@ -66,6 +66,11 @@ export abstract class ComponentBase {
 
     _eventHandlers = new Set<EventHandler>();
 
+    // Messages held back by `sendThrottledMessageToBackend`, and the timeouts
+    // after which they may be sent, by key
+    private _throttledMessages = new Map<string, object>();
+    private _throttleTimeouts = new Map<string, number>();
+
     constructor(id: ComponentId, state: Required<ComponentState>) {
         this.id = id;
         this.state = state;
@@ -326,6 +331,13 @@ export abstract class ComponentBase {
         for (let handler of this._eventHandlers) {
             handler.disconnect();
         }
+
+        for (let timeout of this._throttleTimeouts.values()) {
+            clearTimeout(timeout);
+        }
+
+        this._throttleTimeouts.clear();
+        this._throttledMessages.clear();
     }
 
     /// Given a partial state update, this function updates the component's HTML
@@ -348,6 +360,64 @@ export abstract class ComponentBase {
         });
     }
 
+    /// Like `sendMessageToBackend`, but sends at most one message every
+    /// `interval` milliseconds for each `key`. Messages sent in between replace
+    /// each other, so once the interval is over only the most recent one is
+    /// sent. This is meant for high-frequency events like mouse movements,
+    /// where only the latest state matters.
+    sendThrottledMessageToBackend(
+        key: string,
+        message: object,
+        interval: number
+    ): void {
+        if (interval <= 0) {
+            this.sendMessageToBackend(message);
+            return;
+        }
+
+        // If a message was sent recently, wait for the interval to end
+        if (this._throttleTimeouts.has(key)) {
+            this._throttledMessages.set(key, message);
+            return;
+        }
+
+        this.sendMessageToBackend(message);
+        this._startThrottleInterval(key, interval);
+    }
+
+    private _startThrottleInterval(key: string, interval: number): void {
+        let timeout = window.setTimeout(() => {
+            this._throttleTimeouts.delete(key);
+
+            let message = this._throttledMessages.get(key);
+
+            if (message !== undefined) {
+                this._throttledMessages.delete(key);
+                this.sendMessageToBackend(message);
+                this._startThrottleInterval(key, interval);
+            }
+        }, interval);
+
+        this._throttleTimeouts.set(key, timeout);
+    }
+
+    /// Immediately sends all messages held back by
+    /// `sendThrottledMessageToBackend`. Call this before sending a message
+    /// which must arrive after them, e.g. the end of a drag.
+    flushThrottledMessages(): void {
+        for (let timeout of this._throttleTimeouts.values()) {
+            clearTimeout(timeout);
+        }
+
+        this._throttleTimeouts.clear();
+
+        for (let message of this._throttledMessages.values()) {
+            this.sendMessageToBackend(message);
+        }
+
+        this._throttledMessages.clear();
+    }
+
     _setStateDontNotifyBackend(deltaState: ComponentState): void {
         // Trigger an update
         this.updateElement(deltaState, null as any as Set<ComponentBase>);
@@ -8,11 +8,12 @@ import { ComponentId } from '../models';
 export type DrawerState = ComponentState & {
     _type_: 'Drawer-builtin';
     anchor?: ComponentId;
-    content?: ComponentId;
+    content?: ComponentId | null;
     side?: 'left' | 'right' | 'top' | 'bottom';
     is_modal?: boolean;
     is_open?: boolean;
     is_user_openable?: boolean;
+    mount_content?: 'always' | 'on_open' | 'while_open';
 };
 
 export class DrawerComponent extends ComponentBase {
@@ -306,23 +307,31 @@ export class DrawerComponent extends ComponentBase {
         }
     }
 
+    /// The content may not have been sent yet, if it's mounted lazily
+    private get contentInstance(): ComponentBase | null {
+        return this.state.content === null
+            ? null
+            : componentsById[this.state.content]!;
+    }
+
     updateNaturalWidth(ctx: LayoutContext): void {
         let anchorInst = componentsById[this.state.anchor]!;
-        let contentInst = componentsById[this.state.content]!;
+        let contentInst = this.contentInstance;
 
         this.naturalWidth = Math.max(
             anchorInst.requestedWidth,
-            contentInst.requestedWidth
+            contentInst === null ? 0 : contentInst.requestedWidth
         );
     }
 
     updateAllocatedWidth(ctx: LayoutContext): void {
         let anchorInst = componentsById[this.state.anchor]!;
-        let contentInst = componentsById[this.state.content]!;
+        let contentInst = this.contentInstance;
 
         anchorInst.allocatedWidth = this.allocatedWidth;
 
-        if (this.state.side === 'left' || this.state.side === 'right') {
+        if (contentInst === null) {
+        } else if (this.state.side === 'left' || this.state.side === 'right') {
             contentInst.allocatedWidth = contentInst.requestedWidth;
         } else {
             contentInst.allocatedWidth = this.allocatedWidth;
@@ -331,21 +340,22 @@ export class DrawerComponent extends ComponentBase {
 
     updateNaturalHeight(ctx: LayoutContext): void {
         let anchorInst = componentsById[this.state.anchor]!;
-        let contentInst = componentsById[this.state.content]!;
+        let contentInst = this.contentInstance;
 
         this.naturalHeight = Math.max(
             anchorInst.requestedHeight,
-            contentInst.requestedHeight
+            contentInst === null ? 0 : contentInst.requestedHeight
         );
     }
 
     updateAllocatedHeight(ctx: LayoutContext): void {
         let anchorInst = componentsById[this.state.anchor]!;
-        let contentInst = componentsById[this.state.content]!;
+        let contentInst = this.contentInstance;
 
         anchorInst.allocatedHeight = this.allocatedHeight;
 
-        if (this.state.side === 'top' || this.state.side === 'bottom') {
+        if (contentInst === null) {
+        } else if (this.state.side === 'top' || this.state.side === 'bottom') {
             contentInst.allocatedHeight = contentInst.requestedHeight;
         } else {
             contentInst.allocatedHeight = this.allocatedHeight;
@@ -20,6 +20,12 @@ export type DropdownState = ComponentState & {
     selectedName?: string;
     is_sensitive?: boolean;
     is_valid?: boolean;
+
+    // If set, `optionNames` is empty. Instead, the server is asked for the
+    // options matching the text typed by the user, and answers with
+    // `searchResults`.
+    searchOnServer?: boolean;
+    searchResults?: { query: string; names: string[] } | null;
 };
 
 export class DropdownComponent extends ComponentBase {
@@ -36,6 +42,11 @@ export class DropdownComponent extends ComponentBase {
 
     private longestOptionWidth: number = 0;
 
+    // When searching on the server, only one query is sent at a time. Any
+    // text typed in the meantime is sent once the results have arrived.
+    private isSearchPending: boolean = false;
+    private queuedQuery: string | null = null;
+
     createElement(): HTMLElement {
         // Create the elements
         let element = document.createElement('div');
@@ -101,6 +112,10 @@ export class DropdownComponent extends ComponentBase {
         // Clear the input text so that all options are shown in the dropdown
         this.inputElement.value = '';
 
+        if (this.state.searchOnServer) {
+            this.requestSearchResults();
+        }
+
         this.showPopup();
     }
 
@@ -137,7 +152,7 @@ export class DropdownComponent extends ComponentBase {
             return;
         }
 
-        if (this.state.optionNames.includes(inputText)) {
+        if (this.optionNames.includes(inputText)) {
             this.state.selectedName = inputText;
             this.sendMessageToBackend({
                 name: inputText,
@@ -234,9 +249,38 @@ export class DropdownComponent extends ComponentBase {
     }
 
     private _onInputValueChange(): void {
+        if (this.state.searchOnServer) {
+            this.requestSearchResults();
+        }
+
         this._updateOptionEntries();
     }
 
+    /// The options which may be displayed. When searching on the server, these
+    /// are the results of the most recent search.
+    private get optionNames(): string[] {
+        if (!this.state.searchOnServer) {
+            return this.state.optionNames;
+        }
+
+        return this.state.searchResults?.names ?? [];
+    }
+
+    private requestSearchResults(): void {
+        let query = this.inputElement.value;
+
+        if (this.isSearchPending) {
+            this.queuedQuery = query;
+            return;
+        }
+
+        this.isSearchPending = true;
+        this.queuedQuery = null;
+        this.sendMessageToBackend({
+            query: query,
+        });
+    }
+
     private _highlightOption(optionElement: HTMLElement | null): void {
         // Remove the highlight from the previous option
         if (this.highlightedOptionElement !== null) {
@@ -404,9 +448,15 @@ export class DropdownComponent extends ComponentBase {
         let needleLower = this.inputElement.value.toLowerCase();
 
         // Find matching options
-        for (let optionName of this.state.optionNames) {
+        for (let optionName of this.optionNames) {
             let match = this._highlightMatches(optionName, needleLower);
 
+            // Server side searches may use their own criteria, so display all
+            // of their results
+            if (match === null && this.state.searchOnServer) {
+                match = this._highlightMatches(optionName, '');
+            }
+
             if (match === null) {
                 continue;
             }
@@ -470,6 +520,23 @@ export class DropdownComponent extends ComponentBase {
             }
         }
 
+        if (deltaState.searchResults !== undefined) {
+            this.state.searchResults = deltaState.searchResults;
+            this.isSearchPending = false;
+
+            // Has the user typed something else in the meantime?
+            if (
+                this.queuedQuery !== null &&
+                this.queuedQuery !== deltaState.searchResults?.query
+            ) {
+                this.requestSearchResults();
+            }
+
+            if (this.isOpen) {
+                this._updateOptionEntries();
+            }
+        }
+
         if (deltaState.label !== undefined) {
             let labelElement = element.querySelector(
                 '.rio-input-box-label'
@@ -482,6 +549,15 @@ export class DropdownComponent extends ComponentBase {
 
         if (deltaState.selectedName !== undefined) {
             this.inputElement.value = deltaState.selectedName;
+
+            // When searching on the server the options aren't known, so at
+            // least make sure the selected one fits
+            if (deltaState.searchOnServer ?? this.state.searchOnServer) {
+                this.longestOptionWidth = Math.max(
+                    this.longestOptionWidth,
+                    getTextDimensions(deltaState.selectedName, 'text')[0]
+                );
+            }
         }
 
         if (deltaState.is_sensitive === true) {
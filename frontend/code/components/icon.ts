@@ -1,24 +1,24 @@
 import { ColorSet, Fill } from '../models';
 import { ComponentBase, ComponentState } from './componentBase';
-import { applyFillToSVG } from '../designApplication';
+import {
+    applyFillToSVG,
+    createIconElement,
+    fetchIconSource,
+    registerIcons,
+} from '../designApplication';
 import { pixelsPerRem } from '../app';
 import { LayoutContext } from '../layouting';
 
 export type IconState = ComponentState & {
     _type_: 'Icon-builtin';
-    svgSource: string;
+    iconName: string;
     fill: Fill | ColorSet | 'dim';
 };
 
-function createSVGPath(
-    div: HTMLElement,
-    svgSource: string,
+function applyFillToIcon(
+    svgRoot: SVGSVGElement,
     fill: Fill | ColorSet | 'dim'
 ): void {
-    // Create an SVG element
-    div.innerHTML = svgSource;
-    let svgRoot = div.firstChild as SVGSVGElement;
-
     // If no fill was provided, use the default foreground color.
     if (fill === 'keep') {
         svgRoot.style.fill = 'var(--rio-local-text-color)';
@@ -71,13 +71,30 @@ export class IconComponent extends ComponentBase {
         deltaState: IconState,
         latentComponents: Set<ComponentBase>
     ): void {
-        let element = this.element;
+        let iconName = deltaState.iconName ?? this.state.iconName;
+        let fill = deltaState.fill ?? this.state.fill;
+
+        // Create the SVG. The server sends each icon's source only once per
+        // session, before any components using it.
+        let svgRoot = createIconElement(iconName);
+
+        // If the icon is missing anyway (e.g. because the page was reloaded)
+        // fetch it from the server
+        if (svgRoot === null) {
+            fetchIconSource(iconName).then((svgSource) => {
+                if (this.state.iconName === iconName) {
+                    registerIcons({ [iconName]: svgSource });
+                    this.updateElement({} as IconState, latentComponents);
+                }
+            });
+            return;
+        }
 
-        // Remove all children
+        let element = this.element;
         element.innerHTML = '';
+        element.appendChild(svgRoot);
 
-        // Add the SVG
-        createSVGPath(element, deltaState.svgSource, deltaState.fill);
+        applyFillToIcon(svgRoot, fill);
 
         // Update the SVG's size
         requestAnimationFrame(() => {
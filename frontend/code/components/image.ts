@@ -1,3 +1,5 @@
+import { pixelsPerRem } from '../app';
+import { LayoutContext } from '../layouting';
 import { ComponentBase, ComponentState } from './componentBase';
 
 const FILL_MODE_TO_OBJECT_FIT = {
@@ -6,10 +8,19 @@ const FILL_MODE_TO_OBJECT_FIT = {
     zoom: 'cover',
 } as const;
 
+const FILL_MODE_TO_BACKGROUND_SIZE = {
+    fit: 'contain',
+    stretch: '100% 100%',
+    zoom: 'cover',
+} as const;
+
 export type ImageState = ComponentState & {
     _type_: 'Image-builtin';
     fill_mode?: keyof typeof FILL_MODE_TO_OBJECT_FIT;
     imageUrl?: string;
+    imageSrcset?: string | null;
+    loading?: 'eager' | 'lazy';
+    placeholderUrl?: string | null;
     reportError?: boolean;
     corner_radius?: [number, number, number, number];
 };
@@ -28,6 +39,14 @@ export class ImageComponent extends ComponentBase {
 
         this.imageElement.onload = () => {
             this.imageElement.classList.remove('rio-content-loading');
+
+            // The placeholder is no longer needed. Transparent images would
+            // otherwise show it through.
+            this.imageElement.style.backgroundImage = '';
+
+            // Now that the aspect ratio is known, the required width may have
+            // changed
+            this.updateSizesAttribute();
         };
         this.imageElement.onerror = this._onError.bind(this);
 
@@ -40,6 +59,33 @@ export class ImageComponent extends ComponentBase {
     ): void {
         let imgElement = this.imageElement;
 
+        // The loading mode must be set before the src, otherwise the browser
+        // may already start downloading the image
+        if (deltaState.loading !== undefined) {
+            imgElement.loading = deltaState.loading;
+        }
+
+        // The placeholder is displayed as background of the image element, so
+        // it's visible until the image has loaded. Placeholders can arrive
+        // after the image, in which case they're no longer needed.
+        let imageIsLoading =
+            !imgElement.complete ||
+            (deltaState.imageUrl !== undefined &&
+                deltaState.imageUrl !== this.state.imageUrl);
+
+        if (deltaState.placeholderUrl !== undefined) {
+            imgElement.style.backgroundImage =
+                deltaState.placeholderUrl === null || !imageIsLoading
+                    ? ''
+                    : `url('${deltaState.placeholderUrl}')`;
+        }
+
+        // The srcset must be assigned before the src, otherwise the browser
+        // may start downloading the full size image
+        if (deltaState.imageSrcset !== undefined) {
+            imgElement.srcset = deltaState.imageSrcset ?? '';
+        }
+
         if (
             deltaState.imageUrl !== undefined &&
             imgElement.src !== deltaState.imageUrl
@@ -51,6 +97,10 @@ export class ImageComponent extends ComponentBase {
         if (deltaState.fill_mode !== undefined) {
             imgElement.style.objectFit =
                 FILL_MODE_TO_OBJECT_FIT[deltaState.fill_mode];
+            imgElement.style.backgroundSize =
+                FILL_MODE_TO_BACKGROUND_SIZE[deltaState.fill_mode];
+
+            this.updateSizesAttribute();
         }
 
         if (deltaState.corner_radius !== undefined) {
@@ -61,6 +111,35 @@ export class ImageComponent extends ComponentBase {
         }
     }
 
+    updateAllocatedHeight(ctx: LayoutContext): void {
+        this.updateSizesAttribute();
+    }
+
+    /// Tells the browser how many pixels wide the image will be displayed, so
+    /// it can pick the best matching variant from the srcset.
+    private updateSizesAttribute(): void {
+        let imgElement = this.imageElement;
+
+        if (this.allocatedWidth === undefined) {
+            return;
+        }
+
+        let width = this.allocatedWidth;
+
+        // In zoom mode the image covers the entire element, so it may be
+        // displayed wider than the element itself
+        if (
+            imgElement.style.objectFit === 'cover' &&
+            imgElement.naturalWidth > 0 &&
+            imgElement.naturalHeight > 0
+        ) {
+            let aspectRatio = imgElement.naturalWidth / imgElement.naturalHeight;
+            width = Math.max(width, this.allocatedHeight * aspectRatio);
+        }
+
+        imgElement.sizes = `${Math.ceil(width * pixelsPerRem)}px`;
+    }
+
     private _onError(event: string | Event): void {
         this.imageElement.classList.remove('rio-content-loading');
 
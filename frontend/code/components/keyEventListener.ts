@@ -691,11 +691,37 @@ export type KeyEventListenerState = ComponentState & {
     reportKeyDown?: boolean;
     reportKeyUp?: boolean;
     reportKeyPress?: boolean;
+    hotkeys?: string[] | null;
 };
 
+/// Returns the ways the event could be written as a hotkey, i.e. all of its
+/// modifiers, in a fixed order, followed by either the software or hardware key
+function encodeHotkeys(event: EncodedEvent): string[] {
+    let modifiers = (['control', 'shift', 'alt', 'meta'] as ModifierKey[])
+        .filter((modifier) => event.modifiers.includes(modifier))
+        .map((modifier) => modifier + '+')
+        .join('');
+
+    return [
+        modifiers + event.softwareKey.toLowerCase(),
+        modifiers + event.hardwareKey,
+    ];
+}
+
 export class KeyEventListenerComponent extends SingleContainer {
     state: Required<KeyEventListenerState>;
 
+    // The key combinations to report, or `null` to report all of them
+    private hotkeys: Set<string> | null = null;
+
+    private isReported(event: EncodedEvent): boolean {
+        if (this.hotkeys === null) {
+            return true;
+        }
+
+        return encodeHotkeys(event).some((hotkey) => this.hotkeys!.has(hotkey));
+    }
+
     createElement(): HTMLElement {
         let element = document.createElement('div');
         element.tabIndex = -1; // So that it can receive keyboard events
@@ -708,6 +734,11 @@ export class KeyEventListenerComponent extends SingleContainer {
     ): void {
         let element = this.element;
 
+        if (deltaState.hotkeys !== undefined) {
+            this.hotkeys =
+                deltaState.hotkeys === null ? null : new Set(deltaState.hotkeys);
+        }
+
         let reportKeyDown = firstDefined(
             deltaState.reportKeyDown,
             this.state.reportKeyDown
@@ -725,6 +756,12 @@ export class KeyEventListenerComponent extends SingleContainer {
             element.onkeydown = (e: KeyboardEvent) => {
                 let encodedEvent = encodeEvent(e);
 
+                // Keys the app isn't interested in are never sent to the
+                // backend
+                if (!this.isReported(encodedEvent)) {
+                    return;
+                }
+
                 if (reportKeyPress) {
                     this.sendMessageToBackend({
                         type: 'KeyPress',
@@ -745,9 +782,15 @@ export class KeyEventListenerComponent extends SingleContainer {
 
         if (reportKeyUp) {
             element.onkeyup = (e: KeyboardEvent) => {
+                let encodedEvent = encodeEvent(e);
+
+                if (!this.isReported(encodedEvent)) {
+                    return;
+                }
+
                 this.sendMessageToBackend({
                     type: 'KeyUp',
-                    ...encodeEvent(e),
+                    ...encodedEvent,
                 });
             };
         } else {
@@ -0,0 +1,133 @@
+import { componentsById } from '../componentManagement';
+import { LayoutContext } from '../layouting';
+import { ComponentId } from '../models';
+import { ComponentBase, ComponentState } from './componentBase';
+import { SingleContainer } from './singleContainer';
+
+// The content is only built by the server once this component comes close to
+// the visible area. Until then, an empty placeholder of the estimated height
+// is displayed.
+export type LazyState = ComponentState & {
+    _type_: 'Lazy-builtin';
+    content?: ComponentId | null;
+    estimated_height?: number;
+    unload_when_hidden?: boolean;
+};
+
+/// How close (relative to the size of the scrolling area) the placeholder must
+/// come to the visible area for the content to be built
+const LOAD_MARGIN = '100%';
+
+/// How far away the content must be for it to be discarded again, if
+/// `unload_when_hidden` is set. This is larger than `LOAD_MARGIN` so that
+/// scrolling back and forth a little doesn't rebuild the content over and
+/// over.
+const UNLOAD_MARGIN = '300%';
+
+export class LazyComponent extends SingleContainer {
+    state: Required<LazyState>;
+
+    private loadObserver: IntersectionObserver | null = null;
+    private unloadObserver: IntersectionObserver | null = null;
+
+    // The last visibility that was reported to the server, to avoid sending
+    // the same message over and over
+    private reportedNearViewport: boolean = false;
+
+    // Once the content has been displayed, its height is remembered. If it's
+    // unloaded again, the placeholder keeps that height so that the page
+    // doesn't jump around.
+    private lastContentHeight: number | null = null;
+
+    createElement(): HTMLElement {
+        let element = document.createElement('div');
+        element.classList.add('rio-lazy');
+        return element;
+    }
+
+    updateElement(
+        deltaState: LazyState,
+        latentComponents: Set<ComponentBase>
+    ): void {
+        if (deltaState.content !== undefined) {
+            this.replaceFirstChild(latentComponents, deltaState.content);
+
+            // Whatever the server decided is now the reported state
+            this.reportedNearViewport = deltaState.content !== null;
+        }
+
+        this.makeLayoutDirty();
+    }
+
+    onDestruction(): void {
+        super.onDestruction();
+
+        this.loadObserver?.disconnect();
+        this.unloadObserver?.disconnect();
+    }
+
+    updateNaturalHeight(ctx: LayoutContext): void {
+        if (this.state.content === null) {
+            this.naturalHeight =
+                this.lastContentHeight ?? this.state.estimated_height;
+            return;
+        }
+
+        let child = componentsById[this.state.content]!;
+        this.naturalHeight = child.requestedHeight;
+        this.lastContentHeight = child.requestedHeight;
+    }
+
+    updateAllocatedHeight(ctx: LayoutContext): void {
+        super.updateAllocatedHeight(ctx);
+
+        // The element is guaranteed to be part of the DOM by now, so the
+        // scrolling element to watch can be found
+        if (this.loadObserver === null) {
+            this.createObservers();
+        }
+    }
+
+    private createObservers(): void {
+        // Observe the nearest scrolling ancestor. If there is none, the
+        // browser window is used.
+        let root =
+            this.element.parentElement?.closest(
+                '.rio-scroll-container, .rio-virtual-list-view'
+            ) ?? null;
+
+        this.loadObserver = new IntersectionObserver(
+            (entries) => {
+                if (entries[entries.length - 1].isIntersecting) {
+                    this.reportVisibility(true);
+                }
+            },
+            { root: root, rootMargin: LOAD_MARGIN }
+        );
+        this.loadObserver.observe(this.element);
+
+        this.unloadObserver = new IntersectionObserver(
+            (entries) => {
+                if (
+                    this.state.unload_when_hidden &&
+                    !entries[entries.length - 1].isIntersecting
+                ) {
+                    this.reportVisibility(false);
+                }
+            },
+            { root: root, rootMargin: UNLOAD_MARGIN }
+        );
+        this.unloadObserver.observe(this.element);
+    }
+
+    private reportVisibility(isNearViewport: boolean): void {
+        if (isNearViewport === this.reportedNearViewport) {
+            return;
+        }
+
+        this.reportedNearViewport = isNearViewport;
+        this.sendMessageToBackend({
+            isNearViewport: isNearViewport,
+        });
+    }
+}
@@ -13,15 +13,21 @@ import { applyIcon } from '../designApplication';
 
 export type MarkdownViewState = ComponentState & {
     _type_: 'MarkdownView-builtin';
-    text?: string;
+    text?: string | null;
     default_language?: null | string;
+
+    // If the Markdown was already converted on the server, this is the
+    // resulting HTML, and `text` is `null`
+    html?: string | null;
 };
 
-// Convert a Markdown string to HTML and render it in the given div.
+// Convert a Markdown string to HTML and render it in the given div. If the
+// server has already done the conversion, its HTML is used instead.
 function convertMarkdown(
-    markdownSource: string,
+    markdownSource: string | null,
     div: HTMLElement,
-    defaultLanguage: null | string
+    defaultLanguage: null | string,
+    serverHtml: string | null
 ) {
     // Drop the default language if it isn't supported or recognized
     if (
@@ -32,13 +38,26 @@ function convertMarkdown(
     }
 
     // Convert the Markdown content to HTML
-    div.innerHTML = micromark(markdownSource);
+    if (serverHtml === null) {
+        div.innerHTML = micromark(markdownSource!);
+    } else {
+        div.innerHTML = serverHtml;
+    }
 
     // Enhance code blocks
     const codeBlocks = div.querySelectorAll('pre code');
     codeBlocks.forEach((codeBlockInner) => {
         codeBlockInner = codeBlockInner as HTMLElement;
 
+        // Code blocks highlighted by the server only need to be wrapped
+        let serverLanguageName = (codeBlockInner as HTMLElement).dataset
+            .rioLanguageName;
+
+        if (serverLanguageName !== undefined) {
+            wrapCodeBlock(codeBlockInner as HTMLElement, serverLanguageName);
+            return;
+        }
+
         // Remove empty leading/trailing lines
         codeBlockInner.textContent = codeBlockInner.textContent
             ? codeBlockInner.textContent.trim()
@@ -84,59 +103,7 @@ function convertMarkdown(
         // );
         // const language = languageClass ? languageClass.replace('language-', '') : '';
 
-        // Wrap the code block. This outer element will hold additional components
-        // and styling.
-        let codeBlockOuter = document.createElement('div');
-        codeBlockOuter.classList.add('rio-markdown-code-block');
-
-        codeBlockOuter.innerHTML = `<div class="rio-markdown-code-block-header"><div class="rio-markdown-code-block-language">${
-            languageNiceName === undefined ? '' : languageNiceName
-        }</div><button class="rio-markdown-code-block-copy-button">Copy code</button></div>`;
-
-        codeBlockInner.parentNode!.insertBefore(codeBlockOuter, codeBlockInner);
-        codeBlockOuter.appendChild(codeBlockInner);
-
-        // Create a copy button
-        let copyButton = codeBlockOuter.querySelector(
-            '.rio-markdown-code-block-copy-button'
-        ) as HTMLButtonElement;
-
-        copyButton.title = 'Copy code';
-        applyIcon(
-            copyButton,
-            'material/content-copy',
-            'var(--rio-local-text-color)'
-        );
-
-        copyButton.addEventListener('click', (event) => {
-            const codeToCopy =
-                (codeBlockInner as HTMLElement).textContent ?? '';
-            const textArea = document.createElement('textarea');
-            textArea.value = codeToCopy;
-
-            document.body.appendChild(textArea);
-            textArea.select();
-            document.execCommand('copy');
-            document.body.removeChild(textArea);
-
-            copyButton.title = 'Copied!';
-            applyIcon(
-                copyButton,
-                'material/done',
-                'var(--rio-local-text-color)'
-            );
-
-            setTimeout(() => {
-                copyButton.title = 'Copy code';
-                applyIcon(
-                    copyButton,
-                    'material/content-copy',
-                    'var(--rio-local-text-color)'
-                );
-            }, 5000);
-
-            event.stopPropagation();
-        });
+        wrapCodeBlock(codeBlockInner as HTMLElement, languageNiceName);
     });
 
     // Highlight inline code
@@ -146,7 +113,9 @@ function convertMarkdown(
     //
     // TODO: What if most code blocks had the same language specified? Use the
     // same one here?
-    if (defaultLanguage !== null) {
+    //
+    // The server takes care of this itself.
+    if (defaultLanguage !== null && serverHtml === null) {
         const inlineCodeBlocks = div.querySelectorAll('code');
         inlineCodeBlocks.forEach((codeElement) => {
             let hlResult = hljs.highlight(codeElement.textContent || '', {
@@ -159,6 +128,60 @@ function convertMarkdown(
     }
 }
 
+// Wrap the code block. The outer element holds a header with the language and
+// a copy button, and takes care of styling.
+function wrapCodeBlock(
+    codeBlockInner: HTMLElement,
+    languageNiceName: string | undefined
+): void {
+    let codeBlockOuter = document.createElement('div');
+    codeBlockOuter.classList.add('rio-markdown-code-block');
+
+    codeBlockOuter.innerHTML = `<div class="rio-markdown-code-block-header"><div class="rio-markdown-code-block-language">${
+        languageNiceName === undefined ? '' : languageNiceName
+    }</div><button class="rio-markdown-code-block-copy-button">Copy code</button></div>`;
+
+    codeBlockInner.parentNode!.insertBefore(codeBlockOuter, codeBlockInner);
+    codeBlockOuter.appendChild(codeBlockInner);
+
+    // Create a copy button
+    let copyButton = codeBlockOuter.querySelector(
+        '.rio-markdown-code-block-copy-button'
+    ) as HTMLButtonElement;
+
+    copyButton.title = 'Copy code';
+    applyIcon(
+        copyButton,
+        'material/content-copy',
+        'var(--rio-local-text-color)'
+    );
+
+    copyButton.addEventListener('click', (event) => {
+        const codeToCopy = (codeBlockInner as HTMLElement).textContent ?? '';
+        const textArea = document.createElement('textarea');
+        textArea.value = codeToCopy;
+
+        document.body.appendChild(textArea);
+        textArea.select();
+        document.execCommand('copy');
+        document.body.removeChild(textArea);
+
+        copyButton.title = 'Copied!';
+        applyIcon(copyButton, 'material/done', 'var(--rio-local-text-color)');
+
+        setTimeout(() => {
+            copyButton.title = 'Copy code';
+            applyIcon(
+                copyButton,
+                'material/content-copy',
+                'var(--rio-local-text-color)'
+            );
+        }, 5000);
+
+        event.stopPropagation();
+    });
+}
+
 export class MarkdownViewComponent extends ComponentBase {
     state: Required<MarkdownViewState>;
 
@@ -178,7 +201,7 @@ export class MarkdownViewComponent extends ComponentBase {
         deltaState: MarkdownViewState,
         latentComponents: Set<ComponentBase>
     ): void {
-        if (deltaState.text !== undefined) {
+        if (deltaState.text !== undefined || deltaState.html !== undefined) {
             // Create a new div to hold the markdown content. This is so the
             // layouting code can move it around as needed.
             let defaultLanguage = firstDefined(
@@ -186,7 +209,12 @@ export class MarkdownViewComponent extends ComponentBase {
                 this.state.default_language
             );
 
-            convertMarkdown(deltaState.text, this.element, defaultLanguage);
+            convertMarkdown(
+                firstDefined(deltaState.text, this.state.text),
+                this.element,
+                defaultLanguage,
+                firstDefined(deltaState.html, this.state.html)
+            );
 
             // Update the width request
             //
@@ -582,7 +582,7 @@ export class MediaPlayerComponent extends ComponentBase {
         this._updateVolumeSliderAndIcon();
 
         if (deltaState.background !== undefined) {
-            Object.assign(this.element.style, fillToCss(deltaState.background));
+            Object.assign(this.element.style, fillToCss(deltaState.background, this.element));
         }
 
         if (deltaState.reportError !== undefined) {
@@ -55,6 +55,7 @@ export type MouseEventListenerState = ComponentState & {
     reportDragStart: boolean;
     reportDragMove: boolean;
     reportDragEnd: boolean;
+    max_events_per_second: number | null;
 };
 
 export class MouseEventListenerComponent extends SingleContainer {
@@ -62,6 +63,19 @@ export class MouseEventListenerComponent extends SingleContainer {
 
     private _dragHandler: DragHandler | null = null;
 
+    /// The minimum time between two movement messages, in milliseconds
+    private get movementInterval(): number {
+        let rate = this.state.max_events_per_second;
+        return rate === null ? 0 : 1000 / rate;
+    }
+
+    /// Sends a message, making sure any movements which are still held back
+    /// arrive before it
+    private _sendMessageInOrder(message: object): void {
+        this.flushThrottledMessages();
+        this.sendMessageToBackend(message);
+    }
+
     createElement(): HTMLElement {
         return document.createElement('div');
     }
@@ -74,7 +88,7 @@ export class MouseEventListenerComponent extends SingleContainer {
 
         if (deltaState.reportPress) {
             this.element.onclick = (e) => {
-                this.sendMessageToBackend({
+                this._sendMessageInOrder({
                     type: 'press',
                     ...eventMouseButtonToString(e),
                     ...eventMousePositionToString(e),
@@ -86,7 +100,7 @@ export class MouseEventListenerComponent extends SingleContainer {
 
         if (deltaState.reportMouseDown) {
             this.element.onmousedown = (e) => {
-                this.sendMessageToBackend({
+                this._sendMessageInOrder({
                     type: 'mouseDown',
                     ...eventMouseButtonToString(e),
                     ...eventMousePositionToString(e),
@@ -98,7 +112,7 @@ export class MouseEventListenerComponent extends SingleContainer {
 
         if (deltaState.reportMouseUp) {
             this.element.onmouseup = (e) => {
-                this.sendMessageToBackend({
+                this._sendMessageInOrder({
                     type: 'mouseUp',
                     ...eventMouseButtonToString(e),
                     ...eventMousePositionToString(e),
@@ -110,10 +124,14 @@ export class MouseEventListenerComponent extends SingleContainer {
 
         if (deltaState.reportMouseMove) {
             this.element.onmousemove = (e) => {
-                this.sendMessageToBackend({
-                    type: 'mouseMove',
-                    ...eventMousePositionToString(e),
-                });
+                this.sendThrottledMessageToBackend(
+                    'mouseMove',
+                    {
+                        type: 'mouseMove',
+                        ...eventMousePositionToString(e),
+                    },
+                    this.movementInterval
+                );
             };
         } else {
             this.element.onmousemove = null;
@@ -121,7 +139,7 @@ export class MouseEventListenerComponent extends SingleContainer {
 
         if (deltaState.reportMouseEnter) {
             this.element.onmouseenter = (e) => {
-                this.sendMessageToBackend({
+                this._sendMessageInOrder({
                     type: 'mouseEnter',
                     ...eventMousePositionToString(e),
                 });
@@ -132,7 +150,7 @@ export class MouseEventListenerComponent extends SingleContainer {
 
         if (deltaState.reportMouseLeave) {
             this.element.onmouseleave = (e) => {
-                this.sendMessageToBackend({
+                this._sendMessageInOrder({
                     type: 'mouseLeave',
                     ...eventMousePositionToString(e),
                 });
@@ -182,12 +200,22 @@ export class MouseEventListenerComponent extends SingleContainer {
     }
 
     private _sendDragEvent(eventType: string, event: MouseEvent): void {
-        this.sendMessageToBackend({
+        let message = {
             type: eventType,
             ...eventMouseButtonToString(event),
             x: event.clientX / pixelsPerRem,
             y: event.clientY / pixelsPerRem,
             component: findComponentUnderMouse(event),
-        });
+        };
+
+        if (eventType === 'dragMove') {
+            this.sendThrottledMessageToBackend(
+                eventType,
+                message,
+                this.movementInterval
+            );
+        } else {
+            this._sendMessageInOrder(message);
+        }
     }
 }
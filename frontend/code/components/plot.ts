@@ -2,25 +2,62 @@ import { pixelsPerRem } from '../app';
 import { fillToCss } from '../cssUtils';
 import { LayoutContext } from '../layouting';
 import { Fill } from '../models';
+import { decodeTypedArray, isEncodedTypedArray } from '../utils';
 import { ComponentBase, ComponentState } from './componentBase';
 
 type PlotlyPlot = {
     type: 'plotly';
+    version: number;
+    json: string;
+};
+
+// Changes to the previously sent plotly figure, which turn the plot with
+// version `baseVersion` into the one with `version`
+type PlotlyUpdate = {
+    type: 'plotly-update';
+    baseVersion: number;
+    version: number;
     json: string;
 };
 
 type MatplotlibPlot = {
     type: 'matplotlib';
+    version: number;
     svg: string;
 };
 
+// The figure is the same one that was sent last time
+type UnchangedPlot = {
+    type: 'unchanged';
+    version: number;
+};
+
+// The figure is still being rendered on the server. The previous one remains
+// visible until then.
+type PendingPlot = {
+    type: 'pending';
+};
+
 type PlotState = ComponentState & {
     _type_: 'Plot-builtin';
-    plot: PlotlyPlot | MatplotlibPlot;
+    plot:
+        | PlotlyPlot
+        | PlotlyUpdate
+        | MatplotlibPlot
+        | UnchangedPlot
+        | PendingPlot;
     background: Fill | null;
     corner_radius?: [number, number, number, number];
+    downsampling?: 'none' | 'lttb' | 'min-max';
 };
 
+type AxisRange = [number, number] | null;
+
+/// The plot is only reported as resized once its width has changed by this
+/// factor. Resizing a downsampled plot makes the server send a new figure, so
+/// this shouldn't happen for every single pixel.
+const RESIZE_REPORT_THRESHOLD = 1.25;
+
 let fetchPlotlyPromise: Promise<void> | null = null;
 
 function withPlotly(callback: () => void): void {
@@ -49,9 +86,70 @@ function withPlotly(callback: () => void): void {
     }).then(callback);
 }
 
+/// Replaces the binary arrays in a plotly trace with typed arrays. Plotly.js
+/// can read the binary format itself, but it can only append points to
+/// actual arrays.
+function decodeTraceArrays(trace: object): object {
+    for (let [key, value] of Object.entries(trace)) {
+        if (isEncodedTypedArray(value) && value['shape'] === undefined) {
+            let decoded = decodeTypedArray(value);
+
+            // Plotly can't handle 64 bit integers, so leave those alone
+            if (
+                !(decoded instanceof BigInt64Array) &&
+                !(decoded instanceof BigUint64Array)
+            ) {
+                trace[key] = decoded;
+            }
+        }
+    }
+
+    return trace;
+}
+
+/// Extracts the new range of an axis from a `plotly_relayout` event. Returns
+/// `previous` if the axis wasn't changed, and `null` if the axis was reset, or
+/// isn't numeric.
+function parseAxisRange(
+    event: object,
+    axis: string,
+    previous: AxisRange
+): AxisRange {
+    let range: any[];
+
+    if (event[`${axis}.autorange`] === true) {
+        return null;
+    } else if (event[`${axis}.range[0]`] !== undefined) {
+        range = [event[`${axis}.range[0]`], event[`${axis}.range[1]`]];
+    } else if (event[`${axis}.range`] !== undefined) {
+        range = event[`${axis}.range`];
+    } else {
+        return previous;
+    }
+
+    if (typeof range[0] !== 'number' || typeof range[1] !== 'number') {
+        return null;
+    }
+
+    return [range[0], range[1]];
+}
+
 export class PlotComponent extends ComponentBase {
     state: Required<PlotState>;
 
+    // The version of the figure currently displayed. Updates only apply to
+    // the version they were computed for.
+    private plotVersion: number = 0;
+
+    // The kind of plot currently displayed
+    private plotType: 'plotly' | 'matplotlib' | null = null;
+
+    // The size and zoom last reported to the server. Until the first report,
+    // the server assumes a width of 1000 pixels.
+    private reportedWidth: number = 1000;
+    private reportedXRange: AxisRange = null;
+    private reportedYRange: AxisRange = null;
+
     createElement(): HTMLElement {
         let element = document.createElement('div');
         element.classList.add('rio-plot');
@@ -63,40 +161,13 @@ export class PlotComponent extends ComponentBase {
         latentComponents: Set<ComponentBase>
     ): void {
         if (deltaState.plot !== undefined) {
-            this.element.innerHTML = '';
-
-            // Plotly
-            if (deltaState.plot.type === 'plotly') {
-                let plot = deltaState.plot;
-
-                withPlotly(() => {
-                    let plotJson = JSON.parse(plot.json);
-                    window['Plotly'].newPlot(
-                        this.element,
-                        plotJson.data,
-                        plotJson.layout
-                    );
-
-                    this.updatePlotlyLayout();
-                });
-            }
-            // Matplotlib (Just a SVG)
-            else {
-                this.element.innerHTML = deltaState.plot.svg;
-
-                let svgElement = this.element.querySelector(
-                    'svg'
-                ) as SVGElement;
-
-                svgElement.style.width = '100%';
-                svgElement.style.height = '100%';
-            }
+            this.updatePlot(deltaState.plot);
         }
 
         if (deltaState.background === null) {
             this.element.style.background = 'var(--rio-local-plain-bg-variant)';
         } else if (deltaState.background !== undefined) {
-            Object.assign(this.element.style, fillToCss(deltaState.background));
+            Object.assign(this.element.style, fillToCss(deltaState.background, this.element));
         }
 
         if (deltaState.corner_radius !== undefined) {
@@ -107,6 +178,136 @@ export class PlotComponent extends ComponentBase {
         }
     }
 
+    private updatePlot(plot: PlotState['plot']): void {
+        if (plot.type === 'pending') {
+            return;
+        }
+
+        // Updates can only be applied to the figure they were computed for. If
+        // an update was missed, ask for the entire figure instead.
+        if (plot.type === 'plotly-update' || plot.type === 'unchanged') {
+            let baseVersion =
+                plot.type === 'unchanged' ? plot.version : plot.baseVersion;
+
+            if (baseVersion !== this.plotVersion) {
+                this.plotVersion = -1;
+                this.sendMessageToBackend({
+                    type: 'requestFullPlot',
+                });
+                return;
+            }
+
+            if (plot.type === 'plotly-update') {
+                this.plotVersion = plot.version;
+                this.applyPlotlyUpdate(plot);
+            }
+
+            return;
+        }
+
+        this.plotVersion = plot.version;
+        this.plotType = plot.type;
+        this.element.innerHTML = '';
+
+        // Plotly
+        if (plot.type === 'plotly') {
+            withPlotly(() => {
+                let plotJson = JSON.parse(plot.json);
+                window['Plotly'].newPlot(
+                    this.element,
+                    plotJson.data.map(decodeTraceArrays),
+                    plotJson.layout
+                );
+
+                // `newPlot` removes all event handlers, so they must be
+                // attached again every time
+                this.element['on'](
+                    'plotly_relayout',
+                    this.onPlotlyRelayout.bind(this)
+                );
+
+                this.updatePlotlyLayout();
+            });
+        }
+        // Matplotlib (Just a SVG)
+        else {
+            this.element.innerHTML = plot.svg;
+
+            let svgElement = this.element.querySelector('svg') as SVGElement;
+
+            svgElement.style.width = '100%';
+            svgElement.style.height = '100%';
+        }
+    }
+
+    private applyPlotlyUpdate(plot: PlotlyUpdate): void {
+        withPlotly(() => {
+            let update = JSON.parse(plot.json);
+            let Plotly = window['Plotly'];
+
+            // Layout
+            if (update.layout !== undefined) {
+                Plotly.react(this.element, this.element['data'], update.layout);
+            }
+
+            // Points appended to existing traces
+            for (let extension of update.extendTraces ?? []) {
+                let data = decodeTraceArrays(extension.data);
+                let keys = Object.keys(data);
+
+                Plotly.extendTraces(
+                    this.element,
+                    Object.fromEntries(keys.map((key) => [key, [data[key]]])),
+                    [extension.index],
+                    extension.maxPoints ?? undefined
+                );
+            }
+
+            // New traces
+            if (update.addTraces !== undefined) {
+                Plotly.addTraces(
+                    this.element,
+                    update.addTraces.map(decodeTraceArrays)
+                );
+            }
+
+            this.updatePlotlyLayout();
+        });
+    }
+
+    /// Keeps track of zooming, so that downsampled plots can be filled in with
+    /// more detail
+    private onPlotlyRelayout(event: object): void {
+        let xRange = parseAxisRange(event, 'xaxis', this.reportedXRange);
+        let yRange = parseAxisRange(event, 'yaxis', this.reportedYRange);
+
+        if (
+            xRange === this.reportedXRange &&
+            yRange === this.reportedYRange
+        ) {
+            return;
+        }
+
+        this.reportedXRange = xRange;
+        this.reportedYRange = yRange;
+        this.reportViewport();
+    }
+
+    private reportViewport(): void {
+        if (this.state.downsampling === 'none') {
+            return;
+        }
+
+        this.reportedWidth = this.allocatedWidth * pixelsPerRem;
+
+        this.sendMessageToBackend({
+            type: 'viewport',
+            widthInPixels: this.reportedWidth,
+            xRange: this.reportedXRange,
+            yRange: this.reportedYRange,
+        });
+    }
+
     updatePlotlyLayout(): void {
         window['Plotly'].update(
             this.element,
@@ -120,11 +321,18 @@ export class PlotComponent extends ComponentBase {
 
     updateAllocatedHeight(ctx: LayoutContext): void {
         // Plotly is too dumb to layout itself. Help out.
+        if (this.plotType === 'plotly' && window['Plotly'] !== undefined) {
+            this.updatePlotlyLayout();
+        }
+
+        // Downsampled plots need more points if they've become wider
+        let width = this.allocatedWidth * pixelsPerRem;
+
         if (
-            this.state.plot.type === 'plotly' &&
-            window['Plotly'] !== undefined
+            width > this.reportedWidth * RESIZE_REPORT_THRESHOLD ||
+            width < this.reportedWidth / RESIZE_REPORT_THRESHOLD
         ) {
-            this.updatePlotlyLayout();
+            this.reportViewport();
         }
     }
 }
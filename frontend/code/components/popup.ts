@@ -9,7 +9,8 @@ import { ComponentBase, ComponentState } from './componentBase';
 export type PopupState = ComponentState & {
     _type_: 'Popup-builtin';
     anchor?: ComponentId;
-    content?: ComponentId;
+    content?: ComponentId | null;
+    mount_content?: 'always' | 'on_open' | 'while_open';
     color?: ColorSet;
     direction?: 'left' | 'top' | 'right' | 'bottom' | 'center';
     alignment?: number;
@@ -172,8 +173,11 @@ export class PopupComponent extends ComponentBase {
         let anchorInst = componentsById[this.state.anchor]!;
         anchorInst.allocatedWidth = this.allocatedWidth;
 
-        let contentInst = componentsById[this.state.content]!;
-        contentInst.allocatedWidth = contentInst.requestedWidth;
+        // The content may not have been sent yet, if it's mounted lazily
+        if (this.state.content !== null) {
+            let contentInst = componentsById[this.state.content]!;
+            contentInst.allocatedWidth = contentInst.requestedWidth;
+        }
     }
 
     updateNaturalHeight(ctx: LayoutContext): void {
@@ -185,16 +189,18 @@ export class PopupComponent extends ComponentBase {
         let anchorInst = componentsById[this.state.anchor]!;
         anchorInst.allocatedHeight = this.allocatedHeight;
 
-        let contentInst = componentsById[this.state.content]!;
-        contentInst.allocatedHeight = contentInst.requestedHeight;
-
         // And position the children
         let anchorElem = anchorInst.element;
         anchorElem.style.left = '0';
         anchorElem.style.top = '0';
 
-        let contentElem = contentInst.element;
-        contentElem.style.left = '0';
-        contentElem.style.top = '0';
+        if (this.state.content !== null) {
+            let contentInst = componentsById[this.state.content]!;
+            contentInst.allocatedHeight = contentInst.requestedHeight;
+
+            let contentElem = contentInst.element;
+            contentElem.style.left = '0';
+            contentElem.style.top = '0';
+        }
     }
 }
@@ -47,7 +47,7 @@ function setBoxStyleVariables(
             'shadow-offset-y': '0',
         };
     } else {
-        Object.assign(variables, fillToCss(style.fill));
+        Object.assign(variables, fillToCss(style.fill, element));
 
         variables['stroke-color'] = colorToCssString(style.strokeColor);
         variables['stroke-width'] = `${style.strokeWidth}rem`;
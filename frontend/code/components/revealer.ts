@@ -13,9 +13,10 @@ let HEADER_PADDING: number = 0.6;
 export type RevealerState = ComponentState & {
     _type_: 'Revealer-builtin';
     header?: string | null;
-    content?: ComponentId;
+    content?: ComponentId | null;
     header_style?: 'heading1' | 'heading2' | 'heading3' | 'text' | TextStyle;
     is_open: boolean;
+    mount_content?: 'always' | 'on_open' | 'while_open';
 };
 
 export class RevealerComponent extends ComponentBase {
@@ -240,8 +241,12 @@ export class RevealerComponent extends ComponentBase {
     }
 
     updateNaturalWidth(ctx: LayoutContext): void {
-        // Account for the content
-        this.naturalWidth = componentsById[this.state.content]!.requestedWidth;
+        // Account for the content. It may not have been sent yet, if it's
+        // mounted lazily.
+        this.naturalWidth =
+            this.state.content === null
+                ? 0
+                : componentsById[this.state.content]!.requestedWidth;
 
         // If a header is present, consider that as well
         if (this.state.header !== null) {
@@ -254,7 +259,7 @@ export class RevealerComponent extends ComponentBase {
     updateAllocatedWidth(ctx: LayoutContext): void {
         // Pass on space to the child, but only if the revealer is open. If not,
         // avoid forcing a re-layout of the child.
-        if (this.openFractionBeforeEase > 0) {
+        if (this.openFractionBeforeEase > 0 && this.state.content !== null) {
             componentsById[this.state.content]!.allocatedWidth =
                 this.allocatedWidth;
         }
@@ -269,7 +274,7 @@ export class RevealerComponent extends ComponentBase {
         }
 
         // Account for the content
-        if (this.openFractionBeforeEase > 0) {
+        if (this.openFractionBeforeEase > 0 && this.state.content !== null) {
             let t = easeInOut(this.openFractionBeforeEase);
             let innerHeight =
                 componentsById[this.state.content]!.requestedHeight;
@@ -279,7 +284,7 @@ export class RevealerComponent extends ComponentBase {
 
     updateAllocatedHeight(ctx: LayoutContext): void {
         // Avoid forcing a re-layout of the child if the revealer is closed.
-        if (this.openFractionBeforeEase === 0) {
+        if (this.openFractionBeforeEase === 0 || this.state.content === null) {
             return;
         }
 
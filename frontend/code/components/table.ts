@@ -1,257 +1,335 @@
+import { pixelsPerRem } from '../app';
 import { getElementDimensions } from '../layoutHelpers';
 import { LayoutContext } from '../layouting';
 import { ComponentBase, ComponentState } from './componentBase';
-
-type TableValue = number | string;
-type DataFromBackend = { [label: string]: TableValue[] } | TableValue[][];
-
-type TableDeltaState = ComponentState & {
+import {
+    decodeTypedArray,
+    EncodedTypedArray,
+    isEncodedTypedArray,
+} from '../utils';
+
+type TableValue = number | bigint | string | null;
+
+// The server never sends the entire table. Instead, it sends a window of rows
+// (in display order), and the client requests different rows as the user
+// scrolls. Sorting and filtering also happen on the server. Numeric columns
+// arrive in binary form.
+type TableState = ComponentState & {
     _type_: 'Table-builtin';
-    data?: DataFromBackend;
     show_row_numbers?: boolean;
+    columnNames?: string[] | null;
+    numericColumns?: boolean[];
+    rowCount?: number;
+    windowStart?: number;
+    windowColumns?: (TableValue[] | EncodedTypedArray)[];
+    sortOrder?: [number, boolean][];
 };
 
-// We can receive data either as an object or as a 2d array, but we store it
-// as an array of Columns
-type TableState = Omit<Required<TableDeltaState>, 'data'> & { data: Column[] };
-
-class Column {
-    public name: string;
-    public dataType: 'number' | 'text' | 'empty';
-    public alignment: string;
-    public values: TableValue[];
-
-    constructor(name: string, values: TableValue[]) {
-        this.name = name;
-        this.values = values;
-        this.dataType = this._determineDataType(values);
-        this.alignment = this.dataType === 'number' ? 'right' : 'left';
-    }
+/// All rows (including the header) have the same height. That way the
+/// position of any row can be computed without rendering those above it.
+const ROW_HEIGHT_REM = 2.2;
 
-    private _determineDataType(
-        values: TableValue[]
-    ): 'number' | 'text' | 'empty' {
-        if (values.length === 0) {
-            return 'empty';
-        }
+/// How many rows to render above and below the visible ones. Twice as many are
+/// requested from the server, so that scrolling doesn't immediately require
+/// new data.
+const OVERSCAN_ROWS = 30;
 
-        if (typeof values[0] === 'number') {
-            return 'number';
-        }
+/// Tables don't request more height than this many rows. Larger tables scroll.
+const MAX_NATURAL_ROWS = 100;
 
-        return 'text';
-    }
-}
+/// Browsers can't handle arbitrarily tall elements. If the table would be
+/// taller than this, scrolling is scaled so that all rows remain reachable.
+const MAX_SCROLL_HEIGHT_PX = 10_000_000;
 
-function dataToColumns(data: DataFromBackend): Column[] {
-    let columns: Column[] = [];
+export class TableComponent extends ComponentBase {
+    state: Required<TableState>;
 
-    if (Array.isArray(data)) {
-        let numColumns = data.length === 0 ? 0 : data[0].length;
+    private spacerElement: HTMLElement;
+    private gridElement: HTMLElement;
+    private headerCells: HTMLElement[] = [];
 
-        for (let i = 0; i < numColumns; i++) {
-            let values = data.map((row) => row[i]);
-            columns.push(new Column('', values));
-        }
-    } else {
-        for (let [name, values] of Object.entries(data)) {
-            columns.push(new Column(name, values));
-        }
-    }
+    // The range of rows which is currently rendered. `windowVersion` is
+    // incremented whenever the server sends new rows, so that stale rows are
+    // re-rendered.
+    private renderedStart: number = 0;
+    private renderedEnd: number = 0;
+    private renderedWindowVersion: number = -1;
+    private windowVersion: number = 0;
 
-    return columns;
-}
+    private isRequestPending: boolean = false;
+
+    // The columns of the window, with typed arrays already decoded
+    private windowColumns: ArrayLike<TableValue>[] = [];
+
+    createElement(): HTMLElement {
+        let element = document.createElement('div');
+        element.classList.add('rio-table');
 
-class SortOrder {
-    private sortOrder: [string, number][] = [];
+        this.spacerElement = document.createElement('div');
+        this.spacerElement.classList.add('rio-table-spacer');
+        element.appendChild(this.spacerElement);
 
-    add(columnName: string, ascending: boolean): void {
-        this.sortOrder = this.sortOrder.filter((it) => it[0] !== columnName);
-        this.sortOrder.unshift([columnName, ascending ? 1 : -1]);
+        this.gridElement = document.createElement('div');
+        this.gridElement.classList.add('rio-table-grid');
+        this.gridElement.style.gridAutoRows = `${ROW_HEIGHT_REM}rem`;
+        element.appendChild(this.gridElement);
+
+        element.addEventListener('scroll', this.updateVisibleRows.bind(this), {
+            passive: true,
+        });
+
+        return element;
     }
 
-    sort(columns: Column[]): void {
-        if (columns.length === 0) {
-            return;
+    updateElement(
+        deltaState: TableState,
+        latentComponents: Set<ComponentBase>
+    ): void {
+        // The state is only merged after this function returns, but the
+        // methods below need it
+        this.state = { ...this.state, ...deltaState };
+
+        if (
+            deltaState.columnNames !== undefined ||
+            deltaState.numericColumns !== undefined ||
+            deltaState.sortOrder !== undefined
+        ) {
+            this.createColumnHeaders();
         }
 
-        let valuesByColumnName: { [columnName: string]: TableValue[] } = {};
-        for (let column of columns) {
-            valuesByColumnName[column.name] = column.values;
+        if (deltaState.windowColumns !== undefined) {
+            this.windowColumns = deltaState.windowColumns.map((column) =>
+                isEncodedTypedArray(column) ? decodeTypedArray(column) : column
+            );
+
+            this.windowVersion++;
+            this.isRequestPending = false;
         }
 
-        // Perform an argsort
-        function cmp(i: number, j: number): number {
-            for (let [columnName, multiplier] of this.sortOrder) {
-                let values = valuesByColumnName[columnName];
-                if (values === undefined) {
-                    // The table's contents must've changed and no longer have a
-                    // column with this name
-                    continue;
-                }
-
-                let a = values[i];
-                let b = values[j];
-
-                if (a < b) {
-                    return -1 * multiplier;
-                } else if (a > b) {
-                    return 1 * multiplier;
-                }
-            }
+        // Force a re-render
+        this.renderedWindowVersion = -1;
+        this.updateSpacerHeight();
+        this.updateVisibleRows();
 
-            return 0;
-        }
+        this.makeLayoutDirty();
+    }
 
-        let indices = [...columns[0].values.keys()];
-        indices.sort(cmp.bind(this));
+    updateNaturalWidth(ctx: LayoutContext): void {
+        this.naturalWidth = getElementDimensions(this.gridElement)[0];
+    }
 
-        // Now that we have the sorted indices, we can use them to reorder the values
-        for (let column of columns) {
-            column.values = indices.map((i) => column.values[i]);
-        }
+    updateNaturalHeight(ctx: LayoutContext): void {
+        let numRows = Math.min(this.state.rowCount, MAX_NATURAL_ROWS);
+        this.naturalHeight = (this.headerRows + numRows) * ROW_HEIGHT_REM;
     }
-}
 
-export class TableComponent extends ComponentBase {
-    state: TableState;
+    updateAllocatedHeight(ctx: LayoutContext): void {
+        // More (or fewer) rows may be visible now
+        this.updateSpacerHeight();
+        this.updateVisibleRows();
+    }
 
-    private sortOrder = new SortOrder();
+    private get headerRows(): number {
+        return this.state.columnNames === null ? 0 : 1;
+    }
 
-    private headerCells: HTMLElement[] = [];
-    private rowNumberCells: HTMLElement[] = [];
-    private dataCells: HTMLElement[] = [];
+    private get viewportHeightPx(): number {
+        return this.allocatedHeight * pixelsPerRem;
+    }
 
-    createElement(): HTMLElement {
-        let element = document.createElement('div');
-        element.classList.add('rio-table');
+    private get scrollHeightPx(): number {
+        let rowHeightPx = ROW_HEIGHT_REM * pixelsPerRem;
+        let contentHeight =
+            (this.headerRows + this.state.rowCount) * rowHeightPx;
 
-        return element;
+        return Math.min(contentHeight, MAX_SCROLL_HEIGHT_PX);
     }
 
-    updateElement(
-        deltaState: TableDeltaState,
-        latentComponents: Set<ComponentBase>
-    ): void {
-        if (deltaState.data !== undefined) {
-            this.state.data = dataToColumns(deltaState.data);
+    private updateSpacerHeight(): void {
+        this.spacerElement.style.height = `${this.scrollHeightPx}px`;
+    }
 
-            this.displayData();
+    /// Returns the (fractional) index of the row at the top of the viewport,
+    /// and how many rows fit into the viewport.
+    private getVisibleRows(): [number, number] {
+        let rowHeightPx = ROW_HEIGHT_REM * pixelsPerRem;
+        let headerHeightPx = this.headerRows * rowHeightPx;
 
-            if (deltaState.show_row_numbers ?? this.state.show_row_numbers) {
-                this.showRowNumbers();
-            }
+        let viewportRows =
+            Math.max(this.viewportHeightPx - headerHeightPx, 0) / rowHeightPx;
 
-            if (Array.isArray(deltaState.data)) {
-                this.hideColumnHeaders();
-            } else {
-                this.showColumnHeaders();
-            }
-        } else if (
-            deltaState.show_row_numbers !== undefined &&
-            deltaState.show_row_numbers !== this.state.show_row_numbers
-        ) {
-            if (deltaState.show_row_numbers) {
-                this.showRowNumbers();
-            } else {
-                this.hideRowNumbers();
-            }
+        // Map the scroll position onto the rows. Unless the table is taller
+        // than `MAX_SCROLL_HEIGHT_PX` this is simply `scrollTop / rowHeight`.
+        let maxFirstRow = Math.max(this.state.rowCount - viewportRows, 0);
+        let maxScrollTop = this.scrollHeightPx - this.viewportHeightPx;
+
+        if (maxScrollTop <= 0) {
+            return [0, viewportRows];
         }
 
-        this.makeLayoutDirty();
-        [this.naturalWidth, this.naturalHeight] = getElementDimensions(
-            this.element
-        );
+        let scrollFraction = Math.min(this.element.scrollTop / maxScrollTop, 1);
+        return [scrollFraction * maxFirstRow, viewportRows];
     }
 
-    // Natural size is set in updateElement
-    updateNaturalWidth(ctx: LayoutContext): void {}
-    updateNaturalHeight(ctx: LayoutContext): void {}
+    private updateVisibleRows(): void {
+        let rowCount = this.state.rowCount;
+        let [firstRow, viewportRows] = this.getVisibleRows();
 
-    private displayData(): void {
-        for (let element of this.dataCells) {
-            element.remove();
-        }
+        let visibleStart = Math.floor(firstRow);
+        let visibleEnd = Math.min(
+            Math.ceil(firstRow + viewportRows) + 1,
+            rowCount
+        );
 
-        this.dataCells = [];
+        // Re-render if rows outside of the rendered range have become visible,
+        // or the server has sent new data
+        if (
+            visibleStart < this.renderedStart ||
+            visibleEnd > this.renderedEnd ||
+            this.renderedWindowVersion !== this.windowVersion
+        ) {
+            this.renderRows(
+                Math.max(visibleStart - OVERSCAN_ROWS, 0),
+                Math.min(visibleEnd + OVERSCAN_ROWS, rowCount)
+            );
+        }
 
-        let columnNr = 2;
-        for (let column of this.state.data) {
-            for (let [rowNr, value] of column.values.entries()) {
-                let cell = document.createElement('span');
-                cell.textContent = `${value}`;
-                cell.style.textAlign = column.alignment;
+        // Position the rendered rows so they line up with the scroll position
+        let rowHeightPx = ROW_HEIGHT_REM * pixelsPerRem;
+        let top =
+            this.element.scrollTop -
+            (firstRow - this.renderedStart) * rowHeightPx;
+        this.gridElement.style.top = `${Math.max(top, 0)}px`;
+
+        // Ask the server for more rows if needed
+        let windowStart = this.state.windowStart;
+        let windowEnd =
+            windowStart +
+            (this.windowColumns.length === 0
+                ? 0
+                : this.windowColumns[0].length);
+
+        if (
+            !this.isRequestPending &&
+            this.windowColumns.length > 0 &&
+            (this.renderedStart < windowStart || this.renderedEnd > windowEnd)
+        ) {
+            let start = Math.max(this.renderedStart - OVERSCAN_ROWS, 0);
+            let end = Math.min(this.renderedEnd + OVERSCAN_ROWS, rowCount);
+
+            this.isRequestPending = true;
+            this.sendMessageToBackend({
+                type: 'requestRows',
+                start: start,
+                count: end - start,
+            });
+        }
+    }
 
-                cell.style.gridRow = `${rowNr + 2}`;
-                cell.style.gridColumn = `${columnNr}`;
-                this.element.appendChild(cell);
-                this.dataCells.push(cell);
-            }
+    private renderRows(start: number, end: number): void {
+        this.renderedStart = start;
+        this.renderedEnd = end;
+        this.renderedWindowVersion = this.windowVersion;
 
-            columnNr++;
+        // Remove all previously rendered cells, but keep the header
+        while (this.gridElement.childElementCount > this.headerCells.length) {
+            this.gridElement.lastElementChild!.remove();
         }
-    }
 
-    private showRowNumbers(): void {
-        this.hideRowNumbers();
+        let windowStart = this.state.windowStart;
+        let windowColumns = this.windowColumns;
+        let numericColumns = this.state.numericColumns;
 
-        let numRows =
-            this.state.data.length === 0 ? 0 : this.state.data[0].values.length;
+        // Only rows which the server has already sent can be displayed. The
+        // others stay empty until they arrive.
+        let fragment = document.createDocumentFragment();
 
-        for (let i = 0; i < numRows; i++) {
-            let cell = document.createElement('span');
-            cell.textContent = `${i + 1}.`;
-            cell.style.textAlign = 'right';
-            cell.style.opacity = '0.5';
+        for (let row = start; row < end; row++) {
+            let windowRow = row - windowStart;
 
-            cell.style.gridRow = `${i + 2}`;
-            cell.style.gridColumn = '1';
-            this.element.appendChild(cell);
+            if (
+                windowColumns.length === 0 ||
+                windowRow < 0 ||
+                windowRow >= windowColumns[0].length
+            ) {
+                continue;
+            }
 
-            this.rowNumberCells.push(cell);
+            let gridRow = `${row - start + 1 + this.headerRows}`;
+
+            if (this.state.show_row_numbers) {
+                let cell = document.createElement('span');
+                cell.classList.add('rio-table-row-number');
+                cell.textContent = `${row + 1}.`;
+                cell.style.gridRow = gridRow;
+                cell.style.gridColumn = '1';
+                fragment.appendChild(cell);
+            }
+
+            for (let column = 0; column < windowColumns.length; column++) {
+                let value = windowColumns[column][windowRow];
+
+                let cell = document.createElement('span');
+                cell.textContent =
+                    value === null || Number.isNaN(value) ? '' : `${value}`;
+                cell.style.textAlign = numericColumns[column]
+                    ? 'right'
+                    : 'left';
+                cell.style.gridRow = gridRow;
+                cell.style.gridColumn = `${column + 2}`;
+                fragment.appendChild(cell);
+            }
         }
+
+        this.gridElement.appendChild(fragment);
     }
 
-    private hideRowNumbers(): void {
-        for (let element of this.rowNumberCells) {
-            element.remove();
+    private createColumnHeaders(): void {
+        for (let cell of this.headerCells) {
+            cell.remove();
         }
 
-        this.rowNumberCells = [];
-    }
+        this.headerCells = [];
 
-    private showColumnHeaders(): void {
-        this.hideColumnHeaders();
+        let columnNames = this.state.columnNames;
+        if (columnNames === null) {
+            return;
+        }
+
+        let [sortColumn, sortAscending] =
+            this.state.sortOrder.length === 0
+                ? [null, true]
+                : this.state.sortOrder[0];
 
-        for (let [i, column] of this.state.data.entries()) {
+        for (let [column, name] of columnNames.entries()) {
             let cell = document.createElement('span');
             cell.classList.add('header');
-            cell.textContent = column.name;
-            cell.style.textAlign = column.alignment;
-            cell.style.opacity = '0.5';
+            cell.textContent = name;
+            cell.style.textAlign = this.state.numericColumns[column]
+                ? 'right'
+                : 'left';
+
+            if (column === sortColumn) {
+                cell.dataset.sort = sortAscending ? 'ascending' : 'descending';
+            }
 
             cell.addEventListener(
                 'click',
-                this.onHeaderClick.bind(this, column.name)
+                this.onHeaderClick.bind(this, column)
             );
 
             cell.style.gridRow = '1';
-            cell.style.gridColumn = `${i + 2}`;
-            this.element.appendChild(cell);
+            cell.style.gridColumn = `${column + 2}`;
+            this.gridElement.insertBefore(
+                cell,
+                this.gridElement.children[column] ?? null
+            );
 
             this.headerCells.push(cell);
         }
     }
 
-    private hideColumnHeaders(): void {
-        for (let element of this.headerCells) {
-            element.remove();
-        }
-
-        this.headerCells = [];
-    }
-
-    private onHeaderClick(columnName: string, event: MouseEvent): void {
+    private onHeaderClick(column: number, event: MouseEvent): void {
         let clickedHeader = event.target as HTMLElement;
         if (clickedHeader.tagName !== 'SPAN') {
             clickedHeader = clickedHeader.parentElement!;
@@ -265,9 +343,12 @@ export class TableComponent extends ComponentBase {
         }
         clickedHeader.dataset.sort = ascending ? 'ascending' : 'descending';
 
-        this.sortOrder.add(columnName, ascending);
-        this.sortOrder.sort(this.state.data);
-        this.displayData();
+        // The server sorts the data and sends the visible rows again
+        this.sendMessageToBackend({
+            type: 'sort',
+            column: column,
+            ascending: ascending,
+        });
 
         // Eat the event
         event.stopPropagation();
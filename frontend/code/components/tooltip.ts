@@ -9,6 +9,7 @@ export type TooltipState = ComponentState & {
     anchor?: ComponentId;
     tip_component?: ComponentId | null;
     position?: 'left' | 'top' | 'right' | 'bottom';
+    mount_content?: 'always' | 'on_open' | 'while_open';
 };
 
 export class TooltipComponent extends ComponentBase {
@@ -44,6 +45,23 @@ export class TooltipComponent extends ComponentBase {
             this.labelElement.style.opacity = '0';
         });
 
+        // If the tip is mounted lazily, the server must be told when it's
+        // needed
+        this.anchorContainer.addEventListener('mouseenter', () => {
+            if (
+                this.state.mount_content !== 'always' &&
+                this.state.tip_component === null
+            ) {
+                this.sendMessageToBackend({ isTipShown: true });
+            }
+        });
+
+        this.anchorContainer.addEventListener('mouseleave', () => {
+            if (this.state.mount_content === 'while_open') {
+                this.sendMessageToBackend({ isTipShown: false });
+            }
+        });
+
         return element;
     }
 
@@ -115,10 +133,13 @@ export class TooltipComponent extends ComponentBase {
 
     updateAllocatedWidth(ctx: LayoutContext): void {
         let anchor = componentsById[this.state.anchor!]!;
-        let tip = componentsById[this.state.tip_component!]!;
-
         anchor.allocatedWidth = this.allocatedWidth;
-        tip.allocatedWidth = tip.naturalWidth;
+
+        // The tip may not have been sent yet, if it's mounted lazily
+        if (this.state.tip_component !== null) {
+            let tip = componentsById[this.state.tip_component]!;
+            tip.allocatedWidth = tip.naturalWidth;
+        }
     }
 
     updateNaturalHeight(ctx: LayoutContext): void {
@@ -128,16 +149,18 @@ export class TooltipComponent extends ComponentBase {
 
     updateAllocatedHeight(ctx: LayoutContext): void {
         let anchor = componentsById[this.state.anchor!]!;
-        let tip = componentsById[this.state.tip_component!]!;
-
         anchor.allocatedHeight = this.allocatedHeight;
-        tip.allocatedHeight = tip.naturalHeight;
 
         // Position the children
         anchor.element.style.left = '0';
         anchor.element.style.top = '0';
 
-        tip.element.style.left = '0';
-        tip.element.style.top = '0';
+        if (this.state.tip_component !== null) {
+            let tip = componentsById[this.state.tip_component]!;
+            tip.allocatedHeight = tip.naturalHeight;
+
+            tip.element.style.left = '0';
+            tip.element.style.top = '0';
+        }
     }
 }
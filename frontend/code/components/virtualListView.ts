@@ -0,0 +1,195 @@
+import { pixelsPerRem, scrollBarSize } from '../app';
+import { componentsById } from '../componentManagement';
+import { LayoutContext } from '../layouting';
+import { ComponentId } from '../models';
+import { ComponentBase, ComponentState } from './componentBase';
+import { LinearContainerState } from './linearContainers';
+import { ListViewComponent } from './listView';
+
+// The server only sends the items which are (nearly) visible. Their index in
+// the list starts at `first_index`. The space taken up by all other items is
+// estimated and filled with spacers, so that the scroll bar behaves as if the
+// entire list was present.
+export type VirtualListViewState = ComponentState & {
+    _type_: 'VirtualListView-builtin';
+    children?: ComponentId[];
+    first_index?: number;
+    item_count?: number;
+    overscan?: number;
+};
+
+const NATURAL_SIZE = 1.0;
+
+/// The height assumed for items which haven't been built yet, as long as no
+/// items are available to measure
+const DEFAULT_ITEM_HEIGHT = 2.5;
+
+export class VirtualListViewComponent extends ListViewComponent {
+    state: Required<VirtualListViewState & LinearContainerState>;
+
+    private topSpacer: HTMLElement;
+    private bottomSpacer: HTMLElement;
+
+    // Set while the server is building new items, so that scrolling doesn't
+    // flood it with requests
+    private isRequestPending: boolean = false;
+
+    createElement(): HTMLElement {
+        let element = super.createElement();
+        element.classList.add('rio-virtual-list-view');
+
+        // The list is never larger than its content, so there is no undefined
+        // space. Use spacers instead, which stand in for the items that aren't
+        // built.
+        this.undef1.remove();
+        this.undef2.remove();
+
+        this.topSpacer = document.createElement('div');
+        this.topSpacer.classList.add('rio-virtual-list-view-spacer');
+        element.insertBefore(this.topSpacer, this.childContainer);
+
+        this.bottomSpacer = document.createElement('div');
+        this.bottomSpacer.classList.add('rio-virtual-list-view-spacer');
+        element.appendChild(this.bottomSpacer);
+
+        element.addEventListener(
+            'scroll',
+            this.requestVisibleItems.bind(this),
+            { passive: true }
+        );
+
+        return element;
+    }
+
+    updateElement(
+        deltaState: VirtualListViewState,
+        latentComponents: Set<ComponentBase>
+    ): void {
+        super.updateElement(deltaState, latentComponents);
+
+        // New items have arrived, so it's fine to ask for more
+        this.isRequestPending = false;
+    }
+
+    updateNaturalWidth(ctx: LayoutContext): void {
+        super.updateNaturalWidth(ctx);
+        this.naturalWidth += scrollBarSize;
+    }
+
+    updateAllocatedWidth(ctx: LayoutContext): void {
+        for (let child of this.children) {
+            child.allocatedWidth = this.allocatedWidth - scrollBarSize;
+        }
+    }
+
+    updateNaturalHeight(ctx: LayoutContext): void {
+        this.naturalHeight = NATURAL_SIZE;
+    }
+
+    updateAllocatedHeight(ctx: LayoutContext): void {
+        for (let child of this.children) {
+            child.allocatedHeight = child.requestedHeight;
+        }
+
+        let [topHeight, bottomHeight] = this.getSpacerHeights();
+        this.topSpacer.style.height = `${topHeight}rem`;
+        this.bottomSpacer.style.height = `${bottomHeight}rem`;
+
+        // Now that the size is known, the visible items may have changed.
+        // Checking must wait until the layout has been applied though.
+        requestAnimationFrame(this.requestVisibleItems.bind(this));
+    }
+
+    private get builtItems(): ComponentBase[] {
+        return this.state.children.map((id) => componentsById[id]!);
+    }
+
+    private get estimatedItemHeight(): number {
+        let items = this.builtItems;
+
+        if (items.length === 0) {
+            return DEFAULT_ITEM_HEIGHT;
+        }
+
+        let totalHeight = 0;
+        for (let item of items) {
+            totalHeight += item.requestedHeight;
+        }
+
+        return totalHeight / items.length;
+    }
+
+    private getSpacerHeights(): [number, number] {
+        let itemHeight = this.estimatedItemHeight;
+        let numItemsBelow =
+            this.state.item_count -
+            this.state.first_index -
+            this.state.children.length;
+
+        return [
+            this.state.first_index * itemHeight,
+            Math.max(numItemsBelow, 0) * itemHeight,
+        ];
+    }
+
+    /// Returns the index of the item at the given vertical position (in rems,
+    /// relative to the top of the list)
+    private getItemIndexAt(position: number): number {
+        let itemHeight = this.estimatedItemHeight;
+        let [topHeight, _] = this.getSpacerHeights();
+
+        // Above the built items
+        if (position < topHeight) {
+            return Math.floor(position / itemHeight);
+        }
+
+        // Among the built items
+        let index = this.state.first_index;
+        let itemTop = topHeight;
+
+        for (let item of this.builtItems) {
+            if (position < itemTop + item.requestedHeight) {
+                return index;
+            }
+
+            itemTop += item.requestedHeight;
+            index++;
+        }
+
+        // Below the built items
+        index += Math.floor((position - itemTop) / itemHeight);
+        return Math.min(index, this.state.item_count - 1);
+    }
+
+    private requestVisibleItems(): void {
+        if (this.isRequestPending || this.state.item_count === 0) {
+            return;
+        }
+
+        let scrollTop = this.element.scrollTop / pixelsPerRem;
+        let visibleStart = this.getItemIndexAt(scrollTop);
+        let visibleEnd =
+            this.getItemIndexAt(scrollTop + this.allocatedHeight) + 1;
+
+        // Only bother the server once the visible items come close to the end
+        // of the built ones
+        let builtStart = this.state.first_index;
+        let builtEnd = builtStart + this.state.children.length;
+        let margin = Math.floor(this.state.overscan / 2);
+
+        let needsItemsAbove =
+            builtStart > 0 && visibleStart < builtStart + margin;
+        let needsItemsBelow =
+            builtEnd < this.state.item_count && visibleEnd > builtEnd - margin;
+
+        if (!needsItemsAbove && !needsItemsBelow) {
+            return;
+        }
+
+        this.isRequestPending = true;
+        this.sendMessageToBackend({
+            visibleStart: visibleStart,
+            visibleEnd: visibleEnd,
+        });
+    }
+}
@@ -22,7 +22,95 @@ function gradientToCssString(
     )})`;
 }
 
-function fillToCssString(fill: Fill): string {
+const IMAGE_FILL_MODE_TO_CSS = {
+    fit: 'center/contain no-repeat',
+    stretch: 'top left / 100% 100%',
+    tile: 'left top repeat',
+    zoom: 'center/cover no-repeat',
+} as const;
+
+/// Lazily loaded image fills reference their image through a CSS variable,
+/// which is only set once the element is about to scroll into view. Every
+/// image URL gets its own variable, so elements can have several lazy fills
+/// (e.g. for hover effects).
+const lazyImageVariableNames = new Map<string, string>();
+const revealedElements = new WeakSet<HTMLElement>();
+const elementsAwaitingReveal = new WeakMap<HTMLElement, Set<string>>();
+let lazyImageObserver: IntersectionObserver | null = null;
+
+function getLazyImageVariableName(imageUrl: string): string {
+    let result = lazyImageVariableNames.get(imageUrl);
+
+    if (result === undefined) {
+        result = `--rio-lazy-image-${lazyImageVariableNames.size}`;
+        lazyImageVariableNames.set(imageUrl, result);
+    }
+
+    return result;
+}
+
+function revealLazyImage(element: HTMLElement, imageUrl: string): void {
+    element.style.setProperty(
+        getLazyImageVariableName(imageUrl),
+        `url('${imageUrl}')`
+    );
+}
+
+function getLazyImageObserver(): IntersectionObserver {
+    if (lazyImageObserver === null) {
+        lazyImageObserver = new IntersectionObserver(
+            (entries) => {
+                for (let entry of entries) {
+                    if (!entry.isIntersecting) {
+                        continue;
+                    }
+
+                    let element = entry.target as HTMLElement;
+                    let imageUrls = elementsAwaitingReveal.get(element) ?? [];
+
+                    lazyImageObserver!.unobserve(element);
+                    revealedElements.add(element);
+                    elementsAwaitingReveal.delete(element);
+
+                    for (let imageUrl of imageUrls) {
+                        revealLazyImage(element, imageUrl);
+                    }
+                }
+            },
+            {
+                // Start loading a bit before the element becomes visible
+                rootMargin: '50%',
+            }
+        );
+    }
+
+    return lazyImageObserver;
+}
+
+/// Returns a CSS value referring to the image, which only resolves to the
+/// image once the element is near the viewport.
+function lazyImageToCssUrl(element: HTMLElement, imageUrl: string): string {
+    let variableName = getLazyImageVariableName(imageUrl);
+
+    if (revealedElements.has(element)) {
+        revealLazyImage(element, imageUrl);
+    } else {
+        // Make sure the variable isn't inherited from a parent element
+        element.style.setProperty(variableName, 'none');
+
+        let pending = elementsAwaitingReveal.get(element);
+        if (pending === undefined) {
+            pending = new Set();
+            elementsAwaitingReveal.set(element, pending);
+            getLazyImageObserver().observe(element);
+        }
+        pending.add(imageUrl);
+    }
+
+    return `var(${variableName})`;
+}
+
+function fillToCssString(fill: Fill, element: HTMLElement | null): string {
     // Solid Color
     if (fill.type === 'solid') {
         return colorToCssString(fill.color);
@@ -39,21 +127,30 @@ function fillToCssString(fill: Fill): string {
 
     // Image
     else if (fill.type === 'image') {
-        let cssUrl = `url('${fill.imageUrl}')`;
-
-        if (fill.fillMode == 'fit') {
-            return `${cssUrl} center/contain no-repeat`;
-        } else if (fill.fillMode == 'stretch') {
-            return `${cssUrl} top left / 100% 100%`;
-        } else if (fill.fillMode == 'tile') {
-            return `${cssUrl} left top repeat`;
-        } else if (fill.fillMode == 'zoom') {
-            return `${cssUrl} center/cover no-repeat`;
-        } else {
+        let placement = IMAGE_FILL_MODE_TO_CSS[fill.fillMode];
+
+        if (placement === undefined) {
             // Invalid fill mode
             // @ts-ignore
-            throw `Invalid fill mode for image fill: ${fill.type}`;
+            throw `Invalid fill mode for image fill: ${fill.fillMode}`;
+        }
+
+        // Lazy loading requires an element to observe. Without one, fall back
+        // to loading the image right away.
+        let cssUrl =
+            fill.loading === 'lazy' && element !== null
+                ? lazyImageToCssUrl(element, fill.imageUrl)
+                : `url('${fill.imageUrl}')`;
+
+        let result = `${cssUrl} ${placement}`;
+
+        // The placeholder is drawn below the actual image, so it's visible
+        // until the image has loaded
+        if (fill.placeholderUrl) {
+            result += `, url('${fill.placeholderUrl}') ${placement}`;
         }
+
+        return result;
     }
 
     // Invalid fill type
@@ -61,9 +158,14 @@ function fillToCssString(fill: Fill): string {
     throw `Invalid fill type: ${fill.type}`;
 }
 
-export function fillToCss(fill: Fill): { background: string } {
+/// Converts the fill to CSS. If an element is passed, the fill is going to be
+/// displayed in that element, which allows image fills to be loaded lazily.
+export function fillToCss(
+    fill: Fill,
+    element: HTMLElement | null = null
+): { background: string } {
     return {
-        background: fillToCssString(fill),
+        background: fillToCssString(fill, element),
     };
 }
 
@@ -160,7 +262,7 @@ export function textStyleToCss(
         // Anything else
         else {
             result['color'] = 'unset';
-            result['background'] = fillToCssString(style.fill);
+            result['background'] = fillToCssString(style.fill, null);
             result['-webkit-background-clip'] = 'text';
             result['-webkit-text-fill-color'] = 'transparent';
         }
@@ -3,6 +3,60 @@ import { colorToCssString } from './cssUtils';
 
 const ICON_PROMISE_CACHE: { [key: string]: Promise<string> } = {};
 
+/// Icons which have been sent by the server, as parsed SVG elements. Icon
+/// components only refer to icons by name, and clone these.
+const ICON_TEMPLATES = new Map<string, SVGSVGElement>();
+const ICON_SOURCES = new Map<string, string>();
+
+/// Called by the server to make icons available to the client, before any
+/// components referencing them are created.
+export function registerIcons(icons: { [iconName: string]: string }): void {
+    for (let [iconName, svgSource] of Object.entries(icons)) {
+        ICON_SOURCES.set(iconName, svgSource);
+        ICON_TEMPLATES.delete(iconName);
+        ICON_PROMISE_CACHE[iconName] = Promise.resolve(svgSource);
+    }
+}
+
+/// Returns a new SVG element for the given icon, or `null` if the icon hasn't
+/// been registered.
+export function createIconElement(iconName: string): SVGSVGElement | null {
+    let template = ICON_TEMPLATES.get(iconName);
+
+    if (template === undefined) {
+        let svgSource = ICON_SOURCES.get(iconName);
+
+        if (svgSource === undefined) {
+            return null;
+        }
+
+        // Parse the source only once. Cloning is much cheaper.
+        let container = document.createElement('div');
+        container.innerHTML = svgSource;
+        template = container.firstElementChild as SVGSVGElement;
+        ICON_TEMPLATES.set(iconName, template);
+    }
+
+    return template.cloneNode(true) as SVGSVGElement;
+}
+
+/// Returns the icon's SVG source, fetching it from the server if necessary.
+export function fetchIconSource(iconName: string): Promise<string> {
+    let promise = ICON_PROMISE_CACHE[iconName];
+
+    if (promise === undefined) {
+        console.log(`Fetching icon ${iconName} from server`);
+
+        promise = fetch(`/rio/icon/${iconName}`).then((response) =>
+            response.text()
+        );
+
+        ICON_PROMISE_CACHE[iconName] = promise;
+    }
+
+    return promise;
+}
+
 export function applyColorSet(element: HTMLElement, colorSet: ColorSet): void {
     // Remove all switcheroos
     element.classList.remove(
@@ -180,19 +234,8 @@ export async function applyIcon(
     iconName: string,
     cssColor: string
 ): Promise<void> {
-    // Is the icon already in the cache?
-    let promise = ICON_PROMISE_CACHE[iconName];
-
-    // No, load it from the server
-    if (promise === undefined) {
-        console.log(`Fetching icon ${iconName} from server`);
-
-        promise = fetch(`/rio/icon/${iconName}`).then((response) =>
-            response.text()
-        );
-
-        ICON_PROMISE_CACHE[iconName] = promise;
-    }
+    // Get the icon, loading it from the server if it isn't cached yet
+    let promise = fetchIconSource(iconName);
 
     // Avoid races: When calling this function multiple times on the same
     // element it can sometimes assign the first icon AFTER the second one, thus
@@ -33,6 +33,8 @@ export type Fill =
           type: 'image';
           imageUrl: string;
           fillMode: 'fit' | 'stretch' | 'tile' | 'zoom';
+          loading: 'eager' | 'lazy';
+          placeholderUrl: string | null;
       };
 
 export type TextStyle = {
@@ -1,6 +1,7 @@
 import { goingAway, pixelsPerRem } from './app';
 import { DebuggerConnectorComponent } from './components/debuggerConnector';
 import { componentsById, updateComponentStates } from './componentManagement';
+import { registerIcons } from './designApplication';
 import {
     requestFileUpload,
     registerFont,
@@ -272,6 +273,14 @@ export async function processMessageReturnResponse(
             response = null;
             break;
 
+        case 'registerIcons':
+            // Icon components refer to their icons by name. The sources are
+            // sent separately, once per session.
+            registerIcons(message.params.icons);
+
+            response = null;
+            break;
+
         case 'evaluateJavaScript':
             // Allow the server to run JavaScript
             //
@@ -52,6 +52,115 @@ export async function registerFont(
     }
 }
 
+// Files are uploaded in chunks of this size. If the connection drops, only the
+// chunk that was in flight needs to be sent again.
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+
+// How often to retry a failed upload request before giving up
+const MAX_UPLOAD_ATTEMPTS = 20;
+
+/// Sends a request, retrying with exponential backoff if the network fails or
+/// the server responds with a 5xx error. Client errors (4xx) are not retried,
+/// since repeating the same request won't help.
+async function fetchWithRetries(
+    url: string,
+    init: RequestInit
+): Promise<Response> {
+    let delay = 500;
+
+    for (let attempt = 1; ; attempt++) {
+        let response: Response | null = null;
+
+        try {
+            response = await fetch(url, init);
+        } catch (error) {
+            console.warn(`Upload request to ${url} failed: ${error}`);
+        }
+
+        if (response !== null && response.status < 500) {
+            if (!response.ok) {
+                throw new Error(
+                    `Upload request to ${url} was rejected with status ${response.status}`
+                );
+            }
+
+            return response;
+        }
+
+        if (attempt >= MAX_UPLOAD_ATTEMPTS) {
+            throw new Error(
+                `Giving up on upload request to ${url} after ${attempt} attempts`
+            );
+        }
+
+        await new Promise((resolve) => setTimeout(resolve, delay));
+        delay = Math.min(delay * 2, 30000);
+    }
+}
+
+/// Uploads the given files in chunks. The server keeps track of how much of
+/// each file it has received, so after a failed chunk the upload continues
+/// from wherever the server says it left off.
+async function uploadFilesInChunks(
+    uploadUrl: string,
+    files: File[]
+): Promise<void> {
+    // Announce the files. This also tells us how much has already been
+    // received, in case this upload is being resumed.
+    let response = await fetchWithRetries(uploadUrl, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+            files: files.map((file) => ({
+                name: file.name,
+                type: file.type,
+                size: file.size,
+            })),
+        }),
+    });
+    let received: number[] = (await response.json()).received;
+
+    for (let [fileIndex, file] of files.entries()) {
+        while (received[fileIndex] < file.size) {
+            let start = received[fileIndex];
+            let end = Math.min(start + UPLOAD_CHUNK_SIZE, file.size);
+
+            try {
+                response = await fetchWithRetries(
+                    `${uploadUrl}/${fileIndex}`,
+                    {
+                        method: 'PUT',
+                        headers: {
+                            'Content-Range': `bytes ${start}-${end - 1}/${
+                                file.size
+                            }`,
+                        },
+                        body: file.slice(start, end),
+                    }
+                );
+            } catch (error) {
+                // The chunk may have been rejected because the server's idea
+                // of the upload differs from ours. Resynchronize and continue
+                // from there.
+                console.warn(`Failed to upload chunk: ${error}`);
+                response = await fetchWithRetries(uploadUrl, {
+                    method: 'GET',
+                });
+
+                let newReceived: number[] = (await response.json()).received;
+                if (newReceived[fileIndex] <= start) {
+                    throw error;
+                }
+
+                received = newReceived;
+                continue;
+            }
+
+            received = (await response.json()).received;
+        }
+    }
+}
+
 export function requestFileUpload(message: any): void {
     // Create a file upload input element
     let input = document.createElement('input');
@@ -70,26 +179,13 @@ export function requestFileUpload(message: any): void {
             return;
         }
 
-        // Build a `FormData` object containing the files
-        const data = new FormData();
-
-        let ii = 0;
-        for (const file of input.files || []) {
-            ii += 1;
-            data.append('file_names', file.name);
-            data.append('file_types', file.type);
-            data.append('file_sizes', file.size.toString());
-            data.append('file_streams', file, file.name);
-        }
-
-        // FastAPI has trouble parsing empty form data. Append a dummy value so
-        // it's never empty
-        data.append('dummy', 'dummy');
-
-        // Upload the files
-        fetch(message.uploadUrl, {
-            method: 'PUT',
-            body: data,
+        // Upload the files. If no files were selected, this still informs
+        // the server that the dialog was closed.
+        uploadFilesInChunks(
+            message.uploadUrl,
+            Array.from(input.files || [])
+        ).catch((error) => {
+            console.error(`File upload failed: ${error}`);
         });
 
         // Remove the input element from the DOM. Removing this too early causes
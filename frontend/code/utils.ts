@@ -94,3 +94,57 @@ export function firstDefined(...args: any[]): any {
 
     return undefined;
 }
+
+/// Numeric arrays are sent by the server as base64 encoded, little-endian
+/// buffers rather than JSON lists. This is the same format plotly.js
+/// understands natively.
+export type EncodedTypedArray = {
+    dtype: 'i1' | 'u1' | 'i2' | 'u2' | 'i4' | 'u4' | 'i8' | 'u8' | 'f4' | 'f8';
+    bdata: string;
+};
+
+const TYPED_ARRAY_CONSTRUCTORS = {
+    i1: Int8Array,
+    u1: Uint8Array,
+    i2: Int16Array,
+    u2: Uint16Array,
+    i4: Int32Array,
+    u4: Uint32Array,
+    i8: BigInt64Array,
+    u8: BigUint64Array,
+    f4: Float32Array,
+    f8: Float64Array,
+};
+
+export function isEncodedTypedArray(value: any): value is EncodedTypedArray {
+    return (
+        value !== null &&
+        typeof value === 'object' &&
+        !Array.isArray(value) &&
+        typeof value.bdata === 'string'
+    );
+}
+
+/// Wraps the server's buffer in a typed array. The values themselves are never
+/// parsed.
+export function decodeTypedArray(
+    encoded: EncodedTypedArray
+): ArrayLike<number | bigint> {
+    let bytes: Uint8Array;
+
+    // Use the native decoder where available
+    // @ts-ignore
+    if (Uint8Array.fromBase64 !== undefined) {
+        // @ts-ignore
+        bytes = Uint8Array.fromBase64(encoded.bdata);
+    } else {
+        let binary = atob(encoded.bdata);
+        bytes = new Uint8Array(binary.length);
+
+        for (let ii = 0; ii < binary.length; ii++) {
+            bytes[ii] = binary.charCodeAt(ii);
+        }
+    }
+
+    return new TYPED_ARRAY_CONSTRUCTORS[encoded.dtype](bytes.buffer);
+}
@@ -13,6 +13,7 @@ from .common import (
     EventHandler,
     FileInfo,
     ImageLike,
+    UploadProgress,
     escape_markdown,
     escape_markdown_code,
 )
@@ -20,8 +21,10 @@ from .components import *
 from .cursor_style import CursorStyle
 from .errors import *
 from .fills import *
+from .process_pool import report_progress
 from .routing import Page
 from .session import *
+from .stall_detection import StallReport
 from .text_style import *
 from .theme import *
 from .user_settings_module import *
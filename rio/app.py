@@ -165,6 +165,13 @@ class App:
         build_connection_lost_message: Callable[
             [], rio.Component
         ] = make_default_connection_lost_component,
+        proxy_remote_assets: bool = False,
+        refresh_interval: int | float | timedelta = timedelta(seconds=1 / 60),
+        max_handler_threads: int = 16,
+        max_handler_threads_per_session: int = 4,
+        max_worker_processes: int | None = None,
+        stall_threshold: int | float | timedelta | None = None,
+        on_stall: rio.EventHandler[rio.StallReport] = None,
     ):
         """
         Args:
@@ -229,6 +236,45 @@ class App:
                 are needed by your app. If not specified, Rio will assume the
                 assets are stored in a directory called "assets" in the same
                 directory as the main Python file.
+
+            proxy_remote_assets: If `True`, assets referenced by URL (such as
+                images created from a `rio.URL`) are downloaded by the server
+                and hosted by the app itself, instead of having the client
+                access the remote server directly. Downloads are cached on
+                disk. This is useful if the remote server is slow, not
+                reachable from the client, or shouldn't learn about your users.
+
+            refresh_interval: The minimum time between two refreshes of a
+                session. Whenever a component's state changes, Rio rebuilds
+                the affected components and sends the changes to the client.
+                If many events arrive in quick succession, e.g. while the user
+                drags the mouse, waiting a little allows all of their changes
+                to be handled in a single refresh, rather than one each. A
+                single event is never delayed if the previous refresh was long
+                enough ago. Set this to `0` to refresh as often as possible.
+
+            max_handler_threads: How many event handlers decorated with
+                `rio.event.run_in_thread` may run at the same time, across all
+                sessions. Any further handlers wait for a thread to become
+                available.
+
+            max_handler_threads_per_session: How many event handlers decorated
+                with `rio.event.run_in_thread` a single session may run at the
+                same time. This prevents one user from occupying all threads.
+
+            max_worker_processes: How many processes `Session.run_in_process`
+                may use, across all sessions. If `None`, this is the number of
+                CPU cores.
+
+            stall_threshold: If set, Rio watches for code which blocks the
+                event loop for longer than this. Since all sessions are served
+                by the same loop, every user has to wait while it's blocked.
+                Each such stall is passed to `on_stall`, along with the
+                session, component and event handler which caused it.
+
+            on_stall: Called with a `rio.StallReport` each time the event loop
+                was blocked for longer than `stall_threshold`. If not given,
+                stalls are logged as warnings instead.
         """
         main_file = _get_main_file()
 
@@ -261,12 +307,30 @@ class App:
         self.default_attachments: MutableSequence[Any] = list(default_attachments)
         self._theme = theme
         self._build_connection_lost_message = build_connection_lost_message
+        self._proxy_remote_assets = proxy_remote_assets
 
         if isinstance(ping_pong_interval, timedelta):
             self._ping_pong_interval = ping_pong_interval
         else:
             self._ping_pong_interval = timedelta(seconds=ping_pong_interval)
 
+        if isinstance(refresh_interval, timedelta):
+            self._refresh_interval = refresh_interval
+        else:
+            self._refresh_interval = timedelta(seconds=refresh_interval)
+
+        self._max_handler_threads = max_handler_threads
+        self._max_handler_threads_per_session = max_handler_threads_per_session
+        self._max_worker_processes = max_worker_processes
+        self._on_stall = on_stall
+
+        if isinstance(stall_threshold, timedelta):
+            self._stall_threshold = stall_threshold
+        elif stall_threshold is None:
+            self._stall_threshold = None
+        else:
+            self._stall_threshold = timedelta(seconds=stall_threshold)
+
     def _as_fastapi(
         self,
         *,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import contextlib
 import copy
 import functools
@@ -8,6 +9,7 @@ import inspect
 import io
 import json
 import logging
+import os
 import secrets
 import time
 import traceback
@@ -29,13 +31,18 @@ from . import (
     app,
     assets,
     byte_serving,
+    chunked_uploads,
     common,
     components,
     debug,
     global_state,
     inspection,
+    process_pool,
+    remote_assets,
+    responsive_images,
     routing,
     session,
+    stall_detection,
     user_settings_module,
 )
 from .common import URL
@@ -170,12 +177,38 @@ class AppServer(fastapi.FastAPI):
             str, assets.Asset
         ] = weakref.WeakValueDictionary()
 
+        # Used to download assets from other servers. This pools connections
+        # and caches the downloaded files.
+        self._remote_asset_cache = remote_assets.RemoteAssetCache()
+
         # All pending file uploads. These are stored in memory for a limited
-        # time. When a file is uploaded the corresponding future is set.
+        # time, which is reset whenever the client makes progress. When all
+        # files have been uploaded the upload's future is set.
         self._pending_file_uploads: timer_dict.TimerDict[
-            str, asyncio.Future[list[common.FileInfo]]
+            str, chunked_uploads.PendingUpload
         ] = timer_dict.TimerDict(default_duration=timedelta(minutes=15))
 
+        # Runs event handlers decorated with `rio.event.run_in_thread`, for all
+        # sessions. The threads are only started when needed.
+        self._handler_thread_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=app_._max_handler_threads,
+            thread_name_prefix="rio-event-handler",
+        )
+
+        # Runs CPU heavy functions passed to `Session.run_in_process`, for all
+        # sessions. The processes are only started when needed.
+        self._process_pool = process_pool.ProcessPool(app_._max_worker_processes)
+
+        # Renders matplotlib figures. Rendering is CPU heavy, so this is kept
+        # separate and small, so a page full of plots can't occupy every core.
+        self._figure_rendering_pool = process_pool.ProcessPool(
+            min(4, os.cpu_count() or 1)
+        )
+
+        # Watches for code blocking the event loop, if enabled. This is started
+        # once the loop is running.
+        self._stall_detector: stall_detection.StallDetector | None = None
+
         # FastAPI
         self.add_api_route("/robots.txt", self._serve_robots, methods=["GET"])
         self.add_api_route("/sitemap.xml", self._serve_sitemap, methods=["GET"])
@@ -189,7 +222,19 @@ class AppServer(fastapi.FastAPI):
             "/rio/icon/{icon_name:path}", self._serve_icon, methods=["GET"]
         )
         self.add_api_route(
-            "/rio/upload/{upload_token}", self._serve_file_upload, methods=["PUT"]
+            "/rio/upload/{upload_token}",
+            self._serve_file_upload_start,
+            methods=["PUT"],
+        )
+        self.add_api_route(
+            "/rio/upload/{upload_token}",
+            self._serve_file_upload_status,
+            methods=["GET"],
+        )
+        self.add_api_route(
+            "/rio/upload/{upload_token}/{file_index}",
+            self._serve_file_upload_chunk,
+            methods=["PUT"],
         )
         self.add_api_websocket_route("/rio/ws", self._serve_websocket)
 
@@ -230,6 +275,22 @@ class AppServer(fastapi.FastAPI):
             print("Exception in `_on_app_close` event handler:")
             traceback.print_exc()
 
+    def _report_stall(self, report: stall_detection.StallReport) -> None:
+        if self.app._on_stall is None:
+            logging.warning(f"{report}. It was executing:\n{report.stack}")
+            return
+
+        try:
+            result = self.app._on_stall(report)
+
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result)
+
+        # Display and discard exceptions
+        except Exception:
+            print("Exception in `on_stall` event handler:")
+            traceback.print_exc()
+
     @contextlib.asynccontextmanager
     async def _lifespan(self):
         # If running as a server, periodically clean up expired sessions
@@ -241,6 +302,15 @@ class AppServer(fastapi.FastAPI):
                 name="Periodic session cleanup",
             )
 
+        # Watch for stalls, if requested
+        if self.app._stall_threshold is not None:
+            self._stall_detector = stall_detection.StallDetector(
+                asyncio.get_running_loop(),
+                self.app._stall_threshold.total_seconds(),
+                self._report_stall,
+            )
+            self._stall_detector.start()
+
         # Trigger the app's startup event
         #
         # This will be done blockingly, so the user can prepare any state before
@@ -269,6 +339,15 @@ class AppServer(fastapi.FastAPI):
 
             await self._call_on_app_close()
 
+            await self._remote_asset_cache.aclose()
+
+            self._handler_thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool.shutdown()
+            self._figure_rendering_pool.shutdown()
+
+            if self._stall_detector is not None:
+                self._stall_detector.stop()
+
     def weakly_host_asset(self, asset: assets.HostedAsset) -> None:
         """
         Register an asset with this server. The asset will be held weakly,
@@ -427,6 +506,21 @@ Sitemap: {request_url.with_path("/sitemap.xml")}
             media_type="application/json",
         )
 
+    async def _fetch_asset_as_blob(
+        self, asset: assets.Asset
+    ) -> tuple[bytes, str | None]:
+        """
+        Like `asset.try_fetch_as_blob()`, but remote assets are fetched using
+        this server's HTTP client and cache.
+        """
+        if isinstance(asset, assets.UrlAsset):
+            return await self._remote_asset_cache.fetch(str(asset.url))
+
+        if isinstance(asset, assets.ProxiedUrlAsset):
+            return await self._remote_asset_cache.fetch(str(asset.remote_url))
+
+        return await asset.try_fetch_as_blob()
+
     async def _serve_favicon(self) -> fastapi.responses.Response:
         """
         Handler for serving the favicon via fastapi, if one is set.
@@ -434,7 +528,7 @@ Sitemap: {request_url.with_path("/sitemap.xml")}
         # If an icon is set, make sure a cached version exists
         if self._icon_as_png_blob is None and self.app._icon is not None:
             try:
-                icon_blob, _ = await self.app._icon.try_fetch_as_blob()
+                icon_blob, _ = await self._fetch_asset_as_blob(self.app._icon)
 
                 input_buffer = io.BytesIO(icon_blob)
                 output_buffer = io.BytesIO()
@@ -516,6 +610,12 @@ Sitemap: {request_url.with_path("/sitemap.xml")}
         except KeyError:
             return fastapi.responses.Response(status_code=404)
 
+        # If the client is asking for a specific width, try to serve a
+        # downscaled variant of the image instead of the original
+        variant_response = await self._serve_image_variant(request, asset)
+        if variant_response is not None:
+            return variant_response
+
         # Fetch the asset's content and respond
         if isinstance(asset, assets.BytesAsset):
             return fastapi.responses.Response(
@@ -528,9 +628,76 @@ Sitemap: {request_url.with_path("/sitemap.xml")}
                 file_path=asset.path,
                 media_type=asset.media_type,
             )
+        elif isinstance(asset, assets.PilImageAsset):
+            return fastapi.responses.Response(
+                content=await asset.encode(),
+                media_type=asset.media_type,
+            )
+        elif isinstance(asset, assets.ProxiedUrlAsset):
+            try:
+                content, media_type = await self._fetch_asset_as_blob(asset)
+            except ValueError:
+                return fastapi.responses.Response(
+                    status_code=fastapi.status.HTTP_502_BAD_GATEWAY
+                )
+
+            return fastapi.responses.Response(
+                content=content,
+                media_type=asset.media_type or media_type,
+            )
+        elif isinstance(asset, assets.StreamingAsset):
+            # Streaming assets can only be consumed once. Stop hosting it, so
+            # any further requests receive a 404 rather than an empty file.
+            del self._assets[asset.secret_id]
+
+            return fastapi.responses.StreamingResponse(
+                asset.iter_chunks(),
+                media_type=asset.media_type,
+            )
         else:
             assert False, f"Unable to serve asset of unknown type: {asset}"
 
+    async def _serve_image_variant(
+        self,
+        request: fastapi.Request,
+        asset: assets.HostedAsset,
+    ) -> fastapi.responses.Response | None:
+        """
+        Serves a resized variant of an image asset, if the client has requested
+        one via the `width` query parameter. Returns `None` if the original
+        should be served instead.
+        """
+        try:
+            requested_width = int(request.query_params["width"])
+        except (KeyError, ValueError):
+            return None
+
+        if requested_width <= 0:
+            return None
+
+        accepts_webp = "image/webp" in request.headers.get("accept", "")
+
+        variant = await responsive_images.get_variant(
+            asset,
+            requested_width,
+            accepts_webp=accepts_webp,
+        )
+
+        if variant is None:
+            return None
+
+        file_path, media_type = variant
+        response = byte_serving.range_requests_response(
+            request,
+            file_path=file_path,
+            media_type=media_type,
+        )
+
+        # The format depends on the `Accept` header, so caches must take it
+        # into account
+        response.headers["vary"] = "Accept"
+        return response
+
     async def _serve_icon(self, icon_name: str) -> fastapi.responses.Response:
         """
         Allows the client to request an icon by name. This is not actually the
@@ -551,73 +718,87 @@ Sitemap: {request_url.with_path("/sitemap.xml")}
             media_type="image/svg+xml",
         )
 
-    async def _serve_file_upload(
-        self,
-        upload_token: str,
-        file_names: list[str],
-        file_types: list[str],
-        file_sizes: list[str],
-        # If no files are uploaded `files` isn't present in the form data at
-        # all. Using a default value ensures that those requests don't fail
-        # because of "missing parameters".
-        #
-        # Lists are mutable, make sure not to modify this value!
-        file_streams: list[fastapi.UploadFile] = [],
-    ):
-        # Try to find the future for this token
+    def _get_pending_upload(self, upload_token: str) -> chunked_uploads.PendingUpload:
+        """
+        Looks up the pending upload for the given token, raising a
+        `HTTPException` if there is none. Since the client is evidently still
+        working on the upload, its expiration timer is reset.
+        """
         try:
-            future = self._pending_file_uploads.pop(upload_token)
+            upload = self._pending_file_uploads[upload_token]
         except KeyError:
             raise fastapi.HTTPException(
                 status_code=fastapi.status.HTTP_400_BAD_REQUEST,
                 detail="Invalid upload token.",
             )
 
-        # Make sure the same number of values was received for each parameter
-        n_names = len(file_names)
-        n_types = len(file_types)
-        n_sizes = len(file_sizes)
-        n_streams = len(file_streams)
+        self._pending_file_uploads[upload_token] = upload
+        return upload
+
+    def _forget_upload_if_complete(self, upload_token: str) -> None:
+        upload = self._pending_file_uploads.get(upload_token)
+
+        if upload is not None and upload.future.done():
+            del self._pending_file_uploads[upload_token]
 
-        if n_names != n_types or n_names != n_sizes or n_names != n_streams:
+    async def _serve_file_upload_start(
+        self,
+        request: fastapi.Request,
+        upload_token: str,
+    ) -> fastapi.responses.Response:
+        """
+        Handler for starting a chunked file upload. The client sends a manifest
+        of all files it is about to upload. The response tells the client how
+        many bytes of each file the server has already received, which is zero
+        unless this is a resumed upload.
+        """
+        upload = self._get_pending_upload(upload_token)
+
+        try:
+            manifest = chunked_uploads.UploadManifest.from_json(await request.json())
+        except (ValueError, uniserde.SerdeError):
             raise fastapi.HTTPException(
                 status_code=fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail="Inconsistent number of files between the different message parts.",
+                detail="Invalid upload manifest.",
             )
 
-        # Parse the file sizes
-        parsed_file_sizes: list[int] = []
-        for file_size in file_sizes:
-            try:
-                parsed = int(file_size)
-            except ValueError:
-                raise fastapi.HTTPException(
-                    status_code=fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Invalid file size.",
-                )
+        upload.start(manifest)
+        self._forget_upload_if_complete(upload_token)
 
-            if parsed < 0:
-                raise fastapi.HTTPException(
-                    status_code=fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Invalid file size.",
-                )
+        return fastapi.responses.JSONResponse({"received": upload.bytes_received})
 
-            parsed_file_sizes.append(parsed)
+    async def _serve_file_upload_status(
+        self,
+        upload_token: str,
+    ) -> fastapi.responses.Response:
+        """
+        Handler for querying the state of a chunked file upload. This allows
+        clients to resume an interrupted upload where it left off.
+        """
+        upload = self._get_pending_upload(upload_token)
 
-        # Complete the future
-        future.set_result(
-            [
-                common.FileInfo(
-                    name=file_names[ii],
-                    size_in_bytes=parsed_file_sizes[ii],
-                    media_type=file_types[ii],
-                    _contents=await file_streams[ii].read(),
-                )
-                for ii in range(n_names)
-            ]
+        return fastapi.responses.JSONResponse({"received": upload.bytes_received})
+
+    async def _serve_file_upload_chunk(
+        self,
+        request: fastapi.Request,
+        upload_token: str,
+        file_index: int,
+    ) -> fastapi.responses.Response:
+        """
+        Handler for receiving a single chunk of a file. The chunk's position in
+        the file is specified via the `Content-Range` header.
+        """
+        upload = self._get_pending_upload(upload_token)
+
+        content_range = chunked_uploads.parse_content_range_header(
+            request.headers.get("content-range")
         )
 
-        return fastapi.responses.Response(status_code=fastapi.status.HTTP_200_OK)
+        await upload.write_chunk(file_index, content_range, request.stream())
+        self._forget_upload_if_complete(upload_token)
+
+        return fastapi.responses.JSONResponse({"received": upload.bytes_received})
 
     async def _serve_websocket(
         self,
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import asyncio
 import hashlib
 import io
 import os
@@ -9,12 +10,12 @@ from functools import lru_cache
 from pathlib import Path
 from typing import *  # type: ignore
 
-import httpx
 from PIL.Image import Image
 from yarl import URL
 
 import rio
 
+from . import remote_assets
 from .common import ImageLike
 from .self_serializing import SelfSerializing
 
@@ -118,12 +119,12 @@ class Asset(SelfSerializing):
         image: ImageLike,
         media_type: str | None = None,
     ) -> Asset:
+        # Encoding PIL images is slow, so it's deferred until the image is
+        # actually requested.
         if isinstance(image, Image):
-            file = io.BytesIO()
-            image.save(file, format="PNG")
-            image = file.getvalue()
-            media_type = "image/png"
-        elif media_type is None:
+            return PilImageAsset(image)
+
+        if media_type is None:
             # For some image formats, browsers are too stupid to display the
             # image correctly if we don't explicitly tell them the mime type.
             # Check for those formats.
@@ -230,6 +231,55 @@ class BytesAsset(HostedAsset):
         return "b-" + _securely_hash_bytes_changes_between_runs(self.data).hex()
 
 
+def _encode_png(image: Image) -> bytes:
+    file = io.BytesIO()
+    image.save(file, format="PNG")
+    return file.getvalue()
+
+
+class PilImageAsset(HostedAsset):
+    """
+    An asset backed by a PIL image. The image is only encoded once it's first
+    requested, and the encoding happens in a worker thread so it doesn't block
+    the event loop.
+    """
+
+    def __init__(self, image: Image):
+        super().__init__("image/png")
+
+        self.image = image
+        self._encoded: asyncio.Future[bytes] | None = None
+
+    def _eq(self, other: PilImageAsset) -> bool:
+        return self.secret_id == other.secret_id
+
+    async def try_fetch_as_blob(self) -> tuple[bytes, str | None]:
+        return await self.encode(), self.media_type
+
+    async def encode(self) -> bytes:
+        """
+        Returns the image as PNG, encoding it if that hasn't happened yet.
+        """
+        if self._encoded is None:
+            self._encoded = asyncio.ensure_future(
+                asyncio.to_thread(_encode_png, self.image)
+            )
+
+        return await asyncio.shield(self._encoded)
+
+    def _get_secret_id(self) -> str:
+        # Hash the raw pixels rather than the PNG. That's much cheaper than
+        # encoding, and still gives identical images the same URL, so browsers
+        # can cache them across rebuilds.
+        hasher = hashlib.sha256()
+        hasher.update(_HASH_SALT)
+        hasher.update(
+            f"{self.image.mode}-{self.image.width}x{self.image.height}".encode("utf-8")
+        )
+        hasher.update(self.image.tobytes())
+        return "p-" + hasher.hexdigest()
+
+
 @lru_cache
 def path_exists(path: Path) -> bool:
     return path.exists()
@@ -269,6 +319,127 @@ class PathAsset(HostedAsset):
         )
 
 
+# Streamed data is sent to the client in chunks of roughly this size. Smaller
+# pieces produced by the source are combined, so that e.g. a generator yielding
+# individual CSV lines doesn't result in one network write per line.
+STREAMING_CHUNK_SIZE = 256 * 1024
+
+StreamSource = (
+    AsyncIterable[bytes] | AsyncIterable[str] | Iterable[bytes] | Iterable[str] | IO
+)
+
+
+def _read_batch_sync(source: Iterator[bytes | str] | IO) -> bytes | None:
+    """
+    Reads roughly `STREAMING_CHUNK_SIZE` bytes from a synchronous source.
+    Returns `None` once the source is exhausted.
+
+    This function may block, so it's meant to be called in a worker thread.
+    """
+    # File-like objects
+    if hasattr(source, "read"):
+        data = source.read(STREAMING_CHUNK_SIZE)  # type: ignore
+
+        if not data:
+            return None
+
+        return data.encode("utf-8") if isinstance(data, str) else data
+
+    # Iterators
+    pieces: list[bytes] = []
+    size = 0
+
+    for piece in source:  # type: ignore
+        if isinstance(piece, str):
+            piece = piece.encode("utf-8")
+
+        pieces.append(piece)
+        size += len(piece)
+
+        if size >= STREAMING_CHUNK_SIZE:
+            break
+
+    if not pieces:
+        return None
+
+    return b"".join(pieces)
+
+
+async def iter_byte_chunks(source: StreamSource) -> AsyncIterator[bytes]:
+    """
+    Yields the contents of the given source in reasonably sized `bytes` chunks.
+
+    The source may be an async iterable, a regular iterable or a file-like
+    object, producing either `bytes` or `str`. Strings are encoded as UTF-8.
+    Synchronous sources are read in a worker thread, so slow generators or
+    files don't block the event loop.
+    """
+    # Async iterables
+    if hasattr(source, "__aiter__"):
+        pending: list[bytes] = []
+        pending_size = 0
+
+        async for piece in source:  # type: ignore
+            if isinstance(piece, str):
+                piece = piece.encode("utf-8")
+
+            pending.append(piece)
+            pending_size += len(piece)
+
+            if pending_size >= STREAMING_CHUNK_SIZE:
+                yield b"".join(pending)
+                pending.clear()
+                pending_size = 0
+
+        if pending:
+            yield b"".join(pending)
+
+        return
+
+    # File-like objects and regular iterables
+    if not hasattr(source, "read"):
+        source = iter(source)  # type: ignore
+
+    while True:
+        chunk = await asyncio.to_thread(_read_batch_sync, source)  # type: ignore
+
+        if chunk is None:
+            break
+
+        yield chunk
+
+
+class StreamingAsset(HostedAsset):
+    """
+    An asset whose contents are produced on the fly, rather than being held in
+    memory. Since the underlying source can only be consumed once, the asset
+    can only be served a single time.
+    """
+
+    def __init__(
+        self,
+        source: StreamSource,
+        media_type: str | None = None,
+    ):
+        super().__init__(media_type)
+
+        self.source = source
+
+    def _eq(self, other: StreamingAsset) -> bool:
+        return self is other
+
+    async def try_fetch_as_blob(self) -> tuple[bytes, str | None]:
+        return b"".join([chunk async for chunk in self.iter_chunks()]), self.media_type
+
+    def _get_secret_id(self) -> str:
+        # The contents aren't known in advance, so there's nothing to hash.
+        # Every streaming asset is unique anyway.
+        return "s-" + secrets.token_hex(32)
+
+    def iter_chunks(self) -> AsyncIterator[bytes]:
+        return iter_byte_chunks(self.source)
+
+
 class UrlAsset(Asset):
     def __init__(
         self,
@@ -283,27 +454,61 @@ class UrlAsset(Asset):
         return self.url == other.url
 
     async def try_fetch_as_blob(self) -> tuple[bytes, str | None]:
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(str(self._url))
-
-                content_type = response.headers.get("Content-Type")
-                if content_type is None:
-                    content_type = "application/octet-stream"
-                else:
-                    content_type, _, _ = content_type.partition(";")
-
-                return response.read(), content_type
-        except httpx.HTTPError:
-            raise ValueError(f"Could not fetch asset from {self._url}")
+        return await remote_assets.get_shared_cache().fetch(str(self._url))
 
     @property
     def url(self) -> URL:
         return self._url
 
     def _serialize(self, sess: rio.Session) -> str:
+        # In proxy mode the client doesn't access the remote server directly.
+        # Instead, the app server fetches the asset and hosts it itself.
+        if sess._app_server.app._proxy_remote_assets:
+            return self._get_proxy()._serialize(sess)
+
         return self._url.human_repr()
 
+    def _get_proxy(self) -> ProxiedUrlAsset:
+        # The proxy is only hosted weakly, so it's stored here to keep it alive
+        # for as long as this asset is.
+        try:
+            return self._proxy
+        except AttributeError:
+            pass
+
+        self._proxy = ProxiedUrlAsset(self._url, self.media_type)
+        return self._proxy
+
+
+class ProxiedUrlAsset(HostedAsset):
+    """
+    Hosts a remote asset locally. The app server downloads the asset (using its
+    cache), rather than the client accessing the remote server directly.
+    """
+
+    def __init__(
+        self,
+        remote_url: URL,
+        media_type: str | None = None,
+    ):
+        super().__init__(media_type)
+
+        self.remote_url = remote_url
+
+    def _eq(self, other: ProxiedUrlAsset) -> bool:
+        return self.remote_url == other.remote_url
+
+    async def try_fetch_as_blob(self) -> tuple[bytes, str | None]:
+        return await remote_assets.get_shared_cache().fetch(str(self.remote_url))
+
+    def _get_secret_id(self) -> str:
+        return (
+            "u-"
+            + _securely_hash_bytes_changes_between_runs(
+                str(self.remote_url).encode("utf-8")
+            ).hex()
+        )
+
 
 def detect_important_image_types(image: ImageLike) -> str | None:
     if isinstance(image, Path):
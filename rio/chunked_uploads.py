@@ -0,0 +1,294 @@
+"""
+Implements resumable, chunked file uploads.
+
+Rather than sending all files in a single request, the client first announces
+which files it is going to upload (the "manifest"), and then sends their
+contents in ranged chunks, each marked with a `Content-Range` header. Chunks are
+written to temporary files on the server. If the connection drops, the client
+can ask the server how many bytes have already arrived and continue from there.
+
+Once every file has been received completely, the upload's future is resolved
+with the resulting `FileInfo` instances.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import tempfile
+import weakref
+from pathlib import Path
+from typing import *  # type: ignore
+
+import aiofiles
+import fastapi
+import uniserde
+from fastapi import HTTPException
+
+import rio
+
+from . import common
+
+__all__ = [
+    "PendingUpload",
+    "UploadManifest",
+    "parse_content_range_header",
+]
+
+
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadManifestFile(uniserde.Serde):
+    name: str
+    type: str
+    size: int
+
+
+class UploadManifest(uniserde.Serde):
+    files: list[UploadManifestFile]
+
+
+def _remove_file(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def parse_content_range_header(header: str | None) -> tuple[int, int, int]:
+    """
+    Parses a `Content-Range` header of the form `bytes start-end/total`.
+    `start` and `end` are inclusive, as per RFC 7233.
+
+    Raises a `HTTPException` if the header is missing or malformed.
+    """
+    if header is None:
+        raise HTTPException(
+            fastapi.status.HTTP_400_BAD_REQUEST,
+            detail="Chunks must be sent with a `Content-Range` header.",
+        )
+
+    match = CONTENT_RANGE_PATTERN.match(header.strip())
+    if match is None:
+        raise HTTPException(
+            fastapi.status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid `Content-Range` header: {header!r}",
+        )
+
+    start, end, total = map(int, match.groups())
+
+    if start > end or end >= total:
+        raise HTTPException(
+            fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=f"Invalid chunk range: {header!r}",
+        )
+
+    return start, end, total
+
+
+class _PendingFile:
+    """
+    A single file that is part of a pending upload. Its contents are written to
+    a temporary file, which is deleted automatically unless ownership is
+    transferred to a `FileInfo`.
+    """
+
+    def __init__(self, name: str, media_type: str, size_in_bytes: int):
+        self.name = name
+        self.media_type = media_type
+        self.size_in_bytes = size_in_bytes
+
+        # How many bytes, starting from the beginning of the file, have been
+        # received so far
+        self.bytes_received = 0
+
+        file_descriptor, path = tempfile.mkstemp(prefix="rio-upload-")
+        os.close(file_descriptor)
+        self.path = Path(path)
+
+        self._finalizer = weakref.finalize(self, _remove_file, self.path)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.bytes_received >= self.size_in_bytes
+
+    def as_file_info(self) -> common.FileInfo:
+        result = common.FileInfo(
+            name=self.name,
+            size_in_bytes=self.size_in_bytes,
+            media_type=self.media_type,
+            _contents=self.path,
+        )
+
+        # The temporary file now belongs to the `FileInfo`. Delete it once that
+        # is garbage collected, rather than this object.
+        self._finalizer.detach()
+        weakref.finalize(result, _remove_file, self.path)
+
+        return result
+
+
+class PendingUpload:
+    """
+    Server-side state of a single chunked upload. These are created when the
+    session asks the client to upload files, and stored in the app server until
+    the upload completes or expires.
+    """
+
+    def __init__(
+        self,
+        sess: rio.Session,
+        future: asyncio.Future[list[common.FileInfo]],
+        on_progress: rio.EventHandler[[common.UploadProgress]],
+    ):
+        self.session = sess
+        self.future = future
+        self.on_progress = on_progress
+
+        # The files being uploaded. `None` until the client has sent the
+        # manifest.
+        self.files: list[_PendingFile] | None = None
+
+        # Chunks are written one at a time. This prevents retried requests
+        # from interleaving their writes.
+        self._lock = asyncio.Lock()
+
+    @property
+    def bytes_received(self) -> list[int]:
+        """
+        The number of bytes received for each file, in manifest order.
+        """
+        if self.files is None:
+            return []
+
+        return [file.bytes_received for file in self.files]
+
+    @property
+    def is_complete(self) -> bool:
+        return self.files is not None and all(file.is_complete for file in self.files)
+
+    def start(self, manifest: UploadManifest) -> None:
+        """
+        Registers the files which are about to be uploaded. Calling this again
+        with the same manifest (e.g. because the client has reconnected) does
+        nothing.
+        """
+        if self.files is not None:
+            if [(f.name, f.media_type, f.size_in_bytes) for f in self.files] != [
+                (f.name, f.type, f.size) for f in manifest.files
+            ]:
+                raise HTTPException(
+                    fastapi.status.HTTP_409_CONFLICT,
+                    detail="The upload has already been started with different files.",
+                )
+
+            return
+
+        for file in manifest.files:
+            if file.size < 0:
+                raise HTTPException(
+                    fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="Invalid file size.",
+                )
+
+        self.files = [
+            _PendingFile(file.name, file.type, file.size) for file in manifest.files
+        ]
+
+        self._finish_if_complete()
+
+    async def write_chunk(
+        self,
+        file_index: int,
+        content_range: tuple[int, int, int],
+        chunk: AsyncIterable[bytes],
+    ) -> None:
+        """
+        Writes a single chunk of a file to disk. Chunks may overlap data which
+        has already been received, but may not leave any gaps.
+        """
+        if self.files is None:
+            raise HTTPException(
+                fastapi.status.HTTP_409_CONFLICT,
+                detail="The upload manifest must be sent before any chunks.",
+            )
+
+        # Careful: Negative indices would silently select files from the end
+        if not 0 <= file_index < len(self.files):
+            raise HTTPException(
+                fastapi.status.HTTP_404_NOT_FOUND,
+                detail=f"There is no file with index {file_index} in this upload.",
+            )
+
+        file = self.files[file_index]
+
+        start, end, total = content_range
+
+        if total != file.size_in_bytes:
+            raise HTTPException(
+                fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail=f"The chunk claims the file is {total} bytes large, but the manifest says {file.size_in_bytes}.",
+            )
+
+        async with self._lock:
+            if start > file.bytes_received:
+                raise HTTPException(
+                    fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                    detail=f"Chunks must be contiguous. Expected a chunk starting at or before byte {file.bytes_received}.",
+                )
+
+            expected_size = end - start + 1
+            received_size = 0
+
+            async with aiofiles.open(file.path, "r+b") as f:
+                await f.seek(start)
+
+                async for piece in chunk:
+                    received_size += len(piece)
+
+                    if received_size > expected_size:
+                        raise HTTPException(
+                            fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail="The chunk is larger than its `Content-Range`.",
+                        )
+
+                    await f.write(piece)
+
+            # Only count the data as received if the entire chunk has arrived.
+            # Partial chunks are simply sent again by the client.
+            if received_size != expected_size:
+                raise HTTPException(
+                    fastapi.status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="The chunk is smaller than its `Content-Range`.",
+                )
+
+            file.bytes_received = max(file.bytes_received, end + 1)
+
+        self._report_progress(file)
+        self._finish_if_complete()
+
+    def _report_progress(self, file: _PendingFile) -> None:
+        if self.on_progress is None:
+            return
+
+        assert self.files is not None
+
+        progress = common.UploadProgress(
+            file_name=file.name,
+            bytes_uploaded=sum(f.bytes_received for f in self.files),
+            total_size_in_bytes=sum(f.size_in_bytes for f in self.files),
+        )
+
+        self.session.create_task(
+            self.session._call_event_handler(self.on_progress, progress, refresh=True),
+            name="`on_progress` handler for file upload",
+        )
+
+    def _finish_if_complete(self) -> None:
+        if not self.is_complete or self.future.done():
+            return
+
+        assert self.files is not None
+        self.future.set_result([file.as_file_info() for file in self.files])
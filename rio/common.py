@@ -1,3 +1,4 @@
+import asyncio
 import hashlib
 import os
 import re
@@ -101,7 +102,10 @@ class FileInfo:
     name: str
     size_in_bytes: int
     media_type: str
-    _contents: bytes
+
+    # Either the file's contents, or the path of a (temporary) file on the
+    # server containing them
+    _contents: bytes | Path
 
     async def read_bytes(self) -> bytes:
         """
@@ -110,6 +114,9 @@ class FileInfo:
         Reads and returns the entire file as a `bytes` object. If you know that
         the file is text, consider using `read_text` instead.
         """
+        if isinstance(self._contents, Path):
+            return await asyncio.to_thread(self._contents.read_bytes)
+
         return self._contents
 
     async def read_text(self, *, encoding: str = "utf-8") -> str:
@@ -127,7 +134,7 @@ class FileInfo:
             UnicodeDecodeError: The file could not be decoded using the given
                 `encoding`.
         """
-        return self._contents.decode(encoding)
+        return (await self.read_bytes()).decode(encoding)
 
     @overload
     async def open(self, type: Literal["r"]) -> StringIO:
@@ -164,6 +171,38 @@ class FileInfo:
         raise ValueError("Invalid type. Expected 'r' or 'rb'.")
 
 
+@dataclass(frozen=True)
+class UploadProgress:
+    """
+    Describes how far along a file upload is.
+
+    Passed to the `on_progress` handler of `Session.file_chooser` each time a
+    chunk of a file has arrived at the server.
+
+    Attributes:
+        file_name: The name of the file which is currently being uploaded.
+
+        bytes_uploaded: How many bytes have been uploaded so far, summed over
+            all files.
+
+        total_size_in_bytes: The combined size of all files being uploaded.
+    """
+
+    file_name: str
+    bytes_uploaded: int
+    total_size_in_bytes: int
+
+    @property
+    def fraction(self) -> float:
+        """
+        The upload's progress as a number between 0 and 1.
+        """
+        if self.total_size_in_bytes == 0:
+            return 1
+
+        return self.bytes_uploaded / self.total_size_in_bytes
+
+
 T = TypeVar("T")
 P = ParamSpec("P")
 
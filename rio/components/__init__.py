@@ -21,6 +21,7 @@ from .icon import *
 from .image import *
 from .key_event_listener import *
 from .labeled_column import *
+from .lazy import *
 from .linear_containers import *
 from .link import *
 from .list_items import *
@@ -55,6 +56,7 @@ from .text import *
 from .text_input import *
 from .theme_context_switcher import *
 from .tooltip import *
+from .virtual_list_view import *
 from .website import *
 
 assert (
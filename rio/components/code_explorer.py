@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from uniserde import JsonDoc
+
 import rio
 
+from .. import markdown_rendering
 from .fundamental_component import FundamentalComponent
 
 __all__ = [
@@ -16,5 +19,19 @@ class CodeExplorer(FundamentalComponent):
 
     line_indices_to_component_keys: list[str | None]
 
+    def _custom_serialize(self) -> JsonDoc:
+        # Highlight the code here if possible, so every client doesn't have to
+        # do it again
+        if not markdown_rendering.is_available():
+            return {
+                "source_code_html": None,
+            }
+
+        highlighted = markdown_rendering.highlight_code(self.source_code, "python")
+
+        return {
+            "source_code_html": None if highlighted is None else highlighted[0],
+        }
+
 
 CodeExplorer._unique_id = "CodeExplorer-builtin"
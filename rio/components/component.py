@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import abc
-import asyncio
 import inspect
 import io
 import sys
@@ -22,6 +21,7 @@ import rio
 
 from .. import event, global_state, inspection
 from ..dataclass import RioDataclassMeta, class_local_fields, internal_field
+from ..refresh_scheduling import RefreshPriority
 from ..state_properties import StateBindingMaker, StateProperty
 from . import fundamental_component
 
@@ -31,43 +31,6 @@ __all__ = ["Component"]
 T = TypeVar("T")
 
 
-async def call_component_handler_once(
-    weak_component: weakref.ReferenceType[Component],
-    handler: Callable,
-) -> None:
-    # Does the component still exist?
-    component = weak_component()
-
-    if component is None:
-        return
-
-    # Call the handler
-    await component.call_event_handler(lambda: handler(component))
-    await component.session._refresh()
-
-
-async def _periodic_event_worker(
-    weak_component: weakref.ReferenceType[Component],
-    handler: Callable,
-    period: float,
-) -> None:
-    try:
-        sess = weak_component().session  # type: ignore
-    except AttributeError:
-        return
-
-    while True:
-        # Wait for the next tick
-        await asyncio.sleep(period)
-
-        # Wait until there's an active connection to the client. We won't run
-        # code periodically if we aren't sure whether the client will come back.
-        await sess._is_active_event.wait()
-
-        # Call the handler
-        await call_component_handler_once(weak_component, handler)
-
-
 def _determine_properties_set_by_creator(
     component: Component, args: tuple, kwargs: dict
 ) -> set[str]:
@@ -244,20 +207,13 @@ class ComponentMeta(RioDataclassMeta):
                 continue
 
             # Page changes are handled by the session. Register the handler
+            #
+            # (`periodic` handlers are registered by the session once the
+            # component is mounted.)
             if event_tag == event.EventTag.ON_PAGE_CHANGE:
                 callbacks = tuple(handler for handler, unused in event_handlers)
                 session._page_change_callbacks[component] = callbacks
 
-            # The `periodic` event needs a task to work in
-            elif event_tag == event.EventTag.PERIODIC:
-                for callback, period in event_handlers:
-                    session.create_task(
-                        _periodic_event_worker(
-                            weakref.ref(component), callback, period
-                        ),
-                        name=f"`rio.event.periodic` event worker for {component}",
-                    )
-
         # Call `_rio_post_init` for every class in the MRO
         for base in reversed(type(component).__mro__):
             try:
@@ -489,10 +445,23 @@ class Component(abc.ABC, metaclass=ComponentMeta):
         """
         raise NotImplementedError()  # pragma: no cover
 
+    def _get_hidden_child_attribute_names(self) -> Collection[str]:
+        """
+        Returns the names of all attributes whose child components aren't
+        currently displayed, e.g. the content of a closed `Popup`. Hidden
+        children are neither built nor sent to the client.
+        """
+        return ()
+
     def _iter_direct_children(self) -> Iterable[Component]:
+        hidden_attribute_names = self._get_hidden_child_attribute_names()
+
         for name in inspection.get_child_component_containing_attribute_names(
             type(self)
         ):
+            if name in hidden_attribute_names:
+                continue
+
             try:
                 value = getattr(self, name)
             except AttributeError:
@@ -508,6 +477,24 @@ class Component(abc.ABC, metaclass=ComponentMeta):
                     if isinstance(item, Component):
                         yield item
 
+    def _iter_hidden_children(self) -> Iterable[Component]:
+        """
+        Yields all child components which are currently hidden. See
+        `_get_hidden_child_attribute_names`.
+        """
+        for name in self._get_hidden_child_attribute_names():
+            value = getattr(self, name, None)
+
+            if isinstance(value, Component):
+                yield value
+
+            elif isinstance(value, list):
+                value = cast(list[object], value)
+
+                for item in value:
+                    if isinstance(item, Component):
+                        yield item
+
     def _iter_direct_and_indirect_child_containing_attributes(
         self,
         *,
@@ -552,6 +539,18 @@ class Component(abc.ABC, metaclass=ComponentMeta):
     async def _on_message(self, msg: Jsonable, /) -> None:
         raise RuntimeError(f"{type(self).__name__} received unexpected message `{msg}`")
 
+    def _get_message_coalescing_key(self, msg: Jsonable, /) -> Hashable | None:
+        """
+        Messages which only matter in their most recent form, such as mouse
+        movements, can be coalesced: If several messages with the same key
+        arrive while the component is still busy with an earlier one, only the
+        latest of them is passed to `_on_message`.
+
+        Returns `None` for messages which must all be handled. This is the
+        default.
+        """
+        return None
+
     def _is_in_component_tree(self, cache: dict[rio.Component, bool]) -> bool:
         """
         Returns whether this component is directly or indirectly connected to the
@@ -647,12 +646,20 @@ class Component(abc.ABC, metaclass=ComponentMeta):
         is still running. This allows you to e.g. update a progress bar while
         the operation is still running.
         """
+        await self._force_refresh(RefreshPriority.USER_INPUT)
+
+    async def _force_refresh(self, priority: RefreshPriority) -> None:
+        """
+        Like `force_refresh`, but with the given priority. Components refreshing
+        because some background work has finished should use
+        `RefreshPriority.BACKGROUND`, so they don't hold up user input.
+        """
         self.session._register_dirty_component(
             self,
             include_children_recursively=False,
         )
 
-        await self.session._refresh()
+        await self.session._refresh(priority)
 
     def get_debug_details(self) -> dict[str, Any]:
         """
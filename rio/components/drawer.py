@@ -7,7 +7,7 @@ from uniserde import JsonDoc
 
 import rio
 
-from .fundamental_component import FundamentalComponent
+from .fundamental_component import LazyContentFundamentalComponent
 
 __all__ = [
     "Drawer",
@@ -20,7 +20,7 @@ class DrawerOpenOrCloseEvent:
     is_open: bool
 
 
-class Drawer(FundamentalComponent):
+class Drawer(LazyContentFundamentalComponent):
     """
     # Drawer
 
@@ -58,6 +58,12 @@ class Drawer(FundamentalComponent):
         is `False`, the drawer can only be opened or closed
         programmatically.
 
+    `mount_content`: When to build the content and send it to the client.
+        `"always"` does so even while the drawer is closed. `"on_open"` waits
+        until the drawer is opened for the first time. `"while_open"`
+        additionally discards the content whenever the drawer is closed, which
+        also discards any state stored in it.
+
 
     ## Example:
 
@@ -103,6 +109,10 @@ class Drawer(FundamentalComponent):
     is_modal: bool = True
     is_open: bool = False
     is_user_openable: bool = True
+    mount_content: Literal["always", "on_open", "while_open"] = "always"
+
+    def _are_lazy_children_shown(self) -> bool:
+        return self.is_open
 
     def _validate_delta_state_from_frontend(self, delta_state: JsonDoc) -> None:
         if not set(delta_state) <= {"is_open"}:
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Mapping, Sequence
+import array
+import asyncio
+import inspect
+from collections.abc import Awaitable, Callable, Mapping, Sequence
 from dataclasses import KW_ONLY, dataclass
 from typing import Any, Generic, Literal, TypeVar
 
@@ -17,12 +20,81 @@ __all__ = [
 
 T = TypeVar("T")
 
+# Receives the text typed by the user, and returns the matching options
+_SearchFunction = Callable[
+    [str],
+    Mapping[str, T] | Sequence[T] | Awaitable[Mapping[str, T] | Sequence[T]],
+]
+
 
 @dataclass
 class DropdownChangeEvent(Generic[T]):
     value: T
 
 
+class _OptionIndex:
+    """
+    Finds the option names containing a search string, just like the frontend
+    would, but without looking at every single option.
+
+    Every three-letter sequence (trigram) of every name is recorded, along with
+    the indices of the names containing it. Any name containing the search
+    string must also contain all of its trigrams, so only the names listed for
+    its rarest trigram need to be checked.
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        self.names = names
+        self.lowercase_names = [name.lower() for name in names]
+
+        # The indices are stored in compact arrays, since there are many of
+        # them. They're added in order, so they're also sorted.
+        self.names_by_trigram: dict[str, array.array] = {}
+
+        for index, name in enumerate(self.lowercase_names):
+            for trigram in {name[ii : ii + 3] for ii in range(len(name) - 2)}:
+                try:
+                    self.names_by_trigram[trigram].append(index)
+                except KeyError:
+                    self.names_by_trigram[trigram] = array.array("I", (index,))
+
+    def search(self, query: str, max_results: int) -> list[str]:
+        """
+        Returns the names containing `query`, ignoring case. They are returned
+        in their original order, and only the first `max_results` are
+        considered.
+        """
+        query = query.lower()
+        candidates: Sequence[int]
+
+        # Short queries don't have any trigrams, but match lots of options. Just
+        # go through the options until enough have been found.
+        if len(query) < 3:
+            candidates = range(len(self.names))
+        else:
+            try:
+                candidates = min(
+                    (
+                        self.names_by_trigram[query[ii : ii + 3]]
+                        for ii in range(len(query) - 2)
+                    ),
+                    key=len,
+                )
+            except KeyError:
+                return []
+
+        result: list[str] = []
+
+        for index in candidates:
+            if query in self.lowercase_names[index]:
+                result.append(self.names[index])
+
+                if len(result) >= max_results:
+                    break
+
+        return result
+
+
 class Dropdown(FundamentalComponent, Generic[T]):
     """
     # Dropdown
@@ -53,6 +125,20 @@ class Dropdown(FundamentalComponent, Generic[T]):
 
     `on_change`: Triggered whenever the user selects an option.
 
+    `search_on_server`: Whether to search the options on the server, rather
+        than sending all of them to the browser. This is much faster for
+        dropdowns with thousands of options. Only the best matches for what
+        the user has typed are sent.
+
+    `search`: A function which receives the text typed by the user, and returns
+        the matching options, either as mapping from names to values or as
+        sequence of values. This allows searching a database instead of
+        passing all `options` to the dropdown. `options` must still contain
+        the selected value. Implies `search_on_server`.
+
+    `max_search_results`: How many matches to display when searching on the
+        server.
+
 
     ## Example:
 
@@ -99,6 +185,23 @@ class Dropdown(FundamentalComponent, Generic[T]):
                 on_change=self.on_change_update_value,
             )
     ```
+
+    Dropdowns with a huge number of options can search them on the server
+    instead, so only the matches are sent to the browser:
+
+    ```python
+    class MyComponent(rio.Component):
+        customers: list[str] = [f"Customer #{i}" for i in range(50_000)]
+        customer: str = "Customer #0"
+
+        def build(self) -> rio.Component:
+            return rio.Dropdown(
+                options=self.customers,
+                label="Customer",
+                selected_value=self.bind().customer,
+                search_on_server=True,
+            )
+    ```
     """
 
     options: Mapping[str, T]
@@ -108,6 +211,9 @@ class Dropdown(FundamentalComponent, Generic[T]):
     is_sensitive: bool
     is_valid: bool
     on_change: rio.EventHandler[DropdownChangeEvent[T]]
+    search_on_server: bool
+    search: _SearchFunction[T] | None
+    max_search_results: int
 
     def __init__(
         self,
@@ -118,6 +224,9 @@ class Dropdown(FundamentalComponent, Generic[T]):
         on_change: rio.EventHandler[DropdownChangeEvent[T]] = None,
         is_sensitive: bool = True,
         is_valid: bool = True,
+        search_on_server: bool = False,
+        search: _SearchFunction[T] | None = None,
+        max_search_results: int = 50,
         key: str | None = None,
         margin: float | None = None,
         margin_x: float | None = None,
@@ -149,14 +258,14 @@ class Dropdown(FundamentalComponent, Generic[T]):
             align_y=align_y,
         )
 
-        if isinstance(options, Sequence):
-            options = {str(value): value for value in options}
-
-        self.options = options
+        self.options = _normalize_options(options)
         self.label = label
         self.on_change = on_change
         self.is_sensitive = is_sensitive
         self.is_valid = is_valid
+        self.search_on_server = search_on_server
+        self.search = search
+        self.max_search_results = max_search_results
 
         # This is an unsafe assignment, because the value could be `None`. This
         # will be fixed in `__post_init__`, once the state bindings have been
@@ -168,6 +277,53 @@ class Dropdown(FundamentalComponent, Generic[T]):
         if self.selected_value is None:
             self.selected_value = next(iter(self.options.values()))
 
+        # When searching on the server, these are the options which were last
+        # sent to the frontend, and the query they're for
+        self._search_query: str | None = None
+        self._search_results: dict[str, T] = {}
+
+        # The index used to search the options. It's only built once somebody
+        # searches.
+        self._option_index: _OptionIndex | None = None
+
+    def _searches_on_server(self) -> bool:
+        return self.search_on_server or self.search is not None
+
+    async def _find_matches(self, query: str) -> dict[str, T]:
+        # Let the user search
+        if self.search is not None:
+            result = self.search(query)
+
+            if inspect.isawaitable(result):
+                result = await result
+
+            matches = _normalize_options(result)
+            names = list(matches.keys())[: self.max_search_results]
+            return {name: matches[name] for name in names}
+
+        # Use the index, creating it if necessary. This takes a while for large
+        # option sets, so don't block the event loop while doing so.
+        #
+        # The options are a new mapping whenever the dropdown is rebuilt, even
+        # if their content is the same. Compare the names instead, which is
+        # much faster than indexing them again.
+        options = self.options
+        names = list(options.keys())
+
+        if self._option_index is None or self._option_index.names != names:
+            self._option_index = await asyncio.to_thread(_OptionIndex, names)
+
+        names = self._option_index.search(query, self.max_search_results)
+        return {name: options[name] for name in names}
+
+    async def _on_search(self, query: str) -> None:
+        matches = await self._find_matches(query)
+
+        self._search_query = query
+        self._search_results = matches
+
+        await self.force_refresh()
+
     def _fetch_selected_name(self) -> str:
         # The frontend works with names, not values. Get the corresponding
         # name.
@@ -175,18 +331,38 @@ class Dropdown(FundamentalComponent, Generic[T]):
         # Avoid hammering a potential state binding
         selected_value = self.selected_value
 
-        # Fetch the name
-        for name, value in self.options.items():
-            if value == selected_value:
-                return name
-        else:
-            # If nothing matches, just select the first option
-            return next(iter(self.options.keys()))
+        # Fetch the name. The value may also have been picked from search
+        # results which aren't part of the options.
+        for options in (self._search_results, self.options):
+            for name, value in options.items():
+                if value == selected_value:
+                    return name
+
+        # If nothing matches, just select the first option
+        return next(iter(self.options.keys()))
 
     def _custom_serialize(self) -> JsonDoc:
+        # When searching on the server, only the matches are sent
+        if self._searches_on_server():
+            return {
+                "optionNames": [],
+                "selectedName": self._fetch_selected_name(),
+                "searchOnServer": True,
+                "searchResults": (
+                    None
+                    if self._search_query is None
+                    else {
+                        "query": self._search_query,
+                        "names": list(self._search_results.keys()),
+                    }
+                ),
+            }
+
         result: JsonDoc = {
             "optionNames": list(self.options.keys()),
             "selectedName": self._fetch_selected_name(),
+            "searchOnServer": False,
+            "searchResults": None,
         }
 
         return result
@@ -195,11 +371,23 @@ class Dropdown(FundamentalComponent, Generic[T]):
         # Parse the message
         assert isinstance(msg, dict), msg
 
+        # The user has typed something and is waiting for matching options
+        if "query" in msg:
+            query = msg["query"]
+            assert isinstance(query, str), query
+
+            await self._on_search(query)
+            return
+
         # The frontend works with names, not values. Get the corresponding
         # value.
-        try:
-            selected_value = self.options[msg["name"]]
-        except KeyError:
+        name = msg["name"]
+
+        if name in self._search_results:
+            selected_value = self._search_results[name]
+        elif name in self.options:
+            selected_value = self.options[name]
+        else:
             # Invalid names may be sent due to lag between the frontend and
             # backend. Ignore them.
             return
@@ -215,4 +403,11 @@ class Dropdown(FundamentalComponent, Generic[T]):
         await self.session._refresh()
 
 
+def _normalize_options(options: Mapping[str, T] | Sequence[T]) -> Mapping[str, T]:
+    if isinstance(options, Sequence):
+        return {str(value): value for value in options}
+
+    return options
+
+
 Dropdown._unique_id = "Dropdown-builtin"
@@ -10,7 +10,11 @@ import rio
 from .. import common, inspection
 from .component import Component
 
-__all__ = ["FundamentalComponent", "KeyboardFocusableFundamentalComponent"]
+__all__ = [
+    "FundamentalComponent",
+    "KeyboardFocusableFundamentalComponent",
+    "LazyContentFundamentalComponent",
+]
 
 
 JAVASCRIPT_SOURCE_TEMPLATE = """
@@ -167,3 +171,59 @@ class FundamentalComponent(Component):
 class KeyboardFocusableFundamentalComponent(FundamentalComponent):
     async def grab_keyboard_focus(self) -> None:
         await self.session._remote_set_keyboard_focus(self._id)
+
+
+class LazyContentFundamentalComponent(FundamentalComponent):
+    """
+    Base class for components which only display some of their children some
+    of the time, like the content of a `Popup`.
+
+    Subclasses must have a `mount_content` attribute, which controls when the
+    children stored in the attributes listed in `_lazy_child_attribute_names`
+    are built and sent to the client:
+
+    - `"always"`: Regardless of whether they're displayed
+    - `"on_open"`: Once they're displayed for the first time. Afterwards they're
+      kept, even while hidden.
+    - `"while_open"`: Only while they're displayed
+    """
+
+    _lazy_child_attribute_names = ("content",)
+
+    def __post_init__(self) -> None:
+        # Whether the lazy children have ever been displayed
+        self._lazy_children_were_shown = False
+
+    def _are_lazy_children_shown(self) -> bool:
+        """
+        Returns whether the lazy children are currently displayed.
+        """
+        raise NotImplementedError()  # pragma: no cover
+
+    def _get_hidden_child_attribute_names(self) -> Collection[str]:
+        mount_content: str = self.mount_content  # type: ignore
+
+        if mount_content == "always":
+            return ()
+
+        if self._are_lazy_children_shown():
+            self._lazy_children_were_shown = True
+            return ()
+
+        if mount_content == "on_open" and self._lazy_children_were_shown:
+            return ()
+
+        return self._lazy_child_attribute_names
+
+    def _apply_delta_state_from_frontend(self, delta_state: dict[str, Any]) -> None:
+        hidden_before = self._get_hidden_child_attribute_names()
+
+        super()._apply_delta_state_from_frontend(delta_state)
+
+        # If children have been revealed or hidden, the session needs to know.
+        # Marking the component as dirty takes care of that.
+        if self._get_hidden_child_attribute_names() != hidden_before:
+            self.session._register_dirty_component(
+                self,
+                include_children_recursively=False,
+            )
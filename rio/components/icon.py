@@ -96,11 +96,16 @@ class Icon(FundamentalComponent):
 
         There must not already be a set with the given name.
 
-        The icon set is a `.tar.xz` compressed archive and must contain exactly
-        one directory, which must be named identically to the icon set. Files
-        located in the root of that directory can be accessed as
-        `set_name/icon_name`. Files located in a subdirectory can be accessed as
-        `set_name/icon_name:variant`.
+        The icon set is either an icon pack (a `.rioicons` file, as created by
+        `scripts/build_material_icon_set.py`), or a `.tar.xz` compressed
+        archive. Icon packs are preferable, since icons can be read from them
+        directly. Archives are converted to an icon pack the first time they
+        are used.
+
+        Archives must contain exactly one directory, which must be named
+        identically to the icon set. Files located in the root of that
+        directory can be accessed as `set_name/icon_name`. Files located in a
+        subdirectory can be accessed as `set_name/icon_name:variant`.
 
         For SVG files to work as icons...
 
@@ -115,9 +120,8 @@ class Icon(FundamentalComponent):
             set_name: The name of the new icon set. This will be used to access
                 the icons.
 
-            icon_set_archive_path: The path to the `.tar.xz` archive containing
-            the icon
-                set.
+            icon_set_archive_path: The path to the icon pack or `.tar.xz`
+                archive containing the icon set.
         """
         registry = Icon._get_registry()
 
@@ -211,9 +215,14 @@ class Icon(FundamentalComponent):
         self.fill = fill
 
     def _custom_serialize(self) -> JsonDoc:
-        # Get the icon's SVG
+        # Icons are referenced by name. Make sure the client receives the
+        # icon's SVG, unless it already has it.
         registry = Icon._get_registry()
-        svg_source = registry.get_icon_svg(self.icon)
+        icon_name = registry.normalize_icon_name(self.icon)
+
+        if icon_name not in self.session._icons_sent_to_client:
+            svg_source = registry.get_icon_svg(icon_name)
+            self.session._icons_to_send_to_client[icon_name] = svg_source
 
         # Serialize the fill. This isn't automatically handled because it's a
         # Union.
@@ -227,7 +236,7 @@ class Icon(FundamentalComponent):
 
         # Serialize
         return {
-            "svgSource": svg_source,
+            "iconName": icon_name,
             "fill": fill,
         }
 
@@ -5,8 +5,9 @@ from typing import Literal
 
 from uniserde import JsonDoc
 
-from .. import assets
+from .. import assets, responsive_images
 from ..common import EventHandler, ImageLike
+from ..refresh_scheduling import RefreshPriority
 from .fundamental_component import FundamentalComponent
 
 __all__ = ["Image"]
@@ -53,6 +54,18 @@ class Image(FundamentalComponent):
             radii of the top-left, top-right, bottom-right, and bottom-left
             corners, in that order.
 
+    `loading`: When to load the image. `eager` images are loaded right away,
+            `lazy` images are only loaded once they are about to scroll into
+            view. Lazy loading can greatly speed up pages containing many
+            images.
+
+    `placeholder`: What to display while the image is loading. `blur` shows a
+            tiny, blurry preview of the image and `color` fills the image's
+            area with its average color. Placeholders are generated on the
+            server and sent along with the component, so they are visible
+            immediately. Only images hosted by Rio itself (i.e. not URLs) can
+            have placeholders.
+
 
     ## Example:
 
@@ -87,6 +100,8 @@ class Image(FundamentalComponent):
     fill_mode: Literal["fit", "stretch", "zoom"] = "fit"
     on_error: EventHandler[[]] = None
     corner_radius: float | tuple[float, float, float, float] = 0
+    loading: Literal["eager", "lazy"] = "eager"
+    placeholder: Literal["none", "blur", "color"] = "none"
 
     def _get_image_asset(self) -> assets.Asset:
         image = self.image
@@ -97,14 +112,57 @@ class Image(FundamentalComponent):
 
         return self._cached_image_asset
 
+    def _get_placeholder_url(self, asset: assets.Asset) -> str | None:
+        if self.placeholder == "none":
+            return None
+
+        result = responsive_images.try_get_cached_placeholder(asset, self.placeholder)
+
+        # If the placeholder isn't ready yet, generate it in the background and
+        # send it to the client once it's done
+        if (
+            responsive_images.needs_placeholder(asset, self.placeholder)
+            and getattr(self, "_asset_awaiting_placeholder", None) is not asset
+        ):
+            self._asset_awaiting_placeholder = asset
+            self.session.create_task(
+                self._send_placeholder_when_ready(asset, self.placeholder),
+                name="Generate image placeholder",
+            )
+
+        return result
+
+    async def _send_placeholder_when_ready(
+        self,
+        asset: assets.Asset,
+        kind: Literal["blur", "color"],
+    ) -> None:
+        try:
+            placeholder = await responsive_images.get_placeholder(asset, kind)
+        finally:
+            self._asset_awaiting_placeholder = None
+
+        # Only bother if the image hasn't changed in the meantime
+        if (
+            placeholder is not None
+            and self._get_image_asset() is asset
+            and self.placeholder == kind
+        ):
+            await self._force_refresh(RefreshPriority.BACKGROUND)
+
     def _custom_serialize(self) -> JsonDoc:
         if isinstance(self.corner_radius, (int, float)):
             corner_radius = (self.corner_radius,) * 4
         else:
             corner_radius = self.corner_radius
 
+        asset = self._get_image_asset()
+        image_url = asset._serialize(self.session)
+
         return {
-            "imageUrl": self._get_image_asset()._serialize(self.session),
+            "imageUrl": image_url,
+            "imageSrcset": responsive_images.build_srcset(asset, image_url),
+            "placeholderUrl": self._get_placeholder_url(asset),
             "reportError": self.on_error is not None,
             "corner_radius": corner_radius,
         }
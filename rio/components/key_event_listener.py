@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import functools
+from collections.abc import Sequence
 from dataclasses import KW_ONLY, dataclass
 from typing import Any, Literal
 
@@ -602,6 +604,44 @@ class KeyPressEvent(_KeyUpDownEvent):
     pass
 
 
+@functools.lru_cache(maxsize=256)
+def _normalize_hotkey(hotkey: str) -> str:
+    """
+    Brings a key combination such as `"Shift + Control + S"` into the form the
+    frontend matches events against: The modifiers in a fixed order, followed by
+    the key, all lowercase and joined by `+`.
+    """
+    remainder = hotkey.strip()
+
+    # The plus key itself is written as `+`, so it can't simply be split off
+    if remainder.endswith("+"):
+        key = "+"
+        remainder = remainder[:-1].rstrip().removesuffix("+")
+    else:
+        remainder, _, key = remainder.rpartition("+")
+        key = key.strip().lower()
+
+    if not key:
+        raise ValueError(f"The hotkey {hotkey!r} doesn't specify a key")
+
+    modifiers = {part.strip().lower() for part in remainder.split("+")}
+    modifiers.discard("")
+
+    invalid_modifiers = modifiers.difference(_MODIFIERS)
+
+    if invalid_modifiers:
+        raise ValueError(
+            f"The hotkey {hotkey!r} contains invalid modifiers:"
+            f" {', '.join(sorted(invalid_modifiers))}. Valid modifiers are"
+            f" {', '.join(_MODIFIERS)}."
+        )
+
+    parts = [modifier for modifier in _MODIFIERS if modifier in modifiers]
+    parts.append(key)
+
+    return "+".join(parts)
+
+
 class KeyEventListener(KeyboardFocusableFundamentalComponent):
     """
     Calls an event handler when a key is pressed or released.
@@ -621,6 +661,27 @@ class KeyEventListener(KeyboardFocusableFundamentalComponent):
         on_key_up: A function to call when a key is released.
 
         on_key_press: A function to call repeatedly while a key is held down.
+
+        hotkeys: The key combinations to listen for, such as `"control+s"` or
+            `"escape"`. Each consists of any modifiers (`"control"`, `"shift"`,
+            `"alt"` and `"meta"`) followed by a key, joined with `+`. Only
+            events whose modifiers and key match one of these exactly are
+            reported, all others never leave the browser. If `None`, all
+            events are reported.
+
+
+    ## Example:
+
+    This listener only reacts to `control+s`. All other keys are handled
+    entirely in the browser:
+
+    ```python
+    rio.KeyEventListener(
+        rio.Text("Press control+s to save"),
+        hotkeys=["control+s"],
+        on_key_down=lambda event: print("Saving..."),
+    )
+    ```
     """
 
     content: rio.Component
@@ -628,12 +689,18 @@ class KeyEventListener(KeyboardFocusableFundamentalComponent):
     on_key_down: rio.EventHandler[KeyDownEvent] = None
     on_key_up: rio.EventHandler[KeyUpEvent] = None
     on_key_press: rio.EventHandler[KeyPressEvent] = None
+    hotkeys: Sequence[str] | None = None
 
     def _custom_serialize(self) -> dict[str, Jsonable]:
         return {
             "reportKeyDown": self.on_key_down is not None,
             "reportKeyUp": self.on_key_up is not None,
             "reportKeyPress": self.on_key_press is not None,
+            "hotkeys": (
+                None
+                if self.hotkeys is None
+                else [_normalize_hotkey(hotkey) for hotkey in self.hotkeys]
+            ),
         }
 
     async def _on_message(self, msg: Any) -> None:
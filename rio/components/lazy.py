@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from dataclasses import KW_ONLY
+from typing import *  # type: ignore
+
+import rio
+
+from .component import Component
+from .fundamental_component import FundamentalComponent
+
+__all__ = ["Lazy"]
+
+
+class Lazy(Component):
+    """
+    # Lazy
+
+    Defers building its content until it is scrolled into view.
+
+    Long pages build all of their components right away, even those which are
+    far out of sight. `Lazy` instead only displays an empty placeholder at
+    first, and builds its content once the placeholder comes close to the
+    visible part of the page. This can drastically speed up loading pages with
+    lots of content, such as long documents.
+
+    Since the size of the content isn't known before it's built, the
+    placeholder uses the `estimated_height` instead. The closer the estimate,
+    the less the page jumps around while scrolling.
+
+    If `unload_when_hidden` is set, the content is discarded again once it is
+    scrolled far away, and rebuilt when it comes back. This keeps the number of
+    components low, but any state stored in the content is lost.
+
+
+    ## Attributes:
+
+    `build_content`: A function which returns the content to display. It is
+        only called once the component is near the visible area.
+
+    `estimated_height`: The height of the placeholder which is displayed until
+        the content has been built.
+
+    `unload_when_hidden`: Whether to discard the content again when it is
+        scrolled far out of view.
+
+
+    ## Example:
+
+    A document with hundreds of sections, which are only built as the user
+    scrolls to them:
+
+    ```python
+    import functools
+
+
+    class Document(rio.Component):
+        sections: list[str] = [f"Section {i}" for i in range(500)]
+
+        def build_section(self, title: str) -> rio.Component:
+            return rio.Column(
+                rio.Text(title, style="heading2"),
+                rio.Text("Lorem ipsum " * 100, multiline=True),
+                spacing=1,
+            )
+
+        def build(self) -> rio.Component:
+            return rio.ScrollContainer(
+                rio.Column(
+                    *[
+                        rio.Lazy(
+                            functools.partial(self.build_section, title),
+                            estimated_height=15,
+                        )
+                        for title in self.sections
+                    ],
+                    spacing=2,
+                ),
+                height="grow",
+            )
+    ```
+    """
+
+    build_content: Callable[[], rio.Component]
+    _: KW_ONLY
+    estimated_height: float = 10
+    unload_when_hidden: bool = False
+
+    def __post_init__(self) -> None:
+        # Whether the frontend has reported that this component is close to
+        # the visible area
+        self._is_near_viewport = False
+
+    async def _on_visibility_change(self, is_near_viewport: bool) -> None:
+        if is_near_viewport == self._is_near_viewport:
+            return
+
+        # Once built, the content is kept unless explicitly requested otherwise
+        if not is_near_viewport and not self.unload_when_hidden:
+            return
+
+        self._is_near_viewport = is_near_viewport
+        await self.force_refresh()
+
+    def build(self) -> rio.Component:
+        if self._is_near_viewport:
+            content = self.build_content()
+
+            # Because the build function is being called inside of Rio, the
+            # component is mistaken of being internal to Rio. Take care to fix
+            # that.
+            content._rio_internal_ = False
+        else:
+            content = None
+
+        return _LazyPlaceholder(
+            content=content,
+            estimated_height=self.estimated_height,
+            unload_when_hidden=self.unload_when_hidden,
+            on_visibility_change=self._on_visibility_change,
+        )
+
+
+class _LazyPlaceholder(FundamentalComponent):
+    """
+    Displays the content of a `Lazy` once it exists, and tells the `Lazy` when
+    it comes close to (or moves far away from) the visible area.
+    """
+
+    content: rio.Component | None
+    estimated_height: float
+    unload_when_hidden: bool
+    on_visibility_change: Callable[[bool], Awaitable[None]]
+
+    async def _on_message(self, msg: Any) -> None:
+        # Parse the message
+        assert isinstance(msg, dict), msg
+
+        is_near_viewport = msg["isNearViewport"]
+        assert isinstance(is_near_viewport, bool), is_near_viewport
+
+        await self.on_visibility_change(is_near_viewport)
+
+
+_LazyPlaceholder._unique_id = "Lazy-builtin"
@@ -1,5 +1,8 @@
 from dataclasses import KW_ONLY
 
+from uniserde import JsonDoc
+
+from .. import markdown_rendering
 from .fundamental_component import FundamentalComponent
 
 __all__ = [
@@ -34,6 +37,13 @@ class MarkdownView(FundamentalComponent):
         short to reliably guess the language - so make sure to set a default
         language if you want your inline code to be syntax-highlighted.
 
+    `render_on_server`: Whether to convert the Markdown to HTML on the server,
+        rather than in the browser. Results are cached and shared between all
+        sessions, so this is much faster for large documents which are
+        displayed to many users. Code blocks without a language are still
+        highlighted by the browser. This requires the `markdown` extra, which
+        can be installed with `pip install rio-ui[markdown]`.
+
 
     ## Example:
 
@@ -48,6 +58,22 @@ class MarkdownView(FundamentalComponent):
     text: str
     _: KW_ONLY
     default_language: str | None = None
+    render_on_server: bool = False
+
+    def _custom_serialize(self) -> JsonDoc:
+        if not self.render_on_server:
+            return {
+                "html": None,
+            }
+
+        # There's no need to also send the source text
+        return {
+            "text": None,
+            "html": markdown_rendering.render_markdown(
+                self.text,
+                self.default_language,
+            ),
+        }
 
 
 MarkdownView._unique_id = "MarkdownView-builtin"
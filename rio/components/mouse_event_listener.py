@@ -116,6 +116,11 @@ class MouseEventListener(FundamentalComponent):
 
         on_mouse_leave: Triggered when the mouse previously was located over
             the child component, but now is not.
+
+        max_events_per_second: Limits how often `on_mouse_move` and
+            `on_drag_move` are triggered. Movements in between are combined,
+            i.e. only the most recent position is reported. `None` reports
+            every single movement.
     """
 
     content: rio.Component
@@ -129,6 +134,7 @@ class MouseEventListener(FundamentalComponent):
     on_drag_start: rio.EventHandler[DragStartEvent] = None
     on_drag_move: rio.EventHandler[DragMoveEvent] = None
     on_drag_end: rio.EventHandler[DragEndEvent] = None
+    max_events_per_second: float | None = 60
 
     def _custom_serialize(self) -> JsonDoc:
         return {
@@ -143,6 +149,16 @@ class MouseEventListener(FundamentalComponent):
             "reportDragEnd": self.on_drag_end is not None,
         }
 
+    def _get_message_coalescing_key(self, msg: Any) -> Hashable | None:
+        # Only the latest position matters. The other events must all be
+        # reported.
+        msg_type = msg["type"]
+
+        if msg_type in ("mouseMove", "dragMove"):
+            return msg_type
+
+        return None
+
     async def _on_message(self, msg: Any) -> None:
         # Parse the message
         assert isinstance(msg, dict), msg
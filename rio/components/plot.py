@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import copy
-import io
-from typing import TYPE_CHECKING, Literal, cast
+import base64
+import functools
+import itertools
+from typing import TYPE_CHECKING, Any, Callable, Literal, cast
 
 from uniserde import JsonDoc
 
 import rio
 
-from .. import maybes
+from .. import downsampling, maybes, matplotlib_rendering, typed_arrays
+from ..refresh_scheduling import RefreshPriority
 from .fundamental_component import FundamentalComponent
 
 if TYPE_CHECKING:
@@ -20,12 +22,481 @@ if TYPE_CHECKING:
 __all__ = ["Plot"]
 
 
+# Plotly attributes which look like arrays, but must not be sent as typed
+# arrays. This mirrors plotly.py's own list.
+_PLOTLY_NON_TYPED_ARRAY_KEYS = {"geojson", "layer", "layers", "range"}
+
+
+@functools.cache
+def _plotly_supports_typed_arrays() -> bool:
+    """
+    Returns whether the bundled plotly.js can read binary arrays. This was added
+    in plotly.js 2.28.
+    """
+    import plotly.offline  # type: ignore
+
+    try:
+        major, minor = plotly.offline.get_plotlyjs_version().split(".")[:2]
+        return (int(major), int(minor)) >= (2, 28)
+    except ValueError:
+        return False
+
+
+def _encode_plotly_arrays(value: Any) -> Any:
+    """
+    Recursively replaces numeric numpy arrays with typed arrays (see
+    `rio.typed_arrays`), so they don't have to be serialized number by number.
+    Recent versions of plotly.py already do this themselves, in which case
+    there's nothing left to replace.
+    """
+    if isinstance(value, dict):
+        return {
+            key: (
+                sub_value
+                if key in _PLOTLY_NON_TYPED_ARRAY_KEYS
+                else _encode_plotly_arrays(sub_value)
+            )
+            for key, sub_value in value.items()
+        }
+
+    if isinstance(value, maybes.NUMPY_ARRAY_TYPES):
+        if value.size == 0:
+            return value
+
+        encoded = typed_arrays.encode(value, allow_64_bit_ints=False)
+        return value if encoded is None else encoded
+
+    # Don't look at every single value of long lists of numbers
+    if isinstance(value, (list, tuple)) and value:
+        if isinstance(value[0], (dict, list, tuple, *maybes.NUMPY_ARRAY_TYPES)):
+            return [_encode_plotly_arrays(item) for item in value]
+
+    return value
+
+
+def _plotly_to_json(value: Any) -> str:
+    """
+    Converts (part of) a plotly figure to JSON. Numeric arrays are sent in
+    binary form if possible, which plotly.js reads without parsing.
+    """
+    import plotly.io.json  # type: ignore
+
+    if _plotly_supports_typed_arrays():
+        value = _encode_plotly_arrays(value)
+
+    return plotly.io.json.to_json_plotly(value)
+
+
+def _make_plotly_layout_transparent(layout: dict[str, Any]) -> dict[str, Any]:
+    """
+    Makes the plot transparent, so `Plot.background` shines through. The
+    layout is copied, so the user's figure isn't modified.
+    """
+    return {
+        **layout,
+        "plot_bgcolor": "rgba(0,0,0,0)",
+        "paper_bgcolor": "rgba(0,0,0,0)",
+    }
+
+
+def _plotly_figure_dict_to_json(figure_dict: dict[str, Any]) -> str:
+    return _plotly_to_json(
+        {
+            "data": figure_dict.get("data", []),
+            "layout": _make_plotly_layout_transparent(figure_dict.get("layout", {})),
+        }
+    )
+
+
+def _as_point_array(value: Any) -> Any:
+    """
+    If the value is a one-dimensional array of values (one per point), returns
+    it as a numpy array or list. Otherwise returns `None`.
+    """
+    # Binary arrays, as produced by recent versions of plotly.py
+    if isinstance(value, dict):
+        if set(value) != {"dtype", "bdata"}:
+            return None
+
+        import numpy  # type: ignore
+
+        return numpy.frombuffer(
+            base64.b64decode(value["bdata"]),
+            dtype=numpy.dtype(value["dtype"]),
+        )
+
+    if isinstance(value, maybes.NUMPY_ARRAY_TYPES):
+        return value if value.ndim == 1 else None
+
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (dict, list, tuple)):
+            return None
+
+        return list(value)
+
+    return None
+
+
+def _sequences_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, list) and isinstance(b, list):
+        return a == b
+
+    import numpy  # type: ignore
+
+    return numpy.array_equal(numpy.asarray(a), numpy.asarray(b))
+
+
+def _plotly_values_equal(a: Any, b: Any) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(
+            _plotly_values_equal(a[key], b[key]) for key in a
+        )
+
+    if isinstance(a, maybes.NUMPY_ARRAY_TYPES) or isinstance(
+        b, maybes.NUMPY_ARRAY_TYPES
+    ):
+        return _sequences_equal(a, b)
+
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        if len(a) != len(b):
+            return False
+
+        # Most lists are arrays of plain values, which can be compared in one
+        # go. Only lists containing arrays can't, since comparing those doesn't
+        # result in a `bool`.
+        try:
+            return list(a) == list(b)
+        except (TypeError, ValueError):
+            return all(
+                _plotly_values_equal(item_a, item_b) for item_a, item_b in zip(a, b)
+            )
+
+    try:
+        return bool(a == b)
+    except Exception:
+        return a is b
+
+
+# How many possible positions of the old points among the new ones are checked
+# before giving up. Data with many repeated values would otherwise take long to
+# compare.
+_MAX_WINDOW_CANDIDATES = 8
+
+
+def _find_appended_points(old: Any, new: Any) -> tuple[int, Any] | None:
+    """
+    Checks whether `new` consists of the points in `old` with some new points
+    appended, and possibly some points dropped from the start (as happens in
+    plots which only show the latest data). Returns the number of dropped
+    points and the new points, or `None` if the arrays aren't related this way.
+    """
+    num_old = len(old)
+
+    if len(new) >= num_old and _sequences_equal(new[:num_old], old):
+        return 0, new[num_old:]
+
+    if num_old == 0 or len(new) == 0:
+        return None
+
+    # Find where the new data starts within the old data
+    if isinstance(old, list):
+        candidates = list(
+            itertools.islice(
+                (ii for ii, value in enumerate(old) if value == new[0]),
+                _MAX_WINDOW_CANDIDATES,
+            )
+        )
+    else:
+        import numpy  # type: ignore
+
+        candidates = numpy.flatnonzero(old == new[0]).tolist()
+
+    for num_dropped in candidates[:_MAX_WINDOW_CANDIDATES]:
+        num_kept = num_old - num_dropped
+
+        if num_dropped == 0 or len(new) <= num_kept:
+            continue
+
+        if _sequences_equal(new[:num_kept], old[num_dropped:]):
+            return num_dropped, new[num_kept:]
+
+    return None
+
+
+def _diff_plotly_traces(
+    old: dict[str, Any],
+    new: dict[str, Any],
+) -> JsonDoc | None:
+    """
+    Compares two traces. Returns an empty dict if they're equal, the points
+    which have to be appended to the old trace if only points were added, or
+    `None` if the trace has to be replaced.
+    """
+    if old.keys() != new.keys():
+        return None
+
+    appended_points: dict[str, Any] = {}
+    max_points: int | None = None
+
+    for key, new_value in new.items():
+        old_value = old[key]
+
+        if _plotly_values_equal(old_value, new_value):
+            continue
+
+        old_points = _as_point_array(old_value)
+        new_points = _as_point_array(new_value)
+
+        if old_points is None or new_points is None:
+            return None
+
+        found = _find_appended_points(old_points, new_points)
+        if found is None:
+            return None
+
+        num_dropped, appended_points[key] = found
+
+        # If points were dropped, all arrays must be limited to the same length
+        # for `Plotly.extendTraces` to handle it
+        if num_dropped > 0 or max_points is not None:
+            if max_points not in (None, len(new_points)):
+                return None
+
+            max_points = len(new_points)
+
+    if not appended_points:
+        return {}
+
+    return {
+        "data": appended_points,
+        "maxPoints": max_points,
+    }
+
+
+def _diff_plotly_figures(
+    old: dict[str, Any],
+    new: dict[str, Any],
+) -> JsonDoc | None:
+    """
+    Compares two figures, as returned by `Figure.to_plotly_json`. Returns the
+    changes needed to turn the old figure into the new one, or `None` if it's
+    simpler to send the entire new figure.
+    """
+    old_traces = old.get("data", [])
+    new_traces = new.get("data", [])
+
+    if len(new_traces) < len(old_traces):
+        return None
+
+    update: JsonDoc = {}
+
+    # Layout
+    old_layout = old.get("layout", {})
+    new_layout = new.get("layout", {})
+
+    if not _plotly_values_equal(old_layout, new_layout):
+        update["layout"] = _make_plotly_layout_transparent(new_layout)
+
+    # Points appended to existing traces
+    extensions: list[JsonDoc] = []
+
+    for index, (old_trace, new_trace) in enumerate(zip(old_traces, new_traces)):
+        trace_diff = _diff_plotly_traces(old_trace, new_trace)
+
+        if trace_diff is None:
+            return None
+
+        if trace_diff:
+            extensions.append({"index": index, **trace_diff})
+
+    if extensions:
+        update["extendTraces"] = extensions
+
+    # New traces
+    if len(new_traces) > len(old_traces):
+        update["addTraces"] = new_traces[len(old_traces) :]
+
+    return update
+
+
+def _parse_axis_range(value: Any) -> tuple[float, float] | None:
+    if value is None:
+        return None
+
+    assert isinstance(value, list) and len(value) == 2, value
+    start, end = value
+    assert isinstance(start, (int, float)), start
+    assert isinstance(end, (int, float)), end
+
+    return start, end
+
+
+# Traces with fewer points than this (relative to the plot's width in pixels)
+# are sent as they are
+_DOWNSAMPLING_THRESHOLD = 2
+
+# The width assumed for plots whose width hasn't been reported by the frontend
+# yet
+_DEFAULT_PLOT_WIDTH_PIXELS = 1000
+
+# Trace types made of (x, y) points, where points can be left out without
+# changing how the trace looks
+_DOWNSAMPLABLE_TRACE_TYPES = {"scatter", "scattergl"}
+
+
+def _downsample_plotly_trace(
+    trace: dict[str, Any],
+    method: Literal["lttb", "min-max"],
+    num_points: int,
+    x_range: tuple[float, float] | None,
+) -> dict[str, Any]:
+    """
+    Reduces the points of a trace to (roughly) `num_points`, only considering
+    the ones within `x_range`. Traces which can't be downsampled are returned
+    unchanged.
+    """
+    import numpy  # type: ignore
+
+    if trace.get("type", "scatter") not in _DOWNSAMPLABLE_TRACE_TYPES:
+        return trace
+
+    # Get the points as numbers. Categorical or date axes aren't supported.
+    y = _as_point_array(trace.get("y"))
+    if y is None:
+        return trace
+
+    if "x" in trace:
+        x = _as_point_array(trace["x"])
+    elif "x0" in trace or "dx" in trace:
+        return trace
+    else:
+        x = numpy.arange(len(y))
+
+    if x is None or len(x) != len(y):
+        return trace
+
+    try:
+        x = numpy.asarray(x, dtype=numpy.float64)
+        y = numpy.asarray(y, dtype=numpy.float64)
+    except (TypeError, ValueError):
+        return trace
+
+    num_input_points = len(x)
+
+    # Points are only ever picked within a range of x values, so they must be
+    # sorted
+    if num_input_points < 2 or not numpy.all(x[1:] >= x[:-1]):
+        return trace
+
+    # Only the visible points are of interest. Keep one more on each side, so
+    # the line continues past the edges.
+    start, end = 0, num_input_points
+
+    if x_range is not None:
+        start = max(int(numpy.searchsorted(x, x_range[0], side="left")) - 1, 0)
+        end = min(
+            int(numpy.searchsorted(x, x_range[1], side="right")) + 1,
+            num_input_points,
+        )
+
+    if start == 0 and end == num_input_points:
+        if num_input_points <= num_points * _DOWNSAMPLING_THRESHOLD:
+            return trace
+
+    if method == "lttb":
+        indices = downsampling.lttb(x[start:end], y[start:end], num_points)
+    else:
+        indices = downsampling.min_max(x[start:end], y[start:end], num_points * 2)
+
+    indices += start
+
+    # Apply the selection to all per-point values, so e.g. colors and hover
+    # texts still match their points
+    def select(values: dict[str, Any]) -> dict[str, Any]:
+        result = {}
+
+        for key, value in values.items():
+            points = _as_point_array(value)
+
+            if points is None and isinstance(value, dict):
+                result[key] = select(value)
+            elif points is None or len(points) != num_input_points:
+                result[key] = value
+            elif isinstance(points, list):
+                result[key] = [points[index] for index in indices.tolist()]
+            else:
+                result[key] = points[indices]
+
+        return result
+
+    result = select(trace)
+    result["x"] = x[indices]
+    result["y"] = y[indices]
+    return result
+
+
+def _downsample_plotly_figure(
+    figure_dict: dict[str, Any],
+    method: Literal["lttb", "min-max"],
+    width_in_pixels: float,
+    x_range: tuple[float, float] | None,
+    y_range: tuple[float, float] | None,
+) -> dict[str, Any]:
+    """
+    Downsamples all suitable traces of the figure to roughly one point per
+    pixel. If the user has zoomed in, the visible range is passed in. Only
+    points in that range are kept, which is what allows zooming in to reveal
+    more detail.
+    """
+    num_points = max(round(width_in_pixels), 3)
+
+    traces = []
+
+    for trace in figure_dict.get("data", []):
+        # Only traces on the primary x axis are affected by zooming
+        if trace.get("xaxis", "x") == "x":
+            trace_x_range = x_range
+        else:
+            trace_x_range = None
+
+        traces.append(
+            _downsample_plotly_trace(trace, method, num_points, trace_x_range)
+        )
+
+    # Since the data outside of the visible range is missing, plotly can't
+    # figure out the range by itself
+    layout = dict(figure_dict.get("layout", {}))
+
+    for axis_name, axis_range in (("xaxis", x_range), ("yaxis", y_range)):
+        if axis_range is not None:
+            layout[axis_name] = {
+                **layout.get(axis_name, {}),
+                "range": list(axis_range),
+                "autorange": False,
+            }
+
+    return {
+        **figure_dict,
+        "data": traces,
+        "layout": layout,
+    }
+
+
 class Plot(FundamentalComponent):
     """
     # Plot
 
     Displays a matplotlib, seaborn or plotly plot.
 
+    When a plotly figure is replaced with one that only has additional points,
+    traces or a different layout, only those changes are sent to the browser.
+    This keeps plots that are continuously updated with new data, such as live
+    telemetry, fast even as they grow.
+
+    Matplotlib figures are rendered in separate worker processes, so the rest
+    of the app stays responsive while they're being drawn. Rendered figures are
+    cached, and only rendered again once they have been modified.
+
 
     ## Attributes:
 
@@ -36,6 +507,15 @@ class Plot(FundamentalComponent):
 
     `corner_radius`: The corner radius of the plot
 
+    `downsampling`: How to reduce plotly line and scatter traces with many
+        points. A plot a few thousand pixels wide can't show millions of points,
+        so sending them all only makes the plot slow. `"min-max"` keeps the
+        lowest and highest point for every pixel, which preserves all spikes.
+        `"lttb"` keeps the point that best retains the shape of the line, which
+        needs half as many points. When zooming in, the visible range is filled
+        in with more detail. Only traces with numeric, sorted x values are
+        affected.
+
 
     ## Example:
 
@@ -78,6 +558,7 @@ class Plot(FundamentalComponent):
     )
     background: rio.Fill | None
     corner_radius: float | tuple[float, float, float, float] | None
+    downsampling: Literal["none", "lttb", "min-max"]
 
     def __init__(
         self,
@@ -89,6 +570,7 @@ class Plot(FundamentalComponent):
         *,
         background: rio.FillLike | None = None,
         corner_radius: float | tuple[float, float, float, float] | None = None,
+        downsampling: Literal["none", "lttb", "min-max"] = "none",
         key: str | None = None,
         margin: float | None = None,
         margin_x: float | None = None,
@@ -125,26 +607,219 @@ class Plot(FundamentalComponent):
         else:
             self.corner_radius = corner_radius
 
+        self.downsampling = downsampling
+
+    def __post_init__(self) -> None:
+        # The figure which was last sent to the frontend, and what was sent for
+        # it. Serializing a figure can take a long time, so this is only done
+        # again if the figure has changed.
+        self._sent_figure: object = None
+        self._sent_plotly_dict: dict[str, Any] | None = None
+        self._sent_matplotlib_svg: str | None = None
+
+        # Plotly figures can't tell whether they have been modified. Instead,
+        # the figure's JSON (before downsampling) is kept, along with the
+        # viewport the figure was downsampled for.
+        self._sent_plotly_source: tuple[dict[str, Any], Any] | None = None
+
+        # Matplotlib figures are rendered in the background. This is the hash
+        # of the most recent figure that was handed off for rendering.
+        self._pickled_figure_hash: str | None = None
+
+        # Incremented every time a new figure is sent. The frontend reports if
+        # its version doesn't match, e.g. because it missed an update, in which
+        # case the whole figure is sent again.
+        self._plot_version = 0
+        self._force_full_plot = False
+
+        # The size and zoom reported by the frontend. These determine how far
+        # figures are downsampled.
+        self._width_in_pixels: float = _DEFAULT_PLOT_WIDTH_PIXELS
+        self._x_range: tuple[float, float] | None = None
+        self._y_range: tuple[float, float] | None = None
+
+    def _serialize_plotly(self, figure: plotly.graph_objects.Figure) -> JsonDoc:
+        figure_dict = figure.to_plotly_json()
+
+        # Downsampled figures also depend on the viewport
+        if self.downsampling == "none":
+            viewport = None
+        else:
+            viewport = (
+                self.downsampling,
+                self._width_in_pixels,
+                self._x_range,
+                self._y_range,
+            )
+
+        # Downsampling, diffing and encoding figures is slow. Skip all of it if
+        # the figure hasn't changed. Plotly stores arrays as base64 strings in
+        # its JSON, so comparing the figures is comparatively cheap.
+        if (
+            self._sent_plotly_source is not None
+            and self._sent_plotly_dict is not None
+            and self._sent_plotly_source[1] == viewport
+            and _plotly_values_equal(self._sent_plotly_source[0], figure_dict)
+        ):
+            if not self._force_full_plot:
+                return {
+                    "type": "unchanged",
+                    "version": self._plot_version,
+                }
+
+            self._plot_version += 1
+
+            return {
+                "type": "plotly",
+                "version": self._plot_version,
+                "json": _plotly_figure_dict_to_json(self._sent_plotly_dict),
+            }
+
+        self._sent_figure = figure
+        self._sent_plotly_source = (figure_dict, viewport)
+        self._sent_matplotlib_svg = None
+
+        if self.downsampling != "none":
+            figure_dict = _downsample_plotly_figure(
+                figure_dict,
+                self.downsampling,
+                self._width_in_pixels,
+                self._x_range,
+                self._y_range,
+            )
+
+        old_figure_dict = self._sent_plotly_dict
+        self._sent_plotly_dict = figure_dict
+
+        # If the frontend already has a figure, try to only send what has
+        # changed. This is much faster for plots that are continuously
+        # updated with new data.
+        if old_figure_dict is not None and not self._force_full_plot:
+            update = _diff_plotly_figures(old_figure_dict, figure_dict)
+
+            if update is not None and not update:
+                return {
+                    "type": "unchanged",
+                    "version": self._plot_version,
+                }
+
+            if update is not None:
+                self._plot_version += 1
+
+                return {
+                    "type": "plotly-update",
+                    "baseVersion": self._plot_version - 1,
+                    "version": self._plot_version,
+                    "json": _plotly_to_json(update),
+                }
+
+        self._plot_version += 1
+
+        return {
+            "type": "plotly",
+            "version": self._plot_version,
+            "json": _plotly_figure_dict_to_json(figure_dict),
+        }
+
+    def _get_matplotlib_svg(self, figure: matplotlib.figure.Figure) -> str | None:
+        """
+        Returns the rendered figure, if it's available. Otherwise starts
+        rendering it in the background and returns `None`. The component is
+        refreshed once the rendering is done.
+        """
+        pickled = matplotlib_rendering.pickle_figure(figure)
+
+        # Figures which can't be pickled can't be rendered elsewhere either
+        if pickled is None:
+            return matplotlib_rendering.render_svg_here(figure)
+
+        figure_data, content_hash = pickled
+        self._pickled_figure_hash = content_hash
+
+        result = matplotlib_rendering.try_get_cached_svg(content_hash)
+
+        if result is None:
+            self.session.create_task(
+                self._refresh_when_rendered(figure_data, content_hash),
+                name="Render matplotlib figure",
+            )
+
+        return result
+
+    async def _refresh_when_rendered(
+        self,
+        figure_data: bytes,
+        content_hash: str,
+    ) -> None:
+        await matplotlib_rendering.render_svg(
+            self.session._app_server._figure_rendering_pool,
+            figure_data,
+            content_hash,
+        )
+
+        # Only bother if the figure hasn't changed in the meantime
+        if self._pickled_figure_hash == content_hash:
+            await self._force_refresh(RefreshPriority.BACKGROUND)
+
+    def _serialize_matplotlib(self, figure: matplotlib.figure.Figure) -> JsonDoc:
+        # Matplotlib marks figures as stale when they're modified, so a figure
+        # that's neither new nor stale looks the same as what was already sent
+        if (
+            figure is self._sent_figure
+            and self._sent_matplotlib_svg is not None
+            and not figure.stale
+        ):
+            if not self._force_full_plot:
+                return {
+                    "type": "unchanged",
+                    "version": self._plot_version,
+                }
+
+            svg = self._sent_matplotlib_svg
+
+        else:
+            svg = self._get_matplotlib_svg(figure)
+
+            # Keep displaying the previous figure until this one is ready
+            if svg is None:
+                return {
+                    "type": "pending",
+                }
+
+            self._sent_figure = figure
+            self._sent_matplotlib_svg = svg
+
+            # The frontend no longer has a plotly figure to update
+            self._sent_plotly_source = None
+            self._sent_plotly_dict = None
+
+        self._plot_version += 1
+
+        return {
+            "type": "matplotlib",
+            "version": self._plot_version,
+            "svg": svg,
+        }
+
     def _custom_serialize(self) -> JsonDoc:
         # Figure
         figure = self.figure
         plot: JsonDoc
 
+        # `maybes` only knows about libraries which had already been imported
+        # when it was initialized
+        library = type(figure).__module__.partition(".")[0]
+        known_types = {
+            "plotly": maybes.PLOTLY_GRAPH_TYPES,
+            "matplotlib": maybes.MATPLOTLIB_GRAPH_TYPES,
+        }
+
+        if library in known_types and not known_types[library]:
+            maybes.initialize(force=True)
+
         # Plotly
         if isinstance(figure, maybes.PLOTLY_GRAPH_TYPES):
-            # Make the plot transparent, so `self.background` shines through.
-            figure = cast("plotly.graph_objects.Figure", copy.copy(figure))
-            figure.update_layout(
-                {
-                    "plot_bgcolor": "rgba(0,0,0,0)",
-                    "paper_bgcolor": "rgba(0,0,0,0)",
-                }
-            )
-
-            plot = {
-                "type": "plotly",
-                "json": figure.to_json(),
-            }
+            plot = self._serialize_plotly(figure)
 
         # Matplotlib (+ Seaborn)
         elif isinstance(figure, maybes.MATPLOTLIB_GRAPH_TYPES):
@@ -152,24 +827,14 @@ class Plot(FundamentalComponent):
                 figure = figure.figure
 
             figure = cast("matplotlib.figure.Figure", figure)
-
-            file = io.BytesIO()
-            figure.savefig(
-                file,
-                format="svg",
-                transparent=True,
-                bbox_inches="tight",
-            )
-
-            plot = {
-                "type": "matplotlib",
-                "svg": bytes(file.getbuffer()).decode("utf-8"),
-            }
+            plot = self._serialize_matplotlib(figure)
 
         # Unsupported
         else:
             raise TypeError(f"Unsupported plot type: {type(figure)}")
 
+        self._force_full_plot = False
+
         # Corner radius
         if isinstance(self.corner_radius, (int, float)):
             corner_radius = (self.corner_radius,) * 4
@@ -182,5 +847,30 @@ class Plot(FundamentalComponent):
             "corner_radius": corner_radius,
         }
 
+    async def _on_message(self, msg: Any) -> None:
+        # Parse the message
+        assert isinstance(msg, dict), msg
+
+        # The frontend has lost track of the figure. Send all of it again.
+        if msg["type"] == "requestFullPlot":
+            self._force_full_plot = True
+            await self._force_refresh(RefreshPriority.BACKGROUND)
+
+        # The plot was resized or zoomed. If the figure is downsampled, that
+        # changes which points must be sent.
+        elif msg["type"] == "viewport":
+            width_in_pixels = msg["widthInPixels"]
+            assert isinstance(width_in_pixels, (int, float)), width_in_pixels
+
+            self._width_in_pixels = width_in_pixels
+            self._x_range = _parse_axis_range(msg["xRange"])
+            self._y_range = _parse_axis_range(msg["yRange"])
+
+            if self.downsampling != "none":
+                await self._force_refresh(RefreshPriority.BACKGROUND)
+
+        else:
+            raise AssertionError(f"Unexpected message: {msg}")
+
 
 Plot._unique_id = "Plot-builtin"
@@ -7,7 +7,7 @@ from uniserde import JsonDoc
 
 import rio
 
-from .fundamental_component import FundamentalComponent
+from .fundamental_component import LazyContentFundamentalComponent
 
 __all__ = [
     "Popup",
@@ -20,7 +20,7 @@ class PopupOpenOrCloseEvent:
     is_open: bool
 
 
-class Popup(FundamentalComponent):
+class Popup(LazyContentFundamentalComponent):
     """
     # Popup
 
@@ -59,6 +59,12 @@ class Popup(FundamentalComponent):
 
     `is_open`: Whether the popup is currently open.
 
+    `mount_content`: When to build the content and send it to the client.
+            `"always"` does so even while the popup is closed. `"on_open"`
+            waits until the popup is opened for the first time. `"while_open"`
+            additionally discards the content whenever the popup is closed,
+            which also discards any state stored in it.
+
     `on_open_or_close`: Triggered when the popup is opened or closed.
 
 
@@ -78,8 +84,12 @@ class Popup(FundamentalComponent):
     alignment: float = 0.5
     gap: float = 0.8
     is_open: bool = False
+    mount_content: Literal["always", "on_open", "while_open"] = "always"
     on_open_or_close: rio.EventHandler[PopupOpenOrCloseEvent] = None
 
+    def _are_lazy_children_shown(self) -> bool:
+        return self.is_open
+
     def _validate_delta_state_from_frontend(self, delta_state: JsonDoc) -> None:
         if not set(delta_state) <= {"is_open"}:
             raise AssertionError(
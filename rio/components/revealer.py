@@ -7,7 +7,7 @@ from uniserde import JsonDoc
 
 import rio
 
-from .fundamental_component import FundamentalComponent
+from .fundamental_component import LazyContentFundamentalComponent
 
 __all__ = [
     "Revealer",
@@ -22,7 +22,7 @@ class RevealerChangeEvent:
     is_open: bool
 
 
-class Revealer(FundamentalComponent):
+class Revealer(LazyContentFundamentalComponent):
     """
     # Revealer
 
@@ -49,6 +49,13 @@ class Revealer(FundamentalComponent):
             or closed. The event handler receives a `RevealerChangeEvent` as
             input.
 
+    `mount_content`: When to build the content and send it to the client.
+            `"always"` does so even while the `Revealer` is closed.
+            `"on_open"` waits until the `Revealer` is opened for the first
+            time. `"while_open"` additionally discards the content whenever
+            the `Revealer` is closed, which also discards any state stored in
+            it.
+
 
     ## Example:
 
@@ -88,8 +95,12 @@ class Revealer(FundamentalComponent):
         Literal["heading1", "heading2", "heading3", "text"] | rio.TextStyle
     ) = "text"
     is_open: bool = False
+    mount_content: Literal["always", "on_open", "while_open"] = "always"
     on_change: rio.EventHandler[RevealerChangeEvent] = None
 
+    def _are_lazy_children_shown(self) -> bool:
+        return self.is_open
+
     def _validate_delta_state_from_frontend(self, delta_state: JsonDoc) -> None:
         if not set(delta_state) <= {"is_open"}:
             raise AssertionError(
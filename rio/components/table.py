@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Iterable, Mapping
 from typing import *  # type: ignore
 
 from uniserde import JsonDoc
 
-from .. import maybes
+from .. import table_data
+from ..refresh_scheduling import RefreshPriority
 from .fundamental_component import FundamentalComponent
 
 if TYPE_CHECKING:
@@ -17,7 +19,14 @@ if TYPE_CHECKING:
 __all__ = ["Table"]
 
 
-TableValue = int | float | str
+TableValue = table_data.TableValue
+
+# How many rows are sent to the client before it has requested any. Tables with
+# at most this many rows are sent in their entirety right away.
+INITIAL_WINDOW_SIZE = 100
+
+# The maximum number of rows the client may request at once
+MAX_WINDOW_SIZE = 1000
 
 
 class Table(FundamentalComponent):
@@ -31,6 +40,12 @@ class Table(FundamentalComponent):
     spreadsheets, databases, or CSV files. Tables can be sorted by clicking on
     the column headers.
 
+    Tables can contain millions of rows. Only the rows which are currently
+    visible are sent to the client, and sorting and filtering happen on the
+    server, directly on the DataFrame or array you pass in. The data isn't
+    copied, so it must not be modified while the table is displayed, unless you
+    assign it again (or call `force_refresh`) afterwards.
+
 
     ## Attributes:
 
@@ -38,6 +53,9 @@ class Table(FundamentalComponent):
 
     `show_row_numbers`: Whether to show row numbers on the left side of the table.
 
+    `filter_text`: If not empty, only rows containing this text (ignoring case)
+        in any of their cells are displayed.
+
 
     ## Example:
 
@@ -63,28 +81,122 @@ class Table(FundamentalComponent):
     )
     show_row_numbers: bool = True
 
-    def _custom_serialize(self) -> JsonDoc:
-        return {
-            "data": self._data_to_json(),  # type: ignore[variance]
-        }
-
-    def _data_to_json(self) -> dict[str, list[TableValue]] | list[list[TableValue]]:
-        data = self.data
-
-        if isinstance(data, maybes.PANDAS_DATAFRAME_TYPES):
-            return data.to_dict(orient="list")  # type: ignore
+    filter_text: str = ""
+
+    def __post_init__(self) -> None:
+        # The range of rows the client has requested, in display order
+        self._window_start = 0
+        self._window_size = INITIAL_WINDOW_SIZE
+
+        # The columns the user has sorted by, most significant first. Each
+        # entry is a column index and whether the order is ascending.
+        self._sort_order: list[tuple[int, bool]] = []
+
+        self._table_data: table_data.TableData | None = None
+
+        # The sort order and filter text for which the row order is currently
+        # being computed in a thread, if any
+        self._pending_row_order: tuple[table_data.SortOrder, str] | None = None
+
+    def _get_table_data(self) -> table_data.TableData:
+        # Wrapping the data is cheap, but the wrapper caches the row order.
+        # Only create a new one if the data has been replaced.
+        if self._table_data is None or self._table_data.source is not self.data:
+            self._table_data = table_data.wrap(self.data)
+
+        return self._table_data
+
+    def _get_row_order(
+        self, data: table_data.TableData
+    ) -> table_data.RowIndices | None:
+        if data.is_row_order_ready(self._sort_order, self.filter_text):
+            return data.get_row_order(self._sort_order, self.filter_text)
+
+        # Filtering and sorting look at every single row, which would block the
+        # event loop. Do it in a thread and refresh once it's done. Until then,
+        # keep displaying the rows as they were.
+        key = (tuple(self._sort_order), self.filter_text)
+
+        if self._pending_row_order != key:
+            self._pending_row_order = key
+            self.session.create_task(
+                self._refresh_when_row_order_ready(data, *key),
+                name="Compute table row order",
+            )
+
+        return data.get_previous_row_order()
+
+    async def _refresh_when_row_order_ready(
+        self,
+        data: table_data.TableData,
+        sort_order: table_data.SortOrder,
+        filter_text: str,
+    ) -> None:
+        try:
+            await asyncio.to_thread(data.get_row_order, sort_order, filter_text)
+        finally:
+            if self._pending_row_order == (sort_order, filter_text):
+                self._pending_row_order = None
+
+        await self._force_refresh(RefreshPriority.BACKGROUND)
 
-        if isinstance(data, maybes.POLARS_DATAFRAME_TYPES):
-            return data.to_dict(as_series=False)
+    def _custom_serialize(self) -> JsonDoc:
+        data = self._get_table_data()
+        row_order = self._get_row_order(data)
+        num_rows = data.num_rows if row_order is None else len(row_order)
 
-        if isinstance(data, Mapping):
-            return dict(data)  # type: ignore[wtf]
+        # The data may have shrunk since the client requested the rows
+        window_start = min(self._window_start, num_rows)
+        window_stop = min(window_start + self._window_size, num_rows)
 
-        if isinstance(data, maybes.NUMPY_ARRAY_TYPES):
-            return data.tolist()
+        return {
+            "columnNames": data.column_names,
+            "numericColumns": [
+                data.is_numeric(column) for column in range(data.num_columns)
+            ],
+            "rowCount": num_rows,
+            "windowStart": window_start,
+            "windowColumns": data.get_window(  # type: ignore[variance]
+                row_order,
+                window_start,
+                window_stop,
+            ),
+            "sortOrder": self._sort_order,  # type: ignore[variance]
+        }
 
-        data = cast(Iterable[Iterable[TableValue]], data)
-        return [row if isinstance(row, list) else list(row) for row in data]
+    async def _on_message(self, msg: Any) -> None:
+        # The client has scrolled and needs different rows
+        if msg["type"] == "requestRows":
+            self._window_start = max(int(msg["start"]), 0)
+            self._window_size = min(max(int(msg["count"]), 0), MAX_WINDOW_SIZE)
+
+            # The user is scrolling and waiting for the rows
+            await self.force_refresh()
+
+        # The user has clicked on a column header
+        elif msg["type"] == "sort":
+            column = int(msg["column"])
+            self._sort_order = [
+                (column, bool(msg["ascending"])),
+                *(entry for entry in self._sort_order if entry[0] != column),
+            ]
+
+            # Sorting millions of rows can take a while. Do it in a thread so
+            # the session stays responsive. The result is cached, so it's
+            # available once the table is serialized.
+            data = self._get_table_data()
+            await asyncio.to_thread(
+                data.get_row_order,
+                list(self._sort_order),
+                self.filter_text,
+            )
+
+            await self._force_refresh(RefreshPriority.BACKGROUND)
+
+        else:
+            raise AssertionError(
+                f"Frontend sent an unexpected message to a `Table`: {msg!r}"
+            )
 
 
 Table._unique_id = "Table-builtin"
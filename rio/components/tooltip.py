@@ -1,17 +1,17 @@
 from __future__ import annotations
 
-from typing import Literal
+from typing import Any, Literal
 
 import rio
 
-from .fundamental_component import FundamentalComponent
+from .fundamental_component import LazyContentFundamentalComponent
 
 __all__ = [
     "Tooltip",
 ]
 
 
-class Tooltip(FundamentalComponent):
+class Tooltip(LazyContentFundamentalComponent):
     """
     # Tooltip
 
@@ -31,6 +31,11 @@ class Tooltip(FundamentalComponent):
     `position`: The position of the tooltip relative to the anchor. It can be
         one of the following values: `left`, `top`, `right`, `bottom`.
 
+    `mount_content`: When to build the tip and send it to the client.
+        `"always"` does so even while the tip isn't displayed. `"on_open"`
+        waits until the tip is displayed for the first time. `"while_open"`
+        additionally discards the tip whenever it disappears.
+
 
     ## Example:
 
@@ -49,6 +54,9 @@ class Tooltip(FundamentalComponent):
     tip_text: str | None
     tip_component: rio.Component | None
     position: Literal["left", "top", "right", "bottom"]
+    mount_content: Literal["always", "on_open", "while_open"]
+
+    _lazy_child_attribute_names = ("tip_component",)
 
     # Impute a Text instance if a string is passed in as the tip
     def __init__(
@@ -57,6 +65,7 @@ class Tooltip(FundamentalComponent):
         tip: str | rio.Component,
         position: Literal["left", "top", "right", "bottom"],
         *,
+        mount_content: Literal["always", "on_open", "while_open"] = "always",
         key: str | None = None,
         margin: float | None = None,
         margin_x: float | None = None,
@@ -95,6 +104,7 @@ class Tooltip(FundamentalComponent):
             self.tip_component = tip
 
         self.position = position
+        self.mount_content = mount_content
 
         self._properties_set_by_creator_.update(("tip_text", "tip_component"))
 
@@ -102,5 +112,28 @@ class Tooltip(FundamentalComponent):
         if isinstance(self.tip_text, str):
             self.tip_component = rio.Text(self.tip_text)
 
+        # Whether the user is currently hovering the anchor. Only tracked if the
+        # tip is mounted lazily.
+        self._is_tip_shown = False
+
+    def _are_lazy_children_shown(self) -> bool:
+        return self._is_tip_shown
+
+    async def _on_message(self, msg: Any) -> None:
+        # Parse the message
+        assert isinstance(msg, dict), msg
+
+        is_tip_shown = msg["isTipShown"]
+        assert isinstance(is_tip_shown, bool), is_tip_shown
+
+        # Update the state
+        self._is_tip_shown = is_tip_shown
+
+        self.session._register_dirty_component(
+            self,
+            include_children_recursively=False,
+        )
+        await self.session._refresh()
+
 
 Tooltip._unique_id = "Tooltip-builtin"
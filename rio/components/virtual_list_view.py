@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import KW_ONLY
+from typing import *  # type: ignore
+
+import rio
+
+from .component import Component
+from .fundamental_component import FundamentalComponent
+
+__all__ = ["VirtualListView"]
+
+
+# How many items are built before the frontend has reported which ones are
+# actually visible
+INITIAL_VISIBLE_ITEMS = 20
+
+
+class VirtualListView(Component):
+    """
+    # VirtualListView
+
+    A `ListView` which only builds the items that are currently visible.
+
+    `ListView` requires all of its children to be created up front. That's fine
+    for a few dozen items, but a list with tens of thousands of items would
+    spend most of its time building, reconciling and sending components which
+    nobody ever looks at.
+
+    `VirtualListView` instead takes the number of items and a function which
+    builds a single item. Only the items in (and slightly around) the visible
+    part of the list are built. As the user scrolls, new items are built and
+    items which have scrolled far away are discarded again. The list scrolls by
+    itself, so it shouldn't be placed inside a `ScrollContainer`.
+
+    Since items can be discarded and rebuilt at any time, they shouldn't hold
+    any state which isn't stored elsewhere.
+
+
+    ## Attributes:
+
+    `item_count`: How many items the list contains.
+
+    `build_item`: A function which receives the index of an item and returns
+        the component to display for it.
+
+    `item_key`: A function which receives the index of an item and returns a
+        key for it. Keys allow Rio to recognize items even if they change their
+        position, e.g. because an item above them was removed. If this isn't
+        provided, items are identified by their index.
+
+    `overscan`: How many items to build above and below the visible ones. More
+        items make scrolling smoother, at the cost of building more components.
+
+
+    ## Example:
+
+    A list with a hundred thousand items:
+
+    ```python
+    class MyComponent(rio.Component):
+        products: list[str] = [f"Product {i}" for i in range(100_000)]
+
+        def build_item(self, index: int) -> rio.Component:
+            return rio.SimpleListItem(self.products[index])
+
+        def build(self) -> rio.Component:
+            return rio.VirtualListView(
+                item_count=len(self.products),
+                build_item=self.build_item,
+                item_key=lambda index: self.products[index],
+                height="grow",
+            )
+    ```
+    """
+
+    _: KW_ONLY
+    item_count: int
+    build_item: Callable[[int], rio.Component]
+    item_key: Callable[[int], str | int] | None = None
+    overscan: int = 10
+
+    def __post_init__(self) -> None:
+        # The range of items which the frontend has reported as visible
+        self._visible_start = 0
+        self._visible_end = INITIAL_VISIBLE_ITEMS
+
+    def _get_built_range(self) -> tuple[int, int]:
+        start = min(self._visible_start, self.item_count) - self.overscan
+        end = self._visible_end + self.overscan
+
+        return max(start, 0), min(end, self.item_count)
+
+    async def _on_visible_range_change(self, start: int, end: int) -> None:
+        self._visible_start = max(start, 0)
+        self._visible_end = max(end, self._visible_start)
+
+        await self.force_refresh()
+
+    def build(self) -> rio.Component:
+        first_index, end_index = self._get_built_range()
+
+        items: list[rio.Component] = []
+
+        for index in range(first_index, end_index):
+            item = self.build_item(index)
+
+            # Because the build function is being called inside of Rio, the
+            # component is mistaken of being internal to Rio. Take care to fix
+            # that.
+            item._rio_internal_ = False
+
+            # The key is what allows the reconciler to match up items after
+            # scrolling, since their position in the list changes
+            if self.item_key is not None:
+                item.key = str(self.item_key(index))
+            elif item.key is None:
+                item.key = f"rio-virtual-list-item-{index}"
+
+            items.append(item)
+
+        return _VirtualListViewport(
+            *items,
+            first_index=first_index,
+            item_count=self.item_count,
+            overscan=self.overscan,
+            on_visible_range_change=self._on_visible_range_change,
+        )
+
+
+class _VirtualListViewport(FundamentalComponent):
+    """
+    The scrollable part of a `VirtualListView`. It displays the items it was
+    given and tells the `VirtualListView` which items are visible.
+    """
+
+    children: list[rio.Component]
+    first_index: int
+    item_count: int
+    overscan: int
+    on_visible_range_change: Callable[[int, int], Awaitable[None]]
+
+    def __init__(
+        self,
+        *children: rio.Component,
+        first_index: int,
+        item_count: int,
+        overscan: int,
+        on_visible_range_change: Callable[[int, int], Awaitable[None]],
+    ) -> None:
+        super().__init__()
+
+        self.children = list(children)
+        self.first_index = first_index
+        self.item_count = item_count
+        self.overscan = overscan
+        self.on_visible_range_change = on_visible_range_change
+
+    async def _on_message(self, msg: Any) -> None:
+        # Parse the message
+        assert isinstance(msg, dict), msg
+
+        visible_start = msg["visibleStart"]
+        visible_end = msg["visibleEnd"]
+
+        assert isinstance(visible_start, int), visible_start
+        assert isinstance(visible_end, int), visible_end
+
+        await self.on_visible_range_change(visible_start, visible_end)
+
+
+_VirtualListViewport._unique_id = "VirtualListView-builtin"
@@ -0,0 +1,139 @@
+"""
+Reduction of large data series to a number of points which can be displayed.
+
+A line with millions of points drawn into a plot a few thousand pixels wide
+mostly consists of points which end up on the same pixel. Sending all of them
+to the browser wastes bandwidth and makes the plot sluggish, without showing
+anything more. The functions in this module select a subset of the points that
+looks the same (or nearly the same) when drawn.
+
+Both algorithms return the indices of the points to keep, so any other per-point
+data (such as colors or hover texts) can be reduced the same way.
+
+- `min_max` keeps the smallest and largest value in each bucket of points. This
+  preserves every spike, which makes it the safe choice for sensor data.
+
+- `lttb` ("Largest-Triangle-Three-Buckets") keeps the one point per bucket that
+  forms the largest triangle with its neighbors. It produces half as many points
+  for the same resolution and looks closer to the original line, but may drop
+  single outliers.
+
+All arrays are expected to be sorted by their x values.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import *  # type: ignore
+
+if TYPE_CHECKING:
+    import numpy  # type: ignore
+
+
+__all__ = [
+    "lttb",
+    "min_max",
+]
+
+
+def lttb(x: numpy.ndarray, y: numpy.ndarray, num_points: int) -> numpy.ndarray:
+    """
+    Selects `num_points` points using the Largest-Triangle-Three-Buckets
+    algorithm. The first and last point are always kept.
+
+    Each bucket depends on the point chosen for the previous one, so the buckets
+    are processed one after another. The work within each bucket is vectorized
+    though, so this only loops `num_points` times, regardless of the size of the
+    input.
+    """
+    import numpy  # type: ignore
+
+    num_input_points = len(x)
+
+    if num_points >= num_input_points or num_points < 3:
+        return numpy.arange(num_input_points)
+
+    # The first and last point are their own buckets. Divide the rest evenly.
+    # Since there are more points than buckets, no bucket is empty.
+    edges = numpy.linspace(1, num_input_points - 1, num_points - 1).astype(numpy.intp)
+    starts = edges[:-1]
+    lengths = numpy.diff(edges)
+
+    # The average of each bucket is needed to evaluate the bucket before it
+    mean_x = numpy.add.reduceat(x, starts) / lengths
+    mean_y = numpy.add.reduceat(y, starts) / lengths
+
+    # The last bucket is followed by the last point
+    next_x = numpy.append(mean_x[1:], x[-1])
+    next_y = numpy.append(mean_y[1:], y[-1])
+
+    result = numpy.empty(num_points, dtype=numpy.intp)
+    result[0] = 0
+    result[-1] = num_input_points - 1
+
+    previous = 0
+
+    for bucket, (start, end) in enumerate(zip(starts, edges[1:])):
+        previous_x = x[previous]
+        previous_y = y[previous]
+
+        # Twice the area of the triangle formed by the previously selected
+        # point, each candidate and the average of the next bucket
+        areas = numpy.abs(
+            (previous_x - next_x[bucket]) * (y[start:end] - previous_y)
+            - (previous_x - x[start:end]) * (next_y[bucket] - previous_y)
+        )
+
+        previous = start + int(numpy.argmax(areas))
+        result[bucket + 1] = previous
+
+    return result
+
+
+def min_max(x: numpy.ndarray, y: numpy.ndarray, num_points: int) -> numpy.ndarray:
+    """
+    Selects at most `num_points` points by keeping the smallest and largest y
+    value of each bucket. The first and last point are always kept.
+
+    Only `y` is needed to choose the points, but `x` is accepted as well so
+    this function can be used interchangeably with `lttb`.
+    """
+    import numpy  # type: ignore
+
+    num_input_points = len(y)
+    num_buckets = (num_points - 2) // 2
+
+    if num_points >= num_input_points or num_buckets < 1:
+        return numpy.arange(num_input_points)
+
+    # Pad the values so they can be arranged in equally sized buckets. This
+    # allows finding all minima and maxima in one go. Missing values and the
+    # padding are only selected if a bucket has nothing else. Since every
+    # bucket contains at least one actual point, that can only be a missing
+    # value, which keeps the gap in the line visible.
+    bucket_size = math.ceil(num_input_points / num_buckets)
+    num_buckets = math.ceil(num_input_points / bucket_size)
+    padding = num_buckets * bucket_size - num_input_points
+
+    values = numpy.asarray(y, dtype=numpy.float64)
+    missing = numpy.isnan(values)
+
+    lows = numpy.where(missing, numpy.inf, values)
+    lows = numpy.pad(lows, (0, padding), constant_values=numpy.inf)
+
+    highs = numpy.where(missing, -numpy.inf, values)
+    highs = numpy.pad(highs, (0, padding), constant_values=-numpy.inf)
+
+    bucket_starts = numpy.arange(num_buckets) * bucket_size
+    minima = bucket_starts + lows.reshape(num_buckets, bucket_size).argmin(axis=1)
+    maxima = bucket_starts + highs.reshape(num_buckets, bucket_size).argmax(axis=1)
+
+    return numpy.unique(
+        numpy.concatenate(
+            (
+                [0, num_input_points - 1],
+                minima,
+                maxima,
+            )
+        )
+    )
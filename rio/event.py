@@ -12,9 +12,11 @@ __all__ = [
     "on_mount",
     "on_unmount",
     "periodic",
+    "run_in_thread",
 ]
 
 C = TypeVar("C", bound="rio.Component")
+F = TypeVar("F", bound=Callable)
 R = TypeVar("R")
 SyncOrAsync = R | Awaitable[R]
 SyncOrAsyncNone = TypeVar("SyncOrAsyncNone", bound=SyncOrAsync[None])
@@ -83,12 +85,13 @@ def periodic(
     TODO / unfinished / do not use
 
     This event is triggered repeatedly at a fixed time interval for as long as
-    the component exists. The component does not have to be mounted for this
-    event to trigger.
+    the component is part of the component tree. It stops once the component is
+    unmounted, and resumes if it's mounted again.
 
-    The interval only starts counting after the previous handler has finished
-    executing, so the handler will never run twice simultaneously, even if it
-    takes longer than the interval to execute.
+    All handlers with the same interval are called together, and the session
+    is refreshed once afterwards. The interval only starts counting after the
+    previous handlers have finished executing, so a handler will never run twice
+    simultaneously, even if it takes longer than the interval to execute.
 
     Args:
         period: The number of seconds, or timedelta, between each trigger.
@@ -104,3 +107,30 @@ def periodic(
         return handler
 
     return decorator
+
+
+def run_in_thread(handler: F) -> F:
+    """
+    Runs a synchronous event handler in a worker thread, rather than on the
+    event loop.
+
+    Rio serves all sessions from a single thread. A handler which blocks, e.g.
+    because it queries a database or downloads a file, stalls every session on
+    the server while it runs. Handlers marked with this decorator are instead
+    run in a thread pool, and the session is refreshed once they are done.
+
+    This works for component event handlers, such as `on_press`, as well as
+    event decorators like `rio.event.on_populate`. The handler must be passed
+    directly, rather than wrapped in a lambda. The number of threads is limited
+    by the `max_handler_threads` and `max_handler_threads_per_session` arguments
+    of `rio.App`.
+
+    Since the handler doesn't run on the event loop, it must not call any
+    `async` functions of Rio. Assigning new values to component attributes is
+    fine: the values are stored right away, but the affected components are
+    only marked for rebuilding on the event loop. Don't modify attribute values
+    in place though, e.g. by appending to a list, since the event loop may be
+    reading them at the same time.
+    """
+    handler._rio_run_in_thread_ = True  # type: ignore
+    return handler
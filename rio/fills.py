@@ -9,7 +9,7 @@ from uniserde import Jsonable
 
 import rio
 
-from . import assets
+from . import assets, responsive_images
 from .color import Color
 from .common import ImageLike
 from .self_serializing import SelfSerializing
@@ -164,6 +164,8 @@ class ImageFill(Fill):
         image: ImageLike,
         *,
         fill_mode: Literal["fit", "stretch", "zoom"] = "fit",
+        loading: Literal["eager", "lazy"] = "eager",
+        placeholder: Literal["none", "blur", "color"] = "none",
     ):
         """
         Args:
@@ -175,17 +177,48 @@ class ImageFill(Fill):
                 the image is stretched to fill the shape exactly, possibly
                 distorting it in the process. If `zoom`, the image is scaled to fill
                 the shape entirely, possibly overflowing.
+
+            loading: When to load the image. `eager` images are loaded right
+                away, `lazy` images are only loaded once the shape is about to
+                scroll into view.
+
+            placeholder: What to display while the image is loading. `blur`
+                shows a tiny, blurry preview of the image and `color` uses the
+                image's average color. Placeholders are generated in the
+                background the first time an image is used, so they may be
+                missing the very first time the image is displayed.
         """
         self._image_asset = assets.Asset.from_image(image)
         self._fill_mode = fill_mode
+        self._loading = loading
+        self._placeholder = placeholder
 
     def _serialize(self, sess: rio.Session) -> Jsonable:
         return {
             "type": "image",
             "fillMode": self._fill_mode,
             "imageUrl": self._image_asset._serialize(sess),
+            "loading": self._loading,
+            "placeholderUrl": self._get_placeholder_url(sess),
         }
 
+    def _get_placeholder_url(self, sess: rio.Session) -> str | None:
+        if self._placeholder == "none":
+            return None
+
+        result = responsive_images.try_get_cached_placeholder(
+            self._image_asset, self._placeholder
+        )
+
+        # Fills have no way to update themselves once the placeholder is
+        # ready. Start generating it anyway, so it's available next time.
+        if result is None:
+            responsive_images.request_placeholder(
+                sess, self._image_asset, self._placeholder
+            )
+
+        return result
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ImageFill):
             return NotImplemented
@@ -193,10 +226,14 @@ class ImageFill(Fill):
         return (
             self._image_asset == other._image_asset
             and self._fill_mode == other._fill_mode
+            and self._loading == other._loading
+            and self._placeholder == other._placeholder
         )
 
     def __hash__(self) -> int:
-        return hash((self._image_asset, self._fill_mode))
+        return hash(
+            (self._image_asset, self._fill_mode, self._loading, self._placeholder)
+        )
 
     def _as_css_background(self, sess: rio.Session) -> str:
         # Fetch the escaped URL. That way it cannot interfere with the CSS syntax
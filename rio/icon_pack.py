@@ -0,0 +1,224 @@
+"""
+Reading and writing of icon packs.
+
+An icon pack stores an entire icon set in a single file, so that icons can be
+looked up without first extracting thousands of small files. The file is memory
+mapped, so only the icons which are actually used are ever read from disk.
+
+File layout (all integers are little endian):
+
+    magic           8 bytes     `RIOICONS`
+    version         u32         Currently always 1
+    index size      u32         Size of the index, in bytes
+    index           JSON        See below
+    data            ...         The SVG sources, one after another
+
+The index is a UTF-8 encoded JSON object:
+
+    {
+        "compression": "zlib" | "none",
+        "icons": {
+            "icon-name": [offset, size],
+            "icon-name:variant": [offset, size],
+            ...
+        }
+    }
+
+Offsets are relative to the start of the data section.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import tarfile
+import zlib
+from pathlib import Path
+from typing import *  # type: ignore
+
+__all__ = [
+    "FILE_SUFFIX",
+    "IconPack",
+    "icons_from_archive",
+    "icons_from_directory",
+    "write_icon_pack",
+]
+
+
+FILE_SUFFIX = ".rioicons"
+
+MAGIC = b"RIOICONS"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sII")
+
+
+def _make_key(icon_name: str, variant: str | None) -> str:
+    if variant is None:
+        return icon_name
+
+    return f"{icon_name}:{variant}"
+
+
+class IconPack:
+    """
+    A read-only, memory mapped icon pack.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        with path.open("rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, index_size = _HEADER.unpack_from(self._mmap)
+
+            if magic != MAGIC:
+                raise ValueError(f"`{path}` is not an icon pack")
+
+            if version != VERSION:
+                raise ValueError(
+                    f"`{path}` uses icon pack version {version}, but only version {VERSION} is supported"
+                )
+
+            index = json.loads(
+                self._mmap[_HEADER.size : _HEADER.size + index_size].decode("utf-8")
+            )
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as err:
+            self._mmap.close()
+            raise ValueError(f"`{path}` is not a valid icon pack: {err}") from None
+        except ValueError:
+            self._mmap.close()
+            raise
+
+        self._compression: Literal["zlib", "none"] = index["compression"]
+        self._icons: dict[str, list[int]] = index["icons"]
+        self._data_offset = _HEADER.size + index_size
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def get_svg(self, icon_name: str, variant: str | None) -> str:
+        """
+        Returns the SVG source of the given icon. Raises a `KeyError` if there
+        is no such icon in the pack.
+        """
+        offset, size = self._icons[_make_key(icon_name, variant)]
+
+        start = self._data_offset + offset
+        blob = self._mmap[start : start + size]
+
+        if self._compression == "zlib":
+            blob = zlib.decompress(blob)
+
+        return blob.decode("utf-8")
+
+    def all_variants(self) -> set[str | None]:
+        """
+        Returns the names of all variants in the pack. `None` represents the
+        default variant.
+        """
+        return {variant for _, variant in self.all_icons()}
+
+    def all_icons(self) -> Iterable[tuple[str, str | None]]:
+        """
+        Yields the names and variants of all icons in the pack.
+        """
+        for key in self._icons:
+            icon_name, _, variant = key.partition(":")
+            yield icon_name, variant or None
+
+
+def icons_from_directory(directory: Path) -> Iterable[tuple[str, str | None, str]]:
+    """
+    Yields the name, variant and SVG source of all icons in the directory.
+    Files located directly in the directory are part of the default variant,
+    files in a subdirectory belong to the variant of the same name.
+    """
+    for path in sorted(directory.glob("**/*.svg")):
+        relative_path = path.relative_to(directory)
+
+        if len(relative_path.parts) == 1:
+            variant = None
+        elif len(relative_path.parts) == 2:
+            variant = relative_path.parts[0]
+        else:
+            continue
+
+        yield path.stem, variant, path.read_text("utf-8")
+
+
+def icons_from_archive(archive_path: Path) -> Iterable[tuple[str, str | None, str]]:
+    """
+    Yields the name, variant and SVG source of all icons in a `.tar.xz` icon
+    set archive, as accepted by `Icon.register_icon_set`.
+    """
+    with tarfile.open(archive_path, "r:xz") as tar_file:
+        for member in tar_file:
+            if not member.isfile() or not member.name.endswith(".svg"):
+                continue
+
+            # The first directory is the name of the icon set
+            parts = Path(member.name).parts[1:]
+
+            if len(parts) == 1:
+                variant = None
+            elif len(parts) == 2:
+                variant = parts[0]
+            else:
+                continue
+
+            file = tar_file.extractfile(member)
+            assert file is not None, member
+
+            yield Path(parts[-1]).stem, variant, file.read().decode("utf-8")
+
+
+def write_icon_pack(
+    icons: Iterable[tuple[str, str | None, str]],
+    output_path: Path,
+    *,
+    compress: bool = True,
+) -> None:
+    """
+    Writes the given icons to an icon pack. `icons` yields the name, variant and
+    SVG source of each icon.
+
+    The file is written atomically, so concurrent readers never see a partially
+    written pack.
+    """
+    index: dict[str, list[int]] = {}
+    blobs: list[bytes] = []
+    offset = 0
+
+    for icon_name, variant, svg_source in icons:
+        blob = svg_source.encode("utf-8")
+
+        if compress:
+            blob = zlib.compress(blob, level=9)
+
+        index[_make_key(icon_name, variant)] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    index_bytes = json.dumps(
+        {
+            "compression": "zlib" if compress else "none",
+            "icons": index,
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+    temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+
+    with temp_path.open("wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        file.write(index_bytes)
+
+        for blob in blobs:
+            file.write(blob)
+
+    os.replace(temp_path, output_path)
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 import logging
-import tarfile
 from pathlib import Path
 from typing import *  # type: ignore
 
-from . import common
+from . import common, icon_pack
 from .errors import AssetError
 
 _icon_registry: IconRegistry | None = None
@@ -15,8 +14,11 @@ class IconRegistry:
     """
     Helper class, which keeps track of all icons known to rio.
 
-    Icons are stored in a .tar.xz archive, and extracted on first use. Any icons which
-    have been accessed are kept in memory for rapid access.
+    Icon sets are stored in icon packs: single, indexed files which are memory
+    mapped for fast access. Icon sets may also be registered as `.tar.xz`
+    archives, which are converted to an icon pack in the cache directory on
+    first use. Any icons which have been accessed are kept in memory for rapid
+    access.
     """
 
     def __init__(self) -> None:
@@ -24,9 +26,13 @@ class IconRegistry:
         # names are canonical form.
         self.cached_icons: dict[str, str] = {}
 
-        # Maps icon set names to the path of the archive file containing the icons
+        # Maps icon set names to the path of the file containing the icons.
+        # This is either an icon pack or a `.tar.xz` archive.
         self.icon_set_archives: dict[str, Path] = {}
 
+        # Icon packs which have already been opened, by icon set name
+        self._icon_packs: dict[str, icon_pack.IconPack] = {}
+
     @classmethod
     def get_singleton(cls) -> IconRegistry:
         """
@@ -38,18 +44,18 @@ class IconRegistry:
         if _icon_registry is None:
             _icon_registry = IconRegistry()
 
-            # Register built-in icon sets
-            _icon_registry.icon_set_archives["material"] = (
-                common.RIO_ASSETS_DIR / "icon-sets" / "material.tar.xz"
-            )
+            # Register built-in icon sets. Rio ships prebuilt icon packs for
+            # them, but fall back to the archives in case a pack is missing.
+            for set_name in ("material", "rio", "styling"):
+                path = common.RIO_ASSETS_DIR / "icon-sets" / set_name
 
-            _icon_registry.icon_set_archives["rio"] = (
-                common.RIO_ASSETS_DIR / "icon-sets" / "rio.tar.xz"
-            )
-
-            _icon_registry.icon_set_archives["styling"] = (
-                common.RIO_ASSETS_DIR / "icon-sets" / "styling.tar.xz"
-            )
+                pack_path = path.with_suffix(icon_pack.FILE_SUFFIX)
+                if pack_path.exists():
+                    _icon_registry.icon_set_archives[set_name] = pack_path
+                else:
+                    _icon_registry.icon_set_archives[set_name] = path.with_suffix(
+                        ".tar.xz"
+                    )
 
         # Use it
         return _icon_registry
@@ -102,73 +108,48 @@ class IconRegistry:
 
         return f"{set}/{name}:{section}"
 
-    def _icon_set_extraction_dir(self, icon_set: str) -> Path:
+    def _get_icon_pack(self, icon_set: str) -> icon_pack.IconPack:
         """
-        Given the name of an icon set, return the directory where the icon set
-        will be extracted to. The directory will be created if necessary.
-        """
-        return common.ASSET_MANGER.get_cache_path(
-            Path("icon-sets") / icon_set,
-        )
-
-    def _ensure_icon_set_is_extracted(self, icon_set: str) -> None:
-        """
-        Given the name of an icon set, extract the icon set's archive to the
-        cache directory. The target director must not exist yet. Raises a
+        Given the name of an icon set, return the icon pack containing its
+        icons. Icon sets registered as `.tar.xz` archive are converted to an
+        icon pack first, which is stored in the cache directory. Raises a
         `KeyError` if no icon set with the given name has been registered.
         """
-        # If the target directory already exists there is nothing to do
-        icon_set_dir = self._icon_set_extraction_dir(icon_set)
-
-        if icon_set_dir.exists():
-            return
-
-        # Get the path to the icon set's archive. If there is no icon set with
-        # the given name, this will raise a `KeyError`. That's fine.
-        archive_path = self.icon_set_archives[icon_set]
-
-        # Extract the set
-        logging.debug(
-            f"Extracting icon set `{icon_set}` from `{archive_path}` to `{icon_set_dir}`"
-        )
+        # Already open?
+        try:
+            return self._icon_packs[icon_set]
+        except KeyError:
+            pass
 
-        with tarfile.open(archive_path, "r:xz") as tar_file:
-            tar_file.extractall(icon_set_dir.parent)
+        # Get the path to the icon set's file. If there is no icon set with the
+        # given name, this will raise a `KeyError`. That's fine.
+        source_path = self.icon_set_archives[icon_set]
 
-        # Sanity check: Make sure the target directory exists now
-        if not icon_set_dir.exists():
-            raise RuntimeError(
-                f"After extracting icon set `{icon_set}` from `{archive_path}` to `{icon_set_dir.parent}`, the target directory does not exist. Is the directory in the archive named correctly?"
+        if source_path.suffix == icon_pack.FILE_SUFFIX:
+            pack_path = source_path
+        else:
+            pack_path = common.ASSET_MANGER.get_cache_path(
+                Path("icon-sets") / f"{icon_set}{icon_pack.FILE_SUFFIX}"
             )
 
-    def _get_icon_svg_path(
-        self,
-        icon_name: str,
-    ) -> Path:
-        """
-        Given an icon name, return the path to the SVG file for that icon. This
-        will extract the icon  if necessary.
-        """
-        # Prepare some paths
-        icon_set, icon_name, variant = IconRegistry.parse_icon_name(icon_name)
-
-        icon_set_dir = self._icon_set_extraction_dir(icon_set)
-
-        if variant is None:
-            svg_path = icon_set_dir / f"{icon_name}.svg"
-        else:
-            svg_path = icon_set_dir / variant / f"{icon_name}.svg"
+            if not pack_path.exists():
+                logging.debug(
+                    f"Converting icon set `{icon_set}` from `{source_path}` to an icon pack at `{pack_path}`"
+                )
 
-        # Extract the icon set if necessary
-        self._ensure_icon_set_is_extracted(icon_set)
+                icon_pack.write_icon_pack(
+                    icon_pack.icons_from_archive(source_path),
+                    pack_path,
+                )
 
-        return svg_path
+        result = icon_pack.IconPack(pack_path)
+        self._icon_packs[icon_set] = result
+        return result
 
     def get_icon_svg(self, icon_name: str) -> str:
         """
-        Given an icon name, return the SVG string for that icon. This will
-        extract the icon if necessary. If the icon name is invalid or there is
-        no matching icon, raise an `AssetError`.
+        Given an icon name, return the SVG string for that icon. If the icon
+        name is invalid or there is no matching icon, raise an `AssetError`.
         """
 
         # Normalize the icon name
@@ -180,26 +161,22 @@ class IconRegistry:
         except KeyError:
             pass
 
-        # Get the path to the icon's SVG file
-        svg_path = self._get_icon_svg_path(icon_name)
+        # Find the icon set
+        icon_set, name, variant = IconRegistry.parse_icon_name(icon_name)
 
-        # Read the SVG file
         try:
-            svg_string = svg_path.read_text()
-        except FileNotFoundError:
-            # Figure out which part of the name is the problem to show a
-            # descriptive error message
-            icon_set, icon_name, variant = IconRegistry.parse_icon_name(icon_name)
-
-            icon_set_dir = self._icon_set_extraction_dir(icon_set)
-
-            if not icon_set_dir.exists():
-                raise AssetError(
-                    f"Unknown icon set `{icon_set}`. Known icon sets are: `{'`, `'.join(self.icon_set_archives.keys())}`"
-                ) from None
+            pack = self._get_icon_pack(icon_set)
+        except KeyError:
+            raise AssetError(
+                f"Unknown icon set `{icon_set}`. Known icon sets are: `{'`, `'.join(self.icon_set_archives.keys())}`"
+            ) from None
 
+        # Read the SVG
+        try:
+            svg_string = pack.get_svg(name, variant)
+        except KeyError:
             raise AssetError(
-                f"There is no icon named `{icon_name}` in the `{icon_set}` icon set"
+                f"There is no icon named `{name}` in the `{icon_set}` icon set"
             ) from None
 
         # Cache the icon
@@ -208,32 +185,6 @@ class IconRegistry:
         # Done
         return svg_string
 
-    def _get_variant_directories(
-        self, icon_set: str
-    ) -> Iterable[tuple[str | None, Path]]:
-        """
-        Given the name of an icon set, list the names of all variants in that
-        set along with the directory they are stored in.
-        """
-
-        # Make sure the icon set is extracted
-        self._ensure_icon_set_is_extracted(icon_set)
-
-        # Iterate over all files in the icon set directory. Directories
-        # correspond to variants. If icons are found in the root directory, they
-        # are part of the default variant.
-        icon_set_dir = self._icon_set_extraction_dir(icon_set)
-        has_default_variant = False
-
-        for path in icon_set_dir.iterdir():
-            if path.is_dir():
-                yield (path.name, path)
-            else:
-                has_default_variant = True
-
-        if has_default_variant:
-            yield (None, icon_set_dir)
-
     def all_icon_sets(self) -> Iterable[str]:
         """
         Return the names of all icon set names known to rio.
@@ -245,8 +196,7 @@ class IconRegistry:
         Given the name of an icon set, list the names of all variants in that
         set.
         """
-        for name, _ in self._get_variant_directories(icon_set):
-            yield name
+        return self._get_icon_pack(icon_set).all_variants()
 
     def all_icons_in_set(
         self,
@@ -262,21 +212,11 @@ class IconRegistry:
         Raises a `KeyError` if there is not icon set or variant with the given
         name.
         """
-        # Find all available variants. This will also extract the icon set if
-        # necessary.
-        variants = dict(self._get_variant_directories(icon_set))
-
-        # Apply the variant filter. Any `KeyError` is propagated.
-        if variant is not None:
-            variants = {variant: variants[variant]}
-
-        # Iterate over all variants
-        for variant_name, path in variants.items():
-            for icon_path in path.iterdir():
-                # Only care for SVG files
-                if icon_path.is_dir() or icon_path.suffix != ".svg":
-                    continue
-
-                # Yield
-                icon_name = icon_path.stem
-                yield icon_name, variant_name
+        pack = self._get_icon_pack(icon_set)
+
+        if variant is not None and variant not in pack.all_variants():
+            raise KeyError(variant)
+
+        for icon_name, icon_variant in pack.all_icons():
+            if variant is None or icon_variant == variant:
+                yield icon_name, icon_variant
@@ -0,0 +1,231 @@
+"""
+Converts Markdown to HTML, and highlights source code, on the server.
+
+Normally the browser does this itself. For large documents that is slow, and
+it is repeated by every client which displays the document, every time it is
+updated. Rendering on the server instead allows the result to be cached and
+shared between all sessions.
+
+The HTML matches what the frontend would have produced: Raw HTML in the
+Markdown is escaped, and highlighted code uses the same CSS classes as
+highlight.js, so the existing (light or dark) styles apply. Since the output
+doesn't depend on the theme, the same HTML is served to all sessions.
+
+This requires the optional `markdown-it-py` and `pygments` packages, which are
+part of the `markdown` extra.
+"""
+
+from __future__ import annotations
+
+import functools
+import html
+from typing import *  # type: ignore
+
+__all__ = [
+    "is_available",
+    "highlight_code",
+    "render_markdown",
+]
+
+
+# Rendered documents, keyed by their source text and default language. The dict
+# is kept in least recently used order, so the entries at the front are dropped
+# first.
+#
+# The text itself is used as key, rather than a digest of it: Python strings
+# cache their hash, and comparing a string with itself is instant, so looking up
+# the same document again costs next to nothing, no matter its size.
+_documents: dict[tuple[str, str | None], str] = {}
+_MAX_CACHED_DOCUMENTS = 256
+
+# Maps pygments token types to the highlight.js classes with the same meaning.
+# Token types which aren't listed here use the class of their closest listed
+# parent, if any.
+_HLJS_CLASSES_BY_TOKEN_TYPE_NAME = {
+    "Comment": "hljs-comment",
+    "Comment.Preproc": "hljs-meta",
+    "Comment.PreprocFile": "hljs-string",
+    "Generic.Deleted": "hljs-deletion",
+    "Generic.Emph": "hljs-emphasis",
+    "Generic.Heading": "hljs-section",
+    "Generic.Inserted": "hljs-addition",
+    "Generic.Strong": "hljs-strong",
+    "Generic.Subheading": "hljs-section",
+    "Keyword": "hljs-keyword",
+    "Keyword.Constant": "hljs-literal",
+    "Keyword.Type": "hljs-type",
+    "Literal": "hljs-literal",
+    "Literal.Number": "hljs-number",
+    "Literal.String": "hljs-string",
+    "Literal.String.Regex": "hljs-regexp",
+    "Literal.String.Symbol": "hljs-symbol",
+    "Name.Attribute": "hljs-attr",
+    "Name.Builtin": "hljs-built_in",
+    "Name.Builtin.Pseudo": "hljs-variable",
+    "Name.Class": "hljs-title",
+    "Name.Decorator": "hljs-meta",
+    "Name.Exception": "hljs-title",
+    "Name.Function": "hljs-title",
+    "Name.Tag": "hljs-name",
+    "Name.Variable": "hljs-variable",
+    "Operator": "hljs-operator",
+    "Operator.Word": "hljs-keyword",
+    "Punctuation": "hljs-punctuation",
+}
+
+
+def is_available() -> bool:
+    """
+    Returns whether the packages needed for rendering are installed.
+    """
+    try:
+        import markdown_it  # type: ignore
+        import pygments  # type: ignore
+    except ImportError:
+        return False
+
+    return True
+
+
+def _get_hljs_class(token_type: Any) -> str | None:
+    while token_type:
+        name = str(token_type).removeprefix("Token.")
+
+        try:
+            return _HLJS_CLASSES_BY_TOKEN_TYPE_NAME[name]
+        except KeyError:
+            token_type = token_type.parent
+
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def highlight_code(code: str, language: str) -> tuple[str, str] | None:
+    """
+    Highlights the given code. Returns the resulting HTML and the human readable
+    name of the language, or `None` if the language isn't known. Results are
+    cached.
+    """
+    import pygments.lexers  # type: ignore
+    import pygments.util  # type: ignore
+
+    try:
+        lexer = pygments.lexers.get_lexer_by_name(language, stripnl=False)
+    except pygments.util.ClassNotFound:
+        return None
+
+    # Pygments splits some tokens, like strings, into several parts. Merge
+    # consecutive parts with the same class, to keep the HTML small.
+    runs: list[tuple[str | None, str]] = []
+
+    for token_type, value in lexer.get_tokens(code):
+        css_class = _get_hljs_class(token_type)
+
+        if runs and runs[-1][0] == css_class:
+            runs[-1] = (css_class, runs[-1][1] + value)
+        else:
+            runs.append((css_class, value))
+
+    chunks: list[str] = []
+
+    for css_class, value in runs:
+        value = html.escape(value, quote=False)
+
+        if css_class is None:
+            chunks.append(value)
+        else:
+            chunks.append(f'<span class="{css_class}">{value}</span>')
+
+    # Pygments always terminates the code with a newline
+    result = "".join(chunks)
+
+    if not code.endswith("\n") and result.endswith("\n"):
+        result = result[:-1]
+
+    return result, lexer.name
+
+
+def _render_code_block(code: str, language: str | None) -> str:
+    # Remove empty leading/trailing lines
+    code = code.strip()
+
+    highlighted = None if language is None else highlight_code(code, language)
+
+    # Languages which aren't known, or have to be guessed, are left to the
+    # browser
+    if highlighted is None:
+        return f"<pre><code>{html.escape(code, quote=False)}</code></pre>\n"
+
+    code_html, language_name = highlighted
+    language_name = html.escape(language_name)
+
+    return (
+        f'<pre><code data-rio-language-name="{language_name}">'
+        f"{code_html}</code></pre>\n"
+    )
+
+
+def _create_parser(default_language: str | None) -> Any:
+    import markdown_it  # type: ignore
+
+    # Raw HTML is escaped, just like the frontend does
+    parser = markdown_it.MarkdownIt("commonmark", {"html": False})
+
+    def render_fence(self, tokens, index, options, env) -> str:
+        token = tokens[index]
+        language = token.info.strip().split(maxsplit=1)[0] if token.info else None
+        return _render_code_block(token.content, language or default_language)
+
+    def render_code_block(self, tokens, index, options, env) -> str:
+        return _render_code_block(tokens[index].content, default_language)
+
+    parser.add_render_rule("fence", render_fence)
+    parser.add_render_rule("code_block", render_code_block)
+
+    # Inline code is too short to reliably guess the language. It's only
+    # highlighted if a default language is given.
+    if default_language is not None:
+
+        def render_inline_code(self, tokens, index, options, env) -> str:
+            code = tokens[index].content
+            highlighted = highlight_code(code, default_language)
+
+            if highlighted is None:
+                code_html = html.escape(code, quote=False)
+            else:
+                code_html = highlighted[0]
+
+            return f"<code>{code_html}</code>"
+
+        parser.add_render_rule("code_inline", render_inline_code)
+
+    return parser
+
+
+def render_markdown(text: str, default_language: str | None) -> str:
+    """
+    Converts the Markdown text to HTML, with syntax highlighting for code.
+    Results are cached, so rendering the same document again is fast.
+
+    Raises an `Exception` if the required packages aren't installed.
+    """
+    key = (text, default_language)
+
+    try:
+        result = _documents.pop(key)
+    except KeyError:
+        if not is_available():
+            raise Exception(
+                "The `markdown` extra is required to render Markdown on the"
+                " server. Run `pip install rio-ui[markdown]` to install it."
+            )
+
+        result = _create_parser(default_language).render(text)
+
+    # (Re-)insert the entry at the end, since it was just used
+    _documents[key] = result
+
+    while len(_documents) > _MAX_CACHED_DOCUMENTS:
+        del _documents[next(iter(_documents))]
+
+    return result
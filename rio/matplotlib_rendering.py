@@ -0,0 +1,169 @@
+"""
+Renders matplotlib figures without blocking the event loop.
+
+Rendering a matplotlib figure takes anywhere from a few to several hundred
+milliseconds. Doing so during a refresh would stall the entire server, i.e.
+every other session as well. Instead, figures are pickled and rendered to SVG in
+a pool of worker processes, which is owned by the app server. Rendering in a
+process (rather than a thread) is required, because matplotlib holds the GIL
+while drawing.
+
+Results are cached by a hash of the pickled figure. Pickles contain the ids of
+some of the figure's internals, so pickling a figure again results in a
+different hash. Figures are therefore only pickled again once they've been
+modified. That way a figure which is displayed in many sessions is only rendered
+once. Figures which were created separately never share a hash though, even if
+they look the same.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import pickle
+import weakref
+from typing import *  # type: ignore
+
+from . import process_pool
+
+if TYPE_CHECKING:
+    import matplotlib.figure  # type: ignore
+
+
+__all__ = [
+    "pickle_figure",
+    "render_svg",
+    "render_svg_here",
+    "try_get_cached_svg",
+]
+
+
+# Rendered figures, keyed by content hash. The dict is kept in least recently
+# used order, so the entries at the front are dropped first.
+_svgs: dict[str, str] = {}
+_MAX_CACHED_SVGS = 256
+
+# Figures currently being rendered. If the same figure is requested multiple
+# times in quick succession, it is only rendered once.
+_svgs_in_flight: dict[str, asyncio.Future[str]] = {}
+
+# The most recent pickle of each figure, and its hash
+_pickled_figures: weakref.WeakKeyDictionary[
+    Any, tuple[bytes, str]
+] = weakref.WeakKeyDictionary()
+
+
+def pickle_figure(figure: matplotlib.figure.Figure) -> tuple[bytes, str] | None:
+    """
+    Pickles the figure, so it can be sent to a worker process. Returns the
+    pickled figure and a hash of it, or `None` if the figure can't be pickled,
+    e.g. because it references a lambda.
+
+    Figures which haven't been modified since they were last pickled aren't
+    pickled again, so they keep their hash. This marks the figure as not stale.
+    """
+    if not figure.stale:
+        try:
+            return _pickled_figures[figure]
+        except KeyError:
+            pass
+
+    try:
+        figure_data = pickle.dumps(figure, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+    result = figure_data, hashlib.sha256(figure_data).hexdigest()
+    _pickled_figures[figure] = result
+
+    # The current state of the figure has been captured. Mark it as not stale,
+    # so any further changes can be detected.
+    figure.stale = False
+
+    return result
+
+
+def try_get_cached_svg(content_hash: str) -> str | None:
+    """
+    Returns the SVG for the figure with the given hash if it has already been
+    rendered, or `None` otherwise. This never blocks.
+    """
+    try:
+        result = _svgs.pop(content_hash)
+    except KeyError:
+        return None
+
+    # Move the entry to the end, since it was just used
+    _svgs[content_hash] = result
+    return result
+
+
+def render_svg_here(figure: matplotlib.figure.Figure) -> str:
+    """
+    Renders the figure in the current thread. This is what the worker processes
+    do, and is also used for figures which can't be sent to them.
+    """
+    file = io.BytesIO()
+    figure.savefig(
+        file,
+        format="svg",
+        transparent=True,
+        bbox_inches="tight",
+    )
+
+    return bytes(file.getbuffer()).decode("utf-8")
+
+
+def _render_pickled_figure(figure_data: bytes) -> str:
+    # Don't let matplotlib pick an interactive backend in the worker
+    import matplotlib  # type: ignore
+
+    matplotlib.use("svg")
+
+    return render_svg_here(pickle.loads(figure_data))
+
+
+def _remember_svg(content_hash: str, future: asyncio.Future[str]) -> None:
+    if _svgs_in_flight.get(content_hash) is future:
+        del _svgs_in_flight[content_hash]
+
+    if future.cancelled() or future.exception() is not None:
+        return
+
+    _svgs[content_hash] = future.result()
+
+    while len(_svgs) > _MAX_CACHED_SVGS:
+        del _svgs[next(iter(_svgs))]
+
+
+async def render_svg(
+    pool: process_pool.ProcessPool,
+    figure_data: bytes,
+    content_hash: str,
+) -> str:
+    """
+    Renders a figure, as returned by `pickle_figure`, to SVG in one of the
+    pool's worker processes. Once done, the result can also be fetched using
+    `try_get_cached_svg`.
+
+    If the figure kills its worker, this raises a `BrokenProcessPool` error.
+    The figure isn't rendered again, since it would likely do the same thing.
+    """
+    result = try_get_cached_svg(content_hash)
+    if result is not None:
+        return result
+
+    # Is somebody else already rendering it?
+    try:
+        return await asyncio.shield(_svgs_in_flight[content_hash])
+    except KeyError:
+        pass
+
+    # The result is stored once rendering is done, even if all callers have
+    # been cancelled by then
+    future = asyncio.ensure_future(pool.run(_render_pickled_figure, (figure_data,), {}))
+    _svgs_in_flight[content_hash] = future
+    future.add_done_callback(lambda future: _remember_svg(content_hash, future))
+
+    return await asyncio.shield(future)
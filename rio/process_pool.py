@@ -0,0 +1,254 @@
+"""
+Runs CPU heavy functions in worker processes, on behalf of sessions.
+
+Rio serves all sessions from a single event loop. A function which keeps the
+CPU busy for a while stalls every session on the server, and running it in a
+thread doesn't help either, since it would hold the GIL. Instead, such functions
+are sent to a pool of worker processes, which is shared by the entire app.
+
+Functions running in a worker can report their progress using
+`report_progress`. The values are sent back to the main process through a queue
+and passed on to the session which started the work. Once a function returns,
+its worker sends a final message through the same queue. Since it follows all
+of the function's reports, the job's result is only passed on once it has
+arrived, so no reports are lost.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import functools
+import itertools
+import multiprocessing
+import multiprocessing.queues
+import threading
+from typing import *  # type: ignore
+
+__all__ = [
+    "ProcessPool",
+    "report_progress",
+]
+
+
+T = TypeVar("T")
+
+
+# These are only set in worker processes: The queue to send progress reports
+# through, and the id of the job that's currently running.
+_progress_queue: multiprocessing.queues.Queue | None = None
+_current_job_id: int | None = None
+
+
+def _initialize_worker(progress_queue: multiprocessing.queues.Queue) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_job(
+    job_id: int,
+    function: Callable[..., T],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> T:
+    global _current_job_id
+    _current_job_id = job_id
+
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _current_job_id = None
+
+        # Let the main process know that all reports have been sent
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, True, None))
+
+
+def report_progress(progress: Any) -> None:
+    """
+    Reports the progress of a function started with `Session.run_in_process`.
+
+    The value is passed to the `on_progress` handler given to
+    `Session.run_in_process`, after which the session is refreshed. It can be
+    anything picklable, such as a number between 0 and 1 or a status message.
+    All reports are handled before `Session.run_in_process` returns.
+
+    Outside of such a function, this does nothing. That makes it safe to call
+    from functions which are sometimes run directly.
+    """
+    if _progress_queue is None or _current_job_id is None:
+        return
+
+    _progress_queue.put((_current_job_id, False, progress))
+
+
+class ProcessPool:
+    """
+    A pool of worker processes, with support for progress reports. The
+    processes are only started when the first job is submitted.
+    """
+
+    def __init__(self, max_workers: int | None) -> None:
+        self._max_workers = max_workers
+
+        # Forking a process with running threads (such as the webserver's) can
+        # leave locks in the child in a broken state. Spawn fresh processes
+        # instead.
+        self._mp_context = multiprocessing.get_context("spawn")
+
+        self._executor: concurrent.futures.ProcessPoolExecutor | None = None
+        self._progress_queue: multiprocessing.queues.Queue | None = None
+        self._progress_thread: threading.Thread | None = None
+
+        # Jobs which are still running, mapped to the event loop of their
+        # session, the function to pass progress reports to, and a future which
+        # is set once all of the job's reports have been passed on
+        self._job_ids = itertools.count()
+        self._progress_handlers: dict[
+            int,
+            tuple[
+                asyncio.AbstractEventLoop,
+                Callable[[Any], None],
+                asyncio.Future[None],
+            ],
+        ] = {}
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._progress_queue is None:
+            self._progress_queue = self._mp_context.Queue()
+
+            self._progress_thread = threading.Thread(
+                target=self._forward_progress_reports,
+                args=(self._progress_queue,),
+                name="Rio process pool progress reports",
+                daemon=True,
+            )
+            self._progress_thread.start()
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=self._mp_context,
+                initializer=_initialize_worker,
+                initargs=(self._progress_queue,),
+            )
+
+        return self._executor
+
+    def _forward_progress_reports(
+        self, progress_queue: multiprocessing.queues.Queue
+    ) -> None:
+        # This runs in a thread. `None` signals that the pool was shut down.
+        while True:
+            report = progress_queue.get()
+
+            if report is None:
+                return
+
+            job_id, is_done, progress = report
+
+            try:
+                loop, _, _ = self._progress_handlers[job_id]
+            except KeyError:
+                continue
+
+            try:
+                loop.call_soon_threadsafe(
+                    self._dispatch_progress_report, job_id, is_done, progress
+                )
+
+            # The loop may have been closed in the meantime
+            except RuntimeError:
+                pass
+
+    def _dispatch_progress_report(
+        self,
+        job_id: int,
+        is_done: bool,
+        progress: Any,
+    ) -> None:
+        # The job may have been cancelled while this report was on its way
+        try:
+            _, handler, reports_done = self._progress_handlers[job_id]
+        except KeyError:
+            return
+
+        if not is_done:
+            handler(progress)
+        elif not reports_done.done():
+            reports_done.set_result(None)
+
+    async def run(
+        self,
+        function: Callable[..., T],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        on_progress: Callable[[Any], None] | None = None,
+    ) -> T:
+        """
+        Runs the function in a worker process and returns the result. Progress
+        reports are passed to `on_progress`, on the current event loop. All of
+        them have been passed on by the time this returns.
+
+        If this is cancelled before the job has started, the job is dropped. A
+        job which has already started can't be interrupted though. It runs to
+        completion, but the result is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        job_id = next(self._job_ids)
+        reports_done: asyncio.Future[None] = loop.create_future()
+
+        if on_progress is not None:
+            self._progress_handlers[job_id] = (loop, on_progress, reports_done)
+
+        try:
+            result = await loop.run_in_executor(
+                self._get_executor(),
+                functools.partial(_run_job, job_id, function, args, kwargs),
+            )
+
+            # The result doesn't travel through the progress queue, so it may
+            # have overtaken some reports. Wait for them.
+            if on_progress is not None:
+                await reports_done
+
+            return result
+
+        # If a worker died, the pool can't be used anymore. Replace it, so
+        # future jobs can run. There's no point in trying this job again
+        # though - it may well have killed the worker.
+        except concurrent.futures.process.BrokenProcessPool:
+            self._executor = None
+            raise
+
+        finally:
+            self._progress_handlers.pop(job_id, None)
+
+    def shutdown(self) -> None:
+        """
+        Stops all worker processes, without waiting for running jobs. Jobs which
+        haven't started yet are cancelled.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._progress_queue = None
+            self._progress_thread = None
+
+        # No more reports will arrive, so don't let anybody wait for them
+        for loop, _, reports_done in self._progress_handlers.values():
+            try:
+                loop.call_soon_threadsafe(_set_done, reports_done)
+
+            # The loop may have been closed in the meantime
+            except RuntimeError:
+                pass
+
+
+def _set_done(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
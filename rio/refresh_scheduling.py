@@ -0,0 +1,129 @@
+"""
+Lets urgent refreshes go ahead of less urgent ones, across all sessions.
+
+All sessions share a single event loop, which runs whatever is ready in the
+order it became ready. Without any prioritization, a session refreshing because
+of a periodic update can delay the response to a button press in another
+session.
+
+Each requested refresh is registered here, along with its priority. Refreshes
+which aren't caused by the user check whether any more urgent refreshes are
+pending, and if so, wait for those to finish first. They do this before they
+start, as well as between components while serializing. Since less urgent work
+mustn't be starved entirely, it waits at most `MAX_DELAY` seconds in total.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import time
+from typing import *  # type: ignore
+
+__all__ = [
+    "RefreshPriority",
+    "RefreshRequest",
+]
+
+
+class RefreshPriority(enum.IntEnum):
+    """
+    How urgent a refresh is. Lower values are more urgent.
+    """
+
+    # The user is waiting for a response to their input, e.g. a button press
+    USER_INPUT = 0
+
+    # The user has navigated to another page
+    NAVIGATION = 1
+
+    # The refresh wasn't caused by the user, e.g. periodic updates or the
+    # results of work done in the background
+    BACKGROUND = 2
+
+
+# The longest a refresh may be delayed by more urgent ones, in seconds
+MAX_DELAY = 0.5
+
+# How many refreshes of each priority are currently pending, across all
+# sessions
+_pending_counts = [0] * len(RefreshPriority)
+
+# Futures of refreshes waiting for more urgent ones to finish. They are all
+# woken up whenever a refresh finishes, and check again whether it's their turn.
+_waiters: set[asyncio.Future[None]] = set()
+
+
+def _wake_waiters() -> None:
+    for waiter in _waiters:
+        # The waiter's event loop may have been closed in the meantime
+        try:
+            if not waiter.done():
+                waiter.set_result(None)
+        except RuntimeError:
+            pass
+
+    _waiters.clear()
+
+
+class RefreshRequest:
+    """
+    A refresh which has been requested, but hasn't finished yet. Call `finish`
+    once it's done.
+    """
+
+    def __init__(self, priority: RefreshPriority) -> None:
+        self.priority = priority
+        self._finished = False
+
+        # Waiting is limited in total, not each time
+        self._deadline = time.monotonic() + MAX_DELAY
+
+        _pending_counts[priority] += 1
+
+    def raise_priority(self, priority: RefreshPriority) -> None:
+        """
+        Makes the refresh at least as urgent as `priority`. This is used if
+        more urgent changes are to be handled by the same refresh.
+        """
+        if self._finished or priority >= self.priority:
+            return
+
+        _pending_counts[self.priority] -= 1
+        _pending_counts[priority] += 1
+        self.priority = priority
+
+    def finish(self) -> None:
+        """
+        Marks the refresh as done, allowing less urgent refreshes to proceed.
+        """
+        if self._finished:
+            return
+
+        self._finished = True
+        _pending_counts[self.priority] -= 1
+        _wake_waiters()
+
+    def _is_outranked(self) -> bool:
+        return any(_pending_counts[priority] for priority in range(self.priority))
+
+    async def wait_for_turn(self) -> None:
+        """
+        Waits until no more urgent refreshes are pending, or this refresh has
+        waited long enough. Returns immediately if there's nothing to wait for.
+        """
+        while self._is_outranked():
+            remaining = self._deadline - time.monotonic()
+
+            if remaining <= 0:
+                return
+
+            waiter = asyncio.get_running_loop().create_future()
+            _waiters.add(waiter)
+
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return
+            finally:
+                _waiters.discard(waiter)
@@ -0,0 +1,449 @@
+"""
+Fetches remote assets, i.e. assets which are referenced by URL.
+
+All requests share a pooled HTTP client, so connections to the same host are
+reused. Responses are stored in an on-disk cache, which honors the usual HTTP
+caching headers (`Cache-Control`, `Expires`, `ETag` and `Last-Modified`). Stale
+entries are revalidated with conditional requests, so unchanged assets don't
+have to be downloaded again.
+
+The cache is shared by all sessions, so responses marked as `private` are never
+stored. Once the cache exceeds its maximum size, the least recently used
+entries are deleted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import *  # type: ignore
+
+import httpx
+
+from . import common
+
+__all__ = [
+    "RemoteAssetCache",
+    "get_shared_cache",
+]
+
+
+CACHE_DIR = common.USER_CACHE_DIR / "rio" / "remote-assets"
+
+# If a response doesn't specify how long it may be cached, but does have a
+# `Last-Modified` header, the freshness is estimated as a fraction of the time
+# since it was last modified. This is the heuristic suggested by RFC 9111.
+HEURISTIC_FRESHNESS_FRACTION = 0.1
+MAX_HEURISTIC_FRESHNESS = 24 * 60 * 60
+
+# The total size of all cached responses, in bytes
+MAX_CACHE_SIZE = 256 * 1024 * 1024
+
+
+@dataclass
+class _CacheEntry:
+    url: str
+    media_type: str
+
+    # Unix timestamp until which the entry may be used without asking the
+    # server. Entries are stale afterwards, and must be revalidated.
+    fresh_until: float
+
+    etag: str | None
+    last_modified: str | None
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+
+def parse_cache_control(header: str | None) -> dict[str, str | None]:
+    """
+    Parses a `Cache-Control` header into a dictionary mapping the (lowercase)
+    directives to their values. Directives without a value map to `None`.
+    """
+    result: dict[str, str | None] = {}
+
+    if header is None:
+        return result
+
+    for directive in header.split(","):
+        name, has_value, value = directive.strip().partition("=")
+
+        if not name:
+            continue
+
+        result[name.lower()] = value.strip('"') if has_value else None
+
+    return result
+
+
+def _parse_http_date(value: str | None) -> float | None:
+    if value is None:
+        return None
+
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_seconds(value: str | None) -> float | None:
+    if value is None:
+        return None
+
+    try:
+        return max(float(int(value)), 0)
+    except ValueError:
+        return None
+
+
+def get_freshness_lifetime(headers: httpx.Headers) -> float | None:
+    """
+    Returns how many seconds a response with the given headers may be reused
+    for, or `None` if it must not be stored at all.
+    """
+    cache_control = parse_cache_control(headers.get("cache-control"))
+
+    # Private responses are meant for a single user, but this cache is shared
+    # between all sessions
+    if "no-store" in cache_control or "private" in cache_control:
+        return None
+
+    if "no-cache" in cache_control:
+        return 0
+
+    # Explicit lifetime. `s-maxage` takes precedence, since this is a shared
+    # cache.
+    age = _parse_seconds(headers.get("age")) or 0
+
+    for directive in ("s-maxage", "max-age"):
+        max_age = _parse_seconds(cache_control.get(directive))
+
+        if max_age is not None:
+            return max(max_age - age, 0)
+
+    # Explicit expiration date
+    date = _parse_http_date(headers.get("date")) or time.time()
+
+    if "expires" in headers:
+        expires = _parse_http_date(headers["expires"])
+
+        # Invalid dates mean the response has already expired
+        if expires is None:
+            return 0
+
+        return max(expires - date, 0)
+
+    # Heuristic
+    last_modified = _parse_http_date(headers.get("last-modified"))
+
+    if last_modified is not None:
+        return min(
+            max(date - last_modified, 0) * HEURISTIC_FRESHNESS_FRACTION,
+            MAX_HEURISTIC_FRESHNESS,
+        )
+
+    return 0
+
+
+def _get_media_type(headers: httpx.Headers) -> str:
+    content_type = headers.get("content-type")
+
+    if content_type is None:
+        return "application/octet-stream"
+
+    media_type, _, _ = content_type.partition(";")
+    return media_type.strip()
+
+
+class RemoteAssetCache:
+    """
+    Downloads remote assets using a pooled HTTP client, and caches them on disk.
+
+    Each `AppServer` has its own instance, which is closed when the server shuts
+    down. Code running outside of an app server can use `get_shared_cache`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        *,
+        client: httpx.AsyncClient | None = None,
+        max_size: int = MAX_CACHE_SIZE,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        # The client is created lazily, since many apps never fetch any remote
+        # assets at all
+        self._client = client
+
+        # Downloads which are currently in progress. If the same URL is
+        # requested multiple times concurrently, it's only downloaded once.
+        self._in_flight: dict[str, asyncio.Future[tuple[bytes, str]]] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=httpx.Timeout(15, connect=5),
+                limits=httpx.Limits(
+                    max_connections=32,
+                    max_keepalive_connections=16,
+                ),
+            )
+
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _get_paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.bin"
+
+    def _load_entry(self, url: str) -> _CacheEntry | None:
+        metadata_path, body_path = self._get_paths(url)
+
+        try:
+            entry = _CacheEntry(**json.loads(metadata_path.read_text("utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        # Hash collisions are astronomically unlikely, but it costs nothing to
+        # make sure
+        if entry.url != url or not body_path.exists():
+            return None
+
+        return entry
+
+    def _load_body(self, url: str) -> bytes:
+        _, body_path = self._get_paths(url)
+        body = body_path.read_bytes()
+
+        # The modification time tracks when the entry was last used, so the
+        # least recently used entries can be evicted first
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        return body
+
+    def _store(self, entry: _CacheEntry, body: bytes | None) -> None:
+        """
+        Writes the entry to disk. If `body` is `None`, only the metadata is
+        updated.
+        """
+        metadata_path, body_path = self._get_paths(entry.url)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write to temporary files first and then move them into place. That
+        # way concurrent readers never see partial files.
+        suffix = f".{os.getpid()}.tmp"
+
+        if body is not None:
+            temp_path = body_path.with_name(body_path.name + suffix)
+            temp_path.write_bytes(body)
+            os.replace(temp_path, body_path)
+
+        temp_path = metadata_path.with_name(metadata_path.name + suffix)
+        temp_path.write_text(json.dumps(vars(entry)), "utf-8")
+        os.replace(temp_path, metadata_path)
+
+        if body is not None:
+            self._evict()
+
+    def _evict(self) -> None:
+        """
+        Deletes the least recently used entries until the cache is no larger
+        than `max_size`.
+        """
+        bodies: list[tuple[float, int, Path]] = []
+        total_size = 0
+
+        for body_path in self.cache_dir.glob("*.bin"):
+            try:
+                stat = body_path.stat()
+            except OSError:
+                continue
+
+            bodies.append((stat.st_mtime, stat.st_size, body_path))
+            total_size += stat.st_size
+
+        bodies.sort()
+
+        for _, size, body_path in bodies:
+            if total_size <= self.max_size:
+                break
+
+            for path in (body_path.with_suffix(".json"), body_path):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+            total_size -= size
+
+    def _forget(self, url: str) -> None:
+        for path in self._get_paths(url):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    async def fetch(self, url: str) -> tuple[bytes, str]:
+        """
+        Returns the contents and media type of the resource at the given URL,
+        from the cache if possible.
+
+        Raises a `ValueError` if the resource can't be fetched.
+        """
+        try:
+            return await asyncio.shield(self._in_flight[url])
+        except KeyError:
+            pass
+
+        future = asyncio.ensure_future(self._fetch(url))
+        self._in_flight[url] = future
+
+        # Forget the download once it's done. This mustn't happen when the
+        # caller is cancelled, since the download itself keeps going. Careful
+        # not to remove a newer download of the same URL either.
+        def forget_download(_: asyncio.Future) -> None:
+            if self._in_flight.get(url) is future:
+                del self._in_flight[url]
+
+        future.add_done_callback(forget_download)
+
+        return await asyncio.shield(future)
+
+    async def _fetch(self, url: str) -> tuple[bytes, str]:
+        entry = await asyncio.to_thread(self._load_entry, url)
+
+        # Still fresh? Then there's no need to contact the server at all
+        if entry is not None and entry.is_fresh:
+            body = await asyncio.to_thread(self._load_body, url)
+            return body, entry.media_type
+
+        # Ask the server. If a stale entry exists, only have the server send
+        # the contents if they've changed.
+        headers: dict[str, str] = {}
+
+        if entry is not None:
+            if entry.etag is not None:
+                headers["if-none-match"] = entry.etag
+
+            if entry.last_modified is not None:
+                headers["if-modified-since"] = entry.last_modified
+
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError as err:
+            # If the server can't be reached, a stale entry is better than none
+            if entry is not None:
+                body = await asyncio.to_thread(self._load_body, url)
+                return body, entry.media_type
+
+            raise ValueError(f"Could not fetch asset from {url}: {err}") from err
+
+        freshness_lifetime = get_freshness_lifetime(response.headers)
+
+        # Not modified
+        if response.status_code == 304 and entry is not None:
+            if freshness_lifetime is None:
+                await asyncio.to_thread(self._forget, url)
+            else:
+                entry.fresh_until = time.time() + freshness_lifetime
+                entry.etag = response.headers.get("etag", entry.etag)
+                entry.last_modified = response.headers.get(
+                    "last-modified", entry.last_modified
+                )
+                await asyncio.to_thread(self._store, entry, None)
+
+            body = await asyncio.to_thread(self._load_body, url)
+            return body, entry.media_type
+
+        if not response.is_success:
+            raise ValueError(
+                f"Could not fetch asset from {url}: The server responded with status code {response.status_code}"
+            )
+
+        body = response.content
+        media_type = _get_media_type(response.headers)
+
+        # Store the response, if allowed
+        if freshness_lifetime is None:
+            await asyncio.to_thread(self._forget, url)
+        else:
+            entry = _CacheEntry(
+                url=url,
+                media_type=media_type,
+                fresh_until=time.time() + freshness_lifetime,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+            )
+            await asyncio.to_thread(self._store, entry, body)
+
+        return body, media_type
+
+
+_shared_cache: RemoteAssetCache | None = None
+_shared_cache_loop: asyncio.AbstractEventLoop | None = None
+
+# Closes the shared cache once it's cancelled. See `get_shared_cache`.
+_shared_cache_closer: asyncio.Task[None] | None = None
+
+
+async def _close_when_cancelled(cache: RemoteAssetCache) -> None:
+    try:
+        await asyncio.get_running_loop().create_future()
+    finally:
+        await cache.aclose()
+
+
+def get_shared_cache() -> RemoteAssetCache:
+    """
+    Returns a cache which can be used when no app server is available. HTTP
+    connections can't be shared between event loops, so there is one instance
+    per event loop.
+    """
+    global _shared_cache, _shared_cache_loop, _shared_cache_closer
+
+    loop = asyncio.get_running_loop()
+
+    if _shared_cache is not None and _shared_cache_loop is loop:
+        return _shared_cache
+
+    # The previous cache's connections belong to another event loop, so they
+    # can only be closed there. Have it do that as soon as it gets to run.
+    if _shared_cache_closer is not None:
+        assert _shared_cache_loop is not None
+
+        try:
+            _shared_cache_loop.call_soon_threadsafe(_shared_cache_closer.cancel)
+        except RuntimeError:
+            pass
+
+    _shared_cache = RemoteAssetCache()
+    _shared_cache_loop = loop
+
+    # `asyncio.run` cancels all remaining tasks before closing the loop. This
+    # task uses that to close the cache's connections while that's still
+    # possible.
+    _shared_cache_closer = loop.create_task(
+        _close_when_cancelled(_shared_cache),
+        name="Close the shared remote asset cache",
+    )
+
+    return _shared_cache
@@ -0,0 +1,542 @@
+"""
+Produces resized and transcoded variants of hosted images.
+
+Images are sent to the client together with a `srcset`, listing variants of the
+image at several widths. The browser then only downloads the variant matching
+the size at which the image is actually displayed. Variants are generated on
+demand in a thread pool, and cached on disk. The cache is keyed by a hash of the
+image's contents, the target width and the output format, so it is shared
+between all sessions and survives restarts.
+
+This module also produces placeholders: tiny previews of an image, which are
+small enough to be embedded directly in the component state. They are displayed
+while the real image is still loading.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import *  # type: ignore
+
+import PIL.Image
+import PIL.ImageOps
+
+import rio
+
+from . import assets, common
+
+__all__ = [
+    "WIDTH_BUCKETS",
+    "build_srcset",
+    "get_placeholder",
+    "get_variant",
+    "request_placeholder",
+    "try_get_cached_placeholder",
+]
+
+
+# The widths (in pixels) at which variants are offered to the client. Requests
+# for other widths are rounded up to the next bucket. This keeps the number of
+# variants per image small, which is good both for the cache hit rate and
+# against clients trying to fill the disk with arbitrary sizes.
+WIDTH_BUCKETS = (160, 320, 640, 960, 1280, 1920, 2560)
+
+CACHE_DIR = common.USER_CACHE_DIR / "rio" / "image-variants"
+
+# The maximum width and height of placeholders, in pixels. Browsers scale them
+# up smoothly, which gives them their blurry look.
+PLACEHOLDER_SIZE = 16
+
+# Resizing images is CPU heavy. Use a dedicated, bounded pool, so a page full
+# of images can't monopolize the default executor.
+_executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+# Content hashes of image files, keyed by path, modification time and size.
+# Hashing large files is expensive, so this is only done once per file version.
+# Like all caches in this module, the dict is kept in least recently used order,
+# so the entries at the front are dropped first.
+_path_hashes: dict[tuple[Path, int, int], str] = {}
+_MAX_CACHED_PATH_HASHES = 10_000
+
+# Variants currently being generated. If the same variant is requested
+# multiple times in quick succession, it is only generated once.
+_variants_in_flight: dict[tuple[str, int, bool], asyncio.Future] = {}
+
+# Variants which don't need to be generated, because the original image is
+# already small enough, or can't be resized (e.g. animations). The dict is only
+# used as an ordered set, its values are meaningless.
+_variants_serving_original: dict[tuple[str, int], None] = {}
+_MAX_CACHED_VARIANTS_SERVING_ORIGINAL = 10_000
+
+
+# Placeholders which have already been generated, as data URLs, keyed by
+# content hash and placeholder kind. These are tiny, but there's no reason to
+# keep them around forever, so the oldest ones are dropped eventually. `None`
+# means that no placeholder can be created for the image, which is remembered
+# so it isn't attempted over and over again.
+_placeholders: dict[tuple[str, str], str | None] = {}
+_MAX_CACHED_PLACEHOLDERS = 10_000
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+def _lru_get(cache: dict[K, V], key: K) -> V:
+    """
+    Looks up the key in a least recently used cache, and marks it as recently
+    used. Raises a `KeyError` if it isn't cached.
+    """
+    # (Re-)insert the entry at the end, since it was just used
+    value = cache.pop(key)
+    cache[key] = value
+    return value
+
+
+def _lru_set(cache: dict[K, V], key: K, value: V, max_size: int) -> None:
+    """
+    Adds the entry to a least recently used cache, dropping the oldest entries
+    if there are too many.
+    """
+    cache.pop(key, None)
+    cache[key] = value
+
+    while len(cache) > max_size:
+        del cache[next(iter(cache))]
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            thread_name_prefix="rio-image-variants",
+        )
+
+    return _executor
+
+
+async def _run_in_executor(func: Callable[..., Any], *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_executor(), func, *args
+    )
+
+
+def is_resizable(asset: assets.Asset) -> bool:
+    """
+    Returns whether variants of the given asset can be generated. Only locally
+    hosted raster images qualify.
+    """
+    if not isinstance(
+        asset, (assets.BytesAsset, assets.PathAsset, assets.PilImageAsset)
+    ):
+        return False
+
+    if asset.media_type == "image/svg+xml":
+        return False
+
+    if isinstance(asset, assets.PathAsset) and asset.path.suffix.lower() == ".svg":
+        return False
+
+    return True
+
+
+def build_srcset(asset: assets.Asset, url: str) -> str | None:
+    """
+    Returns a `srcset` string listing all variants of the asset, or `None` if
+    the asset can't be resized.
+    """
+    if not is_resizable(asset):
+        return None
+
+    return ", ".join(f"{url}?width={width} {width}w" for width in WIDTH_BUCKETS)
+
+
+def snap_to_bucket(width: int) -> int:
+    """
+    Rounds the width up to the next width bucket.
+    """
+    for bucket in WIDTH_BUCKETS:
+        if bucket >= width:
+            return bucket
+
+    return WIDTH_BUCKETS[-1]
+
+
+def _hash_file(path: Path) -> str:
+    hasher = hashlib.sha256()
+
+    with path.open("rb") as file:
+        while chunk := file.read(1024 * 1024):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+def _hash_pil_image(image: PIL.Image.Image) -> str:
+    hasher = hashlib.sha256()
+    hasher.update(f"{image.mode}-{image.width}x{image.height}".encode("utf-8"))
+    hasher.update(image.tobytes())
+    return hasher.hexdigest()
+
+
+async def _get_content_hash(
+    asset: assets.BytesAsset | assets.PathAsset | assets.PilImageAsset,
+) -> str:
+    # Already known?
+    try:
+        return asset._content_hash  # type: ignore
+    except AttributeError:
+        pass
+
+    if isinstance(asset, assets.BytesAsset):
+        result = hashlib.sha256(asset.data).hexdigest()
+
+    elif isinstance(asset, assets.PilImageAsset):
+        result = await _run_in_executor(_hash_pil_image, asset.image)
+
+    # Files can change on disk, so their hash must not be stored in the asset.
+    # It is remembered as long as the file's modification time and size don't
+    # change.
+    else:
+        stat = await asyncio.to_thread(asset.path.stat)
+        key = (asset.path, stat.st_mtime_ns, stat.st_size)
+
+        try:
+            return _lru_get(_path_hashes, key)
+        except KeyError:
+            pass
+
+        result = await _run_in_executor(_hash_file, asset.path)
+        _lru_set(_path_hashes, key, result, _MAX_CACHED_PATH_HASHES)
+        return result
+
+    asset._content_hash = result  # type: ignore
+    return result
+
+
+def _open_image(source: bytes | Path | PIL.Image.Image) -> PIL.Image.Image | None:
+    if isinstance(source, PIL.Image.Image):
+        return source
+
+    try:
+        return PIL.Image.open(
+            io.BytesIO(source) if isinstance(source, bytes) else source
+        )
+    except (OSError, ValueError, PIL.Image.DecompressionBombError):
+        return None
+
+
+def _get_source(
+    asset: assets.BytesAsset | assets.PathAsset | assets.PilImageAsset,
+) -> bytes | Path | PIL.Image.Image:
+    if isinstance(asset, assets.BytesAsset):
+        return bytes(asset.data)
+
+    if isinstance(asset, assets.PathAsset):
+        return asset.path
+
+    return asset.image
+
+
+def _find_cached_variant(
+    content_hash: str, width: int, accepts_webp: bool
+) -> tuple[Path, str] | None:
+    if accepts_webp:
+        candidates = (("webp", "image/webp"),)
+    else:
+        candidates = (("png", "image/png"), ("jpg", "image/jpeg"))
+
+    for suffix, media_type in candidates:
+        path = CACHE_DIR / f"{content_hash}-{width}.{suffix}"
+
+        if path.exists():
+            return path, media_type
+
+    return None
+
+
+def _render_variant(
+    source: bytes | Path | PIL.Image.Image,
+    content_hash: str,
+    width: int,
+    accepts_webp: bool,
+) -> tuple[Path, str] | None:
+    """
+    Resizes the image to the given width and stores the result in the cache
+    directory. Returns `None` if the original image should be served instead.
+
+    This is slow and blocking, so it's meant to run in the thread pool.
+    """
+    image = _open_image(source)
+
+    if image is None:
+        return None
+
+    # Resizing would destroy animations
+    if getattr(image, "is_animated", False):
+        return None
+
+    # Apply the EXIF orientation, since it's lost when re-encoding
+    image = PIL.ImageOps.exif_transpose(image)
+
+    # Never enlarge images
+    if width >= image.width:
+        return None
+
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), PIL.Image.Resampling.LANCZOS)
+
+    has_alpha = resized.mode in ("RGBA", "LA", "PA") or (
+        resized.mode == "P" and "transparency" in resized.info
+    )
+
+    if accepts_webp:
+        suffix, media_type, format, options = "webp", "image/webp", "WEBP", {}
+    elif has_alpha:
+        suffix, media_type, format, options = "png", "image/png", "PNG", {}
+    else:
+        suffix, media_type, format, options = (
+            "jpg",
+            "image/jpeg",
+            "JPEG",
+            {"quality": 85, "progressive": True},
+        )
+
+    if format == "JPEG" and resized.mode not in ("RGB", "L"):
+        resized = resized.convert("RGB")
+    elif resized.mode not in ("RGB", "RGBA", "L", "LA"):
+        resized = resized.convert("RGBA" if has_alpha else "RGB")
+
+    # Write to a temporary file first and then move it into place. That way
+    # concurrent readers (e.g. other worker processes) never see partial files.
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = CACHE_DIR / f"{content_hash}-{width}.{suffix}"
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+    resized.save(temp_path, format=format, **options)
+    os.replace(temp_path, path)
+
+    return path, media_type
+
+
+async def get_variant(
+    asset: assets.Asset,
+    requested_width: int,
+    *,
+    accepts_webp: bool,
+) -> tuple[Path, str] | None:
+    """
+    Returns the path and media type of a variant of the asset which is at most
+    `requested_width` pixels wide (rounded up to the next width bucket),
+    generating it if necessary.
+
+    Returns `None` if the original should be served instead, for example
+    because the original is smaller than the requested width anyway.
+    """
+    if not is_resizable(asset):
+        return None
+
+    assert isinstance(
+        asset, (assets.BytesAsset, assets.PathAsset, assets.PilImageAsset)
+    ), asset
+
+    width = snap_to_bucket(requested_width)
+    content_hash = await _get_content_hash(asset)
+
+    # Is it already known that there is no variant for this width?
+    if (content_hash, width) in _variants_serving_original:
+        _lru_get(_variants_serving_original, (content_hash, width))
+        return None
+
+    # Has the variant already been generated?
+    result = await asyncio.to_thread(
+        _find_cached_variant, content_hash, width, accepts_webp
+    )
+    if result is not None:
+        return result
+
+    # Is somebody else already generating it?
+    key = (content_hash, width, accepts_webp)
+
+    try:
+        return await asyncio.shield(_variants_in_flight[key])
+    except KeyError:
+        pass
+
+    # Generate it
+    future = asyncio.ensure_future(
+        _run_in_executor(
+            _render_variant, _get_source(asset), content_hash, width, accepts_webp
+        )
+    )
+    _variants_in_flight[key] = future
+
+    try:
+        result = await asyncio.shield(future)
+    finally:
+        _variants_in_flight.pop(key, None)
+
+    if result is None:
+        _lru_set(
+            _variants_serving_original,
+            (content_hash, width),
+            None,
+            _MAX_CACHED_VARIANTS_SERVING_ORIGINAL,
+        )
+
+    return result
+
+
+def _render_placeholder(
+    source: bytes | Path | PIL.Image.Image,
+    kind: Literal["blur", "color"],
+) -> str | None:
+    """
+    Creates a tiny preview of the image and returns it as data URL. `blur`
+    placeholders are a heavily downscaled version of the image, `color`
+    placeholders are filled with the image's average color.
+
+    This is blocking, so it's meant to run in the thread pool.
+    """
+    image = _open_image(source)
+
+    if image is None:
+        return None
+
+    # JPEGs can be decoded at a fraction of their size, which is much faster
+    # than decoding them in full
+    if image is not source:
+        image.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+
+    image = PIL.ImageOps.exif_transpose(image)
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    # This creates a new image, so PIL images passed in by the user aren't
+    # modified
+    preview = PIL.ImageOps.contain(
+        image,
+        (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE),
+        PIL.Image.Resampling.BOX,
+    )
+
+    if kind == "color":
+        average = preview.resize((1, 1), PIL.Image.Resampling.BOX).getpixel((0, 0))
+        preview = PIL.Image.new(preview.mode, preview.size, average)
+
+    file = io.BytesIO()
+    preview.save(file, format="PNG", optimize=True)
+
+    return "data:image/png;base64," + base64.b64encode(file.getvalue()).decode("ascii")
+
+
+def try_get_cached_placeholder(
+    asset: assets.Asset,
+    kind: Literal["blur", "color"],
+) -> str | None:
+    """
+    Returns the placeholder for the asset if it has already been generated, or
+    `None` otherwise. This never blocks.
+    """
+    try:
+        return asset._placeholders[kind]  # type: ignore
+    except (AttributeError, KeyError):
+        return None
+
+
+def needs_placeholder(
+    asset: assets.Asset,
+    kind: Literal["blur", "color"],
+) -> bool:
+    """
+    Returns whether the placeholder for the asset still has to be generated.
+    That's not the case if it has already been generated, or if it's known that
+    none can be created for the asset.
+    """
+    if not is_resizable(asset):
+        return False
+
+    try:
+        asset._placeholders[kind]  # type: ignore
+    except (AttributeError, KeyError):
+        return True
+
+    return False
+
+
+async def get_placeholder(
+    asset: assets.Asset,
+    kind: Literal["blur", "color"],
+) -> str | None:
+    """
+    Returns a placeholder for the asset as data URL, generating it if
+    necessary. Returns `None` if no placeholder can be created for the asset,
+    e.g. because it isn't a locally hosted raster image.
+    """
+    if not needs_placeholder(asset, kind):
+        return try_get_cached_placeholder(asset, kind)
+
+    # Is somebody else already generating it?
+    in_flight: dict[str, asyncio.Future] = asset.__dict__.setdefault(
+        "_placeholders_in_flight", {}
+    )
+
+    try:
+        return await asyncio.shield(in_flight[kind])
+    except KeyError:
+        pass
+
+    future = asyncio.ensure_future(_generate_placeholder(asset, kind))  # type: ignore
+    in_flight[kind] = future
+
+    try:
+        return await asyncio.shield(future)
+    finally:
+        in_flight.pop(kind, None)
+
+
+async def _generate_placeholder(
+    asset: assets.BytesAsset | assets.PathAsset | assets.PilImageAsset,
+    kind: Literal["blur", "color"],
+) -> str | None:
+    content_hash = await _get_content_hash(asset)
+    key = (content_hash, kind)
+
+    try:
+        result = _lru_get(_placeholders, key)
+    except KeyError:
+        result = await _run_in_executor(_render_placeholder, _get_source(asset), kind)
+        _lru_set(_placeholders, key, result, _MAX_CACHED_PLACEHOLDERS)
+
+    # Remember the result in the asset itself, so it can be looked up
+    # synchronously during serialization. Failures are remembered as well.
+    asset.__dict__.setdefault("_placeholders", {})[kind] = result
+    return result
+
+
+def request_placeholder(
+    sess: rio.Session,
+    asset: assets.Asset,
+    kind: Literal["blur", "color"],
+) -> None:
+    """
+    Starts generating the placeholder for the asset in the background, unless
+    it's already available. Once done, it can be fetched using
+    `try_get_cached_placeholder`.
+    """
+    if not needs_placeholder(asset, kind):
+        return
+
+    sess.create_task(
+        get_placeholder(asset, kind),
+        name="Generate image placeholder",
+    )
@@ -120,6 +120,10 @@ def serialize_and_host_component(component: rio.Component) -> JsonDoc:
         for name, serializer in get_attribute_serializers(type(component)).items():
             result[name] = serializer(sess, getattr(component, name))
 
+        # Hidden children don't exist on the client
+        for name in component._get_hidden_child_attribute_names():
+            result[name] = None
+
         # Encode any internal additional state. Doing it this late allows the custom
         # serialization to overwrite automatically generated values.
         result["_type_"] = component._unique_id
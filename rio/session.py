@@ -2,17 +2,26 @@ from __future__ import annotations
 
 import asyncio
 import collections
+import functools
 import inspect
 import json
 import logging
 import pathlib
 import secrets
 import shutil
+import threading
 import time
 import traceback
 import typing
 import weakref
-from collections.abc import Callable, Coroutine, Iterable, Iterator
+from collections.abc import (
+    AsyncIterable,
+    Callable,
+    Coroutine,
+    Hashable,
+    Iterable,
+    Iterator,
+)
 from dataclasses import dataclass
 from datetime import tzinfo
 from typing import Any, Literal, cast, overload
@@ -28,10 +37,12 @@ import rio
 from . import (
     app_server,
     assets,
+    chunked_uploads,
     common,
     errors,
     global_state,
     inspection,
+    refresh_scheduling,
     routing,
     serialization,
     text_style,
@@ -39,6 +50,7 @@ from . import (
     user_settings_module,
 )
 from .components import build_failed, fundamental_component, root_components
+from .refresh_scheduling import RefreshPriority
 from .state_properties import StateBinding
 
 __all__ = ["Session"]
@@ -63,6 +75,27 @@ class WontSerialize(Exception):
     pass
 
 
+# Threads running event handlers (see `rio.event.run_in_thread`) store the event
+# loop of the handler's session here
+_handler_thread_state = threading.local()
+
+
+def _is_stream_source(value: object) -> bool:
+    """
+    Returns whether the value can be streamed via `assets.iter_byte_chunks`.
+    Bytes-like objects are iterable too, but would be streamed as individual
+    ints, so they don't count.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return False
+
+    return (
+        hasattr(value, "__aiter__")
+        or hasattr(value, "__iter__")
+        or hasattr(value, "read")
+    )
+
+
 async def dummy_send_message(message: Jsonable) -> None:
     raise NotImplementedError()  # pragma: no cover
 
@@ -247,6 +280,13 @@ class Session(unicall.Unicall):
         # Use `register_dirty_component` to add a component to this set.
         self._dirty_components: weakref.WeakSet[rio.Component] = weakref.WeakSet()
 
+        # Components which have hidden children (e.g. a closed `Popup`), mapped
+        # to those children. Hidden children aren't built, so they must be taken
+        # care of once they're revealed.
+        self._hidden_children_by_component: weakref.WeakKeyDictionary[
+            rio.Component, list[rio.Component]
+        ] = weakref.WeakKeyDictionary()
+
         # HTML components have source code which must be evaluated by the client
         # exactly once. Keep track of which components have already sent their
         # source code.
@@ -254,12 +294,52 @@ class Session(unicall.Unicall):
             inspection.get_child_component_containing_attribute_names_for_builtin_components()
         )
 
+        # Icon components only reference their icon by name. The SVG sources
+        # are sent to the client separately, exactly once per session. These
+        # are the icons the client already knows, and the icons which must be
+        # sent along with the next state update.
+        self._icons_sent_to_client: set[str] = set()
+        self._icons_to_send_to_client: dict[str, str] = {}
+
         # This lock is used to order state updates that are sent to the client.
         # Without it a message which was generated later might be sent to the
         # client before an earlier message, leading to invalid component
         # references.
         self._refresh_lock = asyncio.Lock()
 
+        # Refreshes aren't started right away when requested. Instead, they wait
+        # a little, so that the changes of any events arriving in the meantime
+        # are handled by the same refresh. This is the refresh that's currently
+        # waiting to start, if any, the refresh that's currently running, and
+        # the time the last refresh finished. See `_refresh`.
+        self._scheduled_refresh: asyncio.Task[None] | None = None
+        self._scheduled_refresh_request: refresh_scheduling.RefreshRequest | None = (
+            None
+        )
+        self._running_refresh_request: refresh_scheduling.RefreshRequest | None = None
+        self._last_refresh_time: float = -float("inf")
+
+        # `rio.event.periodic` handlers of all mounted components, grouped by
+        # their interval. Each interval has a single task, which calls all of
+        # its handlers together and then refreshes the session once. See
+        # `_register_periodic_handlers`.
+        self._periodic_handlers: dict[
+            float, weakref.WeakKeyDictionary[rio.Component, list[Callable]]
+        ] = {}
+
+        # Limits how many event handlers decorated with `rio.event.run_in_thread`
+        # this session may run at once
+        self._handler_thread_semaphore = asyncio.Semaphore(
+            app_server_.app._max_handler_threads_per_session
+        )
+
+        # Components which are currently working off a queue of messages, mapped
+        # to the messages which have yet to be handled, along with their
+        # coalescing keys. See `_component_message`.
+        self._queued_component_messages: dict[
+            int, collections.deque[tuple[Hashable | None, Any]]
+        ] = {}
+
         # Attachments. These are arbitrary values which are passed around inside
         # of the app. They can be looked up by their type.
         # Note: These are initialized by the AppServer.
@@ -433,10 +513,13 @@ class Session(unicall.Unicall):
 
         # If the handler is available, call it and await it if necessary
         try:
-            result = handler(*event_data)
+            if getattr(handler, "_rio_run_in_thread_", False):
+                await self._run_handler_in_thread(handler, *event_data)
+            else:
+                result = handler(*event_data)
 
-            if inspect.isawaitable(result):
-                await result
+                if inspect.isawaitable(result):
+                    await result
 
         # Display and discard exceptions
         except Exception:
@@ -478,6 +561,15 @@ class Session(unicall.Unicall):
         if handler is None:
             return
 
+        # Handlers which run in a thread can't be waited for. Refresh once
+        # they're done.
+        if getattr(handler, "_rio_run_in_thread_", False):
+            self.create_task(
+                self._call_event_handler(handler, *event_data, refresh=True),
+                name=f'Event handler for "{handler!r}"',
+            )
+            return
+
         # Try to call the event handler synchronously
         try:
             result = handler(*event_data)
@@ -503,6 +595,98 @@ class Session(unicall.Unicall):
 
         self.create_task(worker(), name=f'Event handler for "{handler!r}"')
 
+    async def _run_handler_in_thread(
+        self,
+        handler: Callable[..., Any],
+        *event_data: object,
+    ) -> None:
+        """
+        Runs a synchronous event handler in the app's thread pool, waiting for a
+        free slot if the session already runs too many handlers at once.
+        """
+        loop = asyncio.get_running_loop()
+
+        def run_handler() -> None:
+            _handler_thread_state.loop = loop
+
+            try:
+                handler(*event_data)
+            finally:
+                _handler_thread_state.loop = None
+
+        # The components changed by the handler are registered as dirty via
+        # `call_soon_threadsafe`. Since the result is delivered the same way,
+        # they're all registered by the time this returns.
+        async with self._handler_thread_semaphore:
+            await loop.run_in_executor(
+                self._app_server._handler_thread_pool,
+                run_handler,
+            )
+
+    async def run_in_process(
+        self,
+        function: Callable[..., T],
+        /,
+        *args: Any,
+        on_progress: common.EventHandler[Any] = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Runs a function in a separate process and returns its result.
+
+        Rio serves all sessions from a single thread, so CPU heavy work, such
+        as crunching numbers or processing images, makes the app unresponsive
+        for all users while it runs. Running it in a thread doesn't help either,
+        since Python only executes one thread at a time. This function instead
+        sends the work to a pool of worker processes, which is shared by the
+        entire app.
+
+        The function, its arguments and its result are sent between processes,
+        so they must be picklable. In particular, the function must be defined
+        at the top level of a module, rather than being a lambda or method.
+
+        To report progress, call `rio.report_progress` from within the function.
+        Each value reported is passed to `on_progress`, which can e.g. update a
+        progress bar. The session is refreshed after each report, and once the
+        function returns.
+
+        If the session is closed, the work is cancelled. Since a running process
+        can't be interrupted, a function which has already started runs to
+        completion, but its result is discarded.
+
+        Args:
+            function: The function to run. It is called with the remaining
+                positional and keyword arguments.
+
+            on_progress: Called with every value the function passes to
+                `rio.report_progress`.
+        """
+
+        async def handle_progress(progress: Any) -> None:
+            await self._call_event_handler(on_progress, progress, refresh=False)
+            await self._refresh(RefreshPriority.BACKGROUND)
+
+        def forward_progress(progress: Any) -> None:
+            self.create_task(
+                handle_progress(progress),
+                name=f'Progress handler for "{function!r}"',
+            )
+
+        task = self.create_task(
+            self._app_server._process_pool.run(
+                function,
+                args,
+                kwargs,
+                on_progress=None if on_progress is None else forward_progress,
+            ),
+            name=f'Worker process job for "{function!r}"',
+        )
+
+        try:
+            return await task
+        finally:
+            await self._refresh(RefreshPriority.BACKGROUND)
+
     def create_task(
         self,
         coro: Coroutine[Any, None, T],
@@ -601,7 +785,7 @@ window.location.href = {json.dumps(str(target_url))};
                 page_view, include_children_recursively=False
             )
 
-        self.create_task(self._refresh())
+        self.create_task(self._refresh(RefreshPriority.NAVIGATION))
 
         # Update the browser's history
         async def history_worker() -> None:
@@ -645,6 +829,23 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         The children of non-fundamental components are not added, since they will
         be added after the parent is built anyway.
         """
+        # Event handlers running in a thread can change component state as
+        # well. The event loop may be iterating over the dirty components at
+        # the same time though, so leave registering them to the loop.
+        handler_loop: asyncio.AbstractEventLoop | None = getattr(
+            _handler_thread_state, "loop", None
+        )
+
+        if handler_loop is not None:
+            handler_loop.call_soon_threadsafe(
+                functools.partial(
+                    self._register_dirty_component,
+                    component,
+                    include_children_recursively=include_children_recursively,
+                )
+            )
+            return
+
         self._dirty_components.add(component)
 
         if not include_children_recursively or not isinstance(
@@ -658,6 +859,29 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
                 include_children_recursively=True,
             )
 
+    def _register_component_tree_dirty(self, component: rio.Component) -> None:
+        """
+        Adds the component and all components below it to the set of dirty
+        components. Unlike `_register_dirty_component`, this also includes the
+        build output of high-level components.
+        """
+        to_do = [component]
+
+        while to_do:
+            component = to_do.pop()
+            self._dirty_components.add(component)
+
+            if isinstance(component, fundamental_component.FundamentalComponent):
+                to_do.extend(component._iter_direct_children())
+                continue
+
+            try:
+                component_data = self._weak_component_data_by_component[component]
+            except KeyError:
+                pass
+            else:
+                to_do.append(component_data.build_result)
+
     def _refresh_sync(
         self,
     ) -> tuple[set[rio.Component], set[rio.Component], set[rio.Component]]:
@@ -699,8 +923,23 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
                     f" is modifying the component's state"
                 )
 
-            # Fundamental components require no further treatment
+            # Fundamental components require no further treatment, unless they
+            # have hidden or revealed children. Whether children are part of
+            # the component tree is decided when their builder is built, so it
+            # has to be rebuilt.
             if isinstance(component, fundamental_component.FundamentalComponent):
+                has_hidden_children = bool(
+                    component._get_hidden_child_attribute_names()
+                )
+
+                if has_hidden_children != (
+                    component in self._hidden_children_by_component
+                ):
+                    builder = component._weak_builder_()
+
+                    if builder is not None:
+                        self._dirty_components.add(builder)
+
                 continue
 
             # Trigger the `on_populate` event, if it hasn't already. Since the
@@ -811,6 +1050,31 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
                 child._weak_builder_ = weak_builder
                 child._build_generation_ = component_data.build_generation
 
+                # Hidden children (e.g. the content of a closed `Popup`) aren't
+                # built until they are displayed
+                hidden_children = list(child._iter_hidden_children())
+
+                if hidden_children:
+                    self._hidden_children_by_component[child] = hidden_children
+
+                    for hidden_child in hidden_children:
+                        for hidden_component in hidden_child._iter_direct_and_indirect_child_containing_attributes(
+                            include_self=True,
+                            recurse_into_high_level_components=False,
+                        ):
+                            self._dirty_components.discard(hidden_component)
+
+                # The children have just been revealed. They have either never
+                # been built, or the client has discarded them, so build and
+                # send them.
+                elif child in self._hidden_children_by_component:
+                    self._dirty_components.add(child)
+
+                    for revealed_child in self._hidden_children_by_component.pop(
+                        child
+                    ):
+                        self._register_component_tree_dirty(revealed_child)
+
         # Determine which components are alive, to avoid sending references to
         # dead components to the frontend.
         is_in_component_tree_cache: dict[rio.Component, bool] = {
@@ -846,7 +1110,10 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
             all_children_new,
         )
 
-    async def _refresh(self) -> None:
+    async def _refresh(
+        self,
+        priority: RefreshPriority = RefreshPriority.USER_INPUT,
+    ) -> None:
         """
         Make sure the session state is up to date. Specifically:
 
@@ -857,73 +1124,250 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         Afterwards, the client is also informed of any changes, meaning that
         after this method returns there are no more dirty components in the
         session, and Python's state and the client's state are in sync.
+
+        Refreshes are batched: If the previous refresh has only just finished,
+        this waits for the app's `refresh_interval` to pass. All calls made in
+        the meantime are served by the same refresh.
+
+        Refreshes which aren't a response to user input should pass a lower
+        `priority`. They give way to more urgent refreshes of all sessions.
+        """
+        if self._scheduled_refresh is None:
+            request = refresh_scheduling.RefreshRequest(priority)
+
+            self._scheduled_refresh_request = request
+            self._scheduled_refresh = self.create_task(
+                self._run_scheduled_refresh(request),
+                name="Scheduled refresh",
+            )
+
+            # The task may be cancelled before it even starts, in which case
+            # none of its code runs. Finish the request either way, or it
+            # would hold back less urgent refreshes forever.
+            self._scheduled_refresh.add_done_callback(
+                functools.partial(self._on_scheduled_refresh_done, request)
+            )
+        else:
+            assert self._scheduled_refresh_request is not None
+            self._scheduled_refresh_request.raise_priority(priority)
+
+        # The scheduled refresh can only start once the running one is done.
+        # Make sure that doesn't wait for other sessions either.
+        if self._running_refresh_request is not None:
+            self._running_refresh_request.raise_priority(priority)
+
+        # Callers may be cancelled, but that mustn't affect everybody else
+        # waiting for the same refresh
+        await asyncio.shield(self._scheduled_refresh)
+
+    def _on_scheduled_refresh_done(
+        self,
+        request: refresh_scheduling.RefreshRequest,
+        task: asyncio.Task[None],
+    ) -> None:
+        request.finish()
+
+        if self._scheduled_refresh is task:
+            self._scheduled_refresh = None
+            self._scheduled_refresh_request = None
+
+    async def _run_scheduled_refresh(
+        self,
+        request: refresh_scheduling.RefreshRequest,
+    ) -> None:
+        try:
+            delay = (
+                self._last_refresh_time
+                + self._app_server.app._refresh_interval.total_seconds()
+                - time.monotonic()
+            )
+
+            # Even if there's no need to wait, yield once, so that any messages
+            # which have already arrived get a chance to make their changes
+            # first
+            await asyncio.sleep(max(delay, 0))
+
+            # Give way to more urgent refreshes of other sessions
+            await request.wait_for_turn()
+
+        # Anything changed from now on needs another refresh
+        finally:
+            self._scheduled_refresh = None
+            self._scheduled_refresh_request = None
+
+        try:
+            await self._refresh_now(request)
+        finally:
+            self._last_refresh_time = time.monotonic()
+            request.finish()
+
+    async def _refresh_now(
+        self,
+        request: refresh_scheduling.RefreshRequest | None = None,
+    ) -> None:
+        """
+        Refreshes the session immediately. Use `_refresh` instead, unless there
+        is a good reason not to wait.
+
+        If a `request` is given, the refresh pauses between components for more
+        urgent refreshes of other sessions.
         """
 
         # For why this lock is here see its creation in `__init__`
         async with self._refresh_lock:
-            while self._dirty_components:
-                # Refresh and get a set of all components which have been visited
-                (
-                    visited_components,
-                    all_children_old,
-                    all_children_new,
-                ) = self._refresh_sync()
-
-                # Find all components which have recently been added to or
-                # removed from the component tree
-                mounted_components = all_children_new - all_children_old
-                unmounted_components = all_children_old - all_children_new
-
-                # Any components which were previously unmounted, and are now
-                # mounted may not show up in the `visited_components` set, but
-                # must be sent to the client because it considers them to be
-                # dead.
-                visited_components |= mounted_components
-
-                # Avoid sending empty messages
-                if not visited_components:
-                    return
-
-                # Serialize all components which have been visited
-                delta_states: dict[int, JsonDoc] = {
-                    component._id: serialization.serialize_and_host_component(component)
-                    for component in visited_components
-                }
-
-                await self._update_component_states(visited_components, delta_states)
-
-                # Trigger the `on_unmount` event
-                #
-                # Notes:
-                # - All events are triggered only after the client has been
-                #   notified of the changes. This way, if the event handlers
-                #   trigger another client message themselves, any referenced
-                #   components will already exist
-                for component in unmounted_components:
-                    # Trigger the event
-                    for handler, _ in component._rio_event_handlers_[
-                        rio.event.EventTag.ON_UNMOUNT
-                    ]:
-                        self._call_event_handler_sync(handler, component)
-
-                # Trigger the `on_mount` event
-                #
-                # Notes:
-                # - See the note on running after notifying the client above
-                # - This function enlarges the set of watched components. The
-                #   `on_unmount` event handler iterates over that set. By
-                #   processing that handler first it only needs to process a
-                #   smaller set
-                for component in mounted_components:
-                    # Trigger the event
-                    for handler, _ in component._rio_event_handlers_[
-                        rio.event.EventTag.ON_MOUNT
-                    ]:
-                        self._call_event_handler_sync(handler, component)
-
-                # If there were any synchronous `on_mount` or `on_unmount`
-                # handlers, we must immediately refresh again. So we'll simply
-                # loop until there are no more dirty components.
+            self._running_refresh_request = request
+
+            try:
+                await self._refresh_dirty_components(request)
+            finally:
+                self._running_refresh_request = None
+
+    async def _refresh_dirty_components(
+        self,
+        request: refresh_scheduling.RefreshRequest | None,
+    ) -> None:
+        while self._dirty_components:
+            # Refresh and get a set of all components which have been visited
+            (
+                visited_components,
+                all_children_old,
+                all_children_new,
+            ) = self._refresh_sync()
+
+            # Find all components which have recently been added to or
+            # removed from the component tree
+            mounted_components = all_children_new - all_children_old
+            unmounted_components = all_children_old - all_children_new
+
+            # Any components which were previously unmounted, and are now
+            # mounted may not show up in the `visited_components` set, but
+            # must be sent to the client because it considers them to be
+            # dead.
+            visited_components |= mounted_components
+
+            # Avoid sending empty messages
+            if not visited_components:
+                return
+
+            # Serialize all components which have been visited. This can
+            # take a while, so give more urgent refreshes a chance to go
+            # first. Any components which are changed in the meantime will
+            # be refreshed again.
+            delta_states: dict[int, JsonDoc] = {}
+
+            for component in visited_components:
+                delta_states[component._id] = (
+                    serialization.serialize_and_host_component(component)
+                )
+
+                if request is not None:
+                    await request.wait_for_turn()
+
+            await self._update_component_states(visited_components, delta_states)
+
+            # Trigger the `on_unmount` event
+            #
+            # Notes:
+            # - All events are triggered only after the client has been
+            #   notified of the changes. This way, if the event handlers
+            #   trigger another client message themselves, any referenced
+            #   components will already exist
+            for component in unmounted_components:
+                self._unregister_periodic_handlers(component)
+
+                # Trigger the event
+                for handler, _ in component._rio_event_handlers_[
+                    rio.event.EventTag.ON_UNMOUNT
+                ]:
+                    self._call_event_handler_sync(handler, component)
+
+            # Trigger the `on_mount` event
+            #
+            # Notes:
+            # - See the note on running after notifying the client above
+            # - This function enlarges the set of watched components. The
+            #   `on_unmount` event handler iterates over that set. By
+            #   processing that handler first it only needs to process a
+            #   smaller set
+            for component in mounted_components:
+                self._register_periodic_handlers(component)
+
+                # Trigger the event
+                for handler, _ in component._rio_event_handlers_[
+                    rio.event.EventTag.ON_MOUNT
+                ]:
+                    self._call_event_handler_sync(handler, component)
+
+            # If there were any synchronous `on_mount` or `on_unmount`
+            # handlers, we must immediately refresh again. So we'll simply
+            # loop until there are no more dirty components.
+
+    def _register_periodic_handlers(self, component: rio.Component) -> None:
+        """
+        Starts calling the component's `rio.event.periodic` handlers, if it has
+        any. Handlers with the same interval share a worker, regardless of which
+        component they belong to.
+        """
+        for handler, interval in component._rio_event_handlers_[
+            rio.event.EventTag.PERIODIC
+        ]:
+            try:
+                handlers_by_component = self._periodic_handlers[interval]
+            except KeyError:
+                handlers_by_component = weakref.WeakKeyDictionary()
+                self._periodic_handlers[interval] = handlers_by_component
+
+                self.create_task(
+                    self._periodic_event_worker(interval, handlers_by_component),
+                    name=f"`rio.event.periodic` event worker for {interval}s",
+                )
+
+            handlers_by_component.setdefault(component, []).append(handler)
+
+    def _unregister_periodic_handlers(self, component: rio.Component) -> None:
+        """
+        Stops calling the component's `rio.event.periodic` handlers. Workers
+        without any handlers left stop on their next tick.
+        """
+        for interval, handlers_by_component in list(self._periodic_handlers.items()):
+            handlers_by_component.pop(component, None)
+
+            if not handlers_by_component:
+                del self._periodic_handlers[interval]
+
+    async def _periodic_event_worker(
+        self,
+        interval: float,
+        handlers_by_component: weakref.WeakKeyDictionary[rio.Component, list[Callable]],
+    ) -> None:
+        while True:
+            # Wait for the next tick
+            await asyncio.sleep(interval)
+
+            # Wait until there's an active connection to the client. We won't
+            # run code periodically if we aren't sure whether the client will
+            # come back.
+            await self._is_active_event.wait()
+
+            # Stop if all components have been unmounted in the meantime. If
+            # any have been mounted again since, they have a new worker.
+            if self._periodic_handlers.get(interval) is not handlers_by_component:
+                return
+
+            if not handlers_by_component:
+                del self._periodic_handlers[interval]
+                return
+
+            # Call all handlers, then refresh once for all of them
+            await asyncio.gather(
+                *(
+                    self._call_event_handler(handler, component, refresh=False)
+                    for component, handlers in list(handlers_by_component.items())
+                    for handler in handlers
+                )
+            )
+
+            await self._refresh(RefreshPriority.BACKGROUND)
 
     async def _update_component_states(
         self, visited_components: set[rio.Component], delta_states: dict[int, JsonDoc]
@@ -954,11 +1398,21 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         else:
             root_component_id = None
 
+        # Send any icons the new components need. This must happen first, so
+        # the icons are available once the components are created.
+        if self._icons_to_send_to_client:
+            icons = self._icons_to_send_to_client
+            self._icons_to_send_to_client = {}
+            self._icons_sent_to_client.update(icons)
+
+            await self._remote_register_icons(icons)
+
         # Send the new state to the client
         await self._remote_update_component_states(delta_states, root_component_id)
 
     async def _send_all_components_on_reconnect(self) -> None:
         self._initialized_html_components.clear()
+        self._icons_sent_to_client.clear()
 
         # For why this lock is here see its creation in `__init__`
         async with self._refresh_lock:
@@ -1595,6 +2049,7 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         *,
         file_extensions: Iterable[str] | None = None,
         multiple: Literal[False] = False,
+        on_progress: rio.EventHandler[[common.UploadProgress]] = None,
     ) -> common.FileInfo: ...
 
     @overload
@@ -1603,6 +2058,7 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         *,
         file_extensions: Iterable[str] | None = None,
         multiple: Literal[True],
+        on_progress: rio.EventHandler[[common.UploadProgress]] = None,
     ) -> tuple[common.FileInfo, ...]: ...
 
     async def file_chooser(
@@ -1610,6 +2066,7 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         *,
         file_extensions: Iterable[str] | None = None,
         multiple: bool = False,
+        on_progress: rio.EventHandler[[common.UploadProgress]] = None,
     ) -> common.FileInfo | tuple[common.FileInfo, ...]:
         """
         Open a file chooser dialog.
@@ -1618,6 +2075,9 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         file. The selected file is returned, allowing you to access its
         contents.
 
+        Files are uploaded in chunks. If the connection is interrupted, the
+        upload resumes where it left off rather than starting over.
+
         See also `save_file`, if you want to save a file instead of opening one.
 
         Args:
@@ -1627,6 +2087,10 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
 
             multiple: Whether the user should pick a single file, or multiple.
 
+            on_progress: Triggered each time a chunk of the selected files has
+                been uploaded. This allows you to display the upload's
+                progress, e.g. in a `ProgressBar`.
+
         Raises:
             NoFileSelectedError: If the user did not select a file.
         """
@@ -1634,7 +2098,9 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         upload_id = secrets.token_urlsafe()
         future = asyncio.Future[list[common.FileInfo]]()
 
-        self._app_server._pending_file_uploads[upload_id] = future
+        self._app_server._pending_file_uploads[upload_id] = (
+            chunked_uploads.PendingUpload(self, future, on_progress)
+        )
 
         # Allow the user to specify both `jpg` and `.jpg`
         if file_extensions is not None:
@@ -1671,7 +2137,16 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
 
     async def save_file(
         self,
-        file_contents: pathlib.Path | str | bytes,
+        file_contents: (
+            pathlib.Path
+            | str
+            | bytes
+            | AsyncIterable[bytes]
+            | AsyncIterable[str]
+            | Iterable[bytes]
+            | Iterable[str]
+            | typing.IO
+        ),
         file_name: str = "Unnamed File",
         *,
         media_type: str | None = None,
@@ -1683,12 +2158,18 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
         This function allows you to save a file to the user's device. The user
         will be prompted to select a location to save the file to.
 
+        Large files don't have to be held in memory. Instead of `str` or
+        `bytes`, you can pass an (async) iterable, such as a generator, or a
+        file-like object. Its contents are then streamed to the user as they
+        are produced. Streamed files can only be downloaded once.
+
         See also `file_chooser` if you want to open a file instead of saving
         one.
 
         Args:
             file_contents: The contents of the file to save. This can be a
-                string, bytes, or a path to a file on the server.
+                string, bytes, a path to a file on the server, an iterable or
+                async iterable of strings or bytes, or a file-like object.
 
             file_name: The default file name that will be displayed in the file
                 dialog. The user can freely change it.
@@ -1699,6 +2180,10 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
             directory: The directory where the file dialog should open. This has
                 no effect if the user is visiting the app in a browser.
         """
+        # Other bytes-like objects are handled just like `bytes`
+        if isinstance(file_contents, (bytearray, memoryview)):
+            file_contents = bytes(file_contents)
+
         if self.running_in_window:
             # FIXME: Find (1) a better way to get the active window and (2) a
             # way to open a file dialog without blocking the event loop.
@@ -1722,13 +2207,18 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
                 async with aiofiles.open(destination, "w", encoding="utf8") as file:
                     await file.write(file_contents)
 
-            elif isinstance(file_contents, bytes):  # type: ignore[unnecessary-isinstance]
+            elif isinstance(file_contents, bytes):
                 async with aiofiles.open(destination, "wb") as file:
                     await file.write(file_contents)
 
+            elif _is_stream_source(file_contents):
+                async with aiofiles.open(destination, "wb") as file:
+                    async for chunk in assets.iter_byte_chunks(file_contents):
+                        await file.write(chunk)
+
             else:
                 raise ValueError(
-                    f"The file contents must be a Path, str or bytes, not {file_contents!r}"
+                    f"The file contents must be a Path, str, bytes, iterable or file-like object, not {file_contents!r}"
                 )
 
             return
@@ -1743,15 +2233,21 @@ window.scrollTo({{ top: 0, behavior: "smooth" }});
                 "text/plain" if media_type is None else media_type,
             )
 
-        elif isinstance(file_contents, bytes):  # type: ignore[unnecessary-isinstance]
+        elif isinstance(file_contents, bytes):
             as_asset = assets.BytesAsset(
                 file_contents,
                 "application/octet-stream" if media_type is None else media_type,
             )
 
+        elif _is_stream_source(file_contents):
+            as_asset = assets.StreamingAsset(
+                file_contents,
+                "application/octet-stream" if media_type is None else media_type,
+            )
+
         else:
             raise ValueError(
-                f"The file contents must be a Path, str or bytes, not {file_contents!r}"
+                f"The file contents must be a Path, str, bytes, iterable or file-like object, not {file_contents!r}"
             )
 
         # Host the asset
@@ -1925,6 +2421,18 @@ a.remove();
         """
         raise NotImplementedError  # pragma: no cover
 
+    @unicall.remote(
+        name="registerIcons",
+        parameter_format="dict",
+        await_response=False,
+    )
+    async def _remote_register_icons(self, icons: dict[str, str]) -> None:
+        """
+        Sends SVG sources to the client, so that `Icon` components can refer to
+        them by name.
+        """
+        raise NotImplementedError  # pragma: no cover
+
     @unicall.remote(
         name="evaluateJavaScript",
         parameter_format="dict",
@@ -2033,8 +2541,48 @@ a.remove();
         if component is None:
             return
 
-        # Let the component handle the message
-        await component._on_message(payload)
+        coalescing_key = component._get_message_coalescing_key(payload)
+        queue = self._queued_component_messages.get(component_id)
+
+        # If the component is already busy with a queue of messages, this
+        # message has to wait its turn, so the order is kept intact. If the
+        # last queued message is of the same kind, it's outdated by now and can
+        # be replaced.
+        if queue is not None:
+            if coalescing_key is not None and queue and queue[-1][0] == coalescing_key:
+                queue[-1] = (coalescing_key, payload)
+            else:
+                queue.append((coalescing_key, payload))
+
+            return
+
+        # Messages which can't be coalesced are handled right away. Handling
+        # them concurrently is fine, since it's rare for many to arrive at once.
+        if coalescing_key is None:
+            await component._on_message(payload)
+            return
+
+        # This message may be followed by many more of its kind, e.g. mouse
+        # movements. Handle it, as well as any messages which arrive in the
+        # meantime.
+        queue = collections.deque()
+        self._queued_component_messages[component_id] = queue
+
+        try:
+            while True:
+                try:
+                    await component._on_message(payload)
+                except Exception:
+                    logging.exception(
+                        f"An exception occurred while {component!r} was handling a message"
+                    )
+
+                if not queue:
+                    break
+
+                _, payload = queue.popleft()
+        finally:
+            del self._queued_component_messages[component_id]
 
     @unicall.local(name="ping")
     async def _ping(self, ping: str) -> str:
@@ -2052,7 +2600,7 @@ a.remove();
         )
 
         # Refresh the session
-        await self._refresh()
+        await self._refresh(RefreshPriority.NAVIGATION)
 
     @unicall.local(name="onWindowResize")
     async def _on_window_resize(self, new_width: float, new_height: float) -> None:
@@ -0,0 +1,274 @@
+"""
+Detects when the event loop is blocked, and finds out who is blocking it.
+
+Rio serves all sessions from a single event loop. If one session's `build`
+method, event handler or serialization takes a long time without yielding,
+every other session has to wait for it. Such stalls are hard to track down,
+since by the time anybody notices, the culprit has long finished.
+
+A watchdog thread regularly asks the event loop to respond. If it doesn't within
+the configured threshold, the watchdog takes a snapshot of the loop thread's
+stack, while the stall is still in progress. From the stack it determines which
+session, component and event handler were executing. Once the loop responds
+again, the stall is reported.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import types
+from dataclasses import dataclass
+from typing import *  # type: ignore
+
+import rio
+
+from . import global_state
+
+__all__ = [
+    "StallReport",
+    "StallDetector",
+]
+
+
+@dataclass
+class StallReport:
+    """
+    Describes a time the event loop was blocked.
+
+    Rio serves all sessions from a single event loop. While the loop is blocked,
+    no session can make progress. Apps can be notified of such stalls using the
+    `on_stall` argument of `rio.App`. The report lists what was executing at
+    the time, to help track down the cause.
+
+    Attributes:
+        duration: How long the event loop was blocked, in seconds.
+
+        session: The session whose code was executing, if it could be
+            determined.
+
+        component_class: The class of the component whose code was executing,
+            if any. This is the innermost component on the stack, e.g. the one
+            being built or serialized.
+
+        event_handler: The qualified name of the event handler being executed,
+            if any.
+
+        stack: The stack of the event loop's thread, formatted like a
+            traceback. This was captured while the stall was in progress.
+    """
+
+    duration: float
+    session: rio.Session | None
+    component_class: type[rio.Component] | None
+    event_handler: str | None
+    stack: str
+
+    def __str__(self) -> str:
+        culprits: list[str] = []
+
+        if self.component_class is not None:
+            culprits.append(f"component `{self.component_class.__qualname__}`")
+
+        if self.event_handler is not None:
+            culprits.append(f"event handler `{self.event_handler}`")
+
+        result = f"The event loop was blocked for {self.duration * 1000:.0f} ms"
+
+        if culprits:
+            result += f" by {', '.join(culprits)}"
+
+        return result
+
+
+def _get_handler_name(handler: Any) -> str:
+    # `periodic` handlers are wrapped in a partial
+    while hasattr(handler, "func"):
+        handler = handler.func
+
+    try:
+        return handler.__qualname__
+    except AttributeError:
+        return repr(handler)
+
+
+def _analyze_stack(
+    frame: types.FrameType,
+) -> tuple[rio.Session | None, type[rio.Component] | None, str | None]:
+    """
+    Walks the stack from the innermost frame outwards, and picks out the
+    innermost session, component and event handler.
+    """
+    # Frames of the functions which call event handlers. Their `handler`
+    # variable is the handler being executed.
+    handler_calling_codes = (
+        rio.Session._call_event_handler.__code__,
+        rio.Session._call_event_handler_sync.__code__,
+    )
+
+    session: rio.Session | None = None
+    component: rio.Component | None = None
+    handler_name: str | None = None
+
+    current: types.FrameType | None = frame
+
+    while current is not None:
+        # This reads the variables of a frame which belongs to another thread.
+        # Doing so is fine in CPython, as long as they aren't modified.
+        local_vars = current.f_locals
+        self_ = local_vars.get("self")
+
+        if component is None and isinstance(self_, rio.Component):
+            component = self_
+
+        if session is None and isinstance(self_, rio.Session):
+            session = self_
+
+        if handler_name is None and current.f_code in handler_calling_codes:
+            handler = local_vars.get("handler")
+
+            if handler is not None:
+                handler_name = _get_handler_name(handler)
+
+        current = current.f_back
+
+    # Builds don't always show up on the stack, e.g. if the `build` method
+    # itself is quick, but the components it creates are slow to initialize
+    if component is None:
+        component = global_state.currently_building_component
+
+    if session is None and component is not None:
+        session = getattr(component, "_session_", None)
+
+    component_class = None if component is None else type(component)
+    return session, component_class, handler_name
+
+
+class StallDetector:
+    """
+    Watches an event loop from a separate thread, and reports any stalls longer
+    than `threshold` seconds to `on_stall`. The reports are delivered in the
+    event loop, once the stall is over.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold: float,
+        on_stall: Callable[[StallReport], None],
+    ) -> None:
+        self._loop = loop
+        self._threshold = threshold
+        self._on_stall = on_stall
+
+        # The id of the thread running the event loop. This is needed to find
+        # its stack.
+        self._loop_thread_id: int | None = None
+
+        # When the watchdog last asked the loop to respond, if it hasn't done so
+        # yet, and the stall in progress, if it has already been analyzed.
+        # These are shared between both threads and guarded by the lock.
+        self._lock = threading.Lock()
+        self._ping_time: float | None = None
+        self._current_stall: StallReport | None = None
+
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Starts watching the event loop. This must be called from within the
+        loop.
+        """
+        assert self._thread is None, "The stall detector is already running"
+
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event.clear()
+
+        self._thread = threading.Thread(
+            target=self._watch,
+            name="Rio stall detector",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops watching the event loop. Stalls still in progress aren't reported.
+        """
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread = None
+
+    def _watch(self) -> None:
+        # Check a few times per threshold, so stalls are caught early on, while
+        # whatever causes them is still executing
+        check_interval = self._threshold / 4
+
+        while not self._stop_event.wait(check_interval):
+            with self._lock:
+                now = time.monotonic()
+
+                # Ask the loop to respond, unless a request is already pending
+                if self._ping_time is None:
+                    self._ping_time = now
+
+                    try:
+                        self._loop.call_soon_threadsafe(self._on_pong)
+
+                    # The loop has been closed
+                    except RuntimeError:
+                        return
+
+                    continue
+
+                # Is the loop taking too long to respond? Analyze the stall,
+                # but only once
+                if (
+                    self._current_stall is not None
+                    or now - self._ping_time < self._threshold
+                ):
+                    continue
+
+                self._current_stall = self._analyze_stall()
+
+    def _analyze_stall(self) -> StallReport:
+        assert self._loop_thread_id is not None
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+
+        if frame is None:
+            return StallReport(0, None, None, None, "")
+
+        try:
+            session, component_class, handler_name = _analyze_stack(frame)
+        except Exception:
+            session, component_class, handler_name = None, None, None
+
+        return StallReport(
+            duration=0,
+            session=session,
+            component_class=component_class,
+            event_handler=handler_name,
+            stack="".join(traceback.format_stack(frame)),
+        )
+
+    def _on_pong(self) -> None:
+        # This runs in the event loop
+        with self._lock:
+            ping_time = self._ping_time
+            stall = self._current_stall
+
+            self._ping_time = None
+            self._current_stall = None
+
+        if stall is None or ping_time is None:
+            return
+
+        stall.duration = time.monotonic() - ping_time
+        self._on_stall(stall)
@@ -0,0 +1,674 @@
+"""
+Access to the data displayed in a `rio.Table`.
+
+Tables can easily contain millions of rows, so they are never sent to the
+client in their entirety. Instead, the client requests the rows it's about to
+display, and only those are sliced out of the original data. Sorting and
+filtering happen here as well, directly on the original DataFrame or array,
+without converting it to Python lists first.
+
+Numeric columns are sent to the client in binary form (see `typed_arrays`),
+all other columns as JSON lists.
+"""
+
+from __future__ import annotations
+
+import abc
+import math
+from collections.abc import Iterable, Mapping, Sequence
+from typing import *  # type: ignore
+
+from uniserde import JsonDoc
+
+from . import maybes, typed_arrays
+
+if TYPE_CHECKING:
+    import numpy  # type: ignore
+    import pandas  # type: ignore
+    import polars  # type: ignore
+
+
+__all__ = [
+    "TableData",
+    "TableValue",
+    "wrap",
+]
+
+
+TableValue = int | float | str
+
+# The rows of a table, in display order. These are lists for data stored in
+# Python objects and numpy arrays for everything else. numpy is optional, so
+# the array type only exists for type checkers. At runtime the alias must
+# resolve, since rio's documentation tools evaluate annotations.
+if TYPE_CHECKING:
+    RowIndices = Union[Sequence[int], numpy.ndarray]
+else:
+    RowIndices = Union[Sequence[int], Any]
+
+# Column indices and whether to sort in ascending order. The first entry is the
+# most significant one.
+SortOrder = Sequence[tuple[int, bool]]
+
+
+def _to_json_value(value: object) -> TableValue | None:
+    if isinstance(value, float):
+        # JSON has no representation for NaN and infinity
+        return value if math.isfinite(value) else None
+
+    if value is None or isinstance(value, (int, str)):
+        return value  # type: ignore
+
+    return str(value)
+
+
+class TableData(abc.ABC):
+    """
+    Uniform, read-only access to the data displayed in a `rio.Table`.
+
+    Use `wrap` to create an instance for a given data source.
+    """
+
+    def __init__(self, source: object, column_names: list[str] | None):
+        # The object this table was created from
+        self.source = source
+
+        # `None` if the data doesn't have column names, e.g. because it's a
+        # 2D array
+        self.column_names = column_names
+
+        # Sorting millions of rows takes a while, so the most recent row order
+        # is kept around
+        self._cached_row_order: tuple[Hashable, RowIndices | None] | None = None
+
+    @property
+    @abc.abstractmethod
+    def num_rows(self) -> int:
+        raise NotImplementedError
+
+    @property
+    @abc.abstractmethod
+    def num_columns(self) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def is_numeric(self, column: int) -> bool:
+        """
+        Returns whether the given column contains numbers. These are aligned
+        differently from text.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _get_values(self, column: int, rows: slice | RowIndices) -> list[object]:
+        raise NotImplementedError
+
+    def _get_numeric_values(
+        self,
+        column: int,
+        rows: slice | RowIndices,
+    ) -> numpy.ndarray | None:
+        """
+        Returns the values as a numpy array, if the column contains only
+        numbers. Returns `None` otherwise, e.g. if there are missing values.
+        """
+        return None
+
+    @abc.abstractmethod
+    def _compute_row_order(
+        self,
+        sort_order: SortOrder,
+        filter_text: str,
+    ) -> RowIndices | None:
+        """
+        Returns the indices of all rows which contain the given (lowercase)
+        text in any of their cells, sorted by the given columns. Filtering is
+        skipped if the text is empty.
+        """
+        raise NotImplementedError
+
+    def _get_row_order_key(
+        self,
+        sort_order: SortOrder,
+        filter_text: str,
+    ) -> tuple[SortOrder, str, int] | None:
+        # Sort entries referring to columns which don't exist are ignored
+        sort_order = tuple(
+            (column, ascending)
+            for column, ascending in sort_order
+            if 0 <= column < self.num_columns
+        )
+
+        if not sort_order and not filter_text:
+            return None
+
+        # The number of rows is part of the key, so that appending to a list
+        # (and then calling `force_refresh`) is picked up
+        return (sort_order, filter_text, self.num_rows)
+
+    def is_row_order_ready(self, sort_order: SortOrder, filter_text: str) -> bool:
+        """
+        Returns whether `get_row_order` would return immediately, i.e. the rows
+        don't need to be sorted or filtered, or have been already.
+        """
+        key = self._get_row_order_key(sort_order, filter_text)
+
+        return key is None or (
+            self._cached_row_order is not None and self._cached_row_order[0] == key
+        )
+
+    def get_previous_row_order(self) -> RowIndices | None:
+        """
+        Returns the most recently computed row order, if it still applies to
+        the data. This can be displayed while a new order is being computed.
+        """
+        if self._cached_row_order is None:
+            return None
+
+        (_, _, num_rows), row_order = self._cached_row_order
+
+        if num_rows != self.num_rows:
+            return None
+
+        return row_order
+
+    def get_row_order(
+        self,
+        sort_order: SortOrder,
+        filter_text: str,
+    ) -> RowIndices | None:
+        """
+        Returns the indices of the rows to display, in the order they should be
+        displayed in. Returns `None` if all rows should be displayed in their
+        original order.
+
+        Sort entries referring to columns which don't exist are ignored.
+
+        This can take a while for large tables. Use `is_row_order_ready` to
+        check whether it's safe to call on the event loop.
+        """
+        key = self._get_row_order_key(sort_order, filter_text)
+
+        if key is None:
+            return None
+
+        if self._cached_row_order is not None and self._cached_row_order[0] == key:
+            return self._cached_row_order[1]
+
+        result = self._compute_row_order(key[0], filter_text)
+        self._cached_row_order = (key, result)
+        return result
+
+    def get_window(
+        self,
+        row_order: RowIndices | None,
+        start: int,
+        stop: int,
+    ) -> list[list[TableValue | None] | JsonDoc]:
+        """
+        Returns the values of the rows `start` to `stop` (in display order),
+        one entry per column. Numeric columns are encoded as typed arrays,
+        everything else as lists.
+        """
+        if row_order is None:
+            rows = slice(start, stop)
+        else:
+            rows = row_order[start:stop]
+
+        result: list[list[TableValue | None] | JsonDoc] = []
+
+        for column in range(self.num_columns):
+            numeric_values = self._get_numeric_values(column, rows)
+
+            if numeric_values is not None:
+                encoded = typed_arrays.encode(numeric_values)
+
+                if encoded is not None:
+                    result.append(encoded)
+                    continue
+
+            result.append(
+                [_to_json_value(value) for value in self._get_values(column, rows)]
+            )
+
+        return result
+
+
+class _StableSortTableData(TableData):
+    """
+    Base class for data which is filtered and then sorted one column at a time.
+    """
+
+    @abc.abstractmethod
+    def _find_rows_containing(self, text: str) -> RowIndices:
+        """
+        Returns the indices of all rows which contain the given (lowercase)
+        text in any of their cells.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def _sort_rows(
+        self,
+        rows: RowIndices | None,
+        column: int,
+        ascending: bool,
+    ) -> RowIndices:
+        """
+        Stably sorts the given rows by the values in `column`. If `rows` is
+        `None`, all rows are sorted.
+        """
+        raise NotImplementedError
+
+    def _compute_row_order(
+        self,
+        sort_order: SortOrder,
+        filter_text: str,
+    ) -> RowIndices | None:
+        rows = None
+
+        if filter_text:
+            rows = self._find_rows_containing(filter_text.lower())
+
+        # Sort by the least significant column first. Since the sorts are
+        # stable, this results in the rows being sorted by all columns.
+        for column, ascending in reversed(sort_order):
+            rows = self._sort_rows(rows, column, ascending)
+
+        return rows
+
+
+class _PythonTableData(_StableSortTableData):
+    """
+    Data stored in plain Python objects, as columns.
+    """
+
+    def __init__(
+        self,
+        source: object,
+        column_names: list[str] | None,
+        columns: list[Sequence[object]],
+    ):
+        super().__init__(source, column_names)
+        self._columns = columns
+
+    @property
+    def num_rows(self) -> int:
+        return len(self._columns[0]) if self._columns else 0
+
+    @property
+    def num_columns(self) -> int:
+        return len(self._columns)
+
+    def is_numeric(self, column: int) -> bool:
+        values = self._columns[column]
+
+        if not values:
+            return False
+
+        return isinstance(values[0], (int, float)) and not isinstance(values[0], bool)
+
+    def _get_values(self, column: int, rows: slice | RowIndices) -> list[object]:
+        values = self._columns[column]
+
+        if isinstance(rows, slice):
+            return list(values[rows])
+
+        return [values[row] for row in rows]
+
+    def _find_rows_containing(self, text: str) -> RowIndices:
+        return [
+            row
+            for row in range(self.num_rows)
+            if any(text in str(values[row]).lower() for values in self._columns)
+        ]
+
+    def _sort_rows(
+        self,
+        rows: RowIndices | None,
+        column: int,
+        ascending: bool,
+    ) -> RowIndices:
+        values = self._columns[column]
+
+        if rows is None:
+            rows = range(self.num_rows)
+
+        # Python's sort is stable, even when reversed
+        try:
+            return sorted(rows, key=values.__getitem__, reverse=not ascending)
+        except TypeError:
+            # The column contains values which can't be compared, such as
+            # numbers and strings
+            return sorted(
+                rows,
+                key=lambda row: str(values[row]),
+                reverse=not ascending,
+            )
+
+
+class _RowColumn(Sequence[object]):
+    """
+    A view of a single column in data stored as a sequence of rows.
+    """
+
+    def __init__(self, rows: Sequence[Sequence[object]], column: int):
+        self._rows = rows
+        self._column = column
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> object:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[object]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> object:
+        if isinstance(index, slice):
+            return [row[self._column] for row in self._rows[index]]
+
+        return self._rows[index][self._column]
+
+
+def _stable_argsort(values: numpy.ndarray, ascending: bool) -> numpy.ndarray:
+    import numpy  # type: ignore
+
+    try:
+        if ascending:
+            return numpy.argsort(values, kind="stable")
+
+        # Sorting the reversed values and then reversing the result again
+        # yields a descending order, which keeps equal values in their original
+        # order
+        reverse_order = numpy.argsort(values[::-1], kind="stable")
+        return (len(values) - 1 - reverse_order)[::-1]
+    except TypeError:
+        # Object arrays can contain values which can't be compared, such as
+        # numbers and strings
+        return _stable_argsort(values.astype(str), ascending)
+
+
+class _NumpyTableData(_StableSortTableData):
+    """
+    Data stored in a 2D numpy array. The array is never copied - columns are
+    views of the original array.
+    """
+
+    def __init__(self, source: numpy.ndarray):
+        super().__init__(source, None)
+        self._array = source
+
+    @property
+    def num_rows(self) -> int:
+        return self._array.shape[0]
+
+    @property
+    def num_columns(self) -> int:
+        return self._array.shape[1]
+
+    def is_numeric(self, column: int) -> bool:
+        import numpy  # type: ignore
+
+        return numpy.issubdtype(self._array.dtype, numpy.number)
+
+    def _get_values(self, column: int, rows: slice | RowIndices) -> list[object]:
+        return self._array[rows, column].tolist()
+
+    def _get_numeric_values(
+        self,
+        column: int,
+        rows: slice | RowIndices,
+    ) -> numpy.ndarray | None:
+        return self._array[rows, column]
+
+    def _find_rows_containing(self, text: str) -> RowIndices:
+        import numpy  # type: ignore
+
+        matches = numpy.zeros(self.num_rows, dtype=bool)
+
+        for column in range(self.num_columns):
+            strings = numpy.char.lower(self._array[:, column].astype(str))
+            matches |= numpy.char.find(strings, text) >= 0
+
+        return numpy.flatnonzero(matches)
+
+    def _sort_rows(
+        self,
+        rows: RowIndices | None,
+        column: int,
+        ascending: bool,
+    ) -> RowIndices:
+        values = self._array[:, column]
+
+        if rows is None:
+            return _stable_argsort(values, ascending)
+
+        return rows[_stable_argsort(values[rows], ascending)]  # type: ignore
+
+
+class _PandasTableData(_StableSortTableData):
+    def __init__(self, source: pandas.DataFrame):
+        super().__init__(source, [str(name) for name in source.columns])
+        self._frame = source
+
+    @property
+    def num_rows(self) -> int:
+        return len(self._frame)
+
+    @property
+    def num_columns(self) -> int:
+        return len(self._frame.columns)
+
+    def is_numeric(self, column: int) -> bool:
+        import pandas.api.types  # type: ignore
+
+        dtype = self._frame.dtypes.iloc[column]
+        return pandas.api.types.is_numeric_dtype(
+            dtype
+        ) and not pandas.api.types.is_bool_dtype(dtype)
+
+    def _get_values(self, column: int, rows: slice | RowIndices) -> list[object]:
+        values = self._frame.iloc[rows, column]
+
+        # Replace missing values (`NaN`, `NA`, `NaT`, ...) with `None`
+        return values.astype(object).where(values.notna(), None).tolist()
+
+    def _get_numeric_values(
+        self,
+        column: int,
+        rows: slice | RowIndices,
+    ) -> numpy.ndarray | None:
+        import numpy  # type: ignore
+
+        values = self._frame.iloc[rows, column]
+
+        # Extension types (e.g. nullable integers) would have to be converted
+        if not isinstance(values.dtype, numpy.dtype):
+            return None
+
+        return values.to_numpy()
+
+    def _find_rows_containing(self, text: str) -> RowIndices:
+        import numpy  # type: ignore
+
+        matches = numpy.zeros(self.num_rows, dtype=bool)
+
+        for column in range(self.num_columns):
+            strings = self._frame.iloc[:, column].astype(str)
+            matches |= strings.str.contains(text, case=False, regex=False).to_numpy()
+
+        return numpy.flatnonzero(matches)
+
+    def _sort_rows(
+        self,
+        rows: RowIndices | None,
+        column: int,
+        ascending: bool,
+    ) -> RowIndices:
+        values = self._frame.iloc[:, column]
+
+        if rows is not None:
+            values = values.iloc[rows]
+
+        # Use pandas' own sorting, since it knows how to deal with missing
+        # values. Replacing the index makes it return positions rather than
+        # labels.
+        positions = (
+            values.reset_index(drop=True)
+            .sort_values(ascending=ascending, kind="stable", na_position="last")
+            .index.to_numpy()
+        )
+
+        if rows is None:
+            return positions
+
+        return rows[positions]  # type: ignore
+
+
+class _PolarsTableData(TableData):
+    def __init__(self, source: polars.DataFrame):
+        super().__init__(source, list(source.columns))
+        self._frame = source
+
+    @property
+    def num_rows(self) -> int:
+        return self._frame.height
+
+    @property
+    def num_columns(self) -> int:
+        return self._frame.width
+
+    def is_numeric(self, column: int) -> bool:
+        return self._frame.dtypes[column].is_numeric()
+
+    def _get_values(self, column: int, rows: slice | RowIndices) -> list[object]:
+        return self._frame.to_series(column)[rows].to_list()
+
+    def _get_numeric_values(
+        self,
+        column: int,
+        rows: slice | RowIndices,
+    ) -> numpy.ndarray | None:
+        values = self._frame.to_series(column)[rows]
+
+        # Missing values would be converted to NaN, which isn't the same
+        if not values.dtype.is_numeric() or values.null_count() > 0:
+            return None
+
+        return values.to_numpy()
+
+    def _find_rows_containing(self, text: str) -> RowIndices:
+        import polars  # type: ignore
+
+        matches = self._frame.select(
+            polars.any_horizontal(
+                polars.all()
+                .cast(polars.String)
+                .str.to_lowercase()
+                .str.contains(text, literal=True)
+            )
+        ).to_series()
+
+        return matches.arg_true().to_numpy()
+
+    def _compute_row_order(
+        self,
+        sort_order: SortOrder,
+        filter_text: str,
+    ) -> RowIndices | None:
+        import polars  # type: ignore
+
+        rows = None
+        frame = self._frame
+
+        if filter_text:
+            rows = self._find_rows_containing(filter_text.lower())
+            frame = frame[rows]
+
+        if not sort_order:
+            return rows
+
+        positions = (
+            frame.select(
+                polars.arg_sort_by(
+                    [polars.col(frame.columns[column]) for column, _ in sort_order],
+                    descending=[not ascending for _, ascending in sort_order],
+                    nulls_last=True,
+                    maintain_order=True,
+                )
+            )
+            .to_series()
+            .to_numpy()
+        )
+
+        if rows is None:
+            return positions
+
+        return rows[positions]
+
+
+def wrap(
+    data: pandas.DataFrame
+    | polars.DataFrame
+    | Mapping[str, Iterable[TableValue]]
+    | Iterable[Iterable[TableValue]]
+    | numpy.ndarray,
+) -> TableData:
+    """
+    Returns a `TableData` for any data which can be displayed in a `rio.Table`.
+
+    DataFrames and arrays are accessed in place. Other iterables are only
+    converted to lists if they aren't sequences already.
+    """
+    # `maybes` only knows about libraries which had already been imported when
+    # it was initialized
+    library = type(data).__module__.partition(".")[0]
+    known_types = {
+        "numpy": maybes.NUMPY_ARRAY_TYPES,
+        "pandas": maybes.PANDAS_DATAFRAME_TYPES,
+        "polars": maybes.POLARS_DATAFRAME_TYPES,
+    }
+
+    if library in known_types and not known_types[library]:
+        maybes.initialize(force=True)
+
+    if isinstance(data, maybes.PANDAS_DATAFRAME_TYPES):
+        return _PandasTableData(data)
+
+    if isinstance(data, maybes.POLARS_DATAFRAME_TYPES):
+        return _PolarsTableData(data)
+
+    if isinstance(data, maybes.NUMPY_ARRAY_TYPES):
+        if data.ndim != 2:
+            raise ValueError(
+                f"Only 2-dimensional arrays can be displayed in a table, not {data.ndim}-dimensional ones"
+            )
+
+        return _NumpyTableData(data)
+
+    if isinstance(data, Mapping):
+        return _PythonTableData(
+            data,
+            [str(name) for name in data.keys()],
+            [
+                values if isinstance(values, Sequence) else list(values)
+                for values in data.values()
+            ],
+        )
+
+    rows = data if isinstance(data, Sequence) else list(data)
+
+    if not all(isinstance(row, Sequence) for row in rows):
+        rows = [row if isinstance(row, Sequence) else list(row) for row in rows]
+
+    num_columns = len(rows[0]) if rows else 0
+
+    return _PythonTableData(
+        data,
+        None,
+        [_RowColumn(rows, column) for column in range(num_columns)],
+    )
@@ -0,0 +1,94 @@
+"""
+Binary transport of numeric arrays.
+
+Sending large numeric arrays as JSON is slow: Every number has to be converted
+to a Python object, formatted as text and parsed again by the browser. Instead,
+numeric numpy arrays are sent as base64 encoded little-endian buffers, which
+the client wraps in a typed array (e.g. `Float64Array`) without looking at the
+individual values.
+
+The format is the one plotly.js understands natively:
+
+    {"dtype": "f8", "bdata": "<base64>"}
+
+Multidimensional arrays are flattened in row-major order and additionally
+carry their shape, e.g. `"shape": "3, 4"`.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import *  # type: ignore
+
+from uniserde import JsonDoc
+
+if TYPE_CHECKING:
+    import numpy  # type: ignore
+
+
+__all__ = [
+    "encode",
+]
+
+
+# Maps numpy dtype names to the names used on the wire. Each of these has a
+# corresponding typed array in JavaScript.
+_DTYPE_NAMES = {
+    "int8": "i1",
+    "uint8": "u1",
+    "int16": "i2",
+    "uint16": "u2",
+    "int32": "i4",
+    "uint32": "u4",
+    "int64": "i8",
+    "uint64": "u8",
+    "float32": "f4",
+    "float64": "f8",
+}
+
+
+def encode(
+    array: numpy.ndarray,
+    *,
+    allow_64_bit_ints: bool = True,
+) -> JsonDoc | None:
+    """
+    Encodes a numeric array for the client. Returns `None` if the array can't
+    be sent in binary form, e.g. because it contains strings.
+
+    If `allow_64_bit_ints` is `False`, 64 bit integers are converted to 32 bit
+    integers, or to floats if they don't fit. This is necessary for plotly.js,
+    which doesn't support `BigInt64Array`.
+    """
+    import numpy  # type: ignore
+
+    if array.ndim == 0 or array.dtype.kind not in "iuf":
+        return None
+
+    # Convert types the client can't handle
+    if array.dtype.kind in "iu" and array.dtype.itemsize == 8 and not allow_64_bit_ints:
+        if array.size == 0 or (
+            array.min() >= numpy.iinfo(numpy.int32).min
+            and array.max() <= numpy.iinfo(numpy.int32).max
+        ):
+            array = array.astype(numpy.int32)
+        else:
+            array = array.astype(numpy.float64)
+
+    elif array.dtype.name not in _DTYPE_NAMES:
+        # E.g. float16, for which there is no typed array
+        array = array.astype(numpy.float64)
+
+    # This is a no-op if the array is already contiguous and little-endian,
+    # which is practically always the case
+    array = numpy.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+
+    result: JsonDoc = {
+        "dtype": _DTYPE_NAMES[array.dtype.name],
+        "bdata": base64.b64encode(array).decode("ascii"),  # type: ignore
+    }
+
+    if array.ndim > 1:
+        result["shape"] = ", ".join(str(size) for size in array.shape)
+
+    return result
@@ -1,11 +1,20 @@
 """
 This file reads all materials icons/symbols from their github repository and
-packs them into a `.tar.xz` archive that can be used by rio as icon set.
+packs them into a `.tar.xz` archive that can be used by rio as icon set. It also
+creates an icon pack (`.rioicons`) from the archive, which is what Rio actually
+reads the icons from.
 
 The repository is expected to be available locally already - this script does
 not clone it.
+
+The icon packs are committed and shipped alongside the archives, so fresh
+installations don't have to convert the archives on first use. Whenever an
+archive changes, run this script with `--packs-only` and commit the result. This
+skips the material repository, and instead rebuilds the icon packs for all
+`.tar.xz` archives in the output directory.
 """
 import re
+import sys
 import tarfile
 import tempfile
 from pathlib import Path
@@ -16,6 +25,7 @@ import revel
 from revel import *  # type: ignore
 
 import rio
+import rio.icon_pack
 
 # Configure: The name the resulting icon set will have
 SET_NAME = "material"
@@ -73,7 +83,29 @@ def name_from_icon_path(path: Path) -> tuple[str, str | None | None]:
 # == No changes should be required below this line ==
 
 
+def build_icon_packs() -> None:
+    """
+    Creates an icon pack next to every icon set archive in the output directory.
+    """
+    print_chapter("Building icon packs")
+
+    for archive_path in sorted(OUTPUT_DIR.glob("*.tar.xz")):
+        set_name = archive_path.name.removesuffix(".tar.xz")
+        pack_path = OUTPUT_DIR / f"{set_name}{rio.icon_pack.FILE_SUFFIX}"
+
+        rio.icon_pack.write_icon_pack(
+            rio.icon_pack.icons_from_archive(archive_path),
+            pack_path,
+        )
+
+        print(f"{archive_path.name} -> {pack_path.name}")
+
+
 def main() -> None:
+    if "--packs-only" in sys.argv[1:]:
+        build_icon_packs()
+        return
+
     # Find all files in the input directory
     print_chapter("Scanning files")
 
@@ -156,11 +188,15 @@ def main() -> None:
         archive_path = OUTPUT_DIR / f"{SET_NAME}.tar.xz"
 
         with tarfile.open(archive_path, "w:xz") as out_file:
-            out_file.add(tmp_dir, arcname="")
+            out_file.add(tmp_dir, arcname=SET_NAME)
+
+    # Build the icon pack from the archive, so it's guaranteed to contain the
+    # same icons
+    build_icon_packs()
 
     print_chapter(None)
     print(
-        f"[bold]Done![/] You can find the result at [bold]{OUTPUT_DIR.resolve()}/{SET_NAME}.tar.xz[/]"
+        f"[bold]Done![/] You can find the result at [bold]{OUTPUT_DIR.resolve()}/{SET_NAME}.tar.xz[/] and [bold]{OUTPUT_DIR.resolve()}/{SET_NAME}{rio.icon_pack.FILE_SUFFIX}[/]"
     )
 
 
@@ -0,0 +1,242 @@
+import asyncio
+import base64
+import io
+import types
+from typing import Any
+
+import fastapi
+import PIL.Image
+from utils import create_mockapp
+
+import rio
+import rio.assets
+import rio.responsive_images
+
+
+def _fake_request(headers: dict[str, str] = {}) -> Any:
+    return types.SimpleNamespace(headers=headers, query_params={})
+
+
+async def _read_streaming_response(response: Any) -> bytes:
+    assert isinstance(response, fastapi.responses.StreamingResponse)
+    return b"".join([chunk async for chunk in response.body_iterator])  # type: ignore
+
+
+async def test_iter_byte_chunks_accepts_all_source_types():
+    async def async_gen():
+        yield "a,b\n"
+        yield b"1,2\n"
+
+    sources = [
+        async_gen(),
+        iter(["a,b\n", b"1,2\n"]),
+        ["a,b\n", "1,2\n"],
+        io.BytesIO(b"a,b\n1,2\n"),
+        io.StringIO("a,b\n1,2\n"),
+    ]
+
+    for source in sources:
+        chunks = [chunk async for chunk in rio.assets.iter_byte_chunks(source)]
+        assert b"".join(chunks) == b"a,b\n1,2\n"
+
+
+async def test_iter_byte_chunks_combines_small_pieces():
+    def rows():
+        for ii in range(100_000):
+            yield f"{ii}\n"
+
+    chunks = [chunk async for chunk in rio.assets.iter_byte_chunks(rows())]
+
+    assert len(chunks) < 10
+    assert b"".join(chunks) == "".join(f"{ii}\n" for ii in range(100_000)).encode()
+
+
+async def test_streaming_asset_is_served_once():
+    async with create_mockapp() as app:
+        server = app.session._app_server
+
+        async def contents():
+            for ii in range(3):
+                yield f"row {ii}\n"
+
+        asset = rio.assets.StreamingAsset(contents(), "text/csv")
+        url = server.host_asset_with_timeout(asset, 60)
+        asset_id = url.path.removeprefix("/rio/asset/")
+
+        response = await server._serve_asset(_fake_request(), asset_id)
+        assert response.media_type == "text/csv"
+        assert await _read_streaming_response(response) == b"row 0\nrow 1\nrow 2\n"
+
+        # The asset can't be served a second time
+        response = await server._serve_asset(_fake_request(), asset_id)
+        assert response.status_code == 404
+
+
+async def test_save_file_treats_bytes_like_objects_as_bytes():
+    async with create_mockapp() as app:
+        server = app.session._app_server
+
+        for contents in (bytearray(b"abc"), memoryview(b"abc")):
+            app.outgoing_messages.clear()
+            await app.session.save_file(contents, "test.bin")
+
+            [message] = [
+                message
+                for message in app.outgoing_messages
+                if message["method"] == "evaluateJavaScript"
+            ]
+            source: str = message["params"]["javaScriptSource"]  # type: ignore
+            asset_id = source.split("/rio/asset/", 1)[1].split('"', 1)[0]
+
+            # The contents mustn't be streamed as a sequence of ints
+            response = await server._serve_asset(_fake_request(), asset_id)
+            assert response.body == b"abc"
+
+
+def _png_bytes(width: int, height: int) -> bytes:
+    file = io.BytesIO()
+    PIL.Image.new("RGB", (width, height), "red").save(file, format="PNG")
+    return file.getvalue()
+
+
+async def _serve_image(server, asset, width: int, accept: str) -> Any:
+    url = server.host_asset_with_timeout(asset, 60)
+    request = types.SimpleNamespace(
+        headers={"accept": accept},
+        query_params={"width": str(width)},
+    )
+
+    return await server._serve_asset(request, url.path.removeprefix("/rio/asset/"))
+
+
+async def test_image_variants_are_resized_and_transcoded(tmp_path, monkeypatch):
+    monkeypatch.setattr(rio.responsive_images, "CACHE_DIR", tmp_path)
+
+    async with create_mockapp() as app:
+        server = app.session._app_server
+        asset = rio.assets.BytesAsset(_png_bytes(1000, 500), "image/png")
+
+        # Widths are rounded up to the next bucket
+        response = await _serve_image(server, asset, 300, "image/webp,*/*")
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["vary"] == "Accept"
+
+        data = await _read_streaming_response(response)
+        with PIL.Image.open(io.BytesIO(data)) as image:
+            assert image.size == (320, 160)
+
+        # Browsers without WebP support get a JPEG for opaque images
+        response = await _serve_image(server, asset, 640, "image/png,*/*")
+        assert response.headers["content-type"] == "image/jpeg"
+
+        # Images are never enlarged. The original is served instead.
+        response = await _serve_image(server, asset, 2000, "image/webp,*/*")
+        assert response.media_type == "image/png"
+        assert response.body == asset.data
+
+
+async def test_svgs_are_not_resized(tmp_path, monkeypatch):
+    monkeypatch.setattr(rio.responsive_images, "CACHE_DIR", tmp_path)
+
+    asset = rio.assets.BytesAsset(b"<svg></svg>", "image/svg+xml")
+    assert rio.responsive_images.build_srcset(asset, "/foo") is None
+
+    async with create_mockapp() as app:
+        response = await _serve_image(app.session._app_server, asset, 160, "")
+        assert response.body == b"<svg></svg>"
+
+
+async def test_file_hashes_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(rio.responsive_images, "_MAX_CACHED_PATH_HASHES", 2)
+    monkeypatch.setattr(rio.responsive_images, "_path_hashes", {})
+
+    paths = [tmp_path / f"{ii}.png" for ii in range(3)]
+
+    for path in paths:
+        path.write_bytes(_png_bytes(10, 10))
+        await rio.responsive_images._get_content_hash(rio.assets.PathAsset(path))
+
+    # Only the most recently used hashes are kept
+    cached_paths = [key[0] for key in rio.responsive_images._path_hashes]
+    assert cached_paths == paths[1:]
+
+
+def test_identical_pil_images_share_a_url():
+    image = PIL.Image.new("RGB", (40, 20), "blue")
+
+    first = rio.assets.Asset.from_image(image)
+    second = rio.assets.Asset.from_image(image)
+    copy = rio.assets.Asset.from_image(image.copy())
+    other = rio.assets.Asset.from_image(PIL.Image.new("RGB", (40, 20), "red"))
+
+    assert first.url == second.url == copy.url
+    assert first == copy
+    assert other.url != first.url
+    assert other != first
+
+
+async def test_placeholders_are_tiny_previews():
+    image = PIL.Image.new("RGB", (400, 200), "blue")
+    asset = rio.assets.Asset.from_image(image)
+
+    assert rio.responsive_images.try_get_cached_placeholder(asset, "blur") is None
+
+    for kind in ("blur", "color"):
+        data_url = await rio.responsive_images.get_placeholder(asset, kind)
+        assert data_url is not None
+        assert rio.responsive_images.try_get_cached_placeholder(asset, kind) == data_url
+
+        prefix = "data:image/png;base64,"
+        assert data_url.startswith(prefix)
+
+        data = base64.b64decode(data_url.removeprefix(prefix))
+        with PIL.Image.open(io.BytesIO(data)) as preview:
+            assert preview.size == (16, 8)
+            assert preview.getpixel((0, 0)) == (0, 0, 255)
+
+    # The user's image must not have been modified
+    assert image.size == (400, 200)
+
+
+async def test_failed_placeholders_are_not_retried(monkeypatch):
+    render_calls = 0
+    render_placeholder = rio.responsive_images._render_placeholder
+
+    def counting_render_placeholder(*args):
+        nonlocal render_calls
+        render_calls += 1
+        return render_placeholder(*args)
+
+    monkeypatch.setattr(
+        rio.responsive_images, "_render_placeholder", counting_render_placeholder
+    )
+
+    asset = rio.assets.BytesAsset(b"not an image", "image/png")
+
+    for _ in range(3):
+        assert await rio.responsive_images.get_placeholder(asset, "blur") is None
+
+    assert render_calls == 1
+    assert not rio.responsive_images.needs_placeholder(asset, "blur")
+
+
+async def test_image_sends_placeholder_once_ready():
+    image = PIL.Image.new("RGB", (64, 64), "green")
+
+    async with create_mockapp(
+        lambda: rio.Image(image, placeholder="color", loading="lazy")
+    ) as app:
+        component = app.get_component(rio.Image)
+
+        # Wait for the placeholder to be generated in the background
+        for _ in range(100):
+            if app.last_component_state_changes.get(component, {}).get(
+                "placeholderUrl"
+            ):
+                break
+
+            await asyncio.sleep(0.01)
+        else:
+            assert False, "The placeholder was never sent to the client"
+
+        assert app.last_component_state_changes[component]["loading"] == "lazy"
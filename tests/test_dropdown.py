@@ -0,0 +1,108 @@
+from utils import create_mockapp
+
+import rio
+from rio.components.dropdown import _OptionIndex
+
+
+def test_option_index_finds_substrings() -> None:
+    index = _OptionIndex(["Apple", "Pineapple", "Banana", "Grape", "apricot"])
+
+    assert index.search("APP", 10) == ["Apple", "Pineapple"]
+    assert index.search("ap", 10) == ["Apple", "Pineapple", "Grape", "apricot"]
+    assert index.search("ap", 2) == ["Apple", "Pineapple"]
+    assert index.search("", 3) == ["Apple", "Pineapple", "Banana"]
+    assert index.search("apex", 10) == []
+
+
+async def test_server_side_search_only_sends_matches() -> None:
+    options = [f"Customer #{i}" for i in range(10_000)]
+
+    def build() -> rio.Component:
+        return rio.Dropdown(
+            options,
+            search_on_server=True,
+            max_search_results=5,
+        )
+
+    async with create_mockapp(build) as app:
+        dropdown = app.get_component(rio.Dropdown)
+
+        state = app.last_component_state_changes[dropdown]
+        assert state["optionNames"] == []
+        assert state["selectedName"] == "Customer #0"
+
+        await dropdown._on_message({"query": "#123"})
+
+        state = app.last_component_state_changes[dropdown]
+        assert state["searchResults"] == {
+            "query": "#123",
+            "names": [
+                "Customer #123",
+                "Customer #1230",
+                "Customer #1231",
+                "Customer #1232",
+                "Customer #1233",
+            ],
+        }
+
+        await dropdown._on_message({"name": "Customer #1231"})
+        assert dropdown.selected_value == "Customer #1231"
+
+
+async def test_search_callback_provides_options() -> None:
+    async def search(query: str) -> list[int]:
+        return [int(query) * factor for factor in range(1, 4)]
+
+    def build() -> rio.Component:
+        return rio.Dropdown([0], search=search)
+
+    async with create_mockapp(build) as app:
+        dropdown = app.get_component(rio.Dropdown)
+
+        await dropdown._on_message({"query": "7"})
+        state = app.last_component_state_changes[dropdown]
+        assert state["searchResults"]["names"] == ["7", "14", "21"]
+
+        await dropdown._on_message({"name": "14"})
+        assert dropdown.selected_value == 14
+        assert dropdown._fetch_selected_name() == "14"
+
+
+async def test_option_index_survives_rebuilds() -> None:
+    class Picker(rio.Component):
+        options: list[str]
+        value: str = "a"
+
+        def build(self) -> rio.Component:
+            return rio.Dropdown(
+                self.options,
+                selected_value=self.bind().value,
+                search_on_server=True,
+            )
+
+    async with create_mockapp(lambda: Picker(["a", "b", "c"])) as app:
+        picker = app.get_component(Picker)
+        dropdown = app.get_component(rio.Dropdown)
+
+        await dropdown._on_message({"query": "b"})
+        index = dropdown._option_index
+        assert index is not None
+
+        # Selecting an option rebuilds the parent, which creates a new, but
+        # identical, options mapping
+        await dropdown._on_message({"name": "b"})
+        await app.refresh()
+        assert picker.value == "b"
+
+        await dropdown._on_message({"query": "c"})
+        assert dropdown._option_index is index
+
+        # Different options need a new index
+        picker.options = ["a", "b", "c", "d"]
+        await app.refresh()
+
+        await dropdown._on_message({"query": "d"})
+        assert dropdown._option_index is not index
+        assert app.last_component_state_changes[dropdown]["searchResults"]["names"] == [
+            "d"
+        ]
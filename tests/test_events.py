@@ -1,4 +1,7 @@
 import asyncio
+import threading
+import time
+import weakref
 
 from utils import create_mockapp
 
@@ -77,3 +80,172 @@ async def test_refresh_after_synchronous_mount_handler():
         last_component_state_changes = app.last_component_state_changes
         assert switch in last_component_state_changes
         assert last_component_state_changes[switch].get("is_on") is True
+
+
+async def test_mouse_movements_are_coalesced():
+    events: list[str] = []
+    handler_may_finish = asyncio.Event()
+
+    async def on_mouse_move(event: rio.MouseMoveEvent) -> None:
+        events.append(f"move {event.x}")
+        await handler_may_finish.wait()
+
+    def on_mouse_up(event: rio.MouseUpEvent) -> None:
+        events.append("up")
+
+    def build():
+        return rio.MouseEventListener(
+            rio.Text("hi"),
+            on_mouse_move=on_mouse_move,
+            on_mouse_up=on_mouse_up,
+        )
+
+    async with create_mockapp(build) as app:
+        listener = app.get_component(rio.MouseEventListener)
+
+        def send(payload: dict) -> asyncio.Task:
+            return asyncio.create_task(
+                app.session._component_message(listener._id, payload)
+            )
+
+        tasks = [send({"type": "mouseMove", "x": x, "y": 0}) for x in range(5)]
+        tasks.append(send({"type": "mouseUp", "button": "left", "x": 4, "y": 0}))
+        tasks.append(send({"type": "mouseMove", "x": 5, "y": 0}))
+        await asyncio.sleep(0.01)
+
+        # The first movement is still being handled, everything else is queued
+        assert events == ["move 0"]
+
+        handler_may_finish.set()
+        await asyncio.gather(*tasks)
+
+        # Outdated movements were dropped, but the order was kept
+        assert events == ["move 0", "move 4", "up", "move 5"]
+
+
+async def test_periodic_handlers_share_a_worker():
+    ticks: list[int] = []
+
+    class Clock(rio.Component):
+        number: int
+
+        @rio.event.periodic(0.01)
+        def _on_tick(self) -> None:
+            ticks.append(self.number)
+
+        def build(self) -> rio.Component:
+            return rio.Text(str(self.number))
+
+    def build():
+        return ChildToggler(rio.Column(*(Clock(number) for number in range(3))))
+
+    async with create_mockapp(build) as app:
+        root = app.get_component(ChildToggler)
+
+        # The clocks aren't mounted yet
+        await asyncio.sleep(0.05)
+        assert not ticks
+
+        root.toggle()
+        await app.refresh()
+        await asyncio.sleep(0.1)
+
+        # All clocks are handled by the same worker, so they always tick
+        # together
+        assert ticks
+        assert len(ticks) % 3 == 0
+
+        for start in range(0, len(ticks), 3):
+            assert sorted(ticks[start : start + 3]) == [0, 1, 2]
+        assert list(app.session._periodic_handlers) == [0.01]
+
+        # Once unmounted, they stop
+        root.toggle()
+        await app.refresh()
+        await asyncio.sleep(0.05)
+        tick_count = len(ticks)
+
+        await asyncio.sleep(0.05)
+        assert len(ticks) == tick_count
+        assert not app.session._periodic_handlers
+
+
+async def test_handlers_can_run_in_threads():
+    class DataLoader(rio.Component):
+        text: str = "loading"
+
+        @rio.event.on_populate
+        @rio.event.run_in_thread
+        def _load(self) -> None:
+            time.sleep(0.05)
+            self.text = threading.current_thread().name
+
+        def build(self) -> rio.Component:
+            return rio.Text(self.text)
+
+    async with create_mockapp(DataLoader) as app:
+        # The event loop isn't blocked while the handler runs
+        assert app.get_component(rio.Text).text == "loading"
+
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+
+            if app.get_component(rio.Text).text != "loading":
+                break
+
+        assert app.get_component(rio.Text).text.startswith("rio-event-handler")
+
+
+async def test_threaded_handlers_can_change_state():
+    class Counter(rio.Component):
+        value: int = 0
+
+        @rio.event.run_in_thread
+        def increment(self) -> None:
+            for _ in range(1000):
+                self.value += 1
+
+        def build(self) -> rio.Component:
+            return rio.Text(str(self.value))
+
+    class RecordingWeakSet(weakref.WeakSet):
+        def add(self, item) -> None:
+            threads.add(threading.current_thread())
+            super().add(item)
+
+    threads: set[threading.Thread] = set()
+
+    async with create_mockapp(Counter) as app:
+        counter = app.get_component(Counter)
+        app.session._dirty_components = RecordingWeakSet(app.session._dirty_components)
+
+        await app.session._call_event_handler(counter.increment, refresh=True)
+
+        # The handler sees its own changes right away, but the dirty components
+        # are only registered by the event loop
+        assert counter.value == 1000
+        assert threads == {threading.current_thread()}
+        assert app.get_component(rio.Text).text == "1000"
+
+
+async def test_periodic_handlers_can_run_in_threads():
+    ticked_in: list[threading.Thread] = []
+
+    class Clock(rio.Component):
+        @rio.event.periodic(0.01)
+        @rio.event.run_in_thread
+        def _on_tick(self) -> None:
+            ticked_in.append(threading.current_thread())
+
+        def build(self) -> rio.Component:
+            return rio.Text("tick")
+
+    async with create_mockapp(Clock) as app:
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+
+            if ticked_in:
+                break
+
+        assert ticked_in
+        assert threading.current_thread() not in ticked_in
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import types
+from typing import Any
+
+import fastapi
+import pytest
+from utils import create_mockapp
+
+import rio
+
+
+def _fake_request(body: bytes = b"", headers: dict[str, str] = {}) -> Any:
+    async def read_json() -> Any:
+        return json.loads(body)
+
+    async def stream():
+        # Deliver the body in multiple pieces, like a real network would
+        for ii in range(0, len(body), 3):
+            yield body[ii : ii + 3]
+
+    return types.SimpleNamespace(
+        headers=headers,
+        json=read_json,
+        stream=stream,
+    )
+
+
+def _manifest(*files: tuple[str, int]) -> Any:
+    return _fake_request(
+        json.dumps(
+            {
+                "files": [
+                    {"name": name, "type": "text/plain", "size": size}
+                    for name, size in files
+                ]
+            }
+        ).encode()
+    )
+
+
+async def _start_file_chooser(app, **kwargs) -> tuple[asyncio.Task, str]:
+    task = asyncio.create_task(app.session.file_chooser(**kwargs))
+
+    # Wait for the session to request the upload
+    while not app.session._app_server._pending_file_uploads:
+        await asyncio.sleep(0)
+
+    [upload_token] = app.session._app_server._pending_file_uploads
+    return task, upload_token
+
+
+async def _send_chunk(
+    app, upload_token: str, file_index: int, data: bytes, start: int, total: int
+) -> fastapi.responses.Response:
+    return await app.session._app_server._serve_file_upload_chunk(
+        _fake_request(
+            data,
+            {"content-range": f"bytes {start}-{start + len(data) - 1}/{total}"},
+        ),
+        upload_token,
+        file_index,
+    )
+
+
+async def test_chunked_upload_is_assembled_and_reports_progress():
+    progress: list[rio.UploadProgress] = []
+
+    async with create_mockapp() as app:
+        server = app.session._app_server
+
+        task, token = await _start_file_chooser(app, on_progress=progress.append)
+
+        await server._serve_file_upload_start(_manifest(("a.txt", 11)), token)
+        await _send_chunk(app, token, 0, b"hello", 0, 11)
+        await _send_chunk(app, token, 0, b" worl", 5, 11)
+        await _send_chunk(app, token, 0, b"d", 10, 11)
+
+        file = await task
+        assert file.name == "a.txt"
+        assert file.size_in_bytes == 11
+        assert await file.read_text() == "hello world"
+
+        # The upload is complete, so the token is no longer valid
+        assert token not in server._pending_file_uploads
+
+        # Let the progress handlers run
+        await asyncio.sleep(0.1)
+        assert [p.bytes_uploaded for p in progress] == [5, 10, 11]
+        assert progress[-1].fraction == 1
+
+
+async def test_upload_can_be_resumed():
+    async with create_mockapp() as app:
+        server = app.session._app_server
+
+        task, token = await _start_file_chooser(app, multiple=True)
+
+        await server._serve_file_upload_start(
+            _manifest(("a.txt", 4), ("b.txt", 0)), token
+        )
+        await _send_chunk(app, token, 0, b"ab", 0, 4)
+
+        # Pretend the connection was lost. The client re-sends the manifest and
+        # asks how much has arrived.
+        await server._serve_file_upload_start(
+            _manifest(("a.txt", 4), ("b.txt", 0)), token
+        )
+        response = await server._serve_file_upload_status(token)
+        assert json.loads(response.body) == {"received": [2, 0]}
+
+        # Overlapping chunks are fine, gaps are not
+        with pytest.raises(fastapi.HTTPException):
+            await _send_chunk(app, token, 0, b"d", 3, 4)
+
+        await _send_chunk(app, token, 0, b"bcd", 1, 4)
+
+        files = await task
+        assert [await f.read_bytes() for f in files] == [b"abcd", b""]
+
+
+async def test_empty_upload_raises_no_file_selected():
+    async with create_mockapp() as app:
+        task, token = await _start_file_chooser(app)
+
+        await app.session._app_server._serve_file_upload_start(_manifest(), token)
+
+        with pytest.raises(rio.NoFileSelectedError):
+            await task
+
+
+async def test_invalid_file_index_is_rejected():
+    async with create_mockapp() as app:
+        server = app.session._app_server
+
+        task, token = await _start_file_chooser(app, multiple=True)
+
+        await server._serve_file_upload_start(
+            _manifest(("a.txt", 1), ("b.txt", 1)), token
+        )
+
+        # Negative indices mustn't wrap around to the last file
+        for file_index in (-1, 2):
+            with pytest.raises(fastapi.HTTPException) as exc_info:
+                await _send_chunk(app, token, file_index, b"x", 0, 1)
+
+            assert exc_info.value.status_code == 404
+
+        response = await server._serve_file_upload_status(token)
+        assert json.loads(response.body) == {"received": [0, 0]}
+
+        task.cancel()
@@ -0,0 +1,160 @@
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+from utils import create_mockapp
+
+import rio
+import rio.icon_pack
+from rio.icon_registry import IconRegistry
+
+SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10"><path d="M{}"/></svg>'
+)
+
+
+def _write_archive(path: Path, set_name: str, icons: dict[str, str]) -> None:
+    with tarfile.open(path, "w:xz") as tar_file:
+        for name, source in icons.items():
+            data = source.encode("utf-8")
+            info = tarfile.TarInfo(f"{set_name}/{name}")
+            info.size = len(data)
+            tar_file.addfile(info, io.BytesIO(data))
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_icon_pack_round_trip(tmp_path: Path, compress: bool) -> None:
+    path = tmp_path / f"test{rio.icon_pack.FILE_SUFFIX}"
+
+    rio.icon_pack.write_icon_pack(
+        [
+            ("star", None, SVG.format(1)),
+            ("star", "fill", SVG.format(2)),
+            ("heart", None, SVG.format(3)),
+        ],
+        path,
+        compress=compress,
+    )
+
+    pack = rio.icon_pack.IconPack(path)
+
+    try:
+        assert pack.get_svg("star", None) == SVG.format(1)
+        assert pack.get_svg("star", "fill") == SVG.format(2)
+        assert pack.get_svg("heart", None) == SVG.format(3)
+
+        with pytest.raises(KeyError):
+            pack.get_svg("heart", "fill")
+
+        assert pack.all_variants() == {None, "fill"}
+        assert sorted(pack.all_icons(), key=str) == sorted(
+            [("star", None), ("star", "fill"), ("heart", None)], key=str
+        )
+    finally:
+        pack.close()
+
+
+def test_invalid_icon_packs_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / f"invalid{rio.icon_pack.FILE_SUFFIX}"
+    path.write_bytes(b"definitely not an icon pack")
+
+    with pytest.raises(ValueError):
+        rio.icon_pack.IconPack(path)
+
+
+def test_registry_reads_packs_and_archives(tmp_path: Path, monkeypatch) -> None:
+    # Archives are converted into the cache directory. Don't pollute the real
+    # one.
+    monkeypatch.setattr(
+        rio.common.ASSET_MANGER, "_versioned_cache_dir", tmp_path / "cache"
+    )
+
+    registry = IconRegistry()
+
+    pack_path = tmp_path / f"packed{rio.icon_pack.FILE_SUFFIX}"
+    rio.icon_pack.write_icon_pack([("star", None, SVG.format(1))], pack_path)
+    registry.icon_set_archives["packed"] = pack_path
+
+    archive_path = tmp_path / "archived.tar.xz"
+    _write_archive(
+        archive_path,
+        "archived",
+        {"star.svg": SVG.format(2), "fill/star.svg": SVG.format(3)},
+    )
+    registry.icon_set_archives["archived"] = archive_path
+
+    assert registry.get_icon_svg("packed/star") == SVG.format(1)
+    assert registry.get_icon_svg("archived/star") == SVG.format(2)
+    assert registry.get_icon_svg("archived/star:fill") == SVG.format(3)
+    assert set(registry.all_variants_in_set("archived")) == {None, "fill"}
+    assert list(registry.all_icons_in_set("archived", variant="fill")) == [
+        ("star", "fill")
+    ]
+
+    with pytest.raises(rio.AssetError):
+        registry.get_icon_svg("packed/missing")
+
+    with pytest.raises(rio.AssetError):
+        registry.get_icon_svg("missing-set/star")
+
+
+def test_builtin_icons_are_available() -> None:
+    svg = IconRegistry.get_singleton().get_icon_svg("material/castle")
+    assert svg.startswith("<svg")
+
+
+@pytest.mark.parametrize("set_name", ["material", "rio", "styling"])
+def test_shipped_icon_packs_match_their_archives(set_name: str) -> None:
+    directory = rio.common.RIO_ASSETS_DIR / "icon-sets"
+    archive_icons = {
+        (icon_name, variant): svg
+        for icon_name, variant, svg in rio.icon_pack.icons_from_archive(
+            directory / f"{set_name}.tar.xz"
+        )
+    }
+
+    pack = rio.icon_pack.IconPack(directory / f"{set_name}{rio.icon_pack.FILE_SUFFIX}")
+
+    try:
+        assert set(pack.all_icons()) == set(archive_icons)
+
+        for (icon_name, variant), svg in archive_icons.items():
+            assert pack.get_svg(icon_name, variant) == svg
+    finally:
+        pack.close()
+
+
+async def test_icon_sources_are_sent_once_per_session() -> None:
+    class IconDemo(rio.Component):
+        fill: rio.Color = rio.Color.RED
+
+        def build(self) -> rio.Component:
+            return rio.Column(
+                rio.Icon("material/castle", fill=self.fill),
+                rio.Icon("castle"),
+            )
+
+    async with create_mockapp(IconDemo) as app:
+
+        def count_castle_registrations() -> int:
+            return sum(
+                "material/castle" in message["params"]["icons"]  # type: ignore
+                for message in app.outgoing_messages
+                if message["method"] == "registerIcons"
+            )
+
+        # Both icons are the same, so the source is only sent once
+        assert count_castle_registrations() == 1
+
+        for icon in app.get_components(rio.Icon):
+            state = app.last_component_state_changes[icon]
+            assert state["iconName"] == "material/castle"
+            assert "svgSource" not in state
+
+        # Rebuilding must not send the icon again
+        demo = app.get_component(IconDemo)
+        demo.fill = rio.Color.BLUE
+        await app.refresh()
+
+        assert count_castle_registrations() == 1
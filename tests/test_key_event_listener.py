@@ -0,0 +1,36 @@
+import pytest
+from utils import create_mockapp
+
+import rio
+
+
+async def test_hotkeys_are_sent_normalized() -> None:
+    def build() -> rio.Component:
+        return rio.KeyEventListener(
+            rio.Text("hi"),
+            hotkeys=["Shift + Control + S", "escape", "control++", "+"],
+            on_key_down=lambda event: None,
+        )
+
+    async with create_mockapp(build) as app:
+        listener = app.get_component(rio.KeyEventListener)
+        state = app.last_component_state_changes[listener]
+
+        assert state["hotkeys"] == ["control+shift+s", "escape", "control++", "+"]
+
+
+async def test_all_keys_are_reported_by_default() -> None:
+    def build() -> rio.Component:
+        return rio.KeyEventListener(rio.Text("hi"), on_key_down=lambda event: None)
+
+    async with create_mockapp(build) as app:
+        listener = app.get_component(rio.KeyEventListener)
+        assert app.last_component_state_changes[listener]["hotkeys"] is None
+
+
+@pytest.mark.parametrize("hotkey", ["", "super+a", "control+hyper+x"])
+def test_invalid_hotkeys_are_rejected(hotkey: str) -> None:
+    from rio.components.key_event_listener import _normalize_hotkey
+
+    with pytest.raises(ValueError):
+        _normalize_hotkey(hotkey)
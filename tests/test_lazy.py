@@ -0,0 +1,44 @@
+from utils import create_mockapp
+
+import rio
+from rio.components.lazy import _LazyPlaceholder
+
+
+def _build_page(unload_when_hidden: bool = False) -> rio.Component:
+    return rio.Column(
+        *[
+            rio.Lazy(
+                lambda i=i: rio.Text(f"Section {i}"),
+                unload_when_hidden=unload_when_hidden,
+            )
+            for i in range(100)
+        ]
+    )
+
+
+async def test_content_is_built_once_near_viewport() -> None:
+    async with create_mockapp(_build_page) as app:
+        assert not list(app.get_components(rio.Text))
+
+        placeholder = list(app.get_components(_LazyPlaceholder))[3]
+        await placeholder._on_message({"isNearViewport": True})
+
+        texts = list(app.get_components(rio.Text))
+        assert [text.text for text in texts] == ["Section 3"]
+        assert placeholder.content is texts[0]
+
+        # Since `unload_when_hidden` isn't set, the content stays
+        await placeholder._on_message({"isNearViewport": False})
+        assert len(list(app.get_components(rio.Text))) == 1
+
+
+async def test_content_can_be_unloaded() -> None:
+    async with create_mockapp(lambda: _build_page(unload_when_hidden=True)) as app:
+        placeholder = list(app.get_components(_LazyPlaceholder))[3]
+
+        await placeholder._on_message({"isNearViewport": True})
+        assert len(list(app.get_components(rio.Text))) == 1
+
+        await placeholder._on_message({"isNearViewport": False})
+        assert not list(app.get_components(rio.Text))
+        assert app.last_component_state_changes[placeholder]["content"] is None
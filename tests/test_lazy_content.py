@@ -0,0 +1,90 @@
+from utils import create_mockapp
+
+import rio
+
+
+class HeavyContent(rio.Component):
+    build_count = 0
+
+    def build(self) -> rio.Component:
+        HeavyContent.build_count += 1
+        return rio.Text("Heavy")
+
+
+def _build_popup(mount_content) -> rio.Component:
+    return rio.Popup(
+        anchor=rio.Text("Anchor"),
+        content=HeavyContent(),
+        mount_content=mount_content,
+    )
+
+
+async def test_eager_content_is_built_while_closed() -> None:
+    HeavyContent.build_count = 0
+
+    async with create_mockapp(lambda: _build_popup("always")) as app:
+        assert HeavyContent.build_count == 1
+
+        popup = app.get_component(rio.Popup)
+        assert app.last_component_state_changes[popup]["content"] is not None
+
+
+async def test_lazy_content_is_built_once_opened() -> None:
+    HeavyContent.build_count = 0
+
+    async with create_mockapp(lambda: _build_popup("on_open")) as app:
+        popup = app.get_component(rio.Popup)
+
+        assert HeavyContent.build_count == 0
+        assert app.last_component_state_changes[popup]["content"] is None
+        assert not list(app.get_components(HeavyContent))
+
+        # Open the popup, like the frontend does
+        await app.session._component_state_update(popup._id, {"is_open": True})
+
+        assert HeavyContent.build_count == 1
+
+        content = app.get_component(HeavyContent)
+        state_changes = app.last_component_state_changes
+        assert state_changes[popup]["content"] == content._id
+        assert content in state_changes
+        assert app.get_build_output(content) in state_changes
+
+        # The content is kept after closing
+        await app.session._component_state_update(popup._id, {"is_open": False})
+        assert list(app.get_components(HeavyContent)) == [content]
+
+
+async def test_lazy_content_is_unmounted_when_closed() -> None:
+    async with create_mockapp(lambda: _build_popup("while_open")) as app:
+        popup = app.get_component(rio.Popup)
+
+        await app.session._component_state_update(popup._id, {"is_open": True})
+        assert list(app.get_components(HeavyContent))
+
+        await app.session._component_state_update(popup._id, {"is_open": False})
+        assert not list(app.get_components(HeavyContent))
+        assert app.last_component_state_changes[popup]["content"] is None
+
+        # Re-opening the popup sends the content again
+        await app.session._component_state_update(popup._id, {"is_open": True})
+        content = app.get_component(HeavyContent)
+        assert content in app.last_component_state_changes
+        assert app.get_build_output(content) in app.last_component_state_changes
+
+
+async def test_lazy_tooltip() -> None:
+    def build() -> rio.Component:
+        return rio.Tooltip(
+            anchor=rio.Text("Anchor"),
+            tip=HeavyContent(),
+            position="top",
+            mount_content="on_open",
+        )
+
+    async with create_mockapp(build) as app:
+        tooltip = app.get_component(rio.Tooltip)
+        assert not list(app.get_components(HeavyContent))
+
+        await tooltip._on_message({"isTipShown": True})
+        assert list(app.get_components(HeavyContent))
@@ -0,0 +1,65 @@
+import pytest
+from utils import create_mockapp
+
+import rio
+import rio.markdown_rendering
+
+pytest.importorskip("markdown_it")
+pytest.importorskip("pygments")
+
+
+def test_raw_html_is_escaped() -> None:
+    result = rio.markdown_rendering.render_markdown(
+        "# Title <script>alert(1)</script>",
+        None,
+    )
+
+    assert result == "<h1>Title &lt;script&gt;alert(1)&lt;/script&gt;</h1>\n"
+
+
+def test_code_blocks_are_highlighted() -> None:
+    result = rio.markdown_rendering.render_markdown(
+        '```python\nprint("hi")\n```',
+        None,
+    )
+
+    assert result == (
+        '<pre><code data-rio-language-name="Python">'
+        '<span class="hljs-built_in">print</span>'
+        '<span class="hljs-punctuation">(</span>'
+        '<span class="hljs-string">"hi"</span>'
+        '<span class="hljs-punctuation">)</span>'
+        "</code></pre>\n"
+    )
+
+
+def test_unknown_languages_are_left_to_the_browser() -> None:
+    result = rio.markdown_rendering.render_markdown(
+        "```\nsome code\n```\n\n```no-such-language\nmore code\n```",
+        None,
+    )
+
+    assert result == (
+        "<pre><code>some code</code></pre>\n<pre><code>more code</code></pre>\n"
+    )
+
+
+def test_results_are_cached() -> None:
+    text = "Some *text* which is rendered once"
+
+    first = rio.markdown_rendering.render_markdown(text, None)
+    second = rio.markdown_rendering.render_markdown(text, None)
+
+    assert first is second
+
+
+async def test_markdown_view_sends_html() -> None:
+    def build() -> rio.Component:
+        return rio.MarkdownView("**Hello**", render_on_server=True)
+
+    async with create_mockapp(build) as app:
+        markdown_view = app.get_component(rio.MarkdownView)
+        state = app.last_component_state_changes[markdown_view]
+
+        assert state["text"] is None
+        assert state["html"] == "<p><strong>Hello</strong></p>\n"
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from utils import create_mockapp
+
+import rio
+import rio.matplotlib_rendering
+import rio.process_pool
+
+matplotlib_figure = pytest.importorskip("matplotlib.figure")
+
+
+def _make_figure(values: list[float]):
+    figure = matplotlib_figure.Figure()
+    figure.add_subplot().plot(values)
+    return figure
+
+
+def test_figures_are_only_pickled_again_once_modified() -> None:
+    figure = _make_figure([1, 2, 3])
+
+    first = rio.matplotlib_rendering.pickle_figure(figure)
+    second = rio.matplotlib_rendering.pickle_figure(figure)
+    assert first is not None and first == second
+
+    figure.axes[0].set_title("Modified")
+    third = rio.matplotlib_rendering.pickle_figure(figure)
+    assert third is not None and third[1] != first[1]
+
+
+def test_figures_can_be_rendered_here() -> None:
+    svg = rio.matplotlib_rendering.render_svg_here(_make_figure([1, 2, 3]))
+    assert "<svg" in svg
+
+
+async def test_figures_are_rendered_in_worker_processes() -> None:
+    pickled = rio.matplotlib_rendering.pickle_figure(_make_figure([4, 5, 6]))
+    assert pickled is not None
+    figure_data, content_hash = pickled
+
+    pool = rio.process_pool.ProcessPool(1)
+
+    try:
+        # Concurrent requests for the same figure are rendered once
+        first, second = await asyncio.gather(
+            rio.matplotlib_rendering.render_svg(pool, figure_data, content_hash),
+            rio.matplotlib_rendering.render_svg(pool, figure_data, content_hash),
+        )
+    finally:
+        pool.shutdown()
+
+    assert "<svg" in first
+    assert first == second
+    assert rio.matplotlib_rendering.try_get_cached_svg(content_hash) == first
+
+
+async def test_plot_sends_figure_once_rendered() -> None:
+    figure = _make_figure([7, 8, 9])
+
+    async with create_mockapp(lambda: rio.Plot(figure)) as app:
+        plot = app.get_component(rio.Plot)
+
+        # Wait for the figure to be rendered in the background
+        for _ in range(3000):
+            state = app.last_component_state_changes.get(plot, {})
+
+            if state.get("plot", {}).get("type") == "matplotlib":  # type: ignore
+                break
+
+            await asyncio.sleep(0.01)
+        else:
+            assert False, "The figure was never sent to the client"
+
+        assert "<svg" in state["plot"]["svg"]  # type: ignore
@@ -0,0 +1,235 @@
+import base64
+import json
+
+import numpy as np
+import plotly.graph_objects as go
+from utils import create_mockapp
+
+import rio
+
+
+class PlotHolder(rio.Component):
+    figure: go.Figure
+    corner_radius: float = 1
+
+    def build(self) -> rio.Component:
+        return rio.Plot(self.figure, corner_radius=self.corner_radius)
+
+
+def _line(y: list[float], x: list[float] | None = None) -> go.Scatter:
+    if x is None:
+        x = list(range(len(y)))
+
+    return go.Scatter(x=np.array(x, dtype=float), y=np.array(y, dtype=float))
+
+
+def _decode_points(value: dict[str, str]) -> list[float]:
+    data = base64.b64decode(value["bdata"])
+    return np.frombuffer(data, dtype=value["dtype"]).tolist()
+
+
+async def _change_figure(
+    app, holder: PlotHolder, figure: go.Figure
+) -> dict[str, object]:
+    holder.figure = figure
+    await app.refresh()
+
+    plot = app.get_component(rio.Plot)
+    return app.last_component_state_changes[plot]["plot"]
+
+
+async def test_unchanged_figure_is_not_sent_again() -> None:
+    figure = go.Figure(_line([1, 2, 3]))
+
+    async with create_mockapp(lambda: PlotHolder(figure)) as app:
+        holder = app.get_component(PlotHolder)
+        plot = app.get_component(rio.Plot)
+        assert app.last_component_state_changes[plot]["plot"]["type"] == "plotly"
+
+        holder.corner_radius = 2
+        await app.refresh()
+
+        state = app.last_component_state_changes[plot]
+        assert state["plot"] == {"type": "unchanged", "version": 1}
+        assert state["corner_radius"] == [2, 2, 2, 2]
+
+
+async def test_appended_points_are_sent_as_update() -> None:
+    async with create_mockapp(lambda: PlotHolder(go.Figure(_line([1, 2, 3])))) as app:
+        holder = app.get_component(PlotHolder)
+
+        plot = await _change_figure(app, holder, go.Figure(_line([1, 2, 3, 4, 5])))
+        assert plot["type"] == "plotly-update"
+        assert (plot["baseVersion"], plot["version"]) == (1, 2)
+
+        update = json.loads(plot["json"])
+        assert "layout" not in update
+        assert "addTraces" not in update
+
+        [extension] = update["extendTraces"]
+        assert extension["index"] == 0
+        assert extension["maxPoints"] is None
+        assert _decode_points(extension["data"]["x"]) == [3, 4]
+        assert _decode_points(extension["data"]["y"]) == [4, 5]
+
+
+async def test_sliding_window_is_sent_as_update() -> None:
+    async with create_mockapp(
+        lambda: PlotHolder(go.Figure(_line([1, 2, 3, 4], x=[0, 1, 2, 3])))
+    ) as app:
+        holder = app.get_component(PlotHolder)
+
+        plot = await _change_figure(
+            app, holder, go.Figure(_line([3, 4, 5, 6], x=[2, 3, 4, 5]))
+        )
+        assert plot["type"] == "plotly-update"
+
+        [extension] = json.loads(plot["json"])["extendTraces"]
+        assert extension["maxPoints"] == 4
+        assert _decode_points(extension["data"]["x"]) == [4, 5]
+        assert _decode_points(extension["data"]["y"]) == [5, 6]
+
+
+async def test_added_traces_and_layout_changes_are_sent_as_update() -> None:
+    async with create_mockapp(lambda: PlotHolder(go.Figure(_line([1, 2, 3])))) as app:
+        holder = app.get_component(PlotHolder)
+
+        figure = go.Figure([_line([1, 2, 3]), _line([3, 2, 1])])
+        figure.update_layout(title="Telemetry")
+
+        plot = await _change_figure(app, holder, figure)
+        assert plot["type"] == "plotly-update"
+
+        update = json.loads(plot["json"])
+        assert "extendTraces" not in update
+        assert len(update["addTraces"]) == 1
+        assert update["layout"]["title"]["text"] == "Telemetry"
+        assert update["layout"]["paper_bgcolor"] == "rgba(0,0,0,0)"
+
+
+async def test_modified_points_require_full_figure() -> None:
+    async with create_mockapp(lambda: PlotHolder(go.Figure(_line([1, 2, 3])))) as app:
+        holder = app.get_component(PlotHolder)
+
+        plot = await _change_figure(app, holder, go.Figure(_line([1, 5, 3])))
+        assert plot["type"] == "plotly"
+        assert plot["version"] == 2
+
+
+async def test_frontend_can_request_full_figure() -> None:
+    async with create_mockapp(lambda: PlotHolder(go.Figure(_line([1, 2, 3])))) as app:
+        plot = app.get_component(rio.Plot)
+
+        await plot._on_message({"type": "requestFullPlot"})
+
+        state = app.last_component_state_changes[plot]["plot"]
+        assert state["type"] == "plotly"
+        assert state["version"] == 2
+
+
+async def test_unchanged_figure_is_not_diffed_again(monkeypatch) -> None:
+    figure = go.Figure(_line([1, 2, 3]))
+    attributes_before = set(vars(figure))
+
+    async with create_mockapp(lambda: PlotHolder(figure)) as app:
+        holder = app.get_component(PlotHolder)
+        plot = app.get_component(rio.Plot)
+
+        def fail(*args) -> None:
+            raise AssertionError("The figure was diffed again")
+
+        monkeypatch.setattr(rio.components.plot, "_diff_plotly_figures", fail)
+
+        holder.corner_radius = 2
+        await app.refresh()
+
+        state = app.last_component_state_changes[plot]
+        assert state["plot"] == {"type": "unchanged", "version": 1}
+
+        # Modifying the figure in place is noticed
+        monkeypatch.undo()
+        figure.update_layout(title="Telemetry")
+        await plot.force_refresh()
+
+        state = app.last_component_state_changes[plot]
+        assert state["plot"]["type"] == "plotly-update"
+
+        update = json.loads(state["plot"]["json"])
+        assert update["layout"]["title"]["text"] == "Telemetry"
+
+    # The user's figure must not have been tampered with
+    assert set(vars(figure)) == attributes_before
+
+
+def test_plotly_values_are_compared_in_bulk() -> None:
+    from rio.components.plot import _plotly_values_equal
+
+    assert _plotly_values_equal([1, 2, 3], (1, 2, 3))
+    assert not _plotly_values_equal([1, 2, 3], [1, 2, 4])
+
+    # Lists of arrays can't be compared directly
+    assert _plotly_values_equal([np.array([1, 2])], [np.array([1, 2])])
+    assert not _plotly_values_equal([np.array([1, 2])], [np.array([1, 3])])
+
+
+def test_lttb_keeps_endpoints_and_peaks() -> None:
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros_like(x)
+    y[5_000] = 100
+
+    indices = rio.downsampling.lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0
+    assert indices[-1] == 9_999
+    assert 5_000 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_min_max_keeps_extremes() -> None:
+    x = np.arange(10_001, dtype=float)
+    y = np.sin(x / 100)
+    y[1234] = -5
+    y[4321] = 5
+    y[7000] = np.nan
+
+    indices = rio.downsampling.min_max(x, y, 200)
+
+    assert len(indices) <= 200
+    assert {0, 1234, 4321, 10_000} <= set(indices.tolist())
+
+
+async def test_large_traces_are_downsampled() -> None:
+    y = np.random.default_rng(0).random(100_000)
+
+    def build() -> rio.Component:
+        return rio.Plot(
+            go.Figure(go.Scatter(y=y, text=[str(value) for value in y])),
+            downsampling="min-max",
+        )
+
+    async with create_mockapp(build) as app:
+        plot_component = app.get_component(rio.Plot)
+        plot = app.last_component_state_changes[plot_component]["plot"]
+
+        [trace] = json.loads(plot["json"])["data"]
+        x = _decode_points(trace["x"])
+        assert 100 < len(x) <= 2_000
+        assert len(trace["text"]) == len(x)
+        assert _decode_points(trace["y"]) == y[np.array(x, dtype=int)].tolist()
+
+        # Zooming in sends only the visible points
+        await plot_component._on_message(
+            {
+                "type": "viewport",
+                "widthInPixels": 500,
+                "xRange": [1_000, 1_100],
+                "yRange": None,
+            }
+        )
+
+        plot = app.last_component_state_changes[plot_component]["plot"]
+        figure = json.loads(plot["json"])
+        x = _decode_points(figure["data"][0]["x"])
+        assert x == list(range(999, 1_102))
+        assert figure["layout"]["xaxis"]["range"] == [1_000, 1_100]
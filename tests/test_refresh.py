@@ -1,6 +1,11 @@
+import asyncio
+
+import pytest
 from utils import create_mockapp
 
 import rio
+import rio.refresh_scheduling
+from rio.refresh_scheduling import RefreshPriority, RefreshRequest
 
 
 async def test_refresh_with_nothing_to_do():
@@ -97,3 +102,86 @@ async def test_unmount_and_remount():
             row_component,
             child_component,
         }
+
+
+async def test_concurrent_refreshes_are_batched():
+    build_count = 0
+
+    class Counter(rio.Component):
+        value: int = 0
+
+        def build(self) -> rio.Component:
+            nonlocal build_count
+            build_count += 1
+            return rio.Text(str(self.value))
+
+    async with create_mockapp(Counter) as app:
+        counter = app.get_component(Counter)
+        build_count = 0
+
+        async def handle_event() -> None:
+            counter.value += 1
+            await app.session._refresh()
+
+        await asyncio.gather(*(handle_event() for _ in range(10)))
+
+        assert build_count == 1
+        assert app.get_component(rio.Text).text == "10"
+
+
+async def test_background_refreshes_wait_for_user_input():
+    urgent = RefreshRequest(RefreshPriority.USER_INPUT)
+    background = RefreshRequest(RefreshPriority.BACKGROUND)
+
+    try:
+        waiter = asyncio.create_task(background.wait_for_turn())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+
+        urgent.finish()
+        await asyncio.wait_for(waiter, 0.1)
+    finally:
+        urgent.finish()
+        background.finish()
+
+
+async def test_raised_priority_doesnt_wait():
+    urgent = RefreshRequest(RefreshPriority.USER_INPUT)
+    background = RefreshRequest(RefreshPriority.BACKGROUND)
+
+    try:
+        background.raise_priority(RefreshPriority.USER_INPUT)
+        await asyncio.wait_for(background.wait_for_turn(), 0.01)
+    finally:
+        urgent.finish()
+        background.finish()
+
+
+async def test_background_refreshes_are_not_starved(monkeypatch):
+    monkeypatch.setattr(rio.refresh_scheduling, "MAX_DELAY", 0.05)
+
+    urgent = RefreshRequest(RefreshPriority.USER_INPUT)
+    background = RefreshRequest(RefreshPriority.BACKGROUND)
+
+    try:
+        await asyncio.wait_for(background.wait_for_turn(), 0.5)
+    finally:
+        urgent.finish()
+        background.finish()
+
+
+async def test_refreshes_cancelled_before_starting_dont_hold_up_others():
+    async with create_mockapp() as app:
+        caller = asyncio.create_task(app.session._refresh())
+
+        # Let the caller schedule the refresh, then cancel it before it starts
+        await asyncio.sleep(0)
+        scheduled_refresh = app.session._scheduled_refresh
+        assert scheduled_refresh is not None
+        scheduled_refresh.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        assert rio.refresh_scheduling._pending_counts == [0] * len(RefreshPriority)
+        assert app.session._scheduled_refresh is None
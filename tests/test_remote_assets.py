@@ -0,0 +1,257 @@
+import asyncio
+import contextlib
+import http.server
+import threading
+import types
+from collections.abc import Iterator
+
+import httpx
+import pytest
+from utils import create_mockapp
+
+import rio
+import rio.remote_assets
+
+
+class _StandInServer(http.server.ThreadingHTTPServer):
+    """
+    A local HTTP server that serves a single file, with configurable caching
+    headers. It keeps track of the requests it has received.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _StandInRequestHandler)
+
+        self.body = b"remote content"
+        self.headers: dict[str, str] = {}
+        self.etag: str | None = None
+        self.requests: list[dict[str, str]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/file.txt"
+
+
+class _StandInRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: _StandInServer
+
+    def do_GET(self) -> None:
+        self.server.requests.append(
+            {name.lower(): value for name, value in self.headers.items()}
+        )
+
+        # Query strings are ignored, so tests can request "different" files
+        if self.path.partition("?")[0] != "/file.txt":
+            self.send_error(404)
+            return
+
+        if (
+            self.server.etag is not None
+            and self.headers.get("if-none-match") == self.server.etag
+        ):
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("content-type", "text/plain; charset=utf-8")
+        self.send_header("content-length", str(len(self.server.body)))
+
+        if self.server.etag is not None:
+            self.send_header("etag", self.server.etag)
+
+        for name, value in self.server.headers.items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[_StandInServer]:
+    server = _StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextlib.asynccontextmanager
+async def _make_cache(tmp_path, **kwargs):
+    # Don't let proxy settings from the environment get in the way of talking to
+    # localhost
+    cache = rio.remote_assets.RemoteAssetCache(
+        tmp_path,
+        client=httpx.AsyncClient(trust_env=False),
+        **kwargs,
+    )
+
+    try:
+        yield cache
+    finally:
+        await cache.aclose()
+
+
+async def test_fresh_responses_are_served_from_the_cache(server, tmp_path):
+    server.headers["cache-control"] = "max-age=3600"
+
+    async with _make_cache(tmp_path) as cache:
+        for _ in range(3):
+            assert await cache.fetch(server.url) == (b"remote content", "text/plain")
+
+    # A new cache using the same directory doesn't have to download it either
+    async with _make_cache(tmp_path) as cache:
+        assert await cache.fetch(server.url) == (b"remote content", "text/plain")
+
+    assert len(server.requests) == 1
+
+
+async def test_stale_responses_are_revalidated(server, tmp_path):
+    server.headers["cache-control"] = "no-cache"
+    server.etag = '"v1"'
+
+    async with _make_cache(tmp_path) as cache:
+        assert await cache.fetch(server.url) == (b"remote content", "text/plain")
+
+        # Unchanged
+        assert await cache.fetch(server.url) == (b"remote content", "text/plain")
+        assert server.requests[-1]["if-none-match"] == '"v1"'
+
+        # Changed
+        server.body = b"new content"
+        server.etag = '"v2"'
+        assert await cache.fetch(server.url) == (b"new content", "text/plain")
+
+    assert len(server.requests) == 3
+
+
+async def test_no_store_responses_are_not_cached(server, tmp_path):
+    server.headers["cache-control"] = "no-store"
+
+    async with _make_cache(tmp_path) as cache:
+        await cache.fetch(server.url)
+        await cache.fetch(server.url)
+
+    assert len(server.requests) == 2
+    assert not list(tmp_path.iterdir())
+
+
+async def test_private_responses_are_not_cached(server, tmp_path):
+    server.headers["cache-control"] = "private, max-age=3600"
+
+    async with _make_cache(tmp_path) as cache:
+        await cache.fetch(server.url)
+        await cache.fetch(server.url)
+
+    assert len(server.requests) == 2
+    assert not list(tmp_path.iterdir())
+
+
+async def test_least_recently_used_entries_are_evicted(server, tmp_path):
+    server.headers["cache-control"] = "max-age=3600"
+    urls = [f"{server.url}?{index}" for index in range(3)]
+
+    # Room for two responses
+    async with _make_cache(tmp_path, max_size=2 * len(server.body)) as cache:
+        await cache.fetch(urls[0])
+        await asyncio.sleep(0.01)
+        await cache.fetch(urls[1])
+        await asyncio.sleep(0.01)
+
+        # Using the first entry again makes the second the least recently used
+        await cache.fetch(urls[0])
+        await asyncio.sleep(0.01)
+        await cache.fetch(urls[2])
+
+        assert len(server.requests) == 3
+
+        await cache.fetch(urls[0])
+        await cache.fetch(urls[2])
+        assert len(server.requests) == 3
+
+        await cache.fetch(urls[1])
+        assert len(server.requests) == 4
+
+    assert len(list(tmp_path.glob("*.bin"))) == 2
+
+
+def test_shared_cache_is_closed_with_its_event_loop():
+    async def use_shared_cache() -> rio.remote_assets.RemoteAssetCache:
+        cache = rio.remote_assets.get_shared_cache()
+        assert rio.remote_assets.get_shared_cache() is cache
+
+        # Create the client
+        cache.client
+        return cache
+
+    # Run in a separate thread, since the tests' own event loop may already be
+    # running in this one
+    results: list[rio.remote_assets.RemoteAssetCache] = []
+    thread = threading.Thread(
+        target=lambda: results.append(asyncio.run(use_shared_cache()))
+    )
+    thread.start()
+    thread.join()
+
+    assert results[0]._client is None
+
+
+async def test_cancelled_fetches_dont_abandon_the_download(server, tmp_path):
+    server.headers["cache-control"] = "no-store"
+
+    async with _make_cache(tmp_path) as cache:
+        first = asyncio.create_task(cache.fetch(server.url))
+        await asyncio.sleep(0)
+
+        # The download keeps going, so the next fetch can still join it
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        assert await cache.fetch(server.url) == (b"remote content", "text/plain")
+        assert not cache._in_flight
+
+    assert len(server.requests) == 1
+
+
+async def test_errors_raise_value_error(server, tmp_path):
+    async with _make_cache(tmp_path) as cache:
+        with pytest.raises(ValueError):
+            await cache.fetch(server.url.replace("file.txt", "missing.txt"))
+
+
+async def test_proxy_mode_hosts_remote_assets_locally(server, tmp_path):
+    server.headers["cache-control"] = "max-age=3600"
+
+    async with create_mockapp() as app:
+        app_server = app.session._app_server
+        app_server.app._proxy_remote_assets = True
+
+        await app_server._remote_asset_cache.aclose()
+        app_server._remote_asset_cache = rio.remote_assets.RemoteAssetCache(
+            tmp_path,
+            client=httpx.AsyncClient(trust_env=False),
+        )
+
+        asset = rio.assets.Asset.new(rio.URL(server.url))
+        url = asset._serialize(app.session)
+        assert url.startswith("/rio/asset/temp-")
+
+        for _ in range(2):
+            response = await app_server._serve_asset(
+                types.SimpleNamespace(headers={}, query_params={}),  # type: ignore
+                url.removeprefix("/rio/asset/"),
+            )
+            assert response.body == b"remote content"
+            assert response.media_type == "text/plain"
+
+    assert len(server.requests) == 1
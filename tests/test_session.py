@@ -43,3 +43,32 @@ async def test_default_attachments():
 
         assert session[Settings] == settings_attachment
         assert session[Settings] is not settings_attachment
+
+
+def _sum_of_squares(count: int) -> int:
+    result = 0
+
+    for number in range(count):
+        result += number * number
+        rio.report_progress(number)
+
+    return result
+
+
+async def test_run_in_process():
+    progress: list[int] = []
+
+    async with create_mockapp() as app:
+        result = await app.session.run_in_process(
+            _sum_of_squares,
+            4,
+            on_progress=progress.append,
+        )
+
+        assert result == 0 + 1 + 4 + 9
+
+        # All progress reports are handled before the result is returned
+        assert progress == [0, 1, 2, 3]
+
+        # Outside of a worker process reporting progress does nothing
+        rio.report_progress(5)
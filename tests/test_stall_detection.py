@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+from utils import create_mockapp
+
+import rio
+import rio.stall_detection
+
+
+class SlowComponent(rio.Component):
+    def on_slow_press(self) -> None:
+        time.sleep(0.3)
+
+    def build(self) -> rio.Component:
+        return rio.Button("Press me", on_press=self.on_slow_press)
+
+
+async def test_stalls_are_attributed_to_their_cause() -> None:
+    reports: list[rio.StallReport] = []
+
+    async with create_mockapp(SlowComponent) as app:
+        component = app.get_component(SlowComponent)
+
+        detector = rio.stall_detection.StallDetector(
+            asyncio.get_running_loop(),
+            0.1,
+            reports.append,
+        )
+        detector.start()
+
+        try:
+            await app.session._call_event_handler(
+                component.on_slow_press,
+                refresh=False,
+            )
+
+            # Give the loop a chance to deliver the report
+            await asyncio.sleep(0.05)
+        finally:
+            detector.stop()
+
+    [report] = reports
+    assert report.duration >= 0.1
+    assert report.session is app.session
+    assert report.component_class is SlowComponent
+    assert report.event_handler == "SlowComponent.on_slow_press"
+    assert "time.sleep(0.3)" in report.stack
+    assert "SlowComponent" in str(report)
+
+
+async def test_responsive_loop_is_not_reported() -> None:
+    reports: list[rio.StallReport] = []
+
+    detector = rio.stall_detection.StallDetector(
+        asyncio.get_running_loop(),
+        0.1,
+        reports.append,
+    )
+    detector.start()
+
+    try:
+        await asyncio.sleep(0.3)
+    finally:
+        detector.stop()
+
+    assert not reports
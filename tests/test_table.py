@@ -0,0 +1,180 @@
+import asyncio
+import base64
+
+import pytest
+from utils import create_mockapp
+
+import rio
+import rio.table_data
+import rio.typed_arrays
+
+
+def _make_table_data() -> dict[str, list]:
+    return {
+        "Name": [f"Person {i}" for i in range(1000)],
+        "Group": [i % 3 for i in range(1000)],
+        "Score": [(i * 37) % 101 for i in range(1000)],
+    }
+
+
+async def test_only_a_window_of_rows_is_sent() -> None:
+    data = _make_table_data()
+
+    async with create_mockapp(lambda: rio.Table(data)) as app:
+        table = app.get_component(rio.Table)
+        state = app.last_component_state_changes[table]
+
+        assert state["columnNames"] == ["Name", "Group", "Score"]
+        assert state["numericColumns"] == [False, True, True]
+        assert state["rowCount"] == 1000
+        assert state["windowStart"] == 0
+        assert state["windowColumns"][0] == data["Name"][:100]
+
+        await table._on_message({"type": "requestRows", "start": 500, "count": 20})
+
+        state = app.last_component_state_changes[table]
+        assert state["windowStart"] == 500
+        assert state["windowColumns"][2] == data["Score"][500:520]
+
+
+async def test_sorting_happens_on_the_server() -> None:
+    data = _make_table_data()
+
+    async with create_mockapp(lambda: rio.Table(data)) as app:
+        table = app.get_component(rio.Table)
+
+        await table._on_message({"type": "sort", "column": 2, "ascending": False})
+        await table._on_message({"type": "sort", "column": 1, "ascending": True})
+
+        state = app.last_component_state_changes[table]
+        assert state["sortOrder"] == [[1, True], [2, False]]
+
+        expected = sorted(
+            zip(data["Group"], data["Score"]),
+            key=lambda row: (row[0], -row[1]),
+        )
+        assert list(zip(state["windowColumns"][1], state["windowColumns"][2])) == (
+            expected[:100]
+        )
+
+
+async def _wait_for_row_count(app, table: rio.Table, row_count: int) -> dict:
+    # Filtering happens in a thread, and the table is refreshed once it's done
+    for _ in range(100):
+        state = app.last_component_state_changes.get(table, {})
+
+        if state.get("rowCount") == row_count:
+            return state  # type: ignore
+
+        await asyncio.sleep(0.01)
+
+    assert False, f"The table never showed {row_count} rows"
+
+
+async def test_filtering_happens_on_the_server() -> None:
+    data = _make_table_data()
+
+    async with create_mockapp(lambda: rio.Table(data, filter_text="person 99")) as app:
+        table = app.get_component(rio.Table)
+        state = await _wait_for_row_count(app, table, 11)
+
+        assert state["windowColumns"][0] == [
+            "Person 99",
+            *(f"Person {i}" for i in range(990, 1000)),
+        ]
+
+
+async def test_filtering_doesnt_block_serialization() -> None:
+    data = _make_table_data()
+
+    async with create_mockapp(lambda: rio.Table(data)) as app:
+        table = app.get_component(rio.Table)
+        table_data = table._get_table_data()
+
+        table.filter_text = "person 99"
+        assert not table_data.is_row_order_ready([], "person 99")
+
+        # The rows are still displayed unfiltered while the new order is
+        # computed
+        state = table._custom_serialize()
+        assert state["rowCount"] == 1000
+
+        await _wait_for_row_count(app, table, 11)
+        assert table_data.is_row_order_ready([], "person 99")
+
+
+def test_row_based_data() -> None:
+    data = rio.table_data.wrap([[3, "c"], [1, "a"], [2, "b"], [1, "d"]])
+
+    assert data.column_names is None
+    assert data.num_rows == 4
+
+    row_order = data.get_row_order([(0, False)], "")
+    assert data.get_window(row_order, 0, 4) == [[3, 2, 1, 1], ["c", "b", "a", "d"]]
+
+
+def _decode_typed_array(encoded: dict):
+    numpy = pytest.importorskip("numpy")
+
+    return numpy.frombuffer(
+        base64.b64decode(encoded["bdata"]),
+        dtype=numpy.dtype(encoded["dtype"]).newbyteorder("<"),
+    ).tolist()
+
+
+def test_numpy_data_is_sorted_in_place() -> None:
+    numpy = pytest.importorskip("numpy")
+
+    array = numpy.array([[3.0, 1.0], [1.0, 4.0], [2.0, 0.5]])
+    data = rio.table_data.wrap(array)
+
+    # Numeric columns are sent in binary form
+    row_order = data.get_row_order([(0, True)], "")
+    window = data.get_window(row_order, 0, 3)
+    assert [_decode_typed_array(column) for column in window] == [  # type: ignore
+        [1.0, 2.0, 3.0],
+        [4.0, 0.5, 1.0],
+    ]
+
+    # Filtering matches the text representation of the values
+    row_order = data.get_row_order([], "0.5")
+    window = data.get_window(row_order, 0, 3)
+    assert [_decode_typed_array(column) for column in window] == [  # type: ignore
+        [2.0],
+        [0.5],
+    ]
+
+
+def test_typed_arrays() -> None:
+    numpy = pytest.importorskip("numpy")
+
+    encoded = rio.typed_arrays.encode(numpy.array([1, 2, 3], dtype=">i4"))
+    assert encoded is not None
+    assert encoded["dtype"] == "i4"
+    assert _decode_typed_array(encoded) == [1, 2, 3]
+
+    # plotly.js can't handle 64 bit integers
+    encoded = rio.typed_arrays.encode(
+        numpy.array([1, 2**40]), allow_64_bit_ints=False
+    )
+    assert encoded is not None
+    assert encoded["dtype"] == "f8"
+    assert _decode_typed_array(encoded) == [1.0, 2.0**40]
+
+    # Only numbers can be sent in binary form
+    assert rio.typed_arrays.encode(numpy.array(["a", "b"])) is None
+
+
+def test_polars_data() -> None:
+    polars = pytest.importorskip("polars")
+
+    frame = polars.DataFrame({"a": [3, 1, 2, 1], "b": ["c", "a", "b", "d"]})
+    data = rio.table_data.wrap(frame)
+
+    assert data.column_names == ["a", "b"]
+
+    row_order = data.get_row_order([(0, True), (1, False)], "")
+    assert data.get_window(row_order, 0, 4)[1] == ["d", "a", "b", "c"]
+
+    row_order = data.get_row_order([(0, False)], "A")
+    assert data.get_window(row_order, 0, 4)[1] == ["a"]
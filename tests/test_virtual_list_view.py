@@ -0,0 +1,65 @@
+from utils import create_mockapp
+
+import rio
+from rio.components.virtual_list_view import _VirtualListViewport
+
+
+def _build_list() -> rio.Component:
+    return rio.VirtualListView(
+        item_count=50_000,
+        build_item=lambda index: rio.Text(f"Item {index}"),
+        overscan=5,
+    )
+
+
+def _get_item_texts(app) -> list[str]:
+    viewport = app.get_component(_VirtualListViewport)
+    return [item.text for item in viewport.children]
+
+
+async def test_only_visible_items_are_built() -> None:
+    async with create_mockapp(_build_list) as app:
+        assert _get_item_texts(app) == [f"Item {i}" for i in range(25)]
+
+        viewport = app.get_component(_VirtualListViewport)
+        state = app.last_component_state_changes[viewport]
+        assert state["first_index"] == 0
+        assert state["item_count"] == 50_000
+
+
+async def test_items_are_built_and_evicted_when_scrolling() -> None:
+    async with create_mockapp(_build_list) as app:
+        viewport = app.get_component(_VirtualListViewport)
+        old_items = {item.key: item for item in viewport.children}
+
+        await viewport._on_message({"visibleStart": 15, "visibleEnd": 30})
+
+        assert _get_item_texts(app) == [f"Item {i}" for i in range(10, 35)]
+
+        viewport = app.get_component(_VirtualListViewport)
+        state = app.last_component_state_changes[viewport]
+        assert state["first_index"] == 10
+
+        # Items which remain visible are reused, all others are discarded
+        for item in viewport.children:
+            if item.key in old_items:
+                assert item is old_items[item.key]
+
+        assert len(list(app.get_components(rio.Text))) == 25
+
+
+async def test_item_keys() -> None:
+    def build() -> rio.Component:
+        return rio.VirtualListView(
+            item_count=100,
+            build_item=lambda index: rio.Text(f"Item {index}"),
+            item_key=lambda index: f"item-{index}",
+        )
+
+    async with create_mockapp(build) as app:
+        viewport = app.get_component(_VirtualListViewport)
+        assert [item.key for item in viewport.children[:3]] == [
+            "item-0",
+            "item-1",
+            "item-2",
+        ]